@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Script para archivar en el NAS el audio de todo el catálogo histórico.
+
+Compara las download_url de la base de datos con el inventario del NAS y
+archiva cada episodio que falte (o cuya copia no coincida) usando un pool de
+workers. El resultado de cada episodio se guarda en un archivo de estado para
+que la siguiente ejecución continúe donde se quedó esta.
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Agregar el directorio src al path para importaciones
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from components.config_manager import ConfigManager
+from components.database_manager import DatabaseManager
+from components.archive_backend import create_archive_backend, create_archive_mirrors
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from components.temp_storage import TempStorageManager
+from utils.logger import logger
+from utils.bandwidth import get_bandwidth_governor
+
+
+class ArchiveBackfill:
+    """
+    Archiva en el NAS los episodios que faltan, con prioridad y presupuesto de tiempo.
+    """
+
+    STATE_FILENAME = "archive_backfill_state.json"
+
+    def __init__(self, audio_manager: AudioManager, db_manager: DatabaseManager, state_dir: Path):
+        """
+        Inicializa el backfill.
+
+        Args:
+            audio_manager: Gestor de audio (con inventario del NAS)
+            db_manager: Gestor de base de datos
+            state_dir: Carpeta donde guardar el estado entre ejecuciones
+        """
+        self.audio_manager = audio_manager
+        self.db_manager = db_manager
+        self.state_path = Path(state_dir) / self.STATE_FILENAME
+        self._state_lock = threading.Lock()
+        self.state = self._load_state()
+
+    def plan(self, order: str = "newest", max_attempts: int = 3) -> list:
+        """
+        Calcula la lista de episodios pendientes de archivar, ya ordenada.
+
+        Los episodios nunca intentados van primero (según `order`); después los
+        que fallaron en ejecuciones anteriores, empezando por los de menos intentos.
+
+        Args:
+            order: 'newest' (números altos primero) u 'oldest'
+            max_attempts: Intentos fallidos tras los que un episodio se deja de reintentar
+
+        Returns:
+            list: Filas de podcasts pendientes
+        """
+        candidates = self.db_manager.get_archive_candidates()
+        logger.info(f"📊 {len(candidates)} episodios con URL de descarga en la BD")
+
+        pending = []
+        given_up = 0
+        for podcast in candidates:
+            if not self.audio_manager.needs_archiving(podcast):
+                continue
+
+            entry = self.state['episodes'].get(str(podcast['program_number']), {})
+            if entry.get('status') == 'failed' and entry.get('attempts', 0) >= max_attempts:
+                given_up += 1
+                continue
+            pending.append(podcast)
+
+        newest_first = order == "newest"
+        pending.sort(key=lambda p: (
+            self.state['episodes'].get(str(p['program_number']), {}).get('attempts', 0),
+            -p['program_number'] if newest_first else p['program_number']
+        ))
+
+        logger.info(f"🗂️ {len(pending)} episodios pendientes de archivar")
+        if given_up:
+            logger.info(f"⏭️ {given_up} episodios omitidos por superar {max_attempts} intentos fallidos")
+        return pending
+
+    def run(self, pending: list, workers: int = 2, max_runtime: float | None = None) -> dict:
+        """
+        Archiva los episodios pendientes con un pool de workers.
+
+        Al agotarse el presupuesto de tiempo no se lanzan más episodios; los que
+        ya están en curso terminan con normalidad. Con la estrategia
+        'download_station' los episodios se envían al NAS por lotes en lugar de
+        usar el pool de workers.
+
+        Args:
+            pending: Filas de podcasts a archivar (en orden de prioridad)
+            workers: Número de archivados simultáneos
+            max_runtime: Segundos máximos para lanzar nuevos episodios (None sin límite)
+
+        Returns:
+            dict: Estadísticas de la ejecución
+        """
+        if self.audio_manager.download_station:
+            return self._run_download_station(pending, max_runtime)
+        
+        stats = {'total': len(pending), 'archived': 0, 'failed': 0, 'not_started': 0}
+        deadline = time.monotonic() + max_runtime if max_runtime else None
+        queue = list(pending)
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while queue or in_flight:
+                out_of_time = deadline is not None and time.monotonic() >= deadline
+
+                while queue and len(in_flight) < workers and not out_of_time:
+                    podcast = queue.pop(0)
+                    future = executor.submit(self.audio_manager.archive_podcast, podcast)
+                    in_flight[future] = podcast
+
+                if out_of_time and queue:
+                    logger.warning(f"⏰ Presupuesto de tiempo agotado, {len(queue)} episodios quedan para la próxima ejecución")
+                    stats['not_started'] = len(queue)
+                    queue = []
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    podcast = in_flight.pop(future)
+                    try:
+                        success = future.result()
+                        error = None if success else "archive_podcast devolvió False"
+                    except Exception as e:
+                        success = False
+                        error = str(e)
+
+                    self._record_result(podcast, success, error)
+                    stats['archived' if success else 'failed'] += 1
+                    logger.info(
+                        f"{'✅' if success else '❌'} Episodio {podcast['program_number']} "
+                        f"({stats['archived'] + stats['failed']}/{stats['total']})"
+                    )
+
+        return stats
+
+    def _run_download_station(self, pending: list, max_runtime: float | None = None) -> dict:
+        """
+        Archiva los episodios pendientes con Download Station, por lotes.
+
+        Args:
+            pending: Filas de podcasts a archivar (en orden de prioridad)
+            max_runtime: Segundos máximos para lanzar nuevos lotes (None sin límite)
+
+        Returns:
+            dict: Estadísticas de la ejecución
+        """
+        stats = {'total': len(pending), 'archived': 0, 'failed': 0, 'not_started': 0}
+        deadline = time.monotonic() + max_runtime if max_runtime else None
+        batch_size = self.audio_manager.download_station.batch_size
+
+        for start in range(0, len(pending), batch_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                stats['not_started'] = len(pending) - start
+                logger.warning(f"⏰ Presupuesto de tiempo agotado, {stats['not_started']} episodios quedan para la próxima ejecución")
+                break
+
+            batch = pending[start:start + batch_size]
+            results = self.audio_manager.archive_podcasts(batch)
+            for podcast in batch:
+                success = results.get(podcast['program_number'], False)
+                self._record_result(podcast, success, None if success else "Download Station no completó la descarga")
+                stats['archived' if success else 'failed'] += 1
+            logger.info(f"📦 Lote terminado ({stats['archived'] + stats['failed']}/{stats['total']})")
+
+        return stats
+
+    def _record_result(self, podcast: dict, success: bool, error: str | None) -> None:
+        """Guarda el resultado de un episodio en el archivo de estado."""
+        with self._state_lock:
+            key = str(podcast['program_number'])
+            entry = self.state['episodes'].get(key, {'attempts': 0})
+            entry['status'] = 'archived' if success else 'failed'
+            entry['attempts'] = 0 if success else entry.get('attempts', 0) + 1
+            entry['last_error'] = error
+            entry['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            self.state['episodes'][key] = entry
+            self._save_state()
+
+    def _load_state(self) -> dict:
+        """Carga el estado de ejecuciones anteriores."""
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ No se pudo leer el estado del backfill, se empieza de cero: {e}")
+        return {'episodes': {}}
+
+    def _save_state(self) -> None:
+        """Guarda el estado de forma atómica."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.state_path)
+
+
+def main():
+    """
+    Función principal del script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Archiva en el NAS el audio de los episodios que faltan",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python archive_backfill.py                              # Archivar todo lo que falte
+  python archive_backfill.py --workers 4 --order oldest   # 4 en paralelo, empezando por los antiguos
+  python archive_backfill.py --max-runtime 60             # Lanzar episodios durante 60 minutos como máximo
+  python archive_backfill.py --dry-run                    # Solo mostrar el plan
+        """
+    )
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Número de episodios archivados en paralelo (default: 2)')
+    parser.add_argument('--order', choices=['newest', 'oldest'], default='newest',
+                        help='Prioridad: episodios más nuevos o más antiguos primero (default: newest)')
+    parser.add_argument('--max-runtime', type=float, metavar='MINUTOS',
+                        help='Minutos durante los que se lanzan nuevos episodios')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help='Intentos fallidos tras los que se deja de reintentar un episodio (default: 3)')
+    parser.add_argument('--limit', type=int,
+                        help='Número máximo de episodios a archivar en esta ejecución')
+    parser.add_argument('--refresh-inventory', action='store_true',
+                        help='Ignorar el inventario cacheado y volver a listar el NAS')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Mostrar los episodios pendientes sin archivar nada')
+
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        logger.error("❌ El número de workers debe ser al menos 1")
+        sys.exit(1)
+
+    db_manager = None
+    archive_backend = None
+    try:
+        logger.info("🚀 Iniciando backfill del archivo de audio")
+
+        config_manager = ConfigManager()
+        supabase_credentials = config_manager.get_supabase_credentials()
+        archive_config = config_manager.get_archive_config()
+        cache_dir = config_manager.get_cache_dir()
+        get_bandwidth_governor().configure(**config_manager.get_bandwidth_config())
+
+        db_manager = DatabaseManager(
+            supabase_url=supabase_credentials["url"],
+            supabase_key=supabase_credentials["key"]
+        )
+        archive_backend = create_archive_backend(config_manager)
+        if not archive_backend.login():
+            raise Exception("No se pudo conectar con el archivo de audio")
+
+        inventory = NASInventory(archive_backend, cache_dir=cache_dir, ttl_seconds=archive_config['inventory_ttl'])
+        if args.refresh_inventory:
+            inventory.invalidate()
+
+        temp_storage = TempStorageManager(**config_manager.get_temp_storage_config())
+        mirrors = [m for m in create_archive_mirrors(config_manager) if m['backend'].login()]
+        if args.refresh_inventory:
+            for mirror in mirrors:
+                mirror['inventory'].invalidate()
+        audio_manager = AudioManager(db_manager, archive_backend, archive_config, inventory, temp_storage, mirrors)
+        backfill = ArchiveBackfill(audio_manager, db_manager, cache_dir)
+
+        pending = backfill.plan(order=args.order, max_attempts=args.max_attempts)
+        if args.limit:
+            pending = pending[:args.limit]
+
+        if args.dry_run:
+            logger.info("🔍 === MODO DRY RUN ===")
+            for podcast in pending:
+                logger.info(f"  #{podcast['program_number']}: {podcast.get('title', 'Sin título')} ({podcast.get('file_size') or '?'} bytes)")
+            total_bytes = sum(p.get('file_size') or 0 for p in pending)
+            logger.info(f"📦 {len(pending)} episodios, ~{total_bytes / 1024 / 1024:.0f} MB")
+            return
+
+        max_runtime = args.max_runtime * 60 if args.max_runtime else None
+        stats = backfill.run(pending, workers=args.workers, max_runtime=max_runtime)
+
+        logger.info("📊 === REPORTE DEL BACKFILL ===")
+        logger.info(f"🗂️ Episodios pendientes: {stats['total']}")
+        logger.info(f"✅ Archivados: {stats['archived']}")
+        logger.info(f"❌ Con errores: {stats['failed']}")
+        logger.info(f"⏰ Sin lanzar (presupuesto de tiempo): {stats['not_started']}")
+        get_bandwidth_governor().log_summary()
+        temp_storage.log_usage()
+
+    except KeyboardInterrupt:
+        logger.warning("⚠️ Backfill cancelado por el usuario")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"❌ Error en el backfill: {e}")
+        sys.exit(1)
+    finally:
+        if archive_backend:
+            archive_backend.logout()
+        if db_manager:
+            db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark del tokenizador de playlists (utils/playlist_tokenizer.py).
+
+Parsea todas las playlists históricas del feed RSS con los tres parsers del
+proyecto (RSSDataProcessor, SongProcessor y WordPressClient) y muestra el
+rendimiento de cada uno en canciones por segundo. Si el feed no tiene
+playlists (por ejemplo feed.xml, que solo trae los títulos) o no se puede
+descargar, usa playlists sintéticas con el mismo formato.
+"""
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# Agregar el directorio src al path para importaciones
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from components.config_manager import ConfigManager
+from components.rss_data_processor import RSSDataProcessor
+from components.rss_feed_parser import parse_entries
+from components.song_processor import SongProcessor
+from components.wordpress_client import WordPressClient
+from utils.logger import logger
+
+
+def load_feed_playlists(source) -> list:
+    """Descripciones del feed que contienen una playlist ('::')."""
+    entries = parse_entries(source, 'lxml')
+    return [entry['summary'] for entry in entries if '::' in entry.get('summary', '')]
+
+
+def build_synthetic_playlists(count: int) -> list:
+    """Playlists al estilo de Popcasting: 20 canciones con separadores variados y el pie de Ko-fi."""
+    separators = (' · ', ' · ', ' · ', ' - ', ': ', ' – ')
+    playlists = []
+    for n in range(count):
+        songs = [f"Artista {n}.{i} &amp; Los Suyos{separators[i % len(separators)]}Canción número {i} (versión)"
+                 for i in range(1, 21)]
+        playlists.append(' :: '.join(songs) + " :::::: invita a Popcasting a café https://ko-fi.com/popcasting")
+    return playlists
+
+
+def measure(parse, playlists: list, repeat: int):
+    """Devuelve (mejor tiempo en segundos, canciones extraídas por pasada)."""
+    best = None
+    songs = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        songs = sum(len(parse(playlist)) for playlist in playlists)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, songs
+
+
+def main():
+    """
+    Función principal del script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Mide el rendimiento (canciones/s) de los parsers de playlists",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python benchmark_playlist_parsing.py                       # Playlists del feed de config.ini
+  python benchmark_playlist_parsing.py --feed feed_completo.xml --repeat 20
+  python benchmark_playlist_parsing.py --synthetic 5000      # Sin red
+        """
+    )
+    parser.add_argument('--feed', help='URL o archivo del feed (default: [rss] url de config.ini)')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Usar N playlists sintéticas en lugar del feed')
+    parser.add_argument('--repeat', type=int, default=10, help='Repeticiones; se toma la mejor (default: 10)')
+    args = parser.parse_args()
+
+    playlists = []
+    if not args.synthetic:
+        feed = args.feed or ConfigManager().get_rss_url()
+        try:
+            playlists = load_feed_playlists(feed)
+            logger.info(f"📰 {len(playlists)} playlists históricas en {feed}")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo leer el feed {feed}: {e}")
+        if not playlists:
+            logger.warning("⚠️ El feed no tiene playlists; se usan 500 playlists sintéticas")
+    if not playlists:
+        playlists = build_synthetic_playlists(args.synthetic or 500)
+
+    # Los mensajes por canción ensucian la medición
+    logger.setLevel(logging.WARNING)
+    logging.getLogger('components.song_processor').setLevel(logging.WARNING)
+
+    rss_processor = RSSDataProcessor("")
+    song_processor = SongProcessor(None)
+    wordpress_client = WordPressClient("")
+    parsers = (
+        ("RSSDataProcessor", lambda text: rss_processor._process_rss_playlist(text).split('"position"')[1:]),
+        ("SongProcessor", song_processor._parse_rss_playlist_string),
+        ("WordPressClient", lambda text: wordpress_client._parse_popcasting_playlist_text(
+            wordpress_client._clean_unicode_text(text))),
+    )
+
+    print(f"🎵 {len(playlists)} playlists, mejor de {args.repeat} pasadas")
+    for name, parse in parsers:
+        seconds, songs = measure(parse, playlists, args.repeat)
+        rate = songs / seconds if seconds else 0.0
+        print(f"   {name:<17} {songs:>7} canciones {seconds * 1000:9.1f} ms {rate:>12,.0f} canciones/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los motores de parseo del feed RSS (feedparser y lxml).
+
+Procesa feed.xml y un feed sintético grande con RSSDataProcessor usando cada
+motor, mide el tiempo y comprueba que los episodios resultantes son idénticos.
+"""
+
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+# Agregar el directorio src al path para importaciones
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from components.rss_data_processor import RSSDataProcessor
+from components.rss_feed_parser import PARSER_ENGINES
+from utils.logger import logger
+
+
+def build_synthetic_feed(path: Path, items: int) -> None:
+    """Escribe un feed con `items` episodios al estilo de Popcasting (con playlist en la descripción)."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">\n'
+                '<channel><title>Popcasting</title><link>https://popcastingpop.com/</link>\n')
+        for n in range(items, 0, -1):
+            playlist = ' :: '.join(f"Artista {n}-{i} · Canción número {i} (versión & remezcla)" for i in range(1, 21))
+            f.write(
+                f"<item><title>Popcasting{n}{' (especial)' if n % 50 == 0 else ''}</title>"
+                f"<link>https://popcastingpop.com/episodios/{n}</link>"
+                f"<pubDate>Thu, 24 Jul 2025 18:00:00 +0000</pubDate>"
+                f'<guid isPermaLink="false">https://popcastingpop.com/popcasting-{n}/</guid>'
+                f'<enclosure url="https://www.ivoox.com/popcasting{n}_feed.mp3" length="{100_000_000 + n}" type="audio/mpeg"/>'
+                f"<itunes:episode>{n}</itunes:episode><itunes:duration>01:{n % 60:02d}:12</itunes:duration>"
+                f'<itunes:image href="https://cdn.popcastingpop.com/{n}.jpg"/>'
+                f"<description><![CDATA[{playlist} :::::: invita a Popcasting a café https://ko-fi.com/popcasting]]></description>"
+                f"<itunes:summary>{escape(playlist)}</itunes:summary></item>\n"
+            )
+        f.write('</channel></rss>\n')
+
+
+def run_engine(source: Path, engine: str, repeat: int):
+    """Procesa el feed `repeat` veces y devuelve (mejor tiempo en segundos, episodios)."""
+    processor = RSSDataProcessor(str(source), engine)
+    best = None
+    episodes = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        episodes = processor.fetch_and_process_entries()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, episodes
+
+
+def main():
+    """
+    Función principal del script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compara la velocidad y la salida de los motores de parseo del RSS",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python benchmark_rss_parser.py                    # feed.xml y un feed sintético de 5000 episodios
+  python benchmark_rss_parser.py --items 20000 --repeat 5
+        """
+    )
+    parser.add_argument('--feed', type=Path, default=current_dir / "feed.xml", help='Feed real a medir')
+    parser.add_argument('--items', type=int, default=5000, help='Episodios del feed sintético (default: 5000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por motor; se toma la mejor (default: 3)')
+    args = parser.parse_args()
+
+    # Los mensajes por episodio ensucian la medición
+    logger.setLevel(logging.WARNING)
+
+    identical_everywhere = True
+    with tempfile.TemporaryDirectory() as work:
+        synthetic = Path(work) / "synthetic_feed.xml"
+        build_synthetic_feed(synthetic, args.items)
+
+        for label, source in (("feed.xml", args.feed), (f"sintético ({args.items} episodios)", synthetic)):
+            timings = {}
+            outputs = {}
+            for engine in PARSER_ENGINES:
+                timings[engine], outputs[engine] = run_engine(source, engine, args.repeat)
+
+            identical = outputs['feedparser'] == outputs['lxml']
+            identical_everywhere &= identical
+            print(f"📰 {label}: {len(outputs['lxml'])} episodios")
+            for engine in PARSER_ENGINES:
+                print(f"   {engine:<10} {timings[engine] * 1000:9.1f} ms")
+            print(f"   🚀 lxml es {timings['feedparser'] / timings['lxml']:.1f}x más rápido - "
+                  f"salida {'idéntica ✅' if identical else 'DISTINTA ❌'}")
+
+    if not identical_everywhere:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
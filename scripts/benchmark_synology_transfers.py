@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Benchmark de subidas y descargas con SynologyClient.
+
+Por defecto arranca el NAS falso de tests/fake_synology_server.py en otro
+proceso (con latencia y ancho de banda configurables), así que se puede
+ejecutar sin el NAS real. Para cada tamaño de archivo y nivel de concurrencia
+mide MB/s, el pico de memoria del proceso y el número de peticiones HTTP.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Agregar el directorio src al path para importaciones
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from components.synology_client import SynologyClient
+from utils.logger import logger
+
+
+FAKE_SERVER = current_dir / "tests" / "fake_synology_server.py"
+FAKE_USER = "bench"
+FAKE_PASSWORD = "bench"
+
+
+class PeakMemorySampler:
+    """Muestrea en segundo plano la memoria residente (RSS) del proceso y guarda el pico."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.baseline = self.peak = _current_rss()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.baseline = self.peak = _current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def delta_mb(self) -> float:
+        return (self.peak - self.baseline) / 1024 / 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss())
+
+
+def _current_rss() -> int:
+    """Memoria residente actual en bytes (Linux: /proc; otros sistemas: pico de getrusage)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_server(root: Path, latency_ms: float, bandwidth_mbps: float):
+    """Arranca el NAS falso en otro proceso y espera a que acepte conexiones."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(FAKE_SERVER), '--port', str(port), '--root', str(root),
+         '--user', FAKE_USER, '--password', FAKE_PASSWORD,
+         '--latency-ms', str(latency_ms), '--bandwidth-mbps', str(bandwidth_mbps)],
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise Exception("El NAS falso no arrancó")
+
+
+def make_source_file(folder: Path, size_mb: int) -> Path:
+    """Crea un archivo de `size_mb` MB con datos aleatorios, escrito por bloques."""
+    path = folder / f"bench_{size_mb}mb.bin"
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+    return path
+
+
+class TransferBenchmark:
+    """Ejecuta los escenarios de subida y descarga con un cliente ya autenticado."""
+
+    def __init__(self, client: SynologyClient, remote_root: str, work_dir: Path):
+        self.client = client
+        self.remote_root = remote_root.rstrip('/')
+        self.work_dir = work_dir
+        self._requests = 0
+        self._lock = threading.Lock()
+        client.session.hooks['response'].append(self._count_request)
+
+    def _count_request(self, response, *args, **kwargs):
+        with self._lock:
+            self._requests += 1
+
+    def run(self, sizes: list, concurrencies: list, files: int) -> list:
+        """
+        Returns:
+            list: Una fila por escenario {op, size_mb, concurrency, files, seconds, mbps, peak_rss_mb, requests}
+        """
+        results = []
+        for size_mb in sizes:
+            source = make_source_file(self.work_dir, size_mb)
+            for concurrency in concurrencies:
+                folder = f"{self.remote_root}/{size_mb}mb_c{concurrency}"
+                remote_paths = [f"{folder}/{i:02d}/{source.name}" for i in range(files)]
+                results.append(self._measure('upload', size_mb, concurrency, files,
+                                             partial(self._upload_all, source, remote_paths, concurrency)))
+                results.append(self._measure('download', size_mb, concurrency, files,
+                                             partial(self._download_all, remote_paths, concurrency)))
+            source.unlink()
+        return results
+
+    def _measure(self, op, size_mb, concurrency, files, action) -> dict:
+        logger.info(f"⏱️ {op} {files} x {size_mb} MB con concurrencia {concurrency}...")
+        with self._lock:
+            self._requests = 0
+        with PeakMemorySampler() as memory:
+            start = time.monotonic()
+            ok = action()
+            seconds = time.monotonic() - start
+        total_mb = size_mb * files
+        return {
+            'op': op, 'size_mb': size_mb, 'concurrency': concurrency, 'files': files, 'ok': ok,
+            'seconds': round(seconds, 3), 'mbps': round(total_mb / seconds, 2) if seconds else 0.0,
+            'peak_rss_mb': round(memory.delta_mb, 1), 'requests': self._requests,
+        }
+
+    def _upload_all(self, source: Path, remote_paths: list, concurrency: int) -> bool:
+        def upload(remote_path):
+            return self.client.upload_file_streaming(source, os.path.dirname(remote_path), overwrite=True)['success']
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return all(executor.map(upload, remote_paths))
+
+    def _download_all(self, remote_paths: list, concurrency: int) -> bool:
+        # Cada archivo a su carpeta: en el NAS todos se llaman igual
+        def download(indexed):
+            index, remote_path = indexed
+            return self.client.download_file(remote_path, str(self.work_dir / "down" / f"{index:02d}"))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            ok = all(executor.map(download, enumerate(remote_paths)))
+        for local in (self.work_dir / "down").glob("*/*"):
+            local.unlink()
+        return ok
+
+
+def main():
+    """
+    Función principal del script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Mide el rendimiento de subidas y descargas con SynologyClient",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python benchmark_synology_transfers.py                                   # NAS falso, sin límites
+  python benchmark_synology_transfers.py --latency-ms 5 --bandwidth-mbps 900 # Simular una LAN gigabit
+  python benchmark_synology_transfers.py --sizes 1,50,200 --concurrency 1,8
+  python benchmark_synology_transfers.py --real-nas --remote-folder /tmp/bench # NAS del .env
+        """
+    )
+    parser.add_argument('--sizes', default='1,10,50', help='Tamaños de archivo en MB (default: 1,10,50)')
+    parser.add_argument('--concurrency', default='1,4', help='Niveles de concurrencia (default: 1,4)')
+    parser.add_argument('--files', type=int, default=4, help='Archivos por escenario (default: 4)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latencia por petición del NAS falso')
+    parser.add_argument('--bandwidth-mbps', type=float, default=0,
+                        help='Ancho de banda por conexión del NAS falso en Mbit/s (0 = sin límite)')
+    parser.add_argument('--real-nas', action='store_true', help='Usar el NAS configurado en .env')
+    parser.add_argument('--remote-folder', default='/benchmark', help='Carpeta de trabajo en el NAS')
+    parser.add_argument('--json', type=Path, help='Guardar los resultados en un archivo JSON')
+
+    args = parser.parse_args()
+    sizes = [int(x) for x in args.sizes.split(',')]
+    concurrencies = [int(x) for x in args.concurrency.split(',')]
+
+    server = None
+    client = None
+    with tempfile.TemporaryDirectory(prefix="synology_bench_") as work:
+        work_dir = Path(work)
+        try:
+            if args.real_nas:
+                client = SynologyClient(pool_size=max(concurrencies))
+            else:
+                server, port = start_fake_server(work_dir / "nas", args.latency_ms, args.bandwidth_mbps)
+                client = SynologyClient('127.0.0.1', port, FAKE_USER, FAKE_PASSWORD, pool_size=max(concurrencies))
+            if not client.login():
+                raise Exception("No se pudo iniciar sesión")
+
+            results = TransferBenchmark(client, args.remote_folder, work_dir).run(sizes, concurrencies, args.files)
+
+            logger.info("📊 === RESULTADOS ===")
+            logger.info(f"{'op':<9}{'MB':>6}{'conc':>6}{'arch':>6}{'seg':>9}{'MB/s':>9}{'RSS MB':>9}{'peticiones':>12}")
+            for row in results:
+                logger.info(f"{row['op']:<9}{row['size_mb']:>6}{row['concurrency']:>6}{row['files']:>6}"
+                            f"{row['seconds']:>9.2f}{row['mbps']:>9.1f}{row['peak_rss_mb']:>9.1f}"
+                            f"{row['requests']:>12}{'' if row['ok'] else '  ❌'}")
+
+            if args.json:
+                with open(args.json, 'w', encoding='utf-8') as f:
+                    json.dump(results, f, indent=2)
+                logger.info(f"📄 Resultados guardados en {args.json}")
+
+        except KeyboardInterrupt:
+            logger.warning("⚠️ Benchmark cancelado por el usuario")
+            sys.exit(1)
+        except Exception as e:
+            logger.error(f"❌ Error en el benchmark: {e}")
+            sys.exit(1)
+        finally:
+            if client:
+                client.logout()
+            if server:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -40,13 +40,10 @@ class RSSPlaylistFiller:
             supabase_config['key']
         )
         
-        # Crear instancia del procesador RSS (solo para usar sus métodos de procesamiento)
+        # Procesador RSS: sus métodos de procesamiento y la instantánea del feed
+        # (descargada una vez e indexada por número de programa)
         self.rss_processor = RSSDataProcessor("https://feeds.feedburner.com/popcasting")
         
-        # Cache para datos del RSS
-        self._rss_cache = None
-        self._rss_cache_timestamp = None
-        
         logger.info("🚀 RSSPlaylistFiller inicializado")
     
     def process_all_podcasts(self, batch_size: int = 50, dry_run: bool = False, max_podcasts: int = None):
@@ -280,19 +277,11 @@ class RSSPlaylistFiller:
             str: Texto de playlist o cadena vacía
         """
         try:
-            # Usar cache del RSS si está disponible
-            episodes = self._get_rss_episodes()
-            
-            # Buscar el episodio por número de programa
-            for episode in episodes:
-                if episode.get('program_number') == program_number:
-                    # Obtener el texto original del RSS (antes del procesamiento)
-                    # Necesitamos acceder al summary original, no al rss_playlist ya procesado
-                    logger.debug(f"🎵 Encontrado episodio {program_number} en RSS")
-                    # Buscar en campos que podrían contener el texto original
-                    original_text = episode.get('summary', '') or episode.get('description', '') or episode.get('content', '')
-                    if original_text and not self._is_valid_json_playlist(original_text):
-                        return original_text
+            # Texto original de la descripción (antes del procesamiento), desde la instantánea del feed
+            original_text = self.rss_processor.get_snapshot().raw_playlist(program_number)
+            if original_text and not self._is_valid_json_playlist(original_text):
+                logger.debug(f"🎵 Encontrado episodio {program_number} en RSS")
+                return original_text
             
             logger.debug(f"⚠️ Episodio {program_number} no encontrado en RSS actual")
             return ""
@@ -301,32 +290,6 @@ class RSSPlaylistFiller:
             logger.error(f"❌ Error obteniendo datos del RSS para programa {program_number}: {e}")
             return ""
     
-    def _get_rss_episodes(self) -> list:
-        """
-        Obtiene los episodios del RSS con cache para evitar descargas repetidas.
-        
-        Returns:
-            list: Lista de episodios del RSS
-        """
-        import time
-        
-        # Verificar si el cache es válido (menos de 5 minutos)
-        current_time = time.time()
-        if (self._rss_cache is not None and 
-            self._rss_cache_timestamp is not None and 
-            current_time - self._rss_cache_timestamp < 300):  # 5 minutos
-            
-            logger.debug("📦 Usando cache del RSS")
-            return self._rss_cache
-        
-        # Descargar RSS y actualizar cache
-        logger.info("📡 Descargando RSS para obtener datos de playlist...")
-        self._rss_cache = self.rss_processor.fetch_and_process_entries()
-        self._rss_cache_timestamp = current_time
-        
-        logger.info(f"✅ RSS descargado: {len(self._rss_cache)} episodios")
-        return self._rss_cache
-    
     def _is_valid_json_playlist(self, text: str) -> bool:
         """
         Verifica si un texto es una playlist JSON válida ya procesada.
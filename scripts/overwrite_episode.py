@@ -21,32 +21,97 @@ from components.rss_data_processor import RSSDataProcessor
 from components.wordpress_data_processor import WordPressDataProcessor
 from components.wordpress_client import WordPressClient
 from components.data_processor import DataProcessor
+from components.wordpress_url_map import WordPressURLMap
+from utils.http_cache import get_http_cache
 from utils.logger import logger
 
 
-def find_episode_by_number(episodes: list, target_number: int) -> dict:
+def select_feed(config_manager: ConfigManager, feed_name: str = None) -> dict:
     """
-    Busca un episodio específico por número de programa.
+    Elige el programa (sección [feed:*] de config.ini) cuyos episodios se sobreescriben.
     
     Args:
-        episodes: Lista de episodios procesados
-        target_number: Número del episodio a buscar
+        config_manager: Configuración cargada
+        feed_name: Nombre del programa (opcional si solo hay uno)
         
     Returns:
-        dict: Datos del episodio encontrado o None
+        dict: Programa de ConfigManager.get_feeds()
+        
+    Raises:
+        ValueError: Si el programa no existe o hay varios y no se indica cuál
+    """
+    feeds = {feed['name']: feed for feed in config_manager.get_feeds()}
+    if feed_name is None:
+        if len(feeds) > 1:
+            raise ValueError(f"Hay varios programas configurados; indica uno con --feed ({', '.join(feeds)})")
+        return next(iter(feeds.values()))
+    if feed_name not in feeds:
+        raise ValueError(f"No existe el programa '{feed_name}' en config.ini ({', '.join(feeds)})")
+    return feeds[feed_name]
+
+
+def build_components(config_manager: ConfigManager, feed: dict, episode_numbers: list,
+                     wordpress_index: dict = None) -> dict:
+    """
+    Inicializa una sola vez los componentes de main.py para todos los episodios a sobreescribir.
+    
+    Args:
+        config_manager: Configuración cargada
+        feed: Programa de ConfigManager.get_feeds() (RSS, WordPress y tablas del programa)
+        episode_numbers: Episodios que se van a sobreescribir (se vuelven a buscar aunque constaran sin post)
+        wordpress_index: Índice de WordPressClient.build_index() (evita descargar la página del post)
+        
+    Returns:
+        dict: db_manager, rss_processor, wordpress_client (None si el programa no tiene web) y data_processor
     """
-    for episode in episodes:
-        if episode.get('program_number') == target_number:
-            return episode
-    return None
+    logger.info(f"🔧 Inicializando componentes de {feed['name']}...")
+    supabase_credentials = config_manager.get_supabase_credentials()
+    
+    # Gestor de base de datos con las tablas del programa
+    db_manager = DatabaseManager(
+        supabase_url=supabase_credentials["url"],
+        supabase_key=supabase_credentials["key"]
+    ).for_tables(feed['podcasts_table'], feed['songs_table'])
+    
+    # Procesadores de datos (igual que main.create_feed_sync)
+    rss_processor = RSSDataProcessor(feed['rss_url'], feed['parser'], title_prefix=feed['title_prefix'])
+    wordpress_processor = WordPressDataProcessor()
+    wordpress_client = None
+    url_map = None
+    if feed['wordpress_api_url']:
+        wordpress_client = WordPressClient(feed['wordpress_api_url'], feed['post_slug_template'])
+        wordpress_client.post_index = wordpress_index
+        # Mismo mapa de URLs que main.py; se reintenta aunque el episodio constara sin post
+        url_map_config = config_manager.get_wordpress_url_map_config()
+        if url_map_config['cache_dir']:
+            url_map = WordPressURLMap(url_map_config['cache_dir'], url_map_config['miss_retry_seconds'],
+                                      cache_filename=f"wordpress_urls_{feed['name']}.json")
+            for episode_number in episode_numbers:
+                if url_map.is_missing(episode_number):
+                    url_map.forget(episode_number)
+    data_processor = DataProcessor(rss_processor, wordpress_processor, url_map)
+    
+    logger.info("✅ Todos los componentes inicializados correctamente")
+    return {
+        'db_manager': db_manager,
+        'rss_processor': rss_processor,
+        'wordpress_client': wordpress_client,
+        'data_processor': data_processor,
+    }
 
 
-def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, verbose: bool = False) -> bool:
+def overwrite_episode_in_database(episode_number: int, db_manager: DatabaseManager, rss_snapshot,
+                                  data_processor: DataProcessor, wordpress_client: WordPressClient,
+                                  dry_run: bool = False, verbose: bool = False) -> bool:
     """
     Sobreescribe un episodio específico en la base de datos usando el mismo flujo que main.py.
     
     Args:
         episode_number: Número del episodio a sobreescribir
+        db_manager: Gestor de base de datos (compartido por todos los episodios)
+        rss_snapshot: Episodios del RSS ya descargados (RSSDataProcessor.get_snapshot())
+        data_processor: Procesador que unifica RSS y WordPress
+        wordpress_client: Cliente de WordPress (con el índice del catálogo, si lo hay; None si no hay web)
         dry_run: Si es True, solo muestra los datos sin actualizar la BD
         verbose: Si mostrar información detallada
         
@@ -56,38 +121,9 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
     try:
         logger.info(f"🔄 Iniciando sobreescritura del episodio {episode_number}")
         
-        # 1. Cargar configuración (igual que main.py)
-        logger.info("📋 Cargando configuración...")
-        config_manager = ConfigManager()
-        supabase_credentials = config_manager.get_supabase_credentials()
-        rss_url = config_manager.get_rss_url()
-        wordpress_config = config_manager.get_wordpress_config()
-        
-        # 2. Inicializar componentes (igual que main.py)
-        logger.info("🔧 Inicializando componentes...")
-        
-        # Gestor de base de datos
-        db_manager = DatabaseManager(
-            supabase_url=supabase_credentials["url"],
-            supabase_key=supabase_credentials["key"]
-        )
-        
-        # Procesadores de datos
-        rss_processor = RSSDataProcessor(rss_url)
-        wordpress_processor = WordPressDataProcessor()
-        wordpress_client = WordPressClient(wordpress_config['api_url'])
-        data_processor = DataProcessor(rss_processor, wordpress_processor)
-        
-        logger.info("✅ Todos los componentes inicializados correctamente")
-        
-        # 3. Obtener episodios del RSS (igual que main.py)
-        logger.info("📻 Descargando episodios del RSS...")
-        rss_episodes = rss_processor.fetch_and_process_entries()
-        logger.info(f"📊 Encontrados {len(rss_episodes)} episodios en el RSS")
-        
-        # 4. Buscar el episodio específico
+        # 1. Buscar el episodio específico
         logger.info(f"🔍 Buscando episodio número {episode_number}...")
-        target_episode = find_episode_by_number(rss_episodes, episode_number)
+        target_episode = rss_snapshot.get_by_program_number(episode_number)
         
         if not target_episode:
             logger.error(f"❌ No se encontró el episodio número {episode_number}")
@@ -95,7 +131,7 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
         
         logger.info(f"✅ Episodio encontrado: {target_episode.get('title', 'Sin título')}")
         
-        # 5. Verificar si el episodio ya existe en la base de datos
+        # 2. Verificar si el episodio ya existe en la base de datos
         logger.info("🔍 Verificando si el episodio existe en la base de datos...")
         existing_episode = db_manager.get_podcast_by_program_number(episode_number)
         
@@ -107,7 +143,7 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
             if not dry_run:
                 # Eliminar el episodio existente para evitar conflictos
                 logger.info(f"🗑️ Eliminando episodio existente con ID: {existing_episode.get('id')}")
-                delete_result = db_manager.client.table('podcasts').delete().eq('id', existing_episode.get('id')).execute()
+                delete_result = db_manager.client.table(db_manager.podcasts_table).delete().eq('id', existing_episode.get('id')).execute()
                 if delete_result.data:
                     logger.info(f"✅ Episodio {existing_episode.get('id')} eliminado correctamente")
                 else:
@@ -115,18 +151,21 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
         else:
             logger.info("📊 Episodio no encontrado en BD, se creará uno nuevo")
         
-        # 6. Procesar y unificar con datos de WordPress (igual que main.py)
-        logger.info("🔗 Enriqueciendo datos con WordPress...")
-        episode_data = data_processor.process_single_episode(
-            rss_episode=target_episode,
-            wordpress_client=wordpress_client
-        )
+        # 3. Procesar y unificar con datos de WordPress, si el programa tiene web (igual que main.py)
+        if wordpress_client:
+            logger.info("🔗 Enriqueciendo datos con WordPress...")
+            episode_data = data_processor.process_single_episode(
+                rss_episode=target_episode,
+                wordpress_client=wordpress_client
+            )
+        else:
+            episode_data = target_episode
         
         if not episode_data:
             logger.warning("⚠️ No se pudieron obtener datos unificados")
             return False
         
-        # 7. Mostrar información del episodio
+        # 4. Mostrar información del episodio
         logger.info("📋 === INFORMACIÓN DEL EPISODIO A ACTUALIZAR ===")
         logger.info(f"🎵 Título: {episode_data.get('title', 'Sin título')}")
         logger.info(f"📅 Fecha: {episode_data.get('date', 'Sin fecha')}")
@@ -136,16 +175,17 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
         logger.info(f"🔗 URL: {episode_data.get('url', 'Sin URL')}")
         
         # Información de WordPress si está disponible
-        if episode_data.get('wordpress_id'):
+        wordpress_post = episode_data.wordpress
+        if wordpress_post and wordpress_post.wordpress_id:
             logger.info("🌐 === DATOS DE WORDPRESS ===")
-            logger.info(f"🆔 WordPress ID: {episode_data.get('wordpress_id')}")
-            logger.info(f"📝 Título WordPress: {episode_data.get('wordpress_title', 'Sin título')}")
-            logger.info(f"📄 Extracto: {episode_data.get('wordpress_excerpt', 'Sin extracto')[:100]}...")
-            logger.info(f"🏷️ Categorías: {', '.join(episode_data.get('wordpress_categories', []))}")
-            logger.info(f"🏷️ Tags: {', '.join(episode_data.get('wordpress_tags', []))}")
+            logger.info(f"🆔 WordPress ID: {wordpress_post.wordpress_id}")
+            logger.info(f"📝 Título WordPress: {wordpress_post.title or 'Sin título'}")
+            logger.info(f"📄 Extracto: {(wordpress_post.excerpt or 'Sin extracto')[:100]}...")
+            logger.info(f"🏷️ Categorías: {', '.join(c.get('name', '') for c in wordpress_post.categories)}")
+            logger.info(f"🏷️ Tags: {', '.join(t.get('name', '') for t in wordpress_post.tags)}")
             
-            if episode_data.get('wordpress_playlist_data'):
-                logger.info(f"🎵 Playlist WordPress: {len(episode_data['wordpress_playlist_data'])} canciones")
+            if wordpress_post.playlist_data:
+                logger.info(f"🎵 Playlist WordPress: {len(wordpress_post.playlist_data)} canciones")
         
         # Información de playlists
         logger.info("🎵 === INFORMACIÓN DE PLAYLISTS ===")
@@ -155,7 +195,7 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
             if verbose:
                 logger.info(f"📻 Contenido RSS: {rss_playlist[:200]}...")
         
-        web_playlist = episode_data.get('wordpress_playlist_data', [])
+        web_playlist = wordpress_post.playlist_songs if wordpress_post else None
         if web_playlist and isinstance(web_playlist, list):
             logger.info(f"🌐 Playlist Web: {len(web_playlist)} canciones")
             if verbose and web_playlist:
@@ -164,7 +204,7 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
         else:
             logger.info("🌐 Playlist Web: No disponible")
         
-        # 8. Ejecutar la actualización o mostrar preview
+        # 5. Ejecutar la actualización o mostrar preview
         if dry_run:
             logger.info("🔍 === MODO DRY RUN ===")
             logger.info("📝 Los datos están listos para ser insertados")
@@ -173,7 +213,7 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
             # Guardar datos en archivo temporal para revisión
             temp_file = f"episodio_{episode_number}_preview.json"
             with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(episode_data, f, indent=2, ensure_ascii=False, default=str)
+                json.dump(episode_data.to_dict(), f, indent=2, ensure_ascii=False, default=str)
             logger.info(f"💾 Datos guardados en {temp_file} para revisión")
             
         else:
@@ -200,12 +240,6 @@ def overwrite_episode_in_database(episode_number: int, dry_run: bool = False, ve
     except Exception as e:
         logger.error(f"❌ Error durante la sobreescritura: {e}")
         return False
-    
-    finally:
-        # Cerrar conexión a la base de datos
-        if 'db_manager' in locals():
-            logger.info("🔒 Cerrando conexión a la base de datos...")
-            db_manager.close()
 
 
 def main():
@@ -213,7 +247,7 @@ def main():
     Función principal del script.
     """
     parser = argparse.ArgumentParser(
-        description="Sobreescribe un episodio específico en la base de datos usando el mismo flujo que main.py",
+        description="Sobreescribe episodios específicos en la base de datos usando el mismo flujo que main.py",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Ejemplos de uso:
@@ -221,13 +255,36 @@ Ejemplos de uso:
   python overwrite_episode.py 485 --dry-run         # Preview sin actualizar
   python overwrite_episode.py 100 -v                # Modo verbose
   python overwrite_episode.py 200 --dry-run -v      # Preview verbose
+  python overwrite_episode.py 10 11 12 13           # Varios episodios (catálogo de WordPress en bloque)
+  python overwrite_episode.py 485 --dry-run --offline  # Solo con lo descargado antes (caché HTTP)
+  python overwrite_episode.py 12 --feed otro_programa  # Episodio de otro programa ([feed:otro_programa])
         """
     )
     
     parser.add_argument(
-        'episode_number',
+        'episode_numbers',
         type=int,
-        help='Número del episodio a sobreescribir'
+        nargs='+',
+        help='Número(s) del episodio a sobreescribir'
+    )
+    
+    parser.add_argument(
+        '--feed',
+        help='Programa ([feed:<nombre>] de config.ini) al que pertenecen los episodios '
+             '(obligatorio si hay varios)'
+    )
+    
+    parser.add_argument(
+        '--wp-index',
+        action='store_true',
+        help='Descargar el catálogo de WordPress por la API REST en lugar de una página por episodio '
+             '(por defecto, con más de un episodio)'
+    )
+    
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='No usar la red: el feed RSS y WordPress se leen solo de la caché HTTP'
     )
     
     parser.add_argument(
@@ -244,26 +301,74 @@ Ejemplos de uso:
     
     args = parser.parse_args()
     
-    # Validar número de episodio
-    if args.episode_number <= 0:
+    # Validar números de episodio
+    if any(number <= 0 for number in args.episode_numbers):
         logger.error("❌ El número de episodio debe ser mayor que 0")
         sys.exit(1)
     
-    # Ejecutar sobreescritura
-    success = overwrite_episode_in_database(
-        episode_number=args.episode_number,
-        dry_run=args.dry_run,
-        verbose=args.verbose
-    )
+    # Caché HTTP en disco compartida por todos los episodios (y por ejecuciones anteriores)
+    logger.info("📋 Cargando configuración...")
+    config_manager = ConfigManager()
+    try:
+        feed = select_feed(config_manager, args.feed)
+    except ValueError as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+    http_cache_config = config_manager.get_http_cache_config()
+    if args.offline:
+        if not http_cache_config['cache_dir']:
+            logger.error("❌ --offline necesita la caché HTTP activada ([http_cache] enabled)")
+            sys.exit(1)
+        http_cache_config['offline'] = True
+    http_cache = get_http_cache()
+    http_cache.configure(**http_cache_config)
+    
+    # Con varios episodios, unas pocas páginas de la API REST sustituyen a una página HTML por episodio
+    wordpress_index = None
+    if feed['wordpress_api_url'] and (args.wp_index or len(args.episode_numbers) > 1):
+        wordpress_index = WordPressClient(feed['wordpress_api_url'], feed['post_slug_template']).build_index()
+    
+    # Componentes y feed RSS una sola vez para todos los episodios
+    failed = []
+    components = None
+    try:
+        components = build_components(config_manager, feed, args.episode_numbers, wordpress_index)
+        logger.info("📻 Descargando episodios del RSS...")
+        rss_snapshot = components['rss_processor'].get_snapshot()
+        logger.info(f"📊 Encontrados {len(rss_snapshot)} episodios en el RSS")
+        
+        # Ejecutar sobreescritura
+        for episode_number in args.episode_numbers:
+            success = overwrite_episode_in_database(
+                episode_number=episode_number,
+                db_manager=components['db_manager'],
+                rss_snapshot=rss_snapshot,
+                data_processor=components['data_processor'],
+                wordpress_client=components['wordpress_client'],
+                dry_run=args.dry_run,
+                verbose=args.verbose
+            )
+            if not success:
+                failed.append(episode_number)
+    except Exception as e:
+        logger.error(f"❌ Error durante la sobreescritura: {e}")
+        failed = list(args.episode_numbers)
+    finally:
+        # Cerrar conexión a la base de datos
+        if components:
+            logger.info("🔒 Cerrando conexión a la base de datos...")
+            components['db_manager'].close()
+    http_cache.log_summary()
+    http_cache.save()
     
-    if success:
+    if not failed:
         if args.dry_run:
             logger.info("✅ Preview completado exitosamente")
         else:
             logger.info("✅ Sobreescritura completada exitosamente")
         sys.exit(0)
     else:
-        logger.error("❌ Sobreescritura falló")
+        logger.error(f"❌ Sobreescritura falló: {', '.join(map(str, failed))}")
         sys.exit(1)
 
 
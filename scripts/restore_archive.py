@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Script para descargar del NAS los MP3 archivados (reetiquetado, procesado local o recuperación).
+
+Las descargas se hacen en paralelo sobre la sesión compartida del cliente, se
+reanudan si se cortan y se omiten los archivos que ya están en la carpeta de
+destino con el mismo tamaño y fecha.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar el directorio src al path para importaciones
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from components.config_manager import ConfigManager
+from components.database_manager import DatabaseManager
+from components.synology_client import SynologyClient
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from utils.bandwidth import get_bandwidth_governor
+from utils.logger import logger
+
+
+def main():
+    """
+    Función principal del script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Descarga del NAS los MP3 archivados, en paralelo y con reanudación",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python restore_archive.py --dest /tmp/popcasting             # Todo el archivo
+  python restore_archive.py --dest restore --from 400 --to 499  # Solo un rango de episodios
+  python restore_archive.py --dest restore --workers 8          # Más descargas simultáneas
+        """
+    )
+    parser.add_argument('--dest', type=Path, required=True, help='Carpeta local de destino')
+    parser.add_argument('--workers', type=int, default=4, help='Descargas simultáneas (default: 4)')
+    parser.add_argument('--retries', type=int, default=2, help='Reintentos por archivo (default: 2)')
+    parser.add_argument('--from', dest='from_number', type=int, help='Primer número de episodio')
+    parser.add_argument('--to', dest='to_number', type=int, help='Último número de episodio')
+    parser.add_argument('--no-skip', action='store_true',
+                        help='Descargar aunque ya exista en local con el mismo tamaño y fecha')
+
+    args = parser.parse_args()
+
+    db_manager = None
+    synology_client = None
+    try:
+        logger.info("🚀 Iniciando descarga del archivo de audio")
+
+        config_manager = ConfigManager()
+        supabase_credentials = config_manager.get_supabase_credentials()
+        synology_credentials = config_manager.get_synology_credentials()
+        archive_config = config_manager.get_archive_config()
+        if archive_config['backend'] != 'synology':
+            raise Exception("Con [archive] backend = local los MP3 ya están accesibles en local_root")
+        get_bandwidth_governor().configure(**config_manager.get_bandwidth_config())
+
+        db_manager = DatabaseManager(
+            supabase_url=supabase_credentials["url"],
+            supabase_key=supabase_credentials["key"]
+        )
+        synology_client = SynologyClient(
+            host=synology_credentials["ip"],
+            port=synology_credentials["port"],
+            username=synology_credentials["user"],
+            password=synology_credentials["password"],
+            **config_manager.get_synology_client_config()
+        )
+        if not synology_client.login():
+            raise Exception("No se pudo conectar al NAS Synology")
+
+        inventory = NASInventory(synology_client, cache_dir=config_manager.get_cache_dir(),
+                                 ttl_seconds=archive_config['inventory_ttl'])
+        audio_manager = AudioManager(db_manager, synology_client, archive_config, inventory)
+
+        remote_paths = []
+        for podcast in db_manager.get_archive_candidates():
+            program_number = podcast['program_number']
+            if (args.from_number is not None and program_number < args.from_number) or \
+                    (args.to_number is not None and program_number > args.to_number):
+                continue
+            nas_copy = audio_manager.find_podcast_in_nas(program_number)
+            if nas_copy:
+                remote_paths.append(f"{nas_copy['folder']}/{audio_manager.get_nas_location(program_number)[1]}")
+            else:
+                logger.warning(f"⚠️ Episodio {program_number} no está en el NAS")
+        logger.info(f"📊 {len(remote_paths)} archivos a descargar en {args.dest}")
+
+        summary = synology_client.download_many(remote_paths, args.dest, workers=args.workers,
+                                                skip_identical=not args.no_skip, retries=args.retries)
+
+        logger.info("📊 === REPORTE DE DESCARGA ===")
+        logger.info(f"✅ Descargados: {summary['downloaded']}")
+        logger.info(f"⏭️ Omitidos (ya en local): {summary['skipped']}")
+        logger.info(f"❌ Fallidos: {summary['failed']}")
+        logger.info(f"📶 {summary['bytes'] / 1024 / 1024:.1f} MB en {summary['seconds']:.1f}s "
+                    f"({summary['mbps']:.2f} MB/s)")
+        for remote_path in summary['failures']:
+            logger.warning(f"   {remote_path}")
+
+        if summary['failed']:
+            sys.exit(2)
+
+    except KeyboardInterrupt:
+        logger.warning("⚠️ Descarga cancelada por el usuario (las descargas parciales se reanudarán)")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"❌ Error en la descarga: {e}")
+        sys.exit(1)
+    finally:
+        if synology_client:
+            synology_client.logout()
+        if db_manager:
+            db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la integridad de los MP3 archivados en el NAS.
+
+El MD5 de cada archivo lo calcula el propio NAS (tareas en segundo plano de
+SYNO.FileStation.MD5), así que no se transfiere el contenido de los archivos.
+El resultado se compara con el MD5 registrado al descargar el episodio
+(columna mp3_md5) y se genera un informe con los archivos corruptos o ausentes.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Agregar el directorio src al path para importaciones
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from components.config_manager import ConfigManager
+from components.database_manager import DatabaseManager
+from components.synology_client import SynologyClient
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from utils.logger import logger
+
+
+# Estados posibles de cada episodio en el informe
+OK = "ok"
+CORRUPT = "corrupt"
+MISSING = "missing"
+UNVERIFIED = "unverified"
+ERROR = "error"
+
+
+class ArchiveVerifier:
+    """
+    Verifica los MP3 del NAS con tareas de MD5 ejecutadas en el propio NAS.
+    """
+
+    REPORT_FILENAME = "verify_archive_report.json"
+
+    def __init__(self, synology_client: SynologyClient, audio_manager: AudioManager,
+                 concurrency: int = 8, poll_interval: float = 2, timeout: float = 1800):
+        """
+        Inicializa el verificador.
+
+        Args:
+            synology_client: Cliente con sesión iniciada
+            audio_manager: Gestor de audio (para localizar cada episodio en el NAS)
+            concurrency: Tareas de MD5 simultáneas en el NAS
+            poll_interval: Segundos entre consultas del estado de las tareas
+            timeout: Segundos máximos por tarea
+        """
+        self.client = synology_client
+        self.audio_manager = audio_manager
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def verify(self, podcasts: list) -> dict:
+        """
+        Verifica los episodios indicados.
+
+        Primero se descartan sin llamar al NAS los ausentes y los de tamaño
+        distinto al registrado; después se calcula el MD5 del resto que tenga
+        uno registrado, manteniendo `concurrency` tareas en curso.
+
+        Args:
+            podcasts: Filas de podcasts (program_number, mp3_md5, mp3_size, file_size)
+
+        Returns:
+            dict: {'generated_at', 'summary': {estado: n}, 'episodes': {program_number: resultado}}
+        """
+        episodes = {}
+        to_hash = []
+
+        for podcast in podcasts:
+            program_number = podcast['program_number']
+            nas_copy = self.audio_manager.find_podcast_in_nas(program_number)
+            if not nas_copy:
+                episodes[program_number] = {'status': MISSING}
+                continue
+
+            path = f"{nas_copy['folder']}/{self.audio_manager.get_nas_location(program_number)[1]}"
+            expected_size = podcast.get('mp3_size')
+            if expected_size and nas_copy.get('size') is not None and nas_copy['size'] != expected_size:
+                episodes[program_number] = {
+                    'status': CORRUPT, 'path': path,
+                    'reason': f"tamaño {nas_copy['size']} en el NAS, {expected_size} registrado"
+                }
+            elif not podcast.get('mp3_md5'):
+                episodes[program_number] = {'status': UNVERIFIED, 'path': path, 'reason': "sin MD5 registrado"}
+            else:
+                to_hash.append((program_number, path, podcast['mp3_md5']))
+
+        logger.info(f"🔐 Calculando MD5 en el NAS de {len(to_hash)} archivos ({self.concurrency} en paralelo)")
+        episodes.update(self._hash_on_nas(to_hash))
+
+        summary = dict.fromkeys((OK, CORRUPT, MISSING, UNVERIFIED, ERROR), 0)
+        for result in episodes.values():
+            summary[result['status']] += 1
+
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'summary': summary,
+            'episodes': {str(pn): episodes[pn] for pn in sorted(episodes)},
+        }
+
+    def _hash_on_nas(self, to_hash: list) -> dict:
+        """Lanza y sigue las tareas de MD5 del NAS."""
+        results = {}
+        queue = list(to_hash)
+        in_flight = {}  # task_id -> (program_number, path, md5 esperado, hora de inicio)
+
+        while queue or in_flight:
+            while queue and len(in_flight) < self.concurrency:
+                program_number, path, expected = queue.pop(0)
+                task_id = self.client.start_md5_task(path)
+                if task_id:
+                    in_flight[task_id] = (program_number, path, expected, time.monotonic())
+                else:
+                    results[program_number] = {'status': ERROR, 'path': path, 'reason': "no se pudo iniciar el MD5"}
+
+            if not in_flight:
+                break
+
+            time.sleep(self.poll_interval)
+            for task_id, (program_number, path, expected, started_at) in list(in_flight.items()):
+                status = self.client.get_md5_status(task_id)
+                timed_out = time.monotonic() - started_at > self.timeout
+
+                if status and status['finished']:
+                    md5 = (status['md5'] or '').lower()
+                    if md5 == expected.lower():
+                        results[program_number] = {'status': OK, 'path': path}
+                    else:
+                        results[program_number] = {'status': CORRUPT, 'path': path,
+                                                   'reason': f"MD5 {md5} en el NAS, {expected} registrado"}
+                elif status is None or timed_out:
+                    results[program_number] = {'status': ERROR, 'path': path,
+                                               'reason': "tiempo agotado" if timed_out else "error consultando el MD5"}
+                else:
+                    continue
+
+                self.client.stop_md5_task(task_id)
+                del in_flight[task_id]
+                logger.info(f"{'✅' if results[program_number]['status'] == OK else '❌'} Episodio {program_number}: "
+                            f"{results[program_number]['status']}")
+
+        return results
+
+
+def main():
+    """
+    Función principal del script.
+    """
+    parser = argparse.ArgumentParser(
+        description="Verifica con MD5 calculado en el NAS que los MP3 archivados están íntegros",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python verify_archive.py                          # Verificar todo el archivo
+  python verify_archive.py --from 400 --to 499      # Solo un rango de episodios
+  python verify_archive.py --concurrency 16         # Más tareas de MD5 simultáneas en el NAS
+        """
+    )
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Tareas de MD5 simultáneas en el NAS (default: 8)')
+    parser.add_argument('--poll-interval', type=float, default=2,
+                        help='Segundos entre consultas del estado de las tareas (default: 2)')
+    parser.add_argument('--from', dest='from_number', type=int, help='Primer número de episodio')
+    parser.add_argument('--to', dest='to_number', type=int, help='Último número de episodio')
+    parser.add_argument('--report', type=Path,
+                        help=f'Ruta del informe JSON (default: <cache>/{ArchiveVerifier.REPORT_FILENAME})')
+
+    args = parser.parse_args()
+
+    db_manager = None
+    synology_client = None
+    try:
+        logger.info("🚀 Iniciando verificación del archivo de audio")
+
+        config_manager = ConfigManager()
+        supabase_credentials = config_manager.get_supabase_credentials()
+        synology_credentials = config_manager.get_synology_credentials()
+        archive_config = config_manager.get_archive_config()
+        cache_dir = config_manager.get_cache_dir()
+        if archive_config['backend'] != 'synology':
+            raise Exception("La verificación usa las tareas de MD5 de FileStation: necesita [archive] backend = synology")
+
+        db_manager = DatabaseManager(
+            supabase_url=supabase_credentials["url"],
+            supabase_key=supabase_credentials["key"]
+        )
+        synology_client = SynologyClient(
+            host=synology_credentials["ip"],
+            port=synology_credentials["port"],
+            username=synology_credentials["user"],
+            password=synology_credentials["password"],
+            **config_manager.get_synology_client_config()
+        )
+        if not synology_client.login():
+            raise Exception("No se pudo conectar al NAS Synology")
+
+        inventory = NASInventory(synology_client, cache_dir=cache_dir, ttl_seconds=archive_config['inventory_ttl'])
+        # Se verifica el estado actual del NAS, no el de la caché
+        inventory.invalidate()
+        audio_manager = AudioManager(db_manager, synology_client, archive_config, inventory)
+
+        podcasts = [
+            p for p in db_manager.get_archive_candidates()
+            if (args.from_number is None or p['program_number'] >= args.from_number)
+            and (args.to_number is None or p['program_number'] <= args.to_number)
+        ]
+        logger.info(f"📊 {len(podcasts)} episodios a verificar")
+
+        verifier = ArchiveVerifier(synology_client, audio_manager,
+                                   concurrency=args.concurrency, poll_interval=args.poll_interval)
+        report = verifier.verify(podcasts)
+
+        report_path = args.report or cache_dir / ArchiveVerifier.REPORT_FILENAME
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        summary = report['summary']
+        logger.info("📊 === REPORTE DE VERIFICACIÓN ===")
+        logger.info(f"✅ Íntegros: {summary[OK]}")
+        logger.info(f"❌ Corruptos: {summary[CORRUPT]}")
+        logger.info(f"🕳️ Ausentes: {summary[MISSING]}")
+        logger.info(f"❔ Sin MD5 registrado: {summary[UNVERIFIED]}")
+        logger.info(f"⚠️ Errores: {summary[ERROR]}")
+        for status in (CORRUPT, MISSING):
+            numbers = [pn for pn, result in report['episodes'].items() if result['status'] == status]
+            if numbers:
+                logger.warning(f"   {status}: {', '.join(numbers)}")
+        logger.info(f"📄 Informe guardado en {report_path}")
+
+        if summary[CORRUPT] or summary[MISSING]:
+            sys.exit(2)
+
+    except KeyboardInterrupt:
+        logger.warning("⚠️ Verificación cancelada por el usuario")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"❌ Error en la verificación: {e}")
+        sys.exit(1)
+    finally:
+        if synology_client:
+            synology_client.logout()
+        if db_manager:
+            db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
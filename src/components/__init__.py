@@ -5,6 +5,10 @@ Paquete de componentes especializados para el procesamiento de datos de podcasts
 from .song_processor import SongProcessor
 from .audio_manager import AudioManager
 from .synology_client import SynologyClient
+from .archive_backend import ArchiveBackend, create_archive_backend, create_archive_mirrors
+from .local_archive_backend import LocalArchiveBackend
 from .synology_uploader import SynologyUploader
 
-__all__ = ['SongProcessor', 'AudioManager', 'SynologyClient', 'SynologyUploader'] 
\ No newline at end of file
+__all__ = ['SongProcessor', 'AudioManager', 'SynologyClient', 'SynologyUploader',
+           'ArchiveBackend', 'LocalArchiveBackend', 'create_archive_backend',
+           'create_archive_mirrors'] 
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Interfaz común de los backends donde se archivan los MP3.
+
+AudioManager y NASInventory solo usan los métodos de ArchiveBackend, así que
+el archivo puede estar detrás de la API de FileStation (SynologyClient) o en
+una carpeta local o compartida montada por SMB/NFS (LocalArchiveBackend).
+Además, el archivo puede replicarse en un bucket S3 (S3ArchiveBackend).
+Las rutas remotas son siempre del estilo del NAS (/popcasting_marilyn/mp3/...).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class ArchiveBackend(ABC):
+    """
+    Operaciones que AudioManager necesita del almacenamiento del archivo.
+
+    Un backend que no implemente alguna de ellas no se puede instanciar.
+    """
+
+    @abstractmethod
+    def login(self) -> bool:
+        """Prepara el backend (autenticación, comprobación del montaje...)."""
+
+    @abstractmethod
+    def logout(self) -> None:
+        """Libera los recursos del backend."""
+
+    @abstractmethod
+    def upload_file(self, local_file_path, remote_folder: str, overwrite: bool = False,
+                    progress_callback=None) -> bool:
+        """Copia un archivo local a una carpeta del archivo."""
+
+    @abstractmethod
+    def file_exists(self, remote_file_path: str) -> bool:
+        """Indica si existe un archivo en el archivo."""
+
+    @abstractmethod
+    def get_file_info(self, remote_file_path: str) -> Optional[dict]:
+        """Devuelve {'size', 'mtime'} (y 'etag' si el backend lo conoce) de un archivo o None si no existe."""
+
+    @abstractmethod
+    def list_all_files(self, remote_folder: str, page_size: int = 1000) -> Optional[list]:
+        """
+        Lista una carpeta con entradas al estilo de FileStation:
+        {'name', 'isdir', 'additional': {'size', 'time': {'mtime'}}}.
+        """
+
+    @abstractmethod
+    def create_folder(self, folder_path: str) -> bool:
+        """Crea una carpeta (y sus carpetas padre si hace falta)."""
+
+    @abstractmethod
+    def download_file(self, remote_file_path: str, local_folder: str = "downloads") -> bool:
+        """Copia un archivo del archivo a una carpeta local."""
+
+
+def create_archive_backend(config_manager) -> ArchiveBackend:
+    """
+    Crea el backend configurado en la sección [archive] de config.ini.
+
+    Args:
+        config_manager: Instancia de ConfigManager
+
+    Returns:
+        ArchiveBackend: SynologyClient o LocalArchiveBackend (sin login todavía)
+    """
+    archive_config = config_manager.get_archive_config()
+
+    if archive_config['backend'] == 'local':
+        from .local_archive_backend import LocalArchiveBackend
+        return LocalArchiveBackend(archive_config['local_root'])
+
+    from .synology_client import SynologyClient
+    synology_credentials = config_manager.get_synology_credentials()
+    return SynologyClient(
+        host=synology_credentials["ip"],
+        port=synology_credentials["port"],
+        username=synology_credentials["user"],
+        password=synology_credentials["password"],
+        **config_manager.get_synology_client_config()
+    )
+
+
+def create_archive_mirrors(config_manager) -> list:
+    """
+    Crea las réplicas del archivo configuradas (por ahora, la sección [s3]).
+
+    Cada réplica lleva su propio inventario, cacheado en un archivo aparte.
+
+    Args:
+        config_manager: Instancia de ConfigManager
+
+    Returns:
+        list: [{'name': str, 'backend': ArchiveBackend, 'inventory': NASInventory}]
+    """
+    mirrors = []
+
+    s3_config = config_manager.get_s3_config()
+    if s3_config:
+        from .s3_archive_backend import s3_backend_from_config
+        from .nas_inventory import NASInventory
+        backend = s3_backend_from_config(s3_config)
+        inventory = NASInventory(backend, cache_dir=config_manager.get_cache_dir(),
+                                 ttl_seconds=s3_config['inventory_ttl'], cache_filename="s3_inventory.json")
+        mirrors.append({'name': f"s3://{s3_config['bucket']}", 'backend': backend, 'inventory': inventory})
+
+    return mirrors
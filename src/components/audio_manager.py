@@ -3,13 +3,30 @@ Componente para gestionar la descarga de archivos MP3 de podcasts y su subida al
 """
 
 import os
+import hashlib
 import requests
 import shutil
 import logging
 import json
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+import sys
+
+# Agregar el directorio src al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.bandwidth import get_bandwidth_governor, INGRESS
+from components.temp_storage import TempStorageManager, TempReservation
+from components.download_station_archiver import DownloadStationArchiver
+from components.database_manager import MissingColumnsError
+
+
+DEFAULT_NAS_FOLDER = "/popcasting_marilyn/mp3"
+DEFAULT_FILE_TEMPLATE = "popcasting_{number:04d}.mp3"
+
+# Bytes que se reservan de más cada vez si el servidor no envía Content-Length
+UNKNOWN_LENGTH_STEP = 16 * 1024 * 1024
 
 
 class AudioManager:
@@ -23,23 +40,51 @@ class AudioManager:
     - Limpiar archivos temporales
     """
     
-    def __init__(self, database_manager, synology_client):
+    def __init__(self, database_manager, synology_client, archive_config: Optional[dict] = None,
+                 inventory=None, temp_storage: Optional[TempStorageManager] = None,
+                 mirrors: Optional[list] = None):
         """
         Inicializa el gestor de audio.
         
         Args:
             database_manager: Instancia de DatabaseManager para operaciones de BD
-            synology_client: Instancia de SynologyClient para operaciones del NAS
+            synology_client: Backend del archivo (ArchiveBackend): SynologyClient o
+                LocalArchiveBackend para un recurso del NAS montado
+            archive_config: Configuración del archivo (ver ConfigManager.get_archive_config)
+            inventory: Instancia opcional de NASInventory para consultar existencia sin
+                llamar al NAS por cada episodio
+            temp_storage: Gestor de la carpeta temporal (por defecto temp_downloads en
+                la raíz del proyecto, sin presupuesto)
+            mirrors: Réplicas adicionales del archivo, p. ej. un bucket S3
+                ([{'name', 'backend', 'inventory'}], ver create_archive_mirrors)
         """
         self.db_manager = database_manager
         self.synology_client = synology_client
+        self.inventory = inventory
+        self.mirrors = mirrors or []
         self.logger = logging.getLogger(__name__)
         
-        # Definir carpeta temporal para descargas
-        self.temp_downloads = Path("temp_downloads")
+        archive_config = archive_config or {}
+        self.nas_folder = archive_config.get('nas_folder', DEFAULT_NAS_FOLDER).rstrip('/')
+        self.layout = archive_config.get('layout', 'flat')
+        self.file_template = archive_config.get('file_template', DEFAULT_FILE_TEMPLATE)
         
-        # Crear carpeta temporal si no existe
-        self.temp_downloads.mkdir(exist_ok=True)
+        # Con la estrategia 'download_station' el propio NAS descarga los MP3
+        self.strategy = archive_config.get('strategy', 'local')
+        self.download_station = None
+        if self.strategy == 'download_station':
+            if not hasattr(synology_client, 'create_download_task'):
+                raise ValueError("La estrategia download_station necesita un SynologyClient como backend")
+            self.download_station = DownloadStationArchiver(
+                synology_client,
+                batch_size=archive_config.get('download_station_batch', 20),
+                poll_interval=archive_config.get('download_station_poll', 10),
+                timeout=archive_config.get('download_station_timeout', 3600)
+            )
+        
+        # Carpeta temporal para descargas (con presupuesto de espacio compartido)
+        self.temp_storage = temp_storage or TempStorageManager()
+        self.temp_downloads = self.temp_storage.dir
         
         self.logger.info(f"AudioManager inicializado. Carpeta temporal: {self.temp_downloads}")
     
@@ -53,15 +98,113 @@ class AudioManager:
         Returns:
             bool: True si el proceso fue exitoso, False en caso contrario
         """
-        try:
-            self.logger.info(f"🔄 Iniciando archivo de audio para podcast ID: {podcast_id}")
+        self.logger.info(f"🔄 Iniciando archivo de audio para podcast ID: {podcast_id}")
+        
+        # 1. Obtener información del podcast
+        podcast = self.db_manager.get_podcast_by_id(podcast_id)
+        if not podcast:
+            self.logger.error(f"❌ Podcast con ID {podcast_id} no encontrado")
+            return False
+        
+        return self.archive_podcast(podcast)
+    
+    def archive_podcast(self, podcast: dict) -> bool:
+        """
+        Archiva el audio de un podcast a partir de su fila de la BD.
+        
+        Permite a los procesos por lotes (backfill) reutilizar las filas que ya
+        han leído sin volver a consultar cada podcast por ID.
+        
+        Args:
+            podcast: Datos del podcast (id, program_number, download_url, file_size,
+                     duration, mp3_sha256, mp3_size)
             
-            # 1. Obtener información del podcast
-            podcast = self.db_manager.get_podcast_by_id(podcast_id)
-            if not podcast:
-                self.logger.error(f"❌ Podcast con ID {podcast_id} no encontrado")
-                return False
+        Returns:
+            bool: True si el proceso fue exitoso, False en caso contrario
+        """
+        if self.download_station:
+            return self.archive_podcasts([podcast]).get(podcast.get('program_number'), False)
+        return self._archive_podcast_locally(podcast)
+    
+    def archive_podcasts(self, podcasts: list) -> dict:
+        """
+        Archiva el audio de varios podcasts.
+        
+        Con la estrategia 'download_station' los episodios que faltan en el NAS se
+        descargan allí en paralelo; los que tienen una copia no válida se
+        reemplazan por la vía local, que sí permite sobrescribir.
+        
+        Args:
+            podcasts: Filas de podcasts (ver archive_podcast)
+            
+        Returns:
+            dict: {program_number: bool}
+        """
+        if not self.download_station:
+            return {p.get('program_number'): self._archive_podcast_locally(p) for p in podcasts}
+        
+        results = {}
+        jobs = {}
+        for podcast in podcasts:
+            program_number = podcast.get('program_number')
+            if not podcast.get('download_url') or not program_number:
+                self.logger.error(f"❌ Podcast {podcast.get('id')} sin URL de descarga o número de programa")
+                results[program_number] = False
+                continue
+            
+            nas_copy = self.find_podcast_in_nas(program_number)
+            if nas_copy and self._is_nas_copy_valid(podcast, nas_copy):
+                if self._missing_mirrors(program_number, podcast):
+                    # Solo faltan réplicas: se descarga aquí para subirlo a ellas
+                    results[program_number] = self._archive_podcast_locally(podcast)
+                else:
+                    self.logger.info(f"ℹ️ Archivo ya existe en NAS: {self.get_nas_path_for_podcast(program_number)}")
+                    results[program_number] = True
+            elif nas_copy:
+                results[program_number] = self._archive_podcast_locally(podcast)
+            else:
+                nas_folder, nas_filename = self.get_nas_location(program_number)
+                jobs[program_number] = {
+                    'program_number': program_number,
+                    'download_url': podcast['download_url'],
+                    'folder': nas_folder,
+                    'filename': nas_filename,
+                    'expected_size': podcast.get('file_size'),
+                    'podcast': podcast,
+                }
+        
+        if jobs:
+            self.logger.info(f"📡 Enviando {len(jobs)} episodios a Download Station")
+            for program_number, result in self.download_station.archive(list(jobs.values())).items():
+                results[program_number] = result['success']
+                if not result['success']:
+                    continue
+                
+                job = jobs[program_number]
+                if self.inventory:
+                    self.inventory.record_upload(job['filename'], job['folder'], result['size'])
+                if result['size']:
+                    # El NAS no devuelve hash: se registra solo el tamaño
+                    self.db_manager.update_podcast_audio_fingerprint(job['podcast'].get('id'), None, result['size'])
+                if self._missing_mirrors(program_number, job['podcast']):
+                    # Download Station solo llena el NAS; las réplicas se completan por la vía local
+                    self._archive_podcast_locally(job['podcast'])
+        
+        return results
+    
+    def _archive_podcast_locally(self, podcast: dict) -> bool:
+        """
+        Archiva un podcast descargándolo en esta máquina y subiéndolo al NAS.
+        
+        Args:
+            podcast: Fila del podcast (ver archive_podcast)
             
+        Returns:
+            bool: True si el proceso fue exitoso, False en caso contrario
+        """
+        podcast_id = podcast.get('id')
+        reservation = None
+        try:
             # Verificar que tiene URL de descarga
             download_url = podcast.get('download_url')
             if not download_url:
@@ -74,24 +217,50 @@ class AudioManager:
                 self.logger.error(f"❌ Podcast {podcast_id} no tiene número de programa")
                 return False
             
-            # 2. Verificar si el archivo ya existe en el NAS
-            nas_filename = f"popcasting_{program_number:04d}.mp3"
-            nas_folder = "/popcasting_marilyn/mp3"
+            # 2. Verificar si el archivo ya existe en el NAS y si la copia es válida
+            nas_folder, nas_filename = self.get_nas_location(program_number)
             nas_path = f"{nas_folder}/{nas_filename}"
             
-            if self._file_exists_in_nas(nas_filename, nas_folder):
-                self.logger.info(f"ℹ️ Archivo ya existe en NAS: {nas_path}")
+            nas_copy = self.find_podcast_in_nas(program_number)
+            nas_copy_valid = bool(nas_copy and self._is_nas_copy_valid(podcast, nas_copy))
+            missing_mirrors = self._missing_mirrors(program_number, podcast)
+            if nas_copy_valid and not missing_mirrors:
+                self.logger.info(f"ℹ️ Archivo ya existe en NAS: {nas_copy['folder']}/{nas_filename}")
                 return True
             
+            if nas_copy_valid:
+                self.logger.info(
+                    f"ℹ️ Archivo ya existe en NAS, falta en: {', '.join(m['name'] for m in missing_mirrors)}"
+                )
+            elif nas_copy:
+                self.logger.warning(
+                    f"⚠️ La copia en NAS no coincide con lo esperado ({nas_copy['size']} bytes), "
+                    f"se volverá a archivar: {nas_copy['folder']}/{nas_filename}"
+                )
+            
             self.logger.info(f"📥 Descargando desde: {download_url}")
             
-            # 3. Descargar archivo MP3
-            local_file_path = self._download_file(download_url, self.temp_downloads)
-            if not local_file_path:
+            # 3. Descargar archivo MP3 calculando su huella (SHA-256 y tamaño)
+            reservation = self.temp_storage.reservation(f"Episodio {program_number}")
+            download = self._download_file(download_url, self.temp_downloads, reservation)
+            if not download:
                 self.logger.error(f"❌ Error al descargar archivo para podcast {podcast_id}")
                 return False
             
-            self.logger.info(f"✅ Archivo descargado: {local_file_path}")
+            local_file_path, fingerprint = download
+            self.logger.info(f"✅ Archivo descargado: {local_file_path} (sha256 {fingerprint['sha256'][:12]}…)")
+            
+            expected_size = podcast.get('file_size')
+            if expected_size and fingerprint['size'] != expected_size:
+                self.logger.warning(
+                    f"⚠️ El tamaño descargado ({fingerprint['size']} bytes) no coincide con el del RSS "
+                    f"({expected_size} bytes)"
+                )
+            
+            previous_sha256 = podcast.get('mp3_sha256')
+            self.db_manager.update_podcast_audio_fingerprint(
+                podcast_id, fingerprint['sha256'], fingerprint['size'], fingerprint['md5']
+            )
             
             # 4. Extraer duración exacta del archivo MP3
             mp3_duration = self._get_duration_from_mp3(str(local_file_path))
@@ -120,10 +289,23 @@ class AudioManager:
                 else:
                     self.logger.warning(f"⚠️ No se pudo guardar la duración en la BD")
             
+            # Si la copia del NAS tiene el mismo tamaño y el hash registrado coincide, no hace falta subir
+            upload_to_nas = not nas_copy_valid
+            if (upload_to_nas and nas_copy and nas_copy['folder'] == nas_folder
+                    and nas_copy['size'] == fingerprint['size']
+                    and previous_sha256 in (None, fingerprint['sha256'])):
+                self.logger.info(f"ℹ️ La copia en NAS es idéntica a la descargada, no se sube: {nas_path}")
+                upload_to_nas = False
+            
+            if not upload_to_nas and not missing_mirrors:
+                self._cleanup_temp_file(local_file_path)
+                return True
+            
             self.logger.info(f"📁 Subiendo como: {nas_filename}")
             
-            # 5. Renombrar archivo local al formato correcto antes de subir
+            # 5. Renombrar archivo local al formato correcto antes de subir (también para las réplicas)
             renamed_file_path = local_file_path.parent / nas_filename
+            reservation.track(renamed_file_path)
             try:
                 local_file_path.rename(renamed_file_path)
                 self.logger.info(f"📝 Archivo renombrado: {renamed_file_path}")
@@ -133,36 +315,58 @@ class AudioManager:
                 return False
             
             # 6. Subir archivo al NAS con el nombre correcto
-            upload_success = self.synology_client.upload_file(renamed_file_path, nas_folder)
-            
-            if not upload_success:
-                self.logger.error(f"❌ Error al subir archivo al NAS para podcast {podcast_id}")
-                # Limpiar archivo temporal
-                self._cleanup_temp_file(renamed_file_path)
-                return False
+            if upload_to_nas:
+                replace_existing = bool(nas_copy and nas_copy['folder'] == nas_folder)
+                upload_success = self.synology_client.upload_file(renamed_file_path, nas_folder, overwrite=replace_existing)
+                
+                if not upload_success:
+                    self.logger.error(f"❌ Error al subir archivo al NAS para podcast {podcast_id}")
+                    # Limpiar archivo temporal
+                    self._cleanup_temp_file(renamed_file_path)
+                    return False
+                
+                self.logger.info(f"✅ Archivo subido al NAS: {nas_path}")
+                
+                if self.inventory:
+                    self.inventory.record_upload(nas_filename, nas_folder, fingerprint['size'])
             
-            self.logger.info(f"✅ Archivo subido al NAS: {nas_path}")
+            # 7. Copiar a las réplicas que no lo tienen (un fallo aquí no invalida el archivo en el NAS)
+            self._upload_to_mirrors(renamed_file_path, nas_folder, fingerprint['size'], missing_mirrors)
             
-            # 7. Limpiar archivo temporal
+            # 8. Limpiar archivo temporal
             self._cleanup_temp_file(renamed_file_path)
             
             self.logger.info(f"🎉 Proceso completado exitosamente para podcast {podcast_id}")
             return True
             
+        except MissingColumnsError:
+            # Falta la migración: no tiene sentido seguir con el resto de episodios
+            raise
         except Exception as e:
-            self.logger.error(f"❌ Error inesperado en archive_podcast_audio: {e}")
+            self.logger.error(f"❌ Error inesperado en archive_podcast: {e}")
             return False
+        finally:
+            # Elimina lo que haya quedado en la carpeta temporal y libera el espacio
+            if reservation:
+                reservation.release()
     
-    def _download_file(self, url: str, destination_folder: Path) -> Optional[Path]:
+    def _download_file(self, url: str, destination_folder: Path,
+                       reservation: Optional[TempReservation] = None) -> Optional[Tuple[Path, dict]]:
         """
         Descarga un archivo desde una URL a una carpeta de destino.
         
+        El SHA-256, el MD5 (el que calcula FileStation en el NAS, ver
+        scripts/verify_archive.py) y el tamaño se calculan en la misma pasada de
+        escritura, sin volver a leer el archivo. Con reserva, la descarga solo empieza si su
+        Content-Length cabe en el presupuesto de la carpeta temporal.
+        
         Args:
             url: URL del archivo a descargar
             destination_folder: Carpeta de destino
+            reservation: Reserva de espacio temporal (opcional)
             
         Returns:
-            Path: Ruta completa al archivo descargado o None si falla
+            tuple: (ruta al archivo descargado, {'sha256': str, 'md5': str, 'size': int}) o None si falla
         """
         try:
             self.logger.info(f"📥 Iniciando descarga desde: {url}")
@@ -182,18 +386,55 @@ class AudioManager:
             
             file_path = destination_folder / filename
             
-            # Guardar archivo
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            content_length = response.headers.get('Content-Length')
+            expected_bytes = int(content_length) if content_length and content_length.isdigit() else None
+            
+            if reservation:
+                if not reservation.request(expected_bytes or UNKNOWN_LENGTH_STEP):
+                    self.logger.error(f"❌ No hay espacio temporal para descargar {filename}")
+                    response.close()
+                    return None
+                reservation.track(file_path)
+            
+            # Guardar archivo calculando la huella al vuelo (respetando el límite de entrada)
+            sha256 = hashlib.sha256()
+            md5 = hashlib.md5()
+            size = 0
+            truncated = False
+            with get_bandwidth_governor().transfer(INGRESS, f"Descarga {filename}") as meter, \
+                    open(file_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=65536):
                     if chunk:
+                        if reservation and size + len(chunk) > reservation.nbytes \
+                                and not reservation.request(size + len(chunk) + UNKNOWN_LENGTH_STEP, wait=False):
+                            self.logger.error(f"❌ La descarga de {filename} supera el espacio temporal disponible")
+                            response.close()
+                            truncated = True
+                            break
+                        size += len(chunk)
+                        meter.add(len(chunk))
                         f.write(chunk)
+                        sha256.update(chunk)
+                        md5.update(chunk)
+            
+            # Sin Content-Length, una descarga cortada por falta de espacio no se detectaría por tamaño
+            if truncated:
+                self._cleanup_temp_file(file_path)
+                return None
+            
+            # Detectar descargas truncadas comparando con Content-Length
+            if expected_bytes is not None and expected_bytes != size:
+                self.logger.error(f"❌ Descarga incompleta: {size} de {content_length} bytes")
+                self._cleanup_temp_file(file_path)
+                return None
             
             # Verificar que el archivo se descargó correctamente
-            if file_path.exists() and file_path.stat().st_size > 0:
+            if size > 0:
                 self.logger.info(f"✅ Archivo descargado exitosamente: {file_path}")
-                return file_path
+                return file_path, {'sha256': sha256.hexdigest(), 'md5': md5.hexdigest(), 'size': size}
             else:
                 self.logger.error(f"❌ Archivo descargado está vacío o no existe: {file_path}")
+                self._cleanup_temp_file(file_path)
                 return None
                 
         except requests.exceptions.RequestException as e:
@@ -203,9 +444,161 @@ class AudioManager:
             self.logger.error(f"❌ Error inesperado durante la descarga: {e}")
             return None
     
+    def needs_archiving(self, podcast: dict) -> bool:
+        """
+        Indica si un podcast falta en el NAS o su copia no coincide con lo esperado.
+        
+        Con inventario, la comprobación se resuelve en memoria tras listar cada
+        carpeta una sola vez.
+        
+        Args:
+            podcast: Datos del podcast (program_number, file_size, mp3_size)
+            
+        Returns:
+            bool: True si hay que (re)archivar el audio
+        """
+        program_number = podcast.get('program_number')
+        if not program_number:
+            return False
+        nas_copy = self.find_podcast_in_nas(program_number)
+        if not (nas_copy and self._is_nas_copy_valid(podcast, nas_copy)):
+            return True
+        return bool(self._missing_mirrors(program_number, podcast))
+    
+    def _missing_mirrors(self, program_number: int, podcast: Optional[dict] = None) -> list:
+        """
+        Devuelve las réplicas que no tienen el MP3 de un episodio o cuya copia no coincide.
+        
+        La copia de una réplica se compara como la del NAS (tamaño registrado o del
+        RSS) y, si la réplica da un ETag de una sola parte, con el MD5 registrado.
+        
+        Args:
+            program_number: Número del programa
+            podcast: Datos del podcast en la BD (mp3_size, mp3_md5, file_size)
+            
+        Returns:
+            list: Réplicas (ver __init__) sin el archivo o con una copia distinta
+        """
+        nas_folder, nas_filename = self.get_nas_location(program_number)
+        missing = []
+        for mirror in self.mirrors:
+            try:
+                files = mirror['inventory'].get_folder(nas_folder) if mirror.get('inventory') else None
+                if files is not None:
+                    info = files.get(nas_filename)
+                else:
+                    info = mirror['backend'].get_file_info(f"{nas_folder}/{nas_filename}")
+            except Exception as e:
+                self.logger.warning(f"⚠️ Error al consultar la réplica {mirror['name']}: {e}")
+                info = None
+            if info is None:
+                missing.append(mirror)
+            elif podcast and not self._is_mirror_copy_valid(podcast, info):
+                self.logger.warning(
+                    f"⚠️ La copia de la réplica {mirror['name']} no coincide con lo esperado "
+                    f"({info.get('size')} bytes), se volverá a subir: {nas_folder}/{nas_filename}"
+                )
+                missing.append(mirror)
+        return missing
+    
+    def _is_mirror_copy_valid(self, podcast: dict, info: dict) -> bool:
+        """Tamaño como en _is_nas_copy_valid y, con ETag de una sola parte (el MD5), el mp3_md5 registrado."""
+        if not self._is_nas_copy_valid(podcast, info):
+            return False
+        etag = info.get('etag')
+        expected_md5 = podcast.get('mp3_md5')
+        if etag and '-' not in etag and expected_md5:
+            return etag == expected_md5
+        return True
+    
+    def _upload_to_mirrors(self, file_path: Path, folder: str, size: int, mirrors: list) -> None:
+        """
+        Sube un archivo ya descargado a las réplicas indicadas.
+        
+        Se sube con overwrite: las réplicas de la lista no tienen el archivo o
+        tienen una copia distinta que hay que reparar. Los fallos solo se
+        registran: el episodio se volverá a intentar cuando needs_archiving
+        detecte que la réplica sigue sin una copia válida.
+        """
+        for mirror in mirrors:
+            if mirror['backend'].upload_file(file_path, folder, overwrite=True):
+                self.logger.info(f"✅ Archivo copiado a la réplica {mirror['name']}: {folder}/{file_path.name}")
+                if mirror.get('inventory'):
+                    mirror['inventory'].record_upload(file_path.name, folder, size)
+            else:
+                self.logger.warning(f"⚠️ No se pudo copiar a la réplica {mirror['name']}: {folder}/{file_path.name}")
+    
+    def find_podcast_in_nas(self, program_number: int) -> Optional[dict]:
+        """
+        Busca la copia de un podcast en el NAS (ubicación del layout y, si difiere, la plana).
+        
+        Args:
+            program_number: Número del programa
+            
+        Returns:
+            dict: {'folder': str, 'size': int | None} o None si no existe
+        """
+        nas_folder, nas_filename = self.get_nas_location(program_number)
+        folders = [nas_folder] if nas_folder == self.nas_folder else [nas_folder, self.nas_folder]
+        
+        for folder in folders:
+            info = self._get_nas_file_info(nas_filename, folder)
+            if info is not None:
+                return {'folder': folder, 'size': info.get('size')}
+        return None
+    
+    def _get_nas_file_info(self, filename: str, folder: str) -> Optional[dict]:
+        """
+        Obtiene la información (tamaño, mtime) de un archivo del NAS.
+        
+        Args:
+            filename: Nombre del archivo
+            folder: Carpeta donde buscar
+            
+        Returns:
+            dict: {'size', 'mtime'} o None si no existe
+        """
+        try:
+            if self.inventory:
+                files = self.inventory.get_folder(folder)
+                if files is not None:
+                    return files.get(filename)
+            return self.synology_client.get_file_info(f"{folder}/{filename}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Error al obtener información de archivo en NAS: {e}")
+            return None
+    
+    def _is_nas_copy_valid(self, podcast: dict, nas_copy: dict) -> bool:
+        """
+        Decide si la copia del NAS puede darse por buena sin descargar nada.
+        
+        Se compara el tamaño del NAS con el registrado al subir (mp3_size) o, si no
+        hay registro, con el tamaño del enclosure del RSS (file_size). Si no hay
+        ninguna referencia, se acepta la copia existente.
+        
+        Args:
+            podcast: Datos del podcast en la BD
+            nas_copy: Resultado de find_podcast_in_nas
+            
+        Returns:
+            bool: True si la copia del NAS es válida
+        """
+        nas_size = nas_copy.get('size')
+        if nas_size is None:
+            return True
+        
+        expected_size = podcast.get('mp3_size') or podcast.get('file_size')
+        if not expected_size:
+            return True
+        
+        return nas_size == expected_size
+    
     def _file_exists_in_nas(self, filename: str, folder: str) -> bool:
         """
-        Verifica si un archivo ya existe en el NAS usando file_exists (más eficiente).
+        Verifica si un archivo ya existe en el NAS.
+        
+        Usa el inventario en memoria si está disponible; si no (o si la carpeta
+        no se pudo listar), consulta el NAS con file_exists.
         Args:
             filename: Nombre del archivo a verificar
             folder: Carpeta donde buscar
@@ -213,6 +606,11 @@ class AudioManager:
             bool: True si el archivo existe, False en caso contrario
         """
         try:
+            if self.inventory:
+                files = self.inventory.get_folder(folder)
+                if files is not None:
+                    return filename in files
+                # Si no se pudo listar la carpeta, consultar el archivo directamente
             remote_path = os.path.join(folder, filename)
             return self.synology_client.file_exists(remote_path)
         except Exception as e:
@@ -306,6 +704,26 @@ class AudioManager:
         except Exception as e:
             self.logger.warning(f"⚠️ Error al eliminar carpeta temporal: {e}")
     
+    def get_nas_location(self, program_number: int) -> Tuple[str, str]:
+        """
+        Calcula la carpeta y el nombre del archivo en el NAS para un podcast.
+        
+        Con layout 'hundreds' los archivos se agrupan en subcarpetas por centenas
+        (p. ej. popcasting_0485.mp3 -> <nas_folder>/0400/) para que los listados
+        sigan siendo rápidos a medida que crece el archivo. El nombre sale de
+        file_template (ver [archive] file_template o la sección del feed).
+        
+        Args:
+            program_number: Número del programa
+            
+        Returns:
+            tuple: (carpeta, nombre_archivo)
+        """
+        nas_filename = self.file_template.format(number=program_number)
+        if self.layout == 'hundreds':
+            return f"{self.nas_folder}/{(program_number // 100) * 100:04d}", nas_filename
+        return self.nas_folder, nas_filename
+    
     def get_nas_path_for_podcast(self, program_number: int) -> str:
         """
         Genera la ruta del NAS para un podcast basado en su número de programa.
@@ -316,21 +734,28 @@ class AudioManager:
         Returns:
             str: Ruta completa del archivo en el NAS
         """
-        nas_filename = f"popcasting_{program_number:04d}.mp3"
-        return f"/popcasting_marilyn/mp3/{nas_filename}"
+        nas_folder, nas_filename = self.get_nas_location(program_number)
+        return f"{nas_folder}/{nas_filename}"
     
     def check_podcast_in_nas(self, program_number: int) -> bool:
         """
         Verifica si un podcast existe en el NAS basado en su número de programa.
         
+        Con layout 'hundreds' también se acepta la ubicación plana anterior, para
+        no volver a archivar episodios subidos antes del cambio de layout.
+        
         Args:
             program_number: Número del programa
             
         Returns:
             bool: True si el archivo existe en el NAS
         """
-        nas_filename = f"popcasting_{program_number:04d}.mp3"
-        return self._file_exists_in_nas(nas_filename, "/popcasting_marilyn/mp3")
+        nas_folder, nas_filename = self.get_nas_location(program_number)
+        if self._file_exists_in_nas(nas_filename, nas_folder):
+            return True
+        if nas_folder != self.nas_folder:
+            return self._file_exists_in_nas(nas_filename, self.nas_folder)
+        return False
     
     def __enter__(self):
         """Context manager entry."""
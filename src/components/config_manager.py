@@ -8,6 +8,8 @@ import sys
 current_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(current_dir))
 
+from utils.bandwidth import parse_schedule
+
 class ConfigManager:
     """
     Gestiona la lectura de configuraciones y carga secretos desde variables de entorno.
@@ -60,12 +62,266 @@ class ConfigManager:
             "shared_folder": shared_folder
         }
 
+    def get_synology_client_config(self):
+        """
+        Devuelve las opciones de conexión de SynologyClient.
+        
+        - pool_size: conexiones keep-alive compartidas por todos los hilos
+        - session_cache_dir: carpeta donde guardar el SID entre ejecuciones (None si
+          persist_session = false)
+        """
+        persist = self.config.getboolean('synology', 'persist_session', fallback=True)
+        return {
+            'pool_size': self.config.getint('synology', 'pool_size', fallback=10),
+            'session_cache_dir': self.get_cache_dir() if persist else None,
+        }
+
     def get_rss_url(self):
         """Devuelve la URL del feed RSS."""
         return self.config['rss']['url']
 
+    def get_rss_parser(self):
+        """Devuelve el motor de parseo del feed RSS: 'feedparser' o 'lxml'."""
+        engine = self.config.get('rss', 'parser', fallback='feedparser').strip().lower()
+        if engine not in ('feedparser', 'lxml'):
+            raise ValueError(f"Valor de [rss] parser no soportado: {engine}. Usa 'feedparser' o 'lxml'.")
+        return engine
+
     def get_wordpress_config(self):
         """Devuelve la configuración de WordPress."""
         base_url = self.config['wordpress']['url']
         api_url = f"{base_url.rstrip('/')}/wp-json/wp/v2"
-        return {'api_url': api_url} 
\ No newline at end of file
+        return {'api_url': api_url}
+
+    def get_feeds(self):
+        """
+        Devuelve los programas (feeds) que sincroniza el proceso.
+        
+        Cada sección [feed:<nombre>] de config.ini define un programa. Si no hay
+        ninguna, se usa un único programa con [rss], [wordpress] y [archive].
+        
+        - name: nombre del programa (el de la sección)
+        - rss_url, parser: feed RSS y motor de parseo (por defecto el de [rss])
+        - title_prefix: nombre que precede al número en los títulos ("Popcasting485")
+        - wordpress_api_url: API REST del WordPress del programa (None si no tiene)
+        - post_slug_template: slug de los posts de episodio, con {number}
+        - archive: get_archive_config() con la nas_folder y el file_template del programa
+        - podcasts_table, songs_table: tablas de Supabase del programa
+        """
+        archive_config = self.get_archive_config()
+        default_template = self.config.get('archive', 'file_template', fallback='popcasting_{number:04d}.mp3')
+        sections = [name for name in self.config.sections() if name.startswith('feed:')]
+        
+        if not sections:
+            return [{
+                'name': 'popcasting',
+                'rss_url': self.get_rss_url(),
+                'parser': self.get_rss_parser(),
+                'title_prefix': 'popcasting',
+                'wordpress_api_url': self.get_wordpress_config()['api_url'] if self.config.has_section('wordpress') else None,
+                'post_slug_template': 'popcasting-{number}',
+                'archive': dict(archive_config, file_template=default_template),
+                'podcasts_table': 'podcasts',
+                'songs_table': 'songs',
+            }]
+        
+        feeds = []
+        for section in sections:
+            name = section.split(':', 1)[1].strip()
+            feed = self.config[section]
+            if not feed.get('url', '').strip():
+                raise ValueError(f"Falta url en [{section}].")
+            if not feed.get('nas_folder', '').strip():
+                raise ValueError(f"Falta nas_folder en [{section}].")
+            
+            parser = feed.get('parser', '').strip().lower() or self.get_rss_parser()
+            if parser not in ('feedparser', 'lxml'):
+                raise ValueError(f"Valor de [{section}] parser no soportado: {parser}. Usa 'feedparser' o 'lxml'.")
+            wordpress_url = feed.get('wordpress_url', '').strip()
+            
+            feeds.append({
+                'name': name,
+                'rss_url': feed['url'].strip(),
+                'parser': parser,
+                'title_prefix': feed.get('title_prefix', name).strip(),
+                'wordpress_api_url': f"{wordpress_url.rstrip('/')}/wp-json/wp/v2" if wordpress_url else None,
+                'post_slug_template': feed.get('post_slug_template', f"{name}-{{number}}").strip(),
+                'archive': dict(archive_config,
+                                nas_folder=feed['nas_folder'].strip().rstrip('/'),
+                                file_template=feed.get('file_template', f"{name}_{{number:04d}}.mp3").strip()),
+                'podcasts_table': feed.get('podcasts_table', 'podcasts').strip(),
+                'songs_table': feed.get('songs_table', 'songs').strip(),
+            })
+        
+        # Dos programas no pueden compartir tablas ni nombres de archivo en el NAS
+        for key in ('podcasts_table', 'songs_table'):
+            values = [feed[key] for feed in feeds]
+            if len(set(values)) != len(values):
+                raise ValueError(f"Cada [feed:*] necesita su propia {key}: {', '.join(values)}")
+        locations = [(feed['archive']['nas_folder'], feed['archive']['file_template']) for feed in feeds]
+        if len(set(locations)) != len(locations):
+            raise ValueError("Cada [feed:*] necesita su propia nas_folder o file_template")
+        return feeds
+
+    def get_sync_config(self):
+        """
+        Devuelve la configuración de la sincronización.
+        
+        - max_workers: episodios procesados a la vez entre todos los feeds (se
+          reparten por turnos para que un feed con muchos pendientes no acapare
+          los workers)
+        """
+        return {
+            'max_workers': max(1, self.config.getint('sync', 'max_workers', fallback=1)),
+        }
+
+    def get_cache_dir(self):
+        """Devuelve la carpeta donde se guardan las cachés locales."""
+        project_root = Path(__file__).parent.parent.parent
+        cache_dir = self.config.get('cache', 'dir', fallback='cache')
+        cache_path = Path(cache_dir)
+        if not cache_path.is_absolute():
+            cache_path = project_root / cache_path
+        return cache_path
+
+    def get_http_cache_config(self):
+        """
+        Devuelve la configuración de la caché HTTP en disco (páginas y API REST de WordPress, feed RSS).
+        
+        - cache_dir: <carpeta de cachés>/http, o None si está desactivada
+        - max_bytes: tamaño máximo (None = sin límite); se eliminan las entradas usadas hace más tiempo
+        - offline: servir solo desde la caché, sin red
+        """
+        enabled = self.config.getboolean('http_cache', 'enabled', fallback=True)
+        max_mb = self.config.getfloat('http_cache', 'max_mb', fallback=200)
+        return {
+            'cache_dir': self.get_cache_dir() / 'http' if enabled else None,
+            'max_bytes': int(max_mb * 1024 * 1024) or None,
+            'offline': self.config.getboolean('http_cache', 'offline', fallback=False),
+        }
+
+    def get_wordpress_url_map_config(self):
+        """
+        Devuelve la configuración del mapa persistente número de programa -> URL del post.
+        
+        - cache_dir: carpeta donde se guarda (None si está desactivado)
+        - miss_retry_seconds: espera antes de volver a buscar un episodio sin post
+          (se duplica con cada búsqueda fallida)
+        """
+        enabled = self.config.getboolean('wordpress_urls', 'enabled', fallback=True)
+        return {
+            'cache_dir': self.get_cache_dir() if enabled else None,
+            'miss_retry_seconds': int(self.config.getfloat('wordpress_urls', 'miss_retry_hours', fallback=24) * 3600),
+        }
+
+    def get_archive_config(self):
+        """
+        Devuelve la configuración del archivo de audio en el NAS.
+        
+        - nas_folder: carpeta base de los MP3 en el NAS
+        - layout: 'flat' (todos en la misma carpeta) o 'hundreds' (subcarpetas 0000, 0100, ...)
+        - inventory_ttl: segundos que se considera válido el inventario cacheado
+        - backend: 'synology' (API de FileStation) o 'local' (carpeta local o montada)
+        - local_root: punto de montaje equivalente a la raíz del NAS (backend local)
+        - strategy: 'local' (descargar aquí y subir) o 'download_station' (descarga el NAS)
+        - download_station_batch/poll/timeout: tareas simultáneas, segundos entre
+          consultas y segundos máximos por tarea de Download Station
+        """
+        layout = self.config.get('archive', 'layout', fallback='flat').strip().lower()
+        if layout not in ('flat', 'hundreds'):
+            raise ValueError(f"Valor de [archive] layout no soportado: {layout}. Usa 'flat' o 'hundreds'.")
+        
+        strategy = self.config.get('archive', 'strategy', fallback='local').strip().lower()
+        if strategy not in ('local', 'download_station'):
+            raise ValueError(f"Valor de [archive] strategy no soportado: {strategy}. Usa 'local' o 'download_station'.")
+        
+        backend = self.config.get('archive', 'backend', fallback='synology').strip().lower()
+        if backend not in ('synology', 'local'):
+            raise ValueError(f"Valor de [archive] backend no soportado: {backend}. Usa 'synology' o 'local'.")
+        local_root = self.config.get('archive', 'local_root', fallback='').strip()
+        if backend == 'local' and not local_root:
+            raise ValueError("Con [archive] backend = local hay que indicar local_root (p. ej. /mnt/nas).")
+        if backend == 'local' and strategy == 'download_station':
+            raise ValueError("La estrategia download_station necesita el backend synology.")
+        
+        return {
+            'backend': backend,
+            'local_root': local_root or None,
+            'nas_folder': self.config.get('archive', 'nas_folder', fallback='/popcasting_marilyn/mp3').rstrip('/'),
+            'layout': layout,
+            'inventory_ttl': self.config.getint('archive', 'inventory_ttl', fallback=3600),
+            'strategy': strategy,
+            'download_station_batch': self.config.getint('archive', 'download_station_batch', fallback=20),
+            'download_station_poll': self.config.getfloat('archive', 'download_station_poll', fallback=10),
+            'download_station_timeout': self.config.getfloat('archive', 'download_station_timeout', fallback=3600),
+        }
+
+    def get_s3_config(self):
+        """
+        Devuelve la configuración de la réplica del archivo en S3 o None si está desactivada.
+        
+        - bucket, prefix: bucket y prefijo de las claves
+        - endpoint_url: URL del servicio (vacía para AWS; p. ej. http://localhost:9000 para MinIO)
+        - region: región del bucket
+        - part_size: bytes por parte de las subidas multipart
+        - max_concurrency: partes subidas en paralelo por archivo
+        - inventory_ttl: segundos que el listado del bucket cacheado se considera válido
+        
+        Las credenciales se leen de S3_ACCESS_KEY_ID y S3_SECRET_ACCESS_KEY en .env
+        (o de la cadena de credenciales habitual de boto3).
+        """
+        if not self.config.getboolean('s3', 'mirror', fallback=False):
+            return None
+        
+        bucket = self.config.get('s3', 'bucket', fallback='').strip()
+        if not bucket:
+            raise ValueError("Con [s3] mirror = true hay que indicar bucket.")
+        part_size_mb = self.config.getint('s3', 'part_size_mb', fallback=16)
+        if part_size_mb < 5:
+            raise ValueError("[s3] part_size_mb debe ser al menos 5 (mínimo de S3 para multipart).")
+        
+        return {
+            'bucket': bucket,
+            'prefix': self.config.get('s3', 'prefix', fallback='').strip(),
+            'endpoint_url': self.config.get('s3', 'endpoint_url', fallback='').strip() or None,
+            'region': self.config.get('s3', 'region', fallback='').strip() or None,
+            'part_size': part_size_mb * 1024 * 1024,
+            'max_concurrency': self.config.getint('s3', 'max_concurrency', fallback=8),
+            'inventory_ttl': self.config.getint('s3', 'inventory_ttl', fallback=3600),
+        }
+
+    def get_temp_storage_config(self):
+        """
+        Devuelve la configuración de la carpeta temporal de descargas.
+        
+        - base_dir: carpeta (relativa a la raíz del proyecto)
+        - budget_bytes: bytes máximos reservados a la vez (None = sin límite)
+        - use_tmpfs: usar /dev/shm si está disponible
+        - orphan_max_age: segundos tras los que un archivo temporal se considera huérfano
+        """
+        project_root = Path(__file__).parent.parent.parent
+        base_dir = Path(self.config.get('temp_storage', 'dir', fallback='temp_downloads'))
+        if not base_dir.is_absolute():
+            base_dir = project_root / base_dir
+        budget_mb = self.config.getint('temp_storage', 'budget_mb', fallback=0)
+        return {
+            'base_dir': base_dir,
+            'budget_bytes': budget_mb * 1024 * 1024 or None,
+            'use_tmpfs': self.config.getboolean('temp_storage', 'use_tmpfs', fallback=False),
+            'orphan_max_age': self.config.getint('temp_storage', 'orphan_max_age', fallback=3600),
+        }
+
+    def get_bandwidth_config(self):
+        """
+        Devuelve los límites de ancho de banda en bytes/s (None = sin límite).
+        
+        En config.ini los límites se expresan en KB/s y las franjas horarias con
+        el formato "HH:MM-HH:MM entrada/salida" separadas por comas.
+        """
+        ingress_kb = self.config.getfloat('bandwidth', 'ingress_limit', fallback=0)
+        egress_kb = self.config.getfloat('bandwidth', 'egress_limit', fallback=0)
+        return {
+            'ingress_limit': ingress_kb * 1024 or None,
+            'egress_limit': egress_kb * 1024 or None,
+            'schedule': parse_schedule(self.config.get('bandwidth', 'schedule', fallback='')),
+        }
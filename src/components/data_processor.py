@@ -10,6 +10,9 @@ sys.path.insert(0, str(current_dir))
 from utils.logger import logger
 from components.rss_data_processor import RSSDataProcessor
 from components.wordpress_data_processor import WordPressDataProcessor
+from components.models import Episode
+from components.wordpress_url_map import WordPressURLMap
+from components.wordpress_client import WordPressUnavailableError
 
 
 class DataProcessor:
@@ -17,16 +20,19 @@ class DataProcessor:
     Orquestador que unifica datos del RSS y WordPress usando procesadores específicos.
     """
     
-    def __init__(self, rss_processor: RSSDataProcessor, wordpress_processor: WordPressDataProcessor):
+    def __init__(self, rss_processor: RSSDataProcessor, wordpress_processor: WordPressDataProcessor,
+                 url_map: Optional[WordPressURLMap] = None):
         """
         Inicializa el procesador de datos unificado.
         
         Args:
             rss_processor: Instancia del procesador de RSS
             wordpress_processor: Instancia del procesador de WordPress
+            url_map: Mapa persistente número de programa -> URL del post (None para buscar siempre)
         """
         self.rss_processor = rss_processor
         self.wordpress_processor = wordpress_processor
+        self.url_map = url_map
         logger.info("DataProcessor (orquestador) inicializado")
     
     def process_entry(self, rss_entry, wordpress_data: Optional[Dict] = None) -> Dict:
@@ -177,7 +183,7 @@ class DataProcessor:
         
         return unified_data
     
-    def get_unified_episodes(self, wordpress_client, limit: Optional[int] = None) -> List[Dict]:
+    def get_unified_episodes(self, wordpress_client, limit: Optional[int] = None) -> List[Episode]:
         """
         Obtiene episodios unificados del RSS y WordPress.
         
@@ -186,7 +192,7 @@ class DataProcessor:
             limit: Número máximo de episodios a procesar (None para todos)
             
         Returns:
-            List[Dict]: Lista de episodios unificados
+            List[Episode]: Lista de episodios unificados
         """
         try:
             # Obtener entradas del RSS
@@ -213,16 +219,16 @@ class DataProcessor:
             logger.error(f"Error al obtener episodios unificados: {e}")
             return []
     
-    def process_single_episode(self, rss_episode: Dict, wordpress_client) -> Dict:
+    def process_single_episode(self, rss_episode: Episode, wordpress_client) -> Optional[Episode]:
         """
         Procesa un episodio específico del RSS y lo unifica con datos de WordPress.
         
         Args:
-            rss_episode: Datos del episodio del RSS
+            rss_episode: Episodio del RSS (o diccionario con sus datos)
             wordpress_client: Cliente de WordPress
             
         Returns:
-            Dict: Datos unificados del episodio
+            Episode: Episodio unificado (None si no se pudo procesar)
         """
         try:
             logger.info(f"Procesando episodio individual: {rss_episode.get('title', 'Sin título')}")
@@ -233,30 +239,29 @@ class DataProcessor:
                 return unified_episode
             else:
                 logger.warning(f"No se pudo procesar el episodio: {rss_episode.get('title', 'Sin título')}")
-                return {}
+                return None
                 
         except Exception as e:
             logger.error(f"Error al procesar episodio individual: {e}")
-            return {}
+            return None
     
-    def _unify_rss_with_wordpress(self, rss_entry: Dict, wordpress_client) -> Dict:
+    def _unify_rss_with_wordpress(self, rss_entry: Episode, wordpress_client) -> Episode:
         """
         Unifica datos del RSS con WordPress usando el número de programa.
         
+        El episodio del RSS no se modifica (puede venir de la instantánea
+        compartida del feed): se devuelve uno nuevo enlazado con su post.
+        
         Args:
-            rss_entry: Datos del episodio del RSS
+            rss_entry: Episodio del RSS (o diccionario con sus datos)
             wordpress_client: Cliente de WordPress
             
         Returns:
-            Dict: Datos unificados
+            Episode: Episodio unificado
         """
         try:
-            # Usar los datos del RSS como base
-            unified_data = rss_entry.copy()
-            
-            # Asegurar que el campo guid esté presente
-            if 'guid' not in unified_data:
-                unified_data['guid'] = rss_entry.get('entry_id', '')
+            if not isinstance(rss_entry, Episode):
+                rss_entry = Episode.from_dict(rss_entry)
             
             # Intentar obtener datos de WordPress usando el número de programa
             program_number = rss_entry.get('program_number')
@@ -279,69 +284,79 @@ class DataProcessor:
                     date = "2025-05-31"  # Fallback
                     logger.warning("No hay fecha disponible en el RSS")
                 
-                # Intentar con la fecha exacta del RSS
-                wordpress_data = wordpress_client.get_post_details_by_date_and_number(date, str(program_number))
-                
-                # Si no se encuentra, intentar con fechas cercanas (±1 día)
-                if not wordpress_data:
-                    logger.info(f"No encontrado en fecha exacta {date}, buscando en fechas cercanas...")
-                    from datetime import datetime, timedelta
-                    
-                    try:
-                        base_date = datetime.strptime(date, '%Y-%m-%d')
-                        
-                        # Probar fechas cercanas: -1 día, +1 día, +2 días
-                        nearby_dates = [
-                            (base_date - timedelta(days=1)).strftime('%Y-%m-%d'),
-                            (base_date + timedelta(days=1)).strftime('%Y-%m-%d'),
-                            (base_date + timedelta(days=2)).strftime('%Y-%m-%d')
-                        ]
-                        
-                        for nearby_date in nearby_dates:
-                            logger.info(f"Probando fecha: {nearby_date}")
-                            wordpress_data = wordpress_client.get_post_details_by_date_and_number(nearby_date, str(program_number))
-                            if wordpress_data:
-                                logger.info(f"¡Encontrado en fecha {nearby_date}!")
-                                break
-                    except Exception as e:
-                        logger.warning(f"Error al buscar fechas cercanas: {e}")
+                wordpress_data = self._find_wordpress_post(wordpress_client, program_number, date)
                 
                 if wordpress_data:
                     logger.info(f"Datos de WordPress encontrados para programa {program_number}")
-                    # Procesar datos de WordPress
-                    wordpress_processed = self.wordpress_processor.process_post_data(wordpress_data)
-                    
-                    # Unificar con los datos del RSS
-                    unified_data.update({
-                        'wordpress_id': wordpress_processed.get('wordpress_id'),
-                        'wordpress_title': wordpress_processed.get('title', ''),
-                        'wordpress_content': wordpress_processed.get('content', ''),
-                        'wordpress_excerpt': wordpress_processed.get('excerpt', ''),
-                        'wordpress_slug': wordpress_processed.get('slug', ''),
-                        'wordpress_date': wordpress_processed.get('date'),
-                        'wordpress_modified': wordpress_processed.get('modified'),
-                        'featured_image_url': wordpress_processed.get('featured_image_url'),
-                        'wordpress_author': wordpress_processed.get('author'),
-                        'wordpress_status': wordpress_processed.get('status'),
-                        'wordpress_link': wordpress_processed.get('link', ''),
-                        'wordpress_categories': wordpress_processed.get('categories', []),
-                        'wordpress_tags': wordpress_processed.get('tags', []),
-                        'wordpress_playlist_data': wordpress_processed.get('playlist_data'),
-                        'web_extra_links': wordpress_processed.get('web_extra_links', []),
-                        'content_length': wordpress_processed.get('content_length', 0)
-                    })
-                    
-                    # Priorizar imagen destacada de WordPress si está disponible
-                    if wordpress_processed.get('featured_image_url'):
-                        unified_data['featured_image_url'] = wordpress_processed['featured_image_url']
+                    # Procesar datos de WordPress y enlazar el post (sin copiar sus campos)
+                    wordpress_post = self.wordpress_processor.process_post_data(wordpress_data)
+                    if wordpress_post:
+                        return rss_entry.with_wordpress(wordpress_post)
                 else:
                     logger.warning(f"No se encontraron datos de WordPress para programa {program_number}")
             
-            return unified_data
+            return rss_entry
             
         except Exception as e:
             logger.error(f"Error al unificar RSS con WordPress: {e}")
             return rss_entry
+    
+    def _find_wordpress_post(self, wordpress_client, program_number: int, date: str) -> Optional[Dict]:
+        """
+        Busca el post de un episodio consultando antes el mapa de URLs (si lo hay).
+        
+        - Post ya resuelto: se usa su URL directamente (o el índice del catálogo).
+        - Episodio sin post cuyo reintento no ha llegado: no se busca.
+        - En otro caso se resuelve por la API REST o, si no, comprobando a la vez la
+          fecha exacta y las cercanas (-1, +1 y +2 días), y se anota el resultado.
+          Solo se anota "sin post" si WordPress lo confirma (búsqueda vacía o todo 404):
+          un error de red o un 5xx no cuenta como fallo.
+        
+        Returns:
+            dict: Datos del post (ver WordPressClient.get_post_details_by_url) o None
+        """
+        url_map = self.url_map
+        if url_map is None:
+            return self._search_wordpress_post(wordpress_client, program_number, date)
+        
+        known = url_map.get_url(program_number)
+        if known:
+            wordpress_data = (wordpress_client.get_post_details_from_index(program_number)
+                              or wordpress_client.get_post_details_by_url(known['url'], known['date'] or date))
+            if wordpress_data:
+                logger.info(f"🗺️ Post del programa {program_number} tomado del mapa de URLs: {known['url']}")
+                return wordpress_data
+            logger.warning(f"⚠️ La URL guardada del programa {program_number} ya no responde, se busca de nuevo")
+            url_map.forget(program_number)
+        elif url_map.is_missing(program_number):
+            # Solo se comprueba el índice del catálogo, que no hace peticiones
+            wordpress_data = wordpress_client.get_post_details_from_index(program_number)
+            if not wordpress_data:
+                logger.info(f"⏭️ Programa {program_number} sin post en WordPress en la última búsqueda, "
+                            f"no se vuelve a buscar hasta que caduque")
+                return None
+            url_map.record_found(program_number, wordpress_data['wordpress_url'], wordpress_data.get('date'))
+            return wordpress_data
+        
+        try:
+            wordpress_data = wordpress_client.find_post_by_number(date, str(program_number))
+        except WordPressUnavailableError as e:
+            logger.warning(f"⚠️ No se pudo comprobar el post del programa {program_number}, "
+                           f"se reintentará en la próxima ejecución: {e}")
+            return None
+        if wordpress_data:
+            url_map.record_found(program_number, wordpress_data['wordpress_url'], wordpress_data.get('date'))
+        else:
+            url_map.record_missing(program_number)
+        return wordpress_data
+    
+    def _search_wordpress_post(self, wordpress_client, program_number: int, date: str) -> Optional[Dict]:
+        """Busca el post sin mapa de URLs; si WordPress no responde, el episodio queda sin post."""
+        try:
+            return wordpress_client.find_post_by_number(date, str(program_number))
+        except WordPressUnavailableError as e:
+            logger.warning(f"⚠️ No se pudo comprobar el post del programa {program_number}: {e}")
+            return None
 
 
 if __name__ == "__main__":
@@ -357,7 +372,7 @@ if __name__ == "__main__":
         config_manager = ConfigManager()
         
         # Procesadores específicos
-        rss_processor = RSSDataProcessor(config_manager.get_rss_url())
+        rss_processor = RSSDataProcessor(config_manager.get_rss_url(), config_manager.get_rss_parser())
         wordpress_processor = WordPressDataProcessor()
         
         # Cliente de WordPress
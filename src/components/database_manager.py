@@ -1,5 +1,6 @@
 # Gestor de base de datos para el sincronizador RSS
 from supabase import create_client, Client
+import copy
 import logging
 import sys
 import os
@@ -9,13 +10,34 @@ from pathlib import Path
 current_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(current_dir))
 
+from components.models import Episode, Song
+
+
+# Columnas de podcasts con la huella del MP3 archivado (ver "Archivo de audio en el NAS" en el README)
+AUDIO_FINGERPRINT_COLUMNS = ('mp3_sha256', 'mp3_md5', 'mp3_size')
+
+
+class MissingColumnsError(RuntimeError):
+    """La tabla no tiene columnas que el sincronizador necesita (falta aplicar la migración del README)."""
+
 
 class DatabaseManager:
     """Gestor de base de datos Supabase para el sincronizador RSS."""
     
-    def __init__(self, supabase_url: str, supabase_key: str):
-        """Inicializa la conexión a Supabase."""
+    def __init__(self, supabase_url: str, supabase_key: str, podcasts_table: str = 'podcasts',
+                 songs_table: str = 'songs'):
+        """
+        Inicializa la conexión a Supabase.
+        
+        Args:
+            supabase_url: URL del proyecto de Supabase
+            supabase_key: Clave de la API
+            podcasts_table: Tabla de episodios del programa
+            songs_table: Tabla de canciones del programa
+        """
         self.logger = logging.getLogger(__name__)
+        self.podcasts_table = podcasts_table
+        self.songs_table = songs_table
         
         try:
             # Crear cliente de Supabase
@@ -26,6 +48,22 @@ class DatabaseManager:
             self.logger.error(f"❌ Error al conectar a Supabase: {e}")
             raise
     
+    def for_tables(self, podcasts_table: str, songs_table: str) -> 'DatabaseManager':
+        """
+        Gestor para las tablas de otro programa que comparte la misma conexión.
+        
+        Args:
+            podcasts_table: Tabla de episodios del programa
+            songs_table: Tabla de canciones del programa
+            
+        Returns:
+            DatabaseManager: Copia con las tablas indicadas (el cliente de Supabase es el mismo)
+        """
+        view = copy.copy(self)
+        view.podcasts_table = podcasts_table
+        view.songs_table = songs_table
+        return view
+    
     def test_connection(self):
         """Prueba la conexión ejecutando una consulta simple."""
         try:
@@ -104,7 +142,7 @@ class DatabaseManager:
         """
         try:
             # Obtener el episodio con el número más alto (más reciente)
-            result = self.client.table('podcasts').select('*').order('program_number', desc=True).limit(1).execute()
+            result = self.client.table(self.podcasts_table).select('*').order('program_number', desc=True).limit(1).execute()
             
             if result.data:
                 latest_podcast = result.data[0]
@@ -131,7 +169,7 @@ class DatabaseManager:
             bool: True si el podcast existe, False en caso contrario
         """
         try:
-            result = self.client.table('podcasts').select('id', count='exact').eq('guid', guid).execute()
+            result = self.client.table(self.podcasts_table).select('id', count='exact').eq('guid', guid).execute()
             count = result.count if hasattr(result, 'count') else len(result.data)
             exists = count > 0
             self.logger.debug(f"Verificando podcast con GUID '{guid}': {'existe' if exists else 'no existe'}")
@@ -140,103 +178,35 @@ class DatabaseManager:
             self.logger.error(f"Error al verificar existencia del podcast con GUID '{guid}': {e}")
             return False
     
-    def insert_full_podcast(self, podcast_data: dict) -> int:
+    def insert_full_podcast(self, podcast_data) -> int:
         """
         Inserta un podcast completo con sus canciones en la base de datos.
         Operación transaccional que inserta en las tablas 'podcasts' y 'songs'.
         
         Args:
-            podcast_data: Diccionario con los datos del podcast y sus canciones
+            podcast_data: Episode unificado (o el diccionario antiguo, que se convierte a Episode;
+                          si trae 'web_playlist' como lista, esas canciones se insertan también)
             
         Returns:
             int: ID del podcast insertado
+            
+        Raises:
+            MissingColumnsError: Si la tabla no tiene la columna content_hash
         """
         try:
-            # Extraer la lista de canciones y eliminarla del diccionario principal
-            songs = podcast_data.pop('web_playlist', [])
-            self.logger.info(f"Insertando podcast: {podcast_data.get('title', 'Sin título')}")
-            
-            # Filtrar solo los campos válidos para la tabla podcasts
-            valid_podcast_fields = {
-                'title', 'date', 'url', 'download_url', 'file_size', 'program_number', 
-                'wordpress_url', 'cover_image_url', 'web_extra_links', 'web_playlist',
-                'web_songs_count', 'comments', 'duration', 'rss_playlist'
-            }
-            
-            # Crear diccionario con solo campos válidos y mapeo correcto
-            filtered_podcast_data = {}
-            
-            # Mapeo de campos del procesador a campos de la tabla
-            field_mapping = {
-                'title': 'title',
-                'date': 'date',
-                'url': 'url',
-                'download_url': 'download_url',
-                'file_size': 'file_size',
-                'program_number': 'program_number',
-                'wordpress_link': 'wordpress_url',
-                'featured_image_url': 'cover_image_url',
-                'web_extra_links': 'web_extra_links',
-                'wordpress_playlist_data': 'web_playlist',
-                'comments': 'comments',
-                'duration': 'duration',
-                'rss_playlist': 'rss_playlist'
-            }
-            
-            for key, value in podcast_data.items():
-                if key in field_mapping:
-                    db_field = field_mapping[key]
-                    filtered_podcast_data[db_field] = value
-                else:
-                    self.logger.debug(f"Campo '{key}' omitido (no existe en tabla podcasts)")
-            
-            # Procesar web_playlist y calcular web_songs_count
-            if 'web_playlist' in filtered_podcast_data:
-                web_playlist_data = filtered_podcast_data['web_playlist']
-                
-                # Si es un diccionario con estructura anidada, extraer solo las canciones
-                if isinstance(web_playlist_data, dict) and 'songs' in web_playlist_data:
-                    songs_list = web_playlist_data['songs']
-                    # Calcular el número de canciones
-                    filtered_podcast_data['web_songs_count'] = len(songs_list) if isinstance(songs_list, list) else 0
-                    # Guardar solo la lista de canciones como JSON
-                    import json
-                    filtered_podcast_data['web_playlist'] = json.dumps(songs_list, ensure_ascii=False)
-                    self.logger.info(f"Procesado web_playlist: {filtered_podcast_data['web_songs_count']} canciones")
-                
-                # Si es una lista directa
-                elif isinstance(web_playlist_data, list):
-                    filtered_podcast_data['web_songs_count'] = len(web_playlist_data)
-                    import json
-                    filtered_podcast_data['web_playlist'] = json.dumps(web_playlist_data, ensure_ascii=False)
-                    self.logger.info(f"Procesado web_playlist: {filtered_podcast_data['web_songs_count']} canciones")
-                
-                # Si es un string JSON, intentar parsearlo
-                elif isinstance(web_playlist_data, str):
-                    try:
-                        import json
-                        parsed_data = json.loads(web_playlist_data)
-                        if isinstance(parsed_data, dict) and 'songs' in parsed_data:
-                            songs_list = parsed_data['songs']
-                            filtered_podcast_data['web_songs_count'] = len(songs_list) if isinstance(songs_list, list) else 0
-                            filtered_podcast_data['web_playlist'] = json.dumps(songs_list, ensure_ascii=False)
-                        elif isinstance(parsed_data, list):
-                            filtered_podcast_data['web_songs_count'] = len(parsed_data)
-                        self.logger.info(f"Procesado web_playlist desde JSON: {filtered_podcast_data.get('web_songs_count', 0)} canciones")
-                    except json.JSONDecodeError:
-                        self.logger.warning("No se pudo parsear web_playlist como JSON")
-                        filtered_podcast_data['web_songs_count'] = 0
-                else:
-                    self.logger.warning(f"Formato de web_playlist no reconocido: {type(web_playlist_data)}")
-                    filtered_podcast_data['web_songs_count'] = 0
+            songs = []
+            if not isinstance(podcast_data, Episode):
+                songs = podcast_data.get('web_playlist') or []
+                podcast_data = Episode.from_dict(podcast_data)
+            self.logger.info(f"Insertando podcast: {podcast_data.title or 'Sin título'}")
             
-            # Convertir web_extra_links a JSON string si es una lista
-            if 'web_extra_links' in filtered_podcast_data and isinstance(filtered_podcast_data['web_extra_links'], list):
-                import json
-                filtered_podcast_data['web_extra_links'] = json.dumps(filtered_podcast_data['web_extra_links'], ensure_ascii=False)
+            # Fila con las columnas de la tabla podcasts (el JSON de las playlists se genera aquí)
+            podcast_row = podcast_data.to_podcast_row()
+            if 'web_playlist' in podcast_row:
+                self.logger.info(f"Procesado web_playlist: {podcast_row['web_songs_count']} canciones")
             
             # Insertar el podcast en la tabla podcasts
-            podcast_result = self.client.table('podcasts').insert(filtered_podcast_data).execute()
+            podcast_result = self.client.table(self.podcasts_table).insert(podcast_row).execute()
             
             if not podcast_result.data:
                 raise Exception("No se pudo insertar el podcast en la base de datos")
@@ -247,30 +217,18 @@ class DatabaseManager:
             
             # Si hay canciones, insertarlas en la tabla songs
             if songs:
-                # Añadir el podcast_id a cada canción
-                songs_with_podcast_id = []
-                for song in songs:
-                    song_copy = song.copy()
-                    song_copy['podcast_id'] = podcast_id
-                    songs_with_podcast_id.append(song_copy)
-                
-                # Insertar todas las canciones de una vez
-                songs_result = self.client.table('songs').insert(songs_with_podcast_id).execute()
-                self.logger.info(f"Insertadas {len(songs_with_podcast_id)} canciones para el podcast {podcast_id}")
+                song_rows = [Song.from_dict(song, podcast_id).to_row() for song in songs]
+                self.client.table(self.songs_table).insert(song_rows).execute()
+                self.logger.info(f"Insertadas {len(song_rows)} canciones para el podcast {podcast_id}")
             else:
                 self.logger.info("No hay canciones para insertar")
             
-            # Restaurar la lista de canciones en el diccionario original
-            podcast_data['web_playlist'] = songs
-            
             # Devolver el ID del podcast insertado
             return podcast_id
             
         except Exception as e:
+            self._raise_if_missing_columns(e, ('content_hash',))
             self.logger.error(f"Error al insertar podcast completo: {e}")
-            # Restaurar la lista de canciones en caso de error
-            if 'web_playlist' not in podcast_data:
-                podcast_data['web_playlist'] = songs
             raise
     
     def close(self):
@@ -294,7 +252,7 @@ class DatabaseManager:
             list: Lista de todos los podcasts
         """
         try:
-            result = self.client.table('podcasts').select('*').execute()
+            result = self.client.table(self.podcasts_table).select('*').execute()
             podcasts = result.data
             self.logger.info(f"Obtenidos {len(podcasts)} podcasts de la base de datos")
             return podcasts
@@ -311,7 +269,7 @@ class DatabaseManager:
         """
         try:
             # Obtener podcasts donde rss_playlist es null, vacío o no existe
-            result = self.client.table('podcasts').select('*').or_('rss_playlist.is.null,rss_playlist.eq.,rss_playlist.eq.null').execute()
+            result = self.client.table(self.podcasts_table).select('*').or_('rss_playlist.is.null,rss_playlist.eq.,rss_playlist.eq.null').execute()
             podcasts = result.data
             self.logger.info(f"Encontrados {len(podcasts)} podcasts sin rss_playlist")
             return podcasts
@@ -331,7 +289,7 @@ class DatabaseManager:
             bool: True si se actualizó correctamente, False en caso contrario
         """
         try:
-            result = self.client.table('podcasts').update({'rss_playlist': rss_playlist}).eq('id', podcast_id).execute()
+            result = self.client.table(self.podcasts_table).update({'rss_playlist': rss_playlist}).eq('id', podcast_id).execute()
             
             if result.data:
                 self.logger.info(f"✅ Podcast {podcast_id} actualizado con rss_playlist")
@@ -359,7 +317,7 @@ class DatabaseManager:
             # Convertir a entero para compatibilidad con la BD
             duration_int = int(round(duration_in_seconds))
             
-            result = self.client.table('podcasts').update({'mp3_duration': duration_int}).eq('id', podcast_id).execute()
+            result = self.client.table(self.podcasts_table).update({'mp3_duration': duration_int}).eq('id', podcast_id).execute()
             
             if result.data:
                 self.logger.info(f"✅ Podcast {podcast_id} actualizado con mp3_duration: {duration_int}s")
@@ -372,6 +330,59 @@ class DatabaseManager:
             self.logger.error(f"❌ Error al actualizar mp3_duration del podcast {podcast_id}: {e}")
             return False
     
+    def update_podcast_audio_fingerprint(self, podcast_id: int, sha256: str, size_in_bytes: int,
+                                         md5: str | None = None) -> bool:
+        """
+        Guarda la huella del MP3 archivado (columnas mp3_sha256, mp3_md5 y mp3_size).
+        
+        Args:
+            podcast_id: ID del podcast a actualizar
+            sha256: Hash SHA-256 (hexadecimal) del archivo descargado
+            size_in_bytes: Tamaño del archivo en bytes
+            md5: Hash MD5 (hexadecimal), comparable con el que calcula el NAS
+            
+        Returns:
+            bool: True si se actualizó correctamente, False en caso contrario
+            
+        Raises:
+            MissingColumnsError: Si la tabla no tiene las columnas de la huella
+        """
+        try:
+            result = self.client.table(self.podcasts_table).update({
+                'mp3_sha256': sha256,
+                'mp3_md5': md5,
+                'mp3_size': size_in_bytes
+            }).eq('id', podcast_id).execute()
+            
+            if result.data:
+                self.logger.info(f"✅ Podcast {podcast_id} actualizado con huella del MP3 ({size_in_bytes} bytes)")
+                return True
+            else:
+                self.logger.warning(f"⚠️ No se pudo actualizar la huella del MP3 del podcast {podcast_id}")
+                return False
+                
+        except Exception as e:
+            self._raise_if_missing_columns(e, AUDIO_FINGERPRINT_COLUMNS)
+            self.logger.error(f"❌ Error al actualizar la huella del MP3 del podcast {podcast_id}: {e}")
+            return False
+    
+    def _raise_if_missing_columns(self, error: Exception, columns: tuple) -> None:
+        """
+        Convierte el error de PostgREST por columnas inexistentes en MissingColumnsError.
+        
+        Sin las columnas, cada episodio fallaría en silencio (y se volvería a
+        descargar en cada ejecución), así que se interrumpe con un error claro.
+        """
+        message = str(error)
+        if not any(marker in message for marker in ('42703', 'PGRST204', 'does not exist', 'Could not find')):
+            return
+        missing = [column for column in columns if column in message]
+        if missing:
+            raise MissingColumnsError(
+                f"La tabla {self.podcasts_table} no tiene la columna {', '.join(missing)}; "
+                f"añade {', '.join(columns)} como se indica en el README"
+            ) from error
+    
     def get_podcast_by_program_number(self, program_number: int) -> dict | None:
         """
         Obtiene un podcast específico por su número de programa.
@@ -383,7 +394,7 @@ class DatabaseManager:
             dict: Datos del podcast o None si no se encuentra
         """
         try:
-            result = self.client.table('podcasts').select('*').eq('program_number', program_number).limit(1).execute()
+            result = self.client.table(self.podcasts_table).select('*').eq('program_number', program_number).limit(1).execute()
             
             if result.data:
                 podcast = result.data[0]
@@ -408,7 +419,7 @@ class DatabaseManager:
             dict: Datos del podcast o None si no se encuentra
         """
         try:
-            result = self.client.table('podcasts').select('*').eq('id', podcast_id).limit(1).execute()
+            result = self.client.table(self.podcasts_table).select('*').eq('id', podcast_id).limit(1).execute()
             
             if result.data:
                 podcast = result.data[0]
@@ -434,7 +445,7 @@ class DatabaseManager:
             list: Lista de podcasts del lote
         """
         try:
-            result = self.client.table('podcasts').select('*').range(offset, offset + batch_size - 1).execute()
+            result = self.client.table(self.podcasts_table).select('*').range(offset, offset + batch_size - 1).execute()
             podcasts = result.data
             self.logger.info(f"Obtenidos {len(podcasts)} podcasts (lote {offset//batch_size + 1})")
             return podcasts
@@ -442,13 +453,128 @@ class DatabaseManager:
             self.logger.error(f"Error al obtener lote de podcasts: {e}")
             return []
     
+    def get_archive_candidates(self, page_size: int = 1000) -> list:
+        """
+        Obtiene los podcasts con URL de descarga, con solo las columnas necesarias para archivar.
+        
+        Args:
+            page_size: Tamaño de cada página de la consulta
+            
+        Returns:
+            list: Lista de podcasts (id, program_number, title, date, download_url,
+                  file_size, duration, mp3_sha256, mp3_md5, mp3_size)
+            
+        Raises:
+            MissingColumnsError: Si la tabla no tiene las columnas de la huella
+        """
+        columns = ','.join(('id', 'program_number', 'title', 'date', 'download_url', 'file_size', 'duration')
+                           + AUDIO_FINGERPRINT_COLUMNS)
+        try:
+            candidates = []
+            offset = 0
+            
+            while True:
+                result = (
+                    self.client.table(self.podcasts_table)
+                    .select(columns)
+                    .not_.is_('download_url', 'null')
+                    .order('program_number')
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                )
+                if not result.data:
+                    break
+                candidates.extend(result.data)
+                if len(result.data) < page_size:
+                    break
+                offset += page_size
+            
+            self.logger.info(f"Obtenidos {len(candidates)} podcasts con URL de descarga")
+            return candidates
+        except Exception as e:
+            self._raise_if_missing_columns(e, AUDIO_FINGERPRINT_COLUMNS)
+            self.logger.error(f"Error al obtener podcasts para archivar: {e}")
+            return []
+    
+    def get_podcast_content_index(self, columns: tuple, page_size: int = 1000) -> dict:
+        """
+        Carga en una sola consulta (paginada) el content_hash y las columnas indicadas de todos los podcasts.
+        
+        Args:
+            columns: Columnas a leer además de id, program_number y content_hash
+            page_size: Tamaño de cada página de la consulta
+            
+        Returns:
+            dict: {program_number: fila}
+            
+        Raises:
+            MissingColumnsError: Si la tabla no tiene la columna content_hash
+            Exception: Si falla la consulta (un índice vacío haría pasar todo el feed por
+                episodios nuevos y desactivaría la detección de cambios sin avisar)
+        """
+        select = ','.join(dict.fromkeys(('id', 'program_number', 'content_hash') + tuple(columns)))
+        try:
+            index = {}
+            offset = 0
+            
+            while True:
+                result = (
+                    self.client.table(self.podcasts_table)
+                    .select(select)
+                    .order('program_number')
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                )
+                if not result.data:
+                    break
+                for row in result.data:
+                    if row.get('program_number') is not None:
+                        index[row['program_number']] = row
+                if len(result.data) < page_size:
+                    break
+                offset += page_size
+            
+            self.logger.info(f"Índice de contenido cargado: {len(index)} podcasts")
+            return index
+        except Exception as e:
+            self._raise_if_missing_columns(e, ('content_hash',))
+            self.logger.error(f"Error al cargar el índice de contenido de los podcasts: {e}")
+            raise
+    
+    def update_podcast_fields(self, podcast_id: int, fields: dict) -> bool:
+        """
+        Actualiza solo las columnas indicadas de un podcast.
+        
+        Args:
+            podcast_id: ID del podcast a actualizar
+            fields: {columna: valor nuevo}
+            
+        Returns:
+            bool: True si se actualizó correctamente, False en caso contrario
+        """
+        if not fields:
+            return True
+        try:
+            result = self.client.table(self.podcasts_table).update(fields).eq('id', podcast_id).execute()
+            
+            if result.data:
+                self.logger.info(f"✅ Podcast {podcast_id} actualizado: {', '.join(sorted(fields))}")
+                return True
+            else:
+                self.logger.warning(f"⚠️ No se pudo actualizar el podcast {podcast_id}")
+                return False
+                
+        except Exception as e:
+            self.logger.error(f"❌ Error al actualizar el podcast {podcast_id}: {e}")
+            return False
+    
     def insert_songs_batch(self, songs_data: list) -> int:
         """
         Inserta múltiples canciones en la tabla songs en una sola operación.
         
         Args:
-            songs_data: Lista de diccionarios con datos de canciones.
-                       Cada diccionario debe contener: podcast_id, title, artist, position
+            songs_data: Lista de Song (o de diccionarios con datos de canciones).
+                       Cada canción debe contener: podcast_id, title, artist, position
         
         Returns:
             int: Número de canciones insertadas exitosamente
@@ -463,7 +589,12 @@ class DatabaseManager:
             valid_songs = []
             
             for song in songs_data:
-                if all(field in song for field in required_fields):
+                if isinstance(song, Song):
+                    if song.is_complete():
+                        valid_songs.append(song.to_row())
+                    else:
+                        self.logger.warning(f"Canción omitida por campos faltantes: {song}")
+                elif all(field in song for field in required_fields):
                     valid_songs.append(song)
                 else:
                     self.logger.warning(f"Canción omitida por campos faltantes: {song}")
@@ -473,7 +604,7 @@ class DatabaseManager:
                 return 0
             
             # Insertar todas las canciones de una vez
-            result = self.client.table('songs').insert(valid_songs).execute()
+            result = self.client.table(self.songs_table).insert(valid_songs).execute()
             
             inserted_count = len(result.data) if result.data else 0
             self.logger.info(f"Insertadas {inserted_count} canciones en la tabla songs")
@@ -484,6 +615,24 @@ class DatabaseManager:
             self.logger.error(f"Error al insertar canciones en lote: {e}")
             return 0
 
+    def delete_songs(self, podcast_id: int) -> bool:
+        """
+        Elimina las canciones de un podcast (para volver a generarlas).
+        
+        Args:
+            podcast_id: ID del podcast
+            
+        Returns:
+            bool: True si se eliminaron (o no había ninguna), False si hubo un error
+        """
+        try:
+            result = self.client.table(self.songs_table).delete().eq('podcast_id', podcast_id).execute()
+            self.logger.info(f"🗑️ Eliminadas {len(result.data or [])} canciones del podcast {podcast_id}")
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Error al eliminar las canciones del podcast {podcast_id}: {e}")
+            return False
+    
     def export_table_with_pagination(self, table_name: str, page_size: int = 1000) -> list:
         """
         Exporta una tabla completa usando paginación para manejar tablas grandes.
@@ -0,0 +1,164 @@
+"""
+Estrategia de archivo en la que el propio NAS descarga los MP3 con Download Station.
+
+En lugar de descargar cada episodio en esta máquina y subirlo después al NAS,
+se crea una tarea de Download Station con la URL del enclosure, se consulta la
+lista de tareas por lotes hasta que terminan y se renombra el resultado a
+popcasting_NNNN.mp3. Los bytes no pasan por la red local ni por el disco local.
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+
+# Estados de las tareas de Download Station
+FINISHED_STATUSES = {'finished', 'seeding'}
+FAILED_STATUSES = {'error'}
+
+
+class DownloadStationArchiver:
+    """
+    Lanza y sigue tareas de Download Station para un conjunto de episodios.
+    """
+
+    def __init__(self, synology_client, batch_size: int = 20, poll_interval: float = 10,
+                 timeout: float = 3600):
+        """
+        Inicializa el archivador.
+
+        Args:
+            synology_client: Instancia de SynologyClient con sesión iniciada
+            batch_size: Tareas simultáneas como máximo en Download Station
+            poll_interval: Segundos entre consultas de la lista de tareas
+            timeout: Segundos máximos que puede tardar cada tarea
+        """
+        self.client = synology_client
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+
+    def archive(self, jobs: List[dict]) -> Dict[int, dict]:
+        """
+        Descarga en el NAS los episodios indicados y los renombra.
+
+        Se mantienen como máximo `batch_size` tareas en curso: cada vez que una
+        termina se lanza la siguiente. Si ya existe una tarea con la misma URL
+        y destino (p. ej. de una ejecución interrumpida) se reutiliza.
+
+        Args:
+            jobs: [{'program_number', 'download_url', 'folder', 'filename', 'expected_size'}]
+
+        Returns:
+            dict: {program_number: {'success': bool, 'size': int | None, 'error': str | None}}
+        """
+        results = {}
+        queue = list(jobs)
+        in_flight = {}  # download_url -> (job, hora de envío)
+        created_folders = set()
+
+        existing = {self._task_key(task): task for task in self.client.list_download_tasks() or []}
+
+        while queue or in_flight:
+            while queue and len(in_flight) < self.batch_size:
+                job = queue.pop(0)
+                if self._submit(job, existing, created_folders):
+                    in_flight[job['download_url']] = (job, time.monotonic())
+                else:
+                    results[job['program_number']] = self._result(False, error="No se pudo crear la tarea")
+
+            if not in_flight:
+                break
+
+            time.sleep(self.poll_interval)
+            tasks = self.client.list_download_tasks()
+            if tasks is None:
+                self.logger.warning("⚠️ No se pudo consultar Download Station, se reintentará")
+                continue
+
+            tasks_by_key = {self._task_key(task): task for task in tasks}
+            done_ids = []
+            for url, (job, submitted_at) in list(in_flight.items()):
+                task = tasks_by_key.get((url, job['folder'].strip('/')))
+                result = self._check_task(job, task, submitted_at)
+                if result is None:
+                    continue
+
+                del in_flight[url]
+                results[job['program_number']] = result
+                if task:
+                    done_ids.append(task['id'])
+
+            if done_ids:
+                self.client.delete_download_tasks(done_ids)
+
+        return results
+
+    def _submit(self, job: dict, existing: dict, created_folders: set) -> bool:
+        """Crea la tarea de un episodio (o reutiliza una ya existente)."""
+        folder = job['folder']
+        if (job['download_url'], folder.strip('/')) in existing:
+            self.logger.info(f"♻️ Reutilizando tarea existente de Download Station para el episodio {job['program_number']}")
+            return True
+
+        if folder not in created_folders:
+            # La carpeta puede no existir con el layout por centenas; si ya existe, el error se ignora
+            self.client.create_folder(folder)
+            created_folders.add(folder)
+
+        self.logger.info(f"📡 Download Station: episodio {job['program_number']} -> {folder}")
+        return self.client.create_download_task(job['download_url'], folder)
+
+    def _check_task(self, job: dict, task: Optional[dict], submitted_at: float) -> Optional[dict]:
+        """
+        Revisa el estado de la tarea de un episodio.
+
+        Returns:
+            dict: Resultado final del episodio, o None si la tarea sigue en curso
+        """
+        program_number = job['program_number']
+
+        if task is None:
+            if time.monotonic() - submitted_at > self.timeout:
+                return self._result(False, error="La tarea no aparece en Download Station")
+            return None
+
+        status = task.get('status')
+        if status in FAILED_STATUSES:
+            error = task.get('status_extra', {}).get('error_detail', 'error')
+            self.logger.error(f"❌ Download Station no pudo descargar el episodio {program_number}: {error}")
+            return self._result(False, error=f"Download Station: {error}")
+
+        if status not in FINISHED_STATUSES:
+            if time.monotonic() - submitted_at > self.timeout:
+                self.logger.error(f"⏰ Tiempo agotado esperando al episodio {program_number} ({status})")
+                return self._result(False, error=f"Tiempo agotado ({status})")
+            return None
+
+        size = task.get('size')
+        expected_size = job.get('expected_size')
+        if expected_size and size and size != expected_size:
+            self.logger.warning(
+                f"⚠️ El tamaño descargado por el NAS ({size} bytes) no coincide con el del RSS "
+                f"({expected_size} bytes)"
+            )
+
+        title = task.get('title')
+        if title != job['filename']:
+            if not self.client.rename_file(f"{job['folder']}/{title}", job['filename']):
+                return self._result(False, size, error=f"No se pudo renombrar {title}")
+            self.logger.info(f"📝 Renombrado en el NAS: {title} -> {job['filename']}")
+
+        self.logger.info(f"✅ Episodio {program_number} descargado por el NAS: {job['folder']}/{job['filename']}")
+        return self._result(True, size)
+
+    @staticmethod
+    def _task_key(task: dict) -> tuple:
+        """Identifica una tarea por su URL y carpeta de destino."""
+        detail = task.get('additional', {}).get('detail', {})
+        return detail.get('uri'), (detail.get('destination') or '').strip('/')
+
+    @staticmethod
+    def _result(success: bool, size: Optional[int] = None, error: Optional[str] = None) -> dict:
+        return {'success': success, 'size': size, 'error': error}
@@ -0,0 +1,220 @@
+"""
+Comparación del feed RSS con los episodios guardados en la BD.
+
+Con el índice {program_number: fila} de la BD se detectan tanto los episodios
+que faltan (nuevos o huecos antiguos que fallaron en otra ejecución) como los
+episodios editados en el feed.
+
+Cada episodio procesado por RSSDataProcessor lleva un content_hash de sus
+campos del RSS, que se guarda en la fila del podcast. En cada ejecución se
+carga el índice {program_number: fila} de la BD en una sola consulta, se
+comparan los hashes de todos los episodios en una pasada y, para los que han
+cambiado (título corregido, enclosure sustituido, playlist editada...), se
+envían solo las columnas modificadas, sin volver a consultar WordPress. Si
+cambia la playlist del RSS de un episodio sin playlist web, también se vuelven
+a generar sus canciones (tabla songs).
+
+Las filas guardadas antes de existir el content_hash solo reciben el hash en
+la primera pasada: su texto (p. ej. la playlist con el formato del tokenizador
+anterior) no se compara ni se reescribe, para no regenerar todo el catálogo.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from components.models import CONTENT_HASH_FIELDS
+from components.song_processor import SongProcessor
+
+
+class EpisodeChangeDetector:
+    """
+    Compara los episodios del RSS con los ya guardados y actualiza los que han cambiado.
+
+    Responsabilidades:
+    - Cargar el índice de hashes de la BD una sola vez
+    - Encontrar los episodios del RSS que faltan en la BD (incluidos los huecos)
+    - Calcular qué columnas han cambiado en cada episodio editado
+    - Guardar solo esas columnas (y el nuevo content_hash)
+    - Regenerar las canciones de los episodios cuya playlist del RSS ha cambiado
+    """
+
+    def __init__(self, database_manager, song_processor=None):
+        """
+        Inicializa el detector.
+
+        Args:
+            database_manager: Instancia de DatabaseManager
+            song_processor: SongProcessor para regenerar canciones (por defecto, uno sobre database_manager)
+        """
+        self.db_manager = database_manager
+        self.song_processor = song_processor or SongProcessor(database_manager)
+        self.logger = logging.getLogger(__name__)
+
+    def load_index(self) -> Dict[int, Dict]:
+        """Índice {program_number: fila} con el content_hash y las columnas del RSS."""
+        return self.db_manager.get_podcast_content_index(CONTENT_HASH_FIELDS)
+
+    def find_missing(self, rss_episodes: List[Dict], index: Dict[int, Dict]) -> List[Dict]:
+        """
+        Episodios del RSS cuyo número de programa no está en la BD (diferencia de conjuntos).
+
+        A diferencia de comparar con el último número guardado, recoge también
+        los huecos: un episodio que falló o se saltó en una ejecución anterior
+        se vuelve a encolar en la siguiente.
+
+        Args:
+            rss_episodes: Episodios procesados del RSS (en el orden del feed)
+            index: Resultado de load_index()
+
+        Returns:
+            list: Episodios a insertar, en el orden del feed
+        """
+        missing_numbers = {episode.get('program_number') for episode in rss_episodes} - set(index) - {None}
+        missing = [episode for episode in rss_episodes if episode.get('program_number') in missing_numbers]
+
+        without_number = sum(1 for episode in rss_episodes if episode.get('program_number') is None)
+        if without_number:
+            self.logger.warning(f"⚠️ {without_number} episodios del RSS sin número de programa no se comparan")
+        newest_stored = max(index, default=0)
+        gaps = sum(1 for episode in missing if episode['program_number'] < newest_stored)
+        if gaps:
+            self.logger.info(f"🕳️ {gaps} episodios anteriores al #{newest_stored} faltan en la BD y se reintentarán")
+        return missing
+
+    def find_changes(self, rss_episodes: List[Dict], index: Dict[int, Dict]) -> List[Dict]:
+        """
+        Compara en una pasada los episodios del RSS con el índice de la BD.
+
+        Los episodios que no están en la BD se ignoran (son episodios nuevos).
+        Las filas sin content_hash (anteriores a esta funcionalidad) solo
+        reciben el hash, aunque sus columnas difieran del RSS: las ediciones
+        se detectan a partir de la siguiente ejecución.
+
+        Args:
+            rss_episodes: Episodios de RSSDataProcessor.fetch_and_process_entries()
+            index: Resultado de load_index()
+
+        Returns:
+            list: [{'podcast_id', 'program_number', 'title', 'fields': {columna: valor nuevo}}]
+        """
+        changes = []
+        for episode in rss_episodes:
+            row = index.get(episode.get('program_number'))
+            content_hash = episode.get('content_hash')
+            if not row or not content_hash or row.get('content_hash') == content_hash:
+                continue
+
+            if not row.get('content_hash'):
+                fields = {'content_hash': content_hash}
+            else:
+                fields = {
+                    column: episode.get(column)
+                    for column in CONTENT_HASH_FIELDS
+                    if not _same_value(column, row.get(column), episode.get(column))
+                }
+                fields['content_hash'] = content_hash
+            changes.append({
+                'podcast_id': row['id'],
+                'program_number': episode['program_number'],
+                'title': episode.get('title', 'Sin título'),
+                'fields': fields,
+            })
+        return changes
+
+    def apply_changes(self, changes: List[Dict]) -> Dict[str, int]:
+        """
+        Guarda las columnas modificadas de cada episodio.
+
+        Returns:
+            dict: {'updated': episodios con cambios guardados, 'hashed': filas antiguas
+                   a las que solo se añadió el hash, 'failed': errores}
+        """
+        summary = {'updated': 0, 'hashed': 0, 'failed': 0}
+        for change in changes:
+            edited = sorted(column for column in change['fields'] if column != 'content_hash')
+            if edited:
+                self.logger.info(f"✏️ Episodio #{change['program_number']} editado en el RSS "
+                                 f"({change['title']}): {', '.join(edited)}")
+            if not self.db_manager.update_podcast_fields(change['podcast_id'], change['fields']):
+                summary['failed'] += 1
+            elif edited:
+                summary['updated'] += 1
+                if 'rss_playlist' in change['fields']:
+                    self._refresh_songs(change)
+            else:
+                summary['hashed'] += 1
+        return summary
+
+    def _refresh_songs(self, change: Dict) -> None:
+        """
+        Regenera las canciones de un episodio cuya playlist del RSS ha cambiado.
+
+        Si el episodio tiene playlist web, sus canciones salen de ella (ver
+        SongProcessor.process_and_store_songs) y no se tocan.
+        """
+        podcast_id = change['podcast_id']
+        row = self.db_manager.get_podcast_by_id(podcast_id) or {}
+        if _as_json(row.get('web_playlist')):
+            self.logger.info(f"🎵 Episodio #{change['program_number']}: las canciones vienen de la playlist web, "
+                             f"no se regeneran")
+            return
+        stored = self.song_processor.replace_songs(podcast_id, change['fields']['rss_playlist'])
+        self.logger.info(f"🎵 Episodio #{change['program_number']}: {stored} canciones regeneradas "
+                         f"desde la playlist del RSS")
+
+    def sync(self, rss_episodes: List[Dict], index: Dict[int, Dict] = None) -> Dict[str, int]:
+        """
+        Detecta y guarda los episodios editados.
+
+        Args:
+            rss_episodes: Episodios procesados del RSS
+            index: Índice ya cargado (None para cargarlo)
+
+        Returns:
+            dict: Resumen de apply_changes()
+        """
+        if index is None:
+            index = self.load_index()
+        changes = self.find_changes(rss_episodes, index)
+        summary = self.apply_changes(changes)
+        self.logger.info(f"🔍 Episodios editados en el RSS: {summary['updated']} actualizados, "
+                         f"{summary['hashed']} con hash inicial, {summary['failed']} con errores")
+        return summary
+
+
+def _same_value(column: str, stored, new) -> bool:
+    """Compara un valor de la BD con el del RSS, tolerando las conversiones de tipo de Supabase."""
+    if stored in (None, '') or new in (None, ''):
+        return stored in (None, '') and new in (None, '')
+    if column == 'rss_playlist':
+        return _as_json(stored) == _as_json(new)
+    if column == 'date':
+        return _as_utc(stored) == _as_utc(new)
+    if isinstance(stored, (int, float)) or isinstance(new, (int, float)):
+        try:
+            return float(stored) == float(new)
+        except (TypeError, ValueError):
+            return False
+    return str(stored) == str(new)
+
+
+def _as_json(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value
+    return value
+
+
+def _as_utc(value):
+    """Fecha ISO como datetime UTC sin zona (el RSS guarda fechas UTC sin zona)."""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return str(value)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
@@ -0,0 +1,227 @@
+"""
+Backend de archivo sobre una carpeta local o una carpeta compartida del NAS montada (SMB/NFS).
+
+Con el NAS montado en el equipo de sincronización, copiar el archivo es mucho
+más rápido que la subida multipart por la API de FileStation. Las copias se
+hacen con copy_file_range/sendfile (sin pasar los datos por Python), a un
+archivo temporal en la misma carpeta que luego se renombra de forma atómica.
+"""
+
+import os
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# Agregar el directorio src al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from components.archive_backend import ArchiveBackend
+from utils.bandwidth import get_bandwidth_governor, INGRESS, EGRESS
+from utils.logger import logger
+
+
+# Bytes copiados por llamada al sistema (también es la granularidad del límite de ancho de banda)
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class LocalArchiveBackend(ArchiveBackend):
+    """
+    Archivo en una ruta del sistema de archivos.
+
+    Las rutas remotas (/popcasting_marilyn/mp3/...) se resuelven dentro de
+    `root_dir`, p. ej. /mnt/nas/popcasting_marilyn/mp3/...
+    """
+
+    def __init__(self, root_dir):
+        """
+        Args:
+            root_dir: Carpeta raíz equivalente a la raíz del NAS (punto de montaje)
+        """
+        self.root_dir = Path(root_dir)
+
+    def login(self) -> bool:
+        """Comprueba que la raíz existe y es escribible (p. ej. que el recurso está montado)."""
+        if not self.root_dir.is_dir():
+            logger.error(f"❌ La carpeta del archivo no existe o no está montada: {self.root_dir}")
+            return False
+        if not os.access(self.root_dir, os.W_OK):
+            logger.error(f"❌ Sin permiso de escritura en la carpeta del archivo: {self.root_dir}")
+            return False
+        logger.info(f"✅ Archivo local disponible en {self.root_dir}")
+        return True
+
+    def logout(self) -> None:
+        pass
+
+    def local_path(self, remote_path: str) -> Path:
+        """Ruta local de una ruta remota del archivo."""
+        return self.root_dir / remote_path.lstrip('/')
+
+    def upload_file(self, local_file_path, remote_folder: str = "/mp3", overwrite: bool = False,
+                    progress_callback=None) -> bool:
+        """
+        Copia un archivo al archivo y lo deja en su sitio con un rename atómico.
+
+        Args:
+            local_file_path: Ruta del archivo local
+            remote_folder: Carpeta de destino (ruta del NAS)
+            overwrite: Reemplazar el archivo si ya existe
+            progress_callback: Función opcional llamada con (bytes_copiados, bytes_totales)
+
+        Returns:
+            bool: True si la copia fue exitosa
+        """
+        source = Path(local_file_path)
+        if not source.is_file():
+            logger.error(f"❌ El archivo local no existe: {source}")
+            return False
+
+        folder = self.local_path(remote_folder)
+        target = folder / source.name
+        if target.exists() and not overwrite:
+            logger.error(f"❌ El archivo ya existe en el archivo: {target}")
+            return False
+
+        # El temporal va en la misma carpeta para que el rename sea atómico
+        tmp_target = folder / f".{source.name}.{uuid.uuid4().hex[:8]}.part"
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            with get_bandwidth_governor().transfer(EGRESS, f"Copia {source.name}") as meter:
+                _copy_file(source, tmp_target, meter, progress_callback)
+            os.replace(tmp_target, target)
+            logger.info(f"✅ Archivo copiado a {target}")
+            return True
+        except OSError as e:
+            logger.error(f"❌ Error copiando {source} a {target}: {e}")
+            try:
+                tmp_target.unlink()
+            except OSError:
+                pass
+            return False
+
+    def download_file(self, remote_file_path: str, local_folder: str = "downloads") -> bool:
+        """Copia un archivo del archivo a una carpeta local."""
+        source = self.local_path(remote_file_path)
+        target = Path(local_folder) / source.name
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with get_bandwidth_governor().transfer(INGRESS, f"Copia {source.name}") as meter:
+                _copy_file(source, target, meter)
+            return True
+        except OSError as e:
+            logger.error(f"❌ Error copiando {source}: {e}")
+            return False
+
+    def file_exists(self, remote_file_path: str) -> bool:
+        return self.local_path(remote_file_path).is_file()
+
+    def get_file_info(self, remote_file_path: str) -> Optional[dict]:
+        try:
+            stat = self.local_path(remote_file_path).stat()
+        except OSError:
+            return None
+        return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def list_all_files(self, remote_folder: str = "/mp3", page_size: int = 1000) -> Optional[list]:
+        """
+        Lista una carpeta con os.scandir (una sola llamada, sin stat extra por entrada en la mayoría de sistemas).
+
+        Returns:
+            list: Entradas al estilo de FileStation o None si la carpeta no existe
+        """
+        folder = self.local_path(remote_folder)
+        try:
+            with os.scandir(folder) as entries:
+                files = []
+                for entry in entries:
+                    # Los temporales de copias en curso no forman parte del archivo
+                    if entry.name.startswith('.'):
+                        continue
+                    stat = entry.stat()
+                    is_dir = entry.is_dir()
+                    files.append({
+                        'name': entry.name,
+                        'path': f"{remote_folder.rstrip('/')}/{entry.name}",
+                        'isdir': is_dir,
+                        'additional': {'size': 0 if is_dir else stat.st_size,
+                                       'time': {'mtime': int(stat.st_mtime)}},
+                    })
+            return files
+        except OSError as e:
+            logger.error(f"❌ Error al listar {folder}: {e}")
+            return None
+
+    def list_files(self, remote_folder: str = "/mp3", offset: int = 0, limit: int = 1000) -> Optional[list]:
+        files = self.list_all_files(remote_folder)
+        return None if files is None else files[offset:offset + limit]
+
+    def create_folder(self, folder_path: str) -> bool:
+        try:
+            self.local_path(folder_path).mkdir(parents=True, exist_ok=True)
+            return True
+        except OSError as e:
+            logger.error(f"❌ Error al crear carpeta {folder_path}: {e}")
+            return False
+
+    def __enter__(self):
+        if not self.login():
+            raise Exception(f"El archivo local no está disponible: {self.root_dir}")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.logout()
+
+
+def _copy_file(source: Path, target: Path, meter, progress_callback=None) -> None:
+    """
+    Copia `source` en `target` dentro del kernel cuando es posible.
+
+    Usa os.copy_file_range (Linux, sin copiar datos al espacio de usuario y con
+    copia en el servidor en NFS 4.2/SMB3 si lo soporta); si no está disponible
+    o el sistema de archivos lo rechaza, os.sendfile; y como último recurso
+    una copia por bloques.
+    """
+    total = source.stat().st_size
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        copied = 0
+        for copy_chunk in (_copy_file_range, _sendfile):
+            try:
+                while copied < total:
+                    n = copy_chunk(src.fileno(), dst.fileno(), copied, min(COPY_CHUNK_SIZE, total - copied))
+                    if n == 0:
+                        break
+                    copied += n
+                    meter.add(n)
+                    if progress_callback:
+                        progress_callback(copied, total)
+                break
+            except (AttributeError, OSError) as e:
+                if copied or getattr(e, 'errno', None) not in (None, 18, 22, 38, 95):
+                    # Fallo real de E/S a mitad de copia (no una falta de soporte)
+                    raise
+        if copied < total:
+            src.seek(copied)
+            dst.seek(copied)
+            while True:
+                chunk = src.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                copied += len(chunk)
+                meter.add(len(chunk))
+                if progress_callback:
+                    progress_callback(copied, total)
+        dst.flush()
+        os.fsync(dst.fileno())
+    shutil.copystat(source, target)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    return os.sendfile(dst_fd, src_fd, offset, count)
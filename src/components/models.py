@@ -0,0 +1,267 @@
+"""
+Modelos compactos (dataclasses con __slots__) para episodios, posts de WordPress y canciones.
+
+Sustituyen a los diccionarios que se copiaban y ampliaban en cada paso
+(RSS -> unificación con WordPress -> inserción en la BD). Cada registro
+ocupa solo sus slots, la unificación enlaza el post de WordPress en lugar de
+copiar sus campos al episodio, y el JSON (playlist del RSS, playlist web,
+enlaces extra) se genera solo cuando se necesita y una única vez.
+
+Para no romper el código que trata los episodios como diccionarios, los
+registros admiten lectura tipo dict: registro['campo'], registro.get('campo')
+y 'campo' in registro.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field, fields, replace
+from functools import cache
+from typing import Any, Dict, List, Optional
+
+
+# Campos del episodio que salen del RSS y se guardan tal cual en la tabla podcasts.
+# Su hash (content_hash) permite detectar episodios editados en el feed.
+CONTENT_HASH_FIELDS = ('title', 'date', 'url', 'download_url', 'file_size', 'rss_playlist',
+                       'duration', 'program_number', 'comments')
+
+
+def compute_content_hash(episode_data) -> str:
+    """
+    Calcula un hash estable de los campos del RSS que se guardan en la BD.
+
+    Args:
+        episode_data: Episode o diccionario con los campos de CONTENT_HASH_FIELDS
+
+    Returns:
+        str: SHA-256 hexadecimal de esos campos
+    """
+    content = {name: episode_data.get(name) for name in CONTENT_HASH_FIELDS}
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+@cache
+def _record_keys(cls) -> tuple:
+    """Claves públicas de un registro: sus campos (sin los privados) y las propiedades de _extra_keys."""
+    return tuple(f.name for f in fields(cls) if not f.name.startswith('_')) + cls._extra_keys
+
+
+class _Record:
+    """Lectura tipo diccionario para los modelos con __slots__."""
+    __slots__ = ()
+    _extra_keys = ()
+
+    def keys(self) -> tuple:
+        return _record_keys(type(self))
+
+    def __getitem__(self, key: str):
+        if key not in _record_keys(type(self)):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in _record_keys(type(self)):
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _record_keys(type(self))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Copia como diccionario (para volcados JSON y depuración)."""
+        data = {}
+        for key in self.keys():
+            value = getattr(self, key)
+            data[key] = value.to_dict() if isinstance(value, _Record) else value
+        return data
+
+
+@dataclass(slots=True)
+class Song(_Record):
+    """Canción de una playlist, lista para la tabla songs."""
+    position: Optional[int]
+    artist: str
+    title: str
+    podcast_id: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, song: Dict, podcast_id: Optional[int] = None) -> 'Song':
+        return cls(song.get('position'), song.get('artist'), song.get('title'), podcast_id)
+
+    def is_complete(self) -> bool:
+        """Tiene todos los campos obligatorios de la tabla songs."""
+        return None not in (self.podcast_id, self.position, self.artist, self.title)
+
+    def to_row(self) -> Dict[str, Any]:
+        return {'podcast_id': self.podcast_id, 'position': self.position,
+                'artist': self.artist, 'title': self.title}
+
+
+@dataclass(slots=True)
+class WordPressPost(_Record):
+    """Post de WordPress procesado por WordPressDataProcessor (API REST o extracción HTML)."""
+    wordpress_id: Optional[int] = None
+    title: str = ''
+    content: str = ''
+    excerpt: str = ''
+    slug: str = ''
+    date: Optional[str] = None
+    modified: Optional[str] = None
+    featured_image_url: Optional[str] = None
+    author: Optional[int] = None
+    status: Optional[str] = None
+    link: str = ''
+    categories: List[Dict] = field(default_factory=list)
+    tags: List[Dict] = field(default_factory=list)
+    playlist_data: Optional[Dict] = None
+    web_extra_links: List = field(default_factory=list)
+    content_length: int = 0
+
+    @property
+    def playlist_songs(self) -> Optional[List[Dict]]:
+        """Canciones de la playlist web, o None si el post no trae una lista de canciones."""
+        if isinstance(self.playlist_data, dict) and 'songs' in self.playlist_data:
+            return self.playlist_data['songs']
+        if isinstance(self.playlist_data, list):
+            return self.playlist_data
+        return None
+
+
+@dataclass(slots=True)
+class Episode(_Record):
+    """
+    Episodio del RSS, opcionalmente enlazado con su post de WordPress.
+
+    La playlist del RSS se guarda ya tokenizada (rss_songs); su JSON
+    (rss_playlist) y el content_hash se calculan en el primer acceso y se
+    reutilizan.
+    """
+    title: str
+    date: Optional[str] = None
+    url: str = ''
+    download_url: Optional[str] = None
+    file_size: Optional[int] = None
+    rss_songs: List[Dict] = field(default_factory=list)
+    duration: Optional[int] = None
+    entry_id: str = ''
+    image_url: Optional[str] = None
+    program_number: Optional[int] = None
+    comments: Optional[str] = None
+    wordpress: Optional[WordPressPost] = None
+    _rss_playlist: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _content_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    _extra_keys = ('rss_playlist', 'content_hash', 'guid')
+
+    @property
+    def rss_playlist(self) -> str:
+        """Playlist del RSS en JSON, como se guarda en la columna rss_playlist."""
+        if self._rss_playlist is None:
+            self._rss_playlist = json.dumps(self.rss_songs, ensure_ascii=False)
+        return self._rss_playlist
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            self._content_hash = compute_content_hash(self)
+        return self._content_hash
+
+    @property
+    def guid(self) -> str:
+        return self.entry_id
+
+    def with_wordpress(self, post: Optional[WordPressPost]) -> 'Episode':
+        """Nuevo episodio enlazado con su post, sin modificar el original (compartido por la instantánea del feed)."""
+        return replace(self, wordpress=post)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Episode':
+        """
+        Construye un episodio a partir del diccionario antiguo (RSS más las claves wordpress_* de la unificación).
+        """
+        rss_playlist = data.get('rss_playlist')
+        try:
+            rss_songs = json.loads(rss_playlist) if isinstance(rss_playlist, str) else list(rss_playlist or [])
+        except json.JSONDecodeError:
+            rss_songs = []
+
+        post = None
+        if any(key.startswith('wordpress_') for key in data):
+            post = WordPressPost(
+                wordpress_id=data.get('wordpress_id'),
+                title=data.get('wordpress_title', ''),
+                content=data.get('wordpress_content', ''),
+                excerpt=data.get('wordpress_excerpt', ''),
+                slug=data.get('wordpress_slug', ''),
+                date=data.get('wordpress_date'),
+                modified=data.get('wordpress_modified'),
+                featured_image_url=data.get('featured_image_url'),
+                author=data.get('wordpress_author'),
+                status=data.get('wordpress_status'),
+                link=data.get('wordpress_link', ''),
+                categories=data.get('wordpress_categories', []),
+                tags=data.get('wordpress_tags', []),
+                playlist_data=data.get('wordpress_playlist_data'),
+                web_extra_links=data.get('web_extra_links', []),
+                content_length=data.get('content_length', 0),
+            )
+
+        episode = cls(
+            title=data.get('title', ''),
+            date=data.get('date'),
+            url=data.get('url', ''),
+            download_url=data.get('download_url'),
+            file_size=data.get('file_size'),
+            rss_songs=rss_songs,
+            duration=data.get('duration'),
+            entry_id=data.get('entry_id') or data.get('guid', ''),
+            image_url=data.get('image_url'),
+            program_number=data.get('program_number'),
+            comments=data.get('comments'),
+            wordpress=post,
+        )
+        if isinstance(rss_playlist, str):
+            # Conservar el texto original para que el content_hash no cambie
+            episode._rss_playlist = rss_playlist
+        return episode
+
+    def to_podcast_row(self) -> Dict[str, Any]:
+        """
+        Fila para la tabla podcasts. El JSON de la playlist web y de los enlaces
+        extra se genera aquí, solo para los episodios que se insertan.
+        """
+        row = {
+            'title': self.title,
+            'date': self.date,
+            'url': self.url,
+            'download_url': self.download_url,
+            'file_size': self.file_size,
+            'program_number': self.program_number,
+            'comments': self.comments,
+            'duration': self.duration,
+            'rss_playlist': self.rss_playlist,
+            'content_hash': self.content_hash,
+        }
+        post = self.wordpress
+        if post is None:
+            return row
+
+        row['wordpress_url'] = post.link
+        row['cover_image_url'] = post.featured_image_url
+        row['web_extra_links'] = (json.dumps(post.web_extra_links, ensure_ascii=False)
+                                  if isinstance(post.web_extra_links, list) else post.web_extra_links)
+
+        songs = post.playlist_songs
+        if songs is None and isinstance(post.playlist_data, str):
+            try:
+                parsed = json.loads(post.playlist_data)
+            except json.JSONDecodeError:
+                parsed = None
+            songs = parsed.get('songs') if isinstance(parsed, dict) else parsed
+        if isinstance(songs, list):
+            row['web_playlist'] = json.dumps(songs, ensure_ascii=False)
+            row['web_songs_count'] = len(songs)
+        else:
+            row['web_playlist'] = post.playlist_data
+            row['web_songs_count'] = 0
+        return row
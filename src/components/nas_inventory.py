@@ -0,0 +1,247 @@
+"""
+Inventario local de los archivos archivados en el NAS.
+
+Evita una llamada getinfo por episodio: lista cada carpeta una sola vez (con
+paginación completa), guarda {nombre: {size, mtime}} en disco y responde las
+consultas de existencia y tamaño desde memoria mientras el TTL siga vigente.
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class NASInventory:
+    """
+    Índice en memoria (y cacheado en disco) de los archivos de una o varias carpetas del NAS.
+
+    Responsabilidades:
+    - Listar carpetas del NAS con paginación completa
+    - Cachear el resultado en disco con un TTL
+    - Responder consultas de existencia/tamaño sin llamadas al NAS
+    - Mantenerse al día tras las subidas realizadas por este proceso
+    """
+
+    CACHE_FILENAME = "nas_inventory.json"
+
+    def __init__(self, synology_client, cache_dir: Optional[Path] = None, ttl_seconds: int = 3600,
+                 cache_filename: Optional[str] = None):
+        """
+        Inicializa el inventario.
+
+        Args:
+            synology_client: Backend del archivo (ArchiveBackend) con list_all_files()
+            cache_dir: Carpeta donde persistir el inventario (None para no persistir)
+            ttl_seconds: Segundos que una carpeta listada se considera válida
+            cache_filename: Nombre del archivo de caché (para inventariar varios backends)
+        """
+        self.synology_client = synology_client
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = Path(cache_dir) / (cache_filename or self.CACHE_FILENAME) if cache_dir else None
+        self.logger = logging.getLogger(__name__)
+
+        # carpeta -> {'fetched_at': float, 'files': {nombre: {'size': int, 'mtime': int, 'isdir': bool}}}
+        self._folders: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+
+        self._load_cache()
+
+    def get_folder(self, folder: str, force_refresh: bool = False) -> Optional[Dict[str, Dict]]:
+        """
+        Devuelve el contenido de una carpeta, listándola en el NAS solo si hace falta.
+
+        Args:
+            folder: Carpeta del NAS
+            force_refresh: Ignorar la caché y volver a listar
+
+        Returns:
+            dict: {nombre: {'size', 'mtime', 'isdir'} (y 'etag' en S3)} o None si no se pudo listar
+        """
+        folder = self._normalize_folder(folder)
+
+        with self._lock:
+            entry = self._folders.get(folder)
+            if entry and not force_refresh and not self._is_expired(entry):
+                return entry['files']
+
+        return self.refresh(folder)
+
+    def refresh(self, folder: str) -> Optional[Dict[str, Dict]]:
+        """
+        Vuelve a listar una carpeta del NAS y actualiza la caché.
+
+        Args:
+            folder: Carpeta del NAS
+
+        Returns:
+            dict: Contenido de la carpeta o None si no se pudo listar
+        """
+        folder = self._normalize_folder(folder)
+        self.logger.info(f"📋 Listando carpeta del NAS: {folder}")
+
+        listing = self.synology_client.list_all_files(folder)
+        if listing is None:
+            self.logger.warning(f"⚠️ No se pudo listar la carpeta del NAS: {folder}")
+            return None
+
+        files = {}
+        for item in listing:
+            name = item.get('name')
+            if not name:
+                continue
+            additional = item.get('additional', {})
+            files[name] = {
+                'size': additional.get('size'),
+                'mtime': additional.get('time', {}).get('mtime'),
+                'isdir': bool(item.get('isdir', False)),
+            }
+            if item.get('etag'):
+                # Los backends S3 dan el ETag de cada objeto (para verificar las réplicas)
+                files[name]['etag'] = item['etag']
+
+        with self._lock:
+            self._folders[folder] = {'fetched_at': time.time(), 'files': files}
+            self._save_cache()
+
+        self.logger.info(f"✅ Inventario actualizado: {folder} ({len(files)} elementos)")
+        return files
+
+    def get_tree(self, base_folder: str, force_refresh: bool = False) -> Dict[str, Dict]:
+        """
+        Devuelve todos los archivos de una carpeta y de sus subcarpetas de primer nivel.
+
+        Pensado para el layout por centenas (base/0400/popcasting_0485.mp3), donde los
+        archivos antiguos en la raíz también se incluyen.
+
+        Args:
+            base_folder: Carpeta base del archivo
+            force_refresh: Ignorar la caché y volver a listar
+
+        Returns:
+            dict: {ruta_carpeta: {nombre: info}} solo con archivos (no carpetas)
+        """
+        base_folder = self._normalize_folder(base_folder)
+        tree = {}
+
+        root = self.get_folder(base_folder, force_refresh=force_refresh) or {}
+        tree[base_folder] = {name: info for name, info in root.items() if not info['isdir']}
+
+        for name, info in root.items():
+            if info['isdir']:
+                subfolder = f"{base_folder}/{name}"
+                content = self.get_folder(subfolder, force_refresh=force_refresh) or {}
+                tree[subfolder] = {n: i for n, i in content.items() if not i['isdir']}
+
+        return tree
+
+    def exists(self, filename: str, folder: str) -> bool:
+        """
+        Indica si un archivo existe en una carpeta del NAS.
+
+        Args:
+            filename: Nombre del archivo
+            folder: Carpeta donde buscar
+
+        Returns:
+            bool: True si el archivo aparece en el inventario
+        """
+        return self.get_file_info(filename, folder) is not None
+
+    def get_file_info(self, filename: str, folder: str) -> Optional[Dict]:
+        """
+        Devuelve tamaño y fecha de modificación de un archivo del NAS.
+
+        Args:
+            filename: Nombre del archivo
+            folder: Carpeta donde buscar
+
+        Returns:
+            dict: {'size', 'mtime', 'isdir'} o None si no existe (o no se pudo listar)
+        """
+        files = self.get_folder(folder)
+        if not files:
+            return None
+        return files.get(filename)
+
+    def get_size(self, filename: str, folder: str) -> Optional[int]:
+        """Devuelve el tamaño en bytes de un archivo del NAS o None si no existe."""
+        info = self.get_file_info(filename, folder)
+        return info['size'] if info else None
+
+    def record_upload(self, filename: str, folder: str, size: int, mtime: Optional[int] = None) -> None:
+        """
+        Registra en el inventario un archivo recién subido por este proceso.
+
+        Si la carpeta no estaba cacheada no se hace nada: se listará completa
+        la próxima vez que se consulte.
+
+        Args:
+            filename: Nombre del archivo subido
+            folder: Carpeta de destino
+            size: Tamaño en bytes
+            mtime: Fecha de modificación (por defecto, ahora)
+        """
+        folder = self._normalize_folder(folder)
+        with self._lock:
+            entry = self._folders.get(folder)
+            if entry is None:
+                return
+            entry['files'][filename] = {
+                'size': size,
+                'mtime': int(mtime if mtime is not None else time.time()),
+                'isdir': False,
+            }
+            self._save_cache()
+
+    def invalidate(self, folder: Optional[str] = None) -> None:
+        """
+        Descarta la caché de una carpeta (o de todas).
+
+        Args:
+            folder: Carpeta a invalidar, None para invalidar todo
+        """
+        with self._lock:
+            if folder is None:
+                self._folders.clear()
+            else:
+                self._folders.pop(self._normalize_folder(folder), None)
+            self._save_cache()
+
+    def _is_expired(self, entry: Dict) -> bool:
+        """Indica si una entrada de la caché ha superado el TTL."""
+        return time.time() - entry.get('fetched_at', 0) > self.ttl_seconds
+
+    def _normalize_folder(self, folder: str) -> str:
+        """Normaliza la ruta de una carpeta (sin barra final)."""
+        return folder.rstrip('/') or '/'
+
+    def _load_cache(self) -> None:
+        """Carga el inventario persistido en disco, si existe."""
+        if not self.cache_path or not self.cache_path.exists():
+            return
+
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+            self._folders = data.get('folders', {})
+            self.logger.debug(f"📦 Inventario del NAS cargado desde {self.cache_path}")
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"⚠️ No se pudo cargar el inventario cacheado: {e}")
+            self._folders = {}
+
+    def _save_cache(self) -> None:
+        """Persiste el inventario en disco de forma atómica."""
+        if not self.cache_path:
+            return
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'folders': self._folders}, f)
+            tmp_path.replace(self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ No se pudo guardar el inventario del NAS: {e}")
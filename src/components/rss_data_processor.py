@@ -7,6 +7,7 @@ import feedparser
 from datetime import datetime
 import re
 import json
+import threading
 from typing import Dict, List, Optional
 import sys
 import os
@@ -17,6 +18,11 @@ current_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(current_dir))
 
 from utils.logger import logger
+from components.rss_feed_parser import parse_entries
+from components.rss_feed_snapshot import RSSFeedSnapshot
+from components.models import Episode, compute_content_hash
+from utils.http_cache import CachedSession
+from utils.playlist_tokenizer import clean_rss_playlist, parse_rss_song, tokenize_rss_playlist
 
 
 class RSSDataProcessor:
@@ -24,41 +30,56 @@ class RSSDataProcessor:
     Procesa los datos extraídos del RSS y los prepara para la base de datos.
     """
     
-    def __init__(self, feed_url: str):
+    def __init__(self, feed_url: str, parser_engine: str = 'feedparser', snapshot_ttl: int = 300,
+                 title_prefix: str = 'popcasting'):
         """
         Inicializa el procesador con la URL del feed RSS.
         
         Args:
-            feed_url (str): URL del feed RSS
+            feed_url (str): URL del feed RSS (o ruta de un archivo local)
+            parser_engine (str): Motor de parseo: 'feedparser' o 'lxml' (más rápido,
+                ver components/rss_feed_parser.py)
+            snapshot_ttl (int): Segundos que get_snapshot() reutiliza el feed sin revalidarlo
+            title_prefix (str): Nombre del programa que precede al número en los títulos
+                ("Popcasting485")
         """
         self.feed_url = feed_url
-        logger.info(f"RSSDataProcessor inicializado con URL: {feed_url}")
+        self.parser_engine = parser_engine
+        self.snapshot_ttl = snapshot_ttl
+        prefix = re.escape(title_prefix.lower())
+        self._number_patterns = (
+            re.compile(rf'{prefix}\s*(\d+)'),  # Popcasting485, Popcasting 484
+            re.compile(r'(\d+)$'),              # Número al final
+        )
+        self._comment_patterns = (
+            re.compile(rf'{prefix}\s*\d+\s*\(([^)]+)\)', re.IGNORECASE),  # Popcasting195 (especial Smash Hits 1984)
+            re.compile(rf'{prefix}\s*\d+\s+(.+)$', re.IGNORECASE),         # Popcasting195 especial Smash Hits 1984
+        )
+        self._snapshot: Optional[RSSFeedSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        logger.info(f"RSSDataProcessor inicializado con URL: {feed_url} (parser: {parser_engine})")
     
-    def fetch_and_process_entries(self) -> List[Dict]:
+    def fetch_and_process_entries(self) -> List[Episode]:
         """
         Descarga el feed RSS y procesa todas las entradas.
         
         Returns:
-            List[Dict]: Lista de episodios procesados para la BD
+            List[Episode]: Lista de episodios procesados para la BD
         """
         try:
             logger.info(f"Descargando y procesando feed RSS desde: {self.feed_url}")
             
             # Parsear el feed
-            feed = feedparser.parse(self.feed_url)
+            entries = parse_entries(self.feed_url, self.parser_engine)
             
-            if not feed.entries:
+            if not entries:
                 logger.warning("No se encontraron entradas en el feed RSS")
                 return []
             
-            logger.info(f"Procesando {len(feed.entries)} entradas del RSS")
+            logger.info(f"Procesando {len(entries)} entradas del RSS")
             
             # Procesar cada entrada
-            processed_episodes = []
-            for entry in feed.entries:
-                episode_data = self._process_single_entry(entry)
-                if episode_data:
-                    processed_episodes.append(episode_data)
+            processed_episodes, _ = self._process_entries(entries)
             
             logger.info(f"Procesados {len(processed_episodes)} episodios exitosamente")
             return processed_episodes
@@ -68,15 +89,97 @@ class RSSDataProcessor:
             logger.error(error_msg)
             raise Exception(error_msg) from e
     
-    def _process_single_entry(self, entry) -> Optional[Dict]:
+    def get_snapshot(self, force_refresh: bool = False) -> RSSFeedSnapshot:
+        """
+        Devuelve el feed procesado con índices por número, guid, título y enclosure.
+        
+        Se reutiliza mientras no pase snapshot_ttl; después (o con force_refresh)
+        se revalida de forma condicional y solo se vuelve a parsear si el feed ha cambiado.
+        
+        Args:
+            force_refresh (bool): Revalidar aunque la instantánea siga vigente
+            
+        Returns:
+            RSSFeedSnapshot: Instantánea compartida por todos los que usan este procesador
+        """
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot and not force_refresh and snapshot.age() < self.snapshot_ttl:
+                return snapshot
+            
+            try:
+                download = self._download_feed(snapshot)
+            except Exception as e:
+                if snapshot is None:
+                    raise Exception(f"Error al descargar el feed RSS: {e}") from e
+                logger.warning(f"⚠️ No se pudo revalidar el feed RSS, se usa la copia anterior: {e}")
+                return snapshot
+            
+            if download is None:
+                logger.info(f"📦 Feed RSS sin cambios ({len(snapshot)} episodios)")
+                snapshot.touch()
+                return snapshot
+            
+            data, etag, last_modified = download
+            entries = parse_entries(data, self.parser_engine)
+            episodes, raw_playlists = self._process_entries(entries)
+            self._snapshot = RSSFeedSnapshot(episodes, raw_playlists, etag, last_modified)
+            logger.info(f"📻 Feed RSS cargado: {len(episodes)} episodios indexados")
+            return self._snapshot
+    
+    def _download_feed(self, previous: Optional[RSSFeedSnapshot]):
+        """
+        Descarga el feed si ha cambiado desde la instantánea anterior.
+        
+        Returns:
+            tuple: (contenido, etag, last_modified) o None si no ha cambiado
+        """
+        if os.path.exists(str(self.feed_url)):
+            mtime = str(os.path.getmtime(self.feed_url))
+            if previous and previous.last_modified == mtime:
+                return None
+            with open(self.feed_url, 'rb') as f:
+                return f.read(), None, mtime
+        
+        headers = {'User-Agent': 'popcasting-extractor'}
+        if previous and previous.etag:
+            headers['If-None-Match'] = previous.etag
+        if previous and previous.last_modified:
+            headers['If-Modified-Since'] = previous.last_modified
+        # Pasa por la caché HTTP: la primera descarga del proceso se revalida contra la copia en disco
+        with CachedSession() as session:
+            response = session.get(self.feed_url, headers=headers, timeout=30)
+        if response.status_code == 304 and previous:
+            return None
+        response.raise_for_status()
+        return response.content, response.headers.get('ETag'), response.headers.get('Last-Modified')
+    
+    def _process_entries(self, entries) -> tuple:
+        """
+        Procesa las entradas del feed.
+        
+        Returns:
+            tuple: (episodios procesados, {program_number: texto original de la playlist})
+        """
+        processed_episodes = []
+        raw_playlists = {}
+        for entry in entries:
+            episode_data = self._process_single_entry(entry)
+            if episode_data:
+                processed_episodes.append(episode_data)
+                if episode_data.get('program_number') is not None:
+                    raw_playlists.setdefault(episode_data['program_number'], entry.get('summary', ''))
+        return processed_episodes, raw_playlists
+    
+    def _process_single_entry(self, entry) -> Optional[Episode]:
         """
         Procesa una entrada individual del RSS.
         
         Args:
-            entry: Entrada del RSS parseada por feedparser
+            entry: Entrada del RSS parseada por feedparser (o por el motor lxml, con las mismas claves)
             
         Returns:
-            Dict: Datos del episodio procesados para la BD
+            Episode: Episodio procesado para la BD (o None si la entrada no es válida)
         """
         try:
             # Extraer campos básicos
@@ -94,9 +197,9 @@ class RSSDataProcessor:
             # Extraer datos del archivo de audio
             download_url, file_size = self._extract_audio_data(entry)
             
-            # Extraer y procesar playlist del RSS
+            # Extraer y tokenizar la playlist del RSS (su JSON se genera al primer acceso)
             raw_rss_playlist = entry.get('summary', '').strip()
-            rss_playlist = self._process_rss_playlist(raw_rss_playlist)
+            rss_songs = self._tokenize_rss_playlist(raw_rss_playlist)
             
             # Extraer duración
             duration = self._parse_duration(entry.get('itunes_duration', ''))
@@ -107,76 +210,70 @@ class RSSDataProcessor:
             # Extraer URL de imagen
             image_url = self._extract_image_url(entry)
             
-            # Crear estructura de datos para la BD
-            episode_data = {
-                'title': title,
-                'date': published_date,
-                'url': url,
-                'download_url': download_url,
-                'file_size': file_size,
-                'rss_playlist': rss_playlist,
-                'duration': duration,
-                'entry_id': entry_id,
-                'image_url': image_url,
-                'program_number': self._extract_program_number(title),
-                'comments': self._extract_comments(title)
-            }
+            # Crear el episodio (el content_hash se calcula al primer acceso)
+            episode = Episode(
+                title=title,
+                date=published_date,
+                url=url,
+                download_url=download_url,
+                file_size=file_size,
+                rss_songs=rss_songs,
+                duration=duration,
+                entry_id=entry_id,
+                image_url=image_url,
+                program_number=self._extract_program_number(title),
+                comments=self._extract_comments(title)
+            )
             
             logger.debug(f"Episodio procesado: {title}")
-            return episode_data
+            return episode
             
         except Exception as e:
             logger.error(f"Error al procesar entrada '{entry.get('title', 'Sin título')}': {str(e)}")
             return None
     
-    def _process_rss_playlist(self, playlist_text: str) -> str:
+    @staticmethod
+    def compute_content_hash(episode_data) -> str:
         """
-        Procesa la playlist del RSS y la convierte a formato JSON.
+        Calcula un hash estable de los campos del RSS que se guardan en la BD.
+        
+        Args:
+            episode_data: Episode o diccionario con los campos del episodio
+            
+        Returns:
+            str: SHA-256 hexadecimal de los campos de CONTENT_HASH_FIELDS
+        """
+        return compute_content_hash(episode_data)
+    
+    def _tokenize_rss_playlist(self, playlist_text: str) -> List[Dict]:
+        """
+        Tokeniza la playlist del RSS.
         
         Args:
             playlist_text (str): Texto de la playlist del RSS
             
         Returns:
-            str: JSON string con la playlist procesada
+            List[Dict]: Canciones [{"position", "artist", "title"}] (vacía si hay un error)
         """
         try:
-            if not playlist_text:
-                return json.dumps([], ensure_ascii=False)
-            
-            # 1. Limpieza inicial: eliminar texto extra como Ko-fi
-            cleaned_text = self._clean_playlist_text(playlist_text)
-            
-            if not cleaned_text:
-                return json.dumps([], ensure_ascii=False)
-            
-            # 2. División por canciones usando ::
-            songs_raw = [song.strip() for song in cleaned_text.split('::') if song.strip()]
-            
-            # 3. Procesar cada canción
-            processed_songs = []
-            for i, song_raw in enumerate(songs_raw):
-                song_data = self._parse_song_text(song_raw)
-                if song_data:
-                    # Limpiar campos problemáticos como 'duration'
-                    cleaned_song = {
-                        'position': i + 1,
-                        'artist': song_data['artist'],
-                        'title': song_data['title']
-                    }
-                    # Remover campos problemáticos si existen (prevención)
-                    problematic_fields = ['duration', 'duration_ms', 'duration_seconds']
-                    for field in problematic_fields:
-                        if field in cleaned_song:
-                            del cleaned_song[field]
-                    processed_songs.append(cleaned_song)
-            
-            # 4. Convertir a JSON
-            return json.dumps(processed_songs, ensure_ascii=False)
+            # Limpieza (Ko-fi y similares), división por :: y artista/título en una pasada
+            return tokenize_rss_playlist(playlist_text)
             
         except Exception as e:
             logger.error(f"Error al procesar playlist del RSS: {e}")
-            # En caso de error, devolver playlist vacía
-            return json.dumps([], ensure_ascii=False)
+            return []
+    
+    def _process_rss_playlist(self, playlist_text: str) -> str:
+        """
+        Procesa la playlist del RSS y la convierte a formato JSON.
+        
+        Args:
+            playlist_text (str): Texto de la playlist del RSS
+            
+        Returns:
+            str: JSON string con la playlist procesada
+        """
+        return json.dumps(self._tokenize_rss_playlist(playlist_text), ensure_ascii=False)
     
     def _clean_playlist_text(self, text: str) -> str:
         """
@@ -188,26 +285,7 @@ class RSSDataProcessor:
         Returns:
             str: Texto limpio
         """
-        if not text:
-            return ""
-        
-        # Eliminar texto de Ko-fi y otros patrones comunes
-        patterns_to_remove = [
-            r'::::::\s*invita a Popcasting a café\s*https://ko-fi\.com/popcasting.*',
-            r'::::::\s*invita a Popcasting a café.*',
-            r'https://ko-fi\.com/popcasting.*',
-            r'@rss_data_processor\.py.*',
-            r'@.*\.py.*',
-        ]
-        
-        cleaned_text = text
-        for pattern in patterns_to_remove:
-            cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Limpiar espacios extra y líneas vacías
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-        
-        return cleaned_text
+        return clean_rss_playlist(text)
     
     def _parse_song_text(self, text: str) -> Optional[Dict[str, str]]:
         """
@@ -219,35 +297,7 @@ class RSSDataProcessor:
         Returns:
             Dict: Diccionario con 'artist' y 'title' o None si no se puede parsear
         """
-        if not text:
-            return None
-        
-        # Patrones para extraer artista y título
-        patterns = [
-            r'^(.+?)\s*·\s*(.+)$',  # Artista · Título (formato principal de Popcasting)
-            r'^(.+?)\s*[-–—]\s*(.+)$',  # Artista - Título
-            r'^(.+?)\s*:\s*(.+)$',  # Artista: Título
-            r'^(.+?)\s*"\s*(.+?)\s*"$',  # Artista "Título"
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text.strip())
-            if match:
-                artist = match.group(1).strip()
-                title = match.group(2).strip()
-                
-                # Validar que tanto artista como título tengan contenido válido
-                if (len(artist) > 1 and len(title) > 1 and 
-                    not any(word in artist.lower() for word in [
-                        'comentarios', 'compartir', 'twitter', 'facebook', 
-                        'popcasting', 'ko-fi', 'invita'
-                    ])):
-                    return {
-                        'artist': artist,
-                        'title': title
-                    }
-        
-        return None
+        return parse_rss_song(text)
     
     def _parse_date(self, date_str: str) -> Optional[str]:
         """
@@ -357,13 +407,8 @@ class RSSDataProcessor:
             int: Número del programa o None si no se puede extraer
         """
         # Buscar patrones como "Popcasting485", "Popcasting 484", etc.
-        patterns = [
-            r'popcasting\s*(\d+)',  # Popcasting485, Popcasting 484
-            r'(\d+)$',              # Número al final
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, title.lower())
+        for pattern in self._number_patterns:
+            match = pattern.search(title.lower())
             if match:
                 try:
                     return int(match.group(1))
@@ -383,13 +428,8 @@ class RSSDataProcessor:
             str: Comentarios extraídos o None si no hay comentarios
         """
         # Patrones para extraer comentarios
-        patterns = [
-            r'popcasting\s*\d+\s*\(([^)]+)\)',  # Popcasting195 (especial Smash Hits 1984)
-            r'popcasting\s*\d+\s+(.+)$',        # Popcasting195 especial Smash Hits 1984
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, title, re.IGNORECASE)
+        for pattern in self._comment_patterns:
+            match = pattern.search(title)
             if match:
                 comments = match.group(1).strip()
                 if comments:
@@ -397,7 +437,7 @@ class RSSDataProcessor:
         
         return None
     
-    def get_episode_by_title(self, title: str) -> Optional[Dict]:
+    def get_episode_by_title(self, title: str) -> Optional[Episode]:
         """
         Busca un episodio específico por título.
         
@@ -405,15 +445,21 @@ class RSSDataProcessor:
             title (str): Título del episodio a buscar
             
         Returns:
-            Dict: Datos del episodio o None si no se encuentra
+            Episode: Episodio o None si no se encuentra
         """
-        episodes = self.fetch_and_process_entries()
-        
-        for episode in episodes:
-            if episode['title'].lower() == title.lower():
-                return episode
+        return self.get_snapshot().get_by_title(title)
+    
+    def get_episode_by_program_number(self, program_number: int) -> Optional[Episode]:
+        """
+        Busca un episodio específico por número de programa.
         
-        return None
+        Args:
+            program_number (int): Número del programa
+            
+        Returns:
+            Episode: Episodio o None si no se encuentra
+        """
+        return self.get_snapshot().get_by_program_number(program_number)
 
 
 if __name__ == "__main__":
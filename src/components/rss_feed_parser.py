@@ -0,0 +1,138 @@
+"""
+Motores de parseo del feed RSS.
+
+RSSDataProcessor solo necesita unos pocos campos de cada <item> (título,
+enlace, fecha, guid, enclosure, itunes:duration, descripción e imagen).
+feedparser normaliza y sanea todos los campos de todas las entradas; el motor
+'lxml' recorre el XML una sola vez con iterparse y devuelve únicamente esos
+campos, con las mismas claves que feedparser (title, link, published, id,
+enclosures, itunes_duration, summary, image), así que
+RSSDataProcessor._process_single_entry produce exactamente los mismos datos.
+
+A diferencia de feedparser, el HTML de la descripción no se sanea (el feed de
+Popcasting solo trae texto), y solo se entiende RSS 2.0, no Atom.
+"""
+
+import os
+from io import BytesIO
+from typing import Dict, List
+
+import feedparser
+from lxml import etree
+
+from utils.http_cache import CachedSession
+
+
+PARSER_ENGINES = ('feedparser', 'lxml')
+
+ITUNES_NS = "http://www.itunes.com/dtds/podcast-1.0.dtd"
+ITUNES_DURATION = f"{{{ITUNES_NS}}}duration"
+ITUNES_IMAGE = f"{{{ITUNES_NS}}}image"
+ITUNES_SUMMARY = f"{{{ITUNES_NS}}}summary"
+
+# Etiquetas de <item> que se leen; el resto se ignora sin procesarlo
+_FIELDS = {
+    'title': 'title',
+    'link': 'link',
+    'pubDate': 'published',
+    ITUNES_DURATION: 'itunes_duration',
+}
+
+
+def parse_entries(source, engine: str = 'feedparser') -> List[Dict]:
+    """
+    Parsea un feed RSS y devuelve sus entradas.
+
+    Args:
+        source: URL del feed, ruta de un archivo local o contenido en bytes
+        engine: 'feedparser' o 'lxml'
+
+    Returns:
+        list: Entradas con acceso por clave al estilo de feedparser
+    """
+    if engine == 'feedparser':
+        return feedparser.parse(source).entries
+    if engine == 'lxml':
+        return parse_entries_lxml(_read_source(source))
+    raise ValueError(f"Motor de parseo RSS no soportado: {engine}. Usa uno de {PARSER_ENGINES}.")
+
+
+def parse_entries_lxml(data: bytes) -> List[Dict]:
+    """
+    Extrae con lxml los campos que usa RSSDataProcessor de cada <item>.
+
+    Los <item> se procesan en streaming y se liberan al terminar con cada uno,
+    así que la memoria no crece con el tamaño del feed.
+
+    Args:
+        data: Contenido del feed
+
+    Returns:
+        list: Diccionarios con las claves de feedparser que existan en cada entrada
+    """
+    entries = []
+    context = etree.iterparse(BytesIO(data), events=('end',), tag='item',
+                              resolve_entities=False, no_network=True, huge_tree=True, recover=True)
+    for _, item in context:
+        entries.append(_parse_item(item))
+        # Liberar el <item> ya procesado y los hermanos anteriores
+        item.clear()
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+    return entries
+
+
+def _parse_item(item) -> Dict:
+    """Convierte un elemento <item> en una entrada al estilo de feedparser."""
+    entry = {}
+    guid_is_link = False
+    summary = None
+    itunes_summary = None
+
+    for child in item:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue  # Comentarios e instrucciones de procesado
+        if tag in _FIELDS:
+            entry[_FIELDS[tag]] = _text(child)
+        elif tag == 'guid':
+            entry['id'] = _text(child)
+            guid_is_link = child.get('isPermaLink', 'true').strip().lower() == 'true'
+        elif tag == 'description':
+            summary = _text(child)
+        elif tag == ITUNES_SUMMARY:
+            itunes_summary = _text(child)
+        elif tag == 'enclosure':
+            enclosure = {'href': child.get('url', '').strip()}
+            for attribute in ('length', 'type'):
+                if child.get(attribute) is not None:
+                    enclosure[attribute] = child.get(attribute).strip()
+            entry.setdefault('enclosures', []).append(enclosure)
+        elif tag == ITUNES_IMAGE and child.get('href'):
+            entry['image'] = {'href': child.get('href').strip()}
+
+    # Mismas reglas que feedparser: la descripción tiene prioridad sobre itunes:summary
+    # y un guid permalink hace de enlace si no hay <link>
+    if summary is not None or itunes_summary is not None:
+        entry['summary'] = summary if summary is not None else itunes_summary
+    if 'link' not in entry and guid_is_link and entry.get('id'):
+        entry['link'] = entry['id']
+    return entry
+
+
+def _text(element) -> str:
+    """Texto de un elemento (incluido CDATA), sin espacios en los extremos."""
+    return (element.text or '').strip()
+
+
+def _read_source(source) -> bytes:
+    """Obtiene el contenido del feed desde una URL, una ruta local o bytes."""
+    if isinstance(source, bytes):
+        return source
+    if os.path.exists(str(source)):
+        with open(source, 'rb') as f:
+            return f.read()
+    with CachedSession() as session:
+        response = session.get(source, timeout=30, headers={'User-Agent': 'popcasting-extractor'})
+    response.raise_for_status()
+    return response.content
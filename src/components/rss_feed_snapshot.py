@@ -0,0 +1,80 @@
+"""
+Instantánea del feed RSS ya procesado, con índices para búsquedas directas.
+
+RSSDataProcessor.get_snapshot() la construye una vez y la reutiliza mientras
+no caduque su TTL; al caducar revalida el feed con If-None-Match /
+If-Modified-Since (o la fecha de modificación, si el feed es un archivo
+local) y solo lo vuelve a parsear si ha cambiado.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from components.models import Episode
+
+
+class RSSFeedSnapshot:
+    """
+    Episodios procesados del feed con índices O(1) por número de programa,
+    guid, título y URL del enclosure.
+
+    Si una clave se repite en el feed gana el primer episodio (el más
+    reciente), igual que al recorrer la lista.
+    """
+
+    def __init__(self, episodes: List[Episode], raw_playlists: Optional[Dict[int, str]] = None,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Args:
+            episodes: Episodios de RSSDataProcessor._process_single_entry, en el orden del feed
+            raw_playlists: Texto original de la descripción por número de programa
+            etag: Cabecera ETag de la respuesta del feed
+            last_modified: Cabecera Last-Modified (o mtime, si el feed es un archivo local)
+        """
+        self.episodes = episodes
+        self.raw_playlists = raw_playlists or {}
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+        self.by_program_number: Dict[int, Episode] = {}
+        self.by_guid: Dict[str, Episode] = {}
+        self.by_title: Dict[str, Episode] = {}
+        self.by_enclosure: Dict[str, Episode] = {}
+        for episode in episodes:
+            if episode.get('program_number') is not None:
+                self.by_program_number.setdefault(episode['program_number'], episode)
+            if episode.get('entry_id'):
+                self.by_guid.setdefault(episode['entry_id'], episode)
+            if episode.get('title'):
+                self.by_title.setdefault(episode['title'].lower(), episode)
+            if episode.get('download_url'):
+                self.by_enclosure.setdefault(episode['download_url'], episode)
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def age(self) -> float:
+        """Segundos desde que se descargó o revalidó el feed."""
+        return time.monotonic() - self.fetched_at
+
+    def touch(self):
+        """Marca la instantánea como revalidada (el feed no ha cambiado)."""
+        self.fetched_at = time.monotonic()
+
+    def get_by_program_number(self, program_number: int) -> Optional[Episode]:
+        return self.by_program_number.get(program_number)
+
+    def get_by_guid(self, guid: str) -> Optional[Episode]:
+        return self.by_guid.get(guid)
+
+    def get_by_title(self, title: str) -> Optional[Episode]:
+        """Búsqueda por título sin distinguir mayúsculas."""
+        return self.by_title.get(title.lower()) if title else None
+
+    def get_by_enclosure(self, download_url: str) -> Optional[Episode]:
+        return self.by_enclosure.get(download_url)
+
+    def raw_playlist(self, program_number: int) -> str:
+        """Texto original de la playlist (descripción del feed) de un programa, o cadena vacía."""
+        return self.raw_playlists.get(program_number, '')
@@ -0,0 +1,256 @@
+"""
+Backend de archivo en un almacenamiento de objetos compatible con S3 (AWS, MinIO, Backblaze...).
+
+Se usa sobre todo como réplica del archivo del Synology. Las subidas son
+multipart en paralelo (tamaño de parte y concurrencia configurables) y se
+omiten si el objeto ya existe con el mismo MD5/ETag. Requiere boto3, que es
+una dependencia opcional (pip install boto3).
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+# Agregar el directorio src al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from components.archive_backend import ArchiveBackend
+from utils.bandwidth import get_bandwidth_governor, INGRESS, EGRESS
+from utils.logger import logger
+
+
+def compute_s3_etag(file_path, part_size: int) -> dict:
+    """
+    Calcula el MD5 de un archivo y el ETag que tendrá en S3 al subirlo con `part_size`.
+
+    Como boto3, se sube en multipart todo archivo de `part_size` bytes o más
+    (multipart_threshold = part_size), aunque quepa en una sola parte. Para
+    subidas de una sola petición el ETag es el MD5; para multipart es el MD5 de
+    los MD5 binarios de cada parte seguido de "-<número de partes>".
+
+    Returns:
+        dict: {'md5': str, 'etag': str, 'size': int}
+    """
+    md5 = hashlib.md5()
+    part_digests = []
+    size = 0
+    with open(file_path, 'rb') as f:
+        while True:
+            part = f.read(part_size)
+            if not part:
+                break
+            md5.update(part)
+            part_digests.append(hashlib.md5(part).digest())
+            size += len(part)
+
+    if size < part_size:
+        etag = md5.hexdigest()
+    else:
+        etag = f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+    return {'md5': md5.hexdigest(), 'etag': etag, 'size': size}
+
+
+class S3ArchiveBackend(ArchiveBackend):
+    """
+    Archivo en un bucket S3. Las rutas del NAS (/popcasting_marilyn/mp3/x.mp3) se
+    guardan como claves <prefix>popcasting_marilyn/mp3/x.mp3.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, access_key: Optional[str] = None,
+                 secret_key: Optional[str] = None, part_size: int = 16 * 1024 * 1024,
+                 max_concurrency: int = 8):
+        """
+        Args:
+            bucket: Nombre del bucket
+            prefix: Prefijo de las claves (p. ej. "archivo/")
+            endpoint_url: URL del servicio (None para AWS; p. ej. http://localhost:9000 para MinIO)
+            region: Región del bucket
+            access_key: Clave de acceso (None para usar la cadena de credenciales de boto3)
+            secret_key: Clave secreta
+            part_size: Bytes por parte en las subidas multipart (mínimo 5 MB en S3)
+            max_concurrency: Partes subidas en paralelo por archivo
+        """
+        if boto3 is None:
+            raise ImportError("El backend S3 necesita boto3: pip install boto3")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self.part_size = part_size
+        self.s3 = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=max_concurrency,
+            use_threads=True,
+        )
+
+    def key_for(self, remote_path: str) -> str:
+        """Clave S3 de una ruta del archivo."""
+        return self.prefix + remote_path.strip('/')
+
+    def login(self) -> bool:
+        """Comprueba que el bucket existe y es accesible."""
+        try:
+            self.s3.head_bucket(Bucket=self.bucket)
+            logger.info(f"✅ Bucket S3 disponible: {self.bucket}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ No se puede acceder al bucket S3 {self.bucket}: {e}")
+            return False
+
+    def logout(self) -> None:
+        pass
+
+    def upload_file(self, local_file_path, remote_folder: str = "/mp3", overwrite: bool = False,
+                    progress_callback=None) -> bool:
+        """
+        Sube un archivo con multipart en paralelo, salvo que ya exista idéntico.
+
+        El objeto se considera idéntico si su metadato md5 o su ETag coinciden
+        con los del archivo local. Si existe pero es distinto, solo se
+        reemplaza con `overwrite`.
+
+        Args:
+            local_file_path: Ruta del archivo local
+            remote_folder: Carpeta de destino (ruta del NAS)
+            overwrite: Reemplazar el objeto si existe y es distinto
+            progress_callback: Función opcional llamada con (bytes_enviados, bytes_totales)
+
+        Returns:
+            bool: True si el objeto queda en el bucket con el contenido local
+        """
+        local_file_path = Path(local_file_path)
+        key = self.key_for(f"{remote_folder}/{local_file_path.name}")
+        fingerprint = compute_s3_etag(local_file_path, self.part_size)
+
+        existing = self._head(key)
+        if existing:
+            remote_md5 = existing.get('Metadata', {}).get('md5')
+            remote_etag = existing.get('ETag', '').strip('"')
+            if remote_md5 == fingerprint['md5'] or remote_etag == fingerprint['etag']:
+                logger.info(f"ℹ️ El objeto s3://{self.bucket}/{key} ya es idéntico, no se sube")
+                return True
+            if not overwrite:
+                logger.error(f"❌ El objeto s3://{self.bucket}/{key} ya existe y es distinto")
+                return False
+
+        try:
+            with get_bandwidth_governor().transfer(EGRESS, f"S3 {local_file_path.name}") as meter:
+                def on_bytes(nbytes):
+                    # boto3 llama desde sus hilos de subida: el límite se reparte entre ellos
+                    meter.add(nbytes)
+                    if progress_callback:
+                        progress_callback(meter.bytes, fingerprint['size'])
+
+                self.s3.upload_file(
+                    str(local_file_path), self.bucket, key,
+                    ExtraArgs={'Metadata': {'md5': fingerprint['md5']}, 'ContentType': 'audio/mpeg'},
+                    Config=self.transfer_config,
+                    Callback=on_bytes,
+                )
+            logger.info(f"✅ Archivo subido a s3://{self.bucket}/{key}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error subiendo a s3://{self.bucket}/{key}: {e}")
+            return False
+
+    def download_file(self, remote_file_path: str, local_folder: str = "downloads") -> bool:
+        """Descarga un objeto (por partes en paralelo) a una carpeta local."""
+        target = Path(local_folder) / Path(remote_file_path).name
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with get_bandwidth_governor().transfer(INGRESS, f"S3 {target.name}") as meter:
+                self.s3.download_file(self.bucket, self.key_for(remote_file_path), str(target),
+                                      Config=self.transfer_config, Callback=meter.add)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error descargando {remote_file_path} de S3: {e}")
+            return False
+
+    def file_exists(self, remote_file_path: str) -> bool:
+        return self._head(self.key_for(remote_file_path)) is not None
+
+    def get_file_info(self, remote_file_path: str) -> Optional[dict]:
+        head = self._head(self.key_for(remote_file_path))
+        if head is None:
+            return None
+        return {'size': head['ContentLength'], 'mtime': int(head['LastModified'].timestamp()),
+                'etag': head.get('ETag', '').strip('"')}
+
+    def list_all_files(self, remote_folder: str = "/mp3", page_size: int = 1000) -> Optional[list]:
+        """
+        Lista una "carpeta" recorriendo todas las páginas de list_objects_v2.
+
+        Returns:
+            list: Entradas al estilo de FileStation (subprefijos como carpetas) o None si hay error
+        """
+        prefix = self.key_for(remote_folder) + '/'
+        folder = remote_folder.rstrip('/')
+        files = []
+        try:
+            paginator = self.s3.get_paginator('list_objects_v2')
+            pages = paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter='/',
+                                       PaginationConfig={'PageSize': page_size})
+            for page in pages:
+                for common_prefix in page.get('CommonPrefixes', []):
+                    name = common_prefix['Prefix'][len(prefix):].rstrip('/')
+                    files.append({'name': name, 'path': f"{folder}/{name}", 'isdir': True,
+                                  'additional': {'size': 0, 'time': {'mtime': 0}}})
+                for obj in page.get('Contents', []):
+                    name = obj['Key'][len(prefix):]
+                    if not name:
+                        continue
+                    files.append({
+                        'name': name,
+                        'path': f"{folder}/{name}",
+                        'isdir': False,
+                        'etag': obj.get('ETag', '').strip('"'),
+                        'additional': {'size': obj['Size'], 'time': {'mtime': int(obj['LastModified'].timestamp())}},
+                    })
+            return files
+        except Exception as e:
+            logger.error(f"❌ Error listando s3://{self.bucket}/{prefix}: {e}")
+            return None
+
+    def create_folder(self, folder_path: str) -> bool:
+        # En S3 las carpetas son solo prefijos de las claves
+        return True
+
+    def _head(self, key: str) -> Optional[dict]:
+        """head_object o None si el objeto no existe."""
+        try:
+            return self.s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+
+def s3_backend_from_config(s3_config: dict) -> S3ArchiveBackend:
+    """Crea el backend a partir de ConfigManager.get_s3_config()."""
+    return S3ArchiveBackend(
+        bucket=s3_config['bucket'],
+        prefix=s3_config['prefix'],
+        endpoint_url=s3_config['endpoint_url'],
+        region=s3_config['region'],
+        access_key=os.getenv("S3_ACCESS_KEY_ID"),
+        secret_key=os.getenv("S3_SECRET_ACCESS_KEY"),
+        part_size=s3_config['part_size'],
+        max_concurrency=s3_config['max_concurrency'],
+    )
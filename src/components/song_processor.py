@@ -8,6 +8,13 @@ import logging
 import re
 from typing import List, Dict, Optional
 
+from components.models import Song
+from utils.playlist_tokenizer import (
+    clean_song_processor_playlist,
+    parse_song_processor_song,
+    tokenize_song_processor_playlist,
+)
+
 
 class SongProcessor:
     """
@@ -41,28 +48,8 @@ class SongProcessor:
             Lista de diccionarios con estructura: [{"position": int, "artist": str, "title": str}]
         """
         try:
-            if not playlist_text:
-                return []
-            
-            # 1. Limpieza inicial: eliminar texto extra como Ko-fi
-            cleaned_text = self._clean_playlist_text(playlist_text)
-            
-            if not cleaned_text:
-                return []
-            
-            # 2. División por canciones usando ::
-            songs_raw = [song.strip() for song in cleaned_text.split('::') if song.strip()]
-            
-            # 3. Procesar cada canción
-            processed_songs = []
-            for i, song_raw in enumerate(songs_raw):
-                song_data = self._parse_song_text(song_raw)
-                if song_data:
-                    processed_songs.append({
-                        'position': i + 1,
-                        'artist': song_data['artist'],
-                        'title': song_data['title']
-                    })
+            # Limpieza, división por :: y artista/título en una sola pasada
+            processed_songs = tokenize_song_processor_playlist(playlist_text)
             
             self.logger.debug(f"Playlist RSS procesada: {len(processed_songs)} canciones")
             return processed_songs
@@ -81,31 +68,7 @@ class SongProcessor:
         Returns:
             Texto limpio para procesamiento
         """
-        if not playlist_text:
-            return ""
-        
-        # Eliminar texto de Ko-fi y otros patrones no deseados
-        patterns_to_remove = [
-            r"::::::\s*invita a Popcasting a café\s*https://ko-fi\.com/popcasting.*$",
-            r"@rss_data_processor\.py.*$",
-            r"https?://[^\s]+",
-            r"invita a popcasting.*$",
-            r"flor de pasión.*$",
-            r"my favourite.*$",
-            r"las felindras.*$",
-            r"revisionist history.*$",
-            r"ko-fi\.com.*$",
-            r"youtu\.be.*$",
-        ]
-        
-        cleaned_text = playlist_text
-        for pattern in patterns_to_remove:
-            cleaned_text = re.sub(pattern, "", cleaned_text, flags=re.IGNORECASE)
-        
-        # Limpiar espacios extra y líneas vacías
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-        
-        return cleaned_text
+        return clean_song_processor_playlist(playlist_text)
     
     def _parse_song_text(self, song_raw: str) -> Optional[Dict]:
         """
@@ -117,38 +80,7 @@ class SongProcessor:
         Returns:
             Diccionario con 'artist' y 'title' o None si no es válido
         """
-        if not song_raw or len(song_raw.strip()) < 3:
-            return None
-        
-        # Limpiar el texto
-        song_raw = song_raw.strip()
-        
-        # Buscar separadores comunes
-        separators = [' · ', ' • ', ' - ', ': ', ' "', '" ']
-        
-        for separator in separators:
-            if separator in song_raw:
-                parts = song_raw.split(separator, 1)
-                if len(parts) == 2:
-                    artist = parts[0].strip()
-                    title = parts[1].strip()
-                    
-                    # Validar que ambos campos tengan contenido
-                    if (len(artist) >= 2 and len(title) >= 2 and 
-                        len(artist) < 100 and len(title) < 100):
-                        return {
-                            'artist': artist,
-                            'title': title
-                        }
-        
-        # Si no se encontró separador válido, considerar todo como título
-        if len(song_raw) >= 2 and len(song_raw) < 100:
-            return {
-                'artist': 'Unknown',
-                'title': song_raw
-            }
-        
-        return None
+        return parse_song_processor_song(song_raw)
     
     def process_and_store_songs(self, podcast_id: int, web_playlist: Optional[List[Dict]] = None, 
                                rss_playlist: Optional[str] = None) -> int:
@@ -172,7 +104,7 @@ class SongProcessor:
                 songs_to_store = web_playlist
             elif rss_playlist and isinstance(rss_playlist, str):
                 self.logger.info(f"Usando playlist RSS para podcast {podcast_id}")
-                songs_to_store = self._parse_rss_playlist_string(rss_playlist)
+                songs_to_store = _rss_playlist_songs(rss_playlist) or self._parse_rss_playlist_string(rss_playlist)
             else:
                 self.logger.warning(f"No hay playlist disponible para podcast {podcast_id}")
                 return 0
@@ -181,15 +113,11 @@ class SongProcessor:
                 self.logger.warning(f"No se encontraron canciones válidas para podcast {podcast_id}")
                 return 0
             
-            # Añadir el podcast_id a cada canción
-            songs_with_podcast_id = []
-            for song in songs_to_store:
-                song_copy = song.copy()
-                song_copy['podcast_id'] = podcast_id
-                songs_with_podcast_id.append(song_copy)
+            # Crear las canciones con su podcast_id (sin copiar cada diccionario)
+            songs = [Song.from_dict(song, podcast_id) for song in songs_to_store]
             
             # Almacenar en la base de datos
-            stored_count = self.db_manager.insert_songs_batch(songs_with_podcast_id)
+            stored_count = self.db_manager.insert_songs_batch(songs)
             
             self.logger.info(f"Almacenadas {stored_count} canciones para el podcast {podcast_id}")
             return stored_count
@@ -198,6 +126,21 @@ class SongProcessor:
             self.logger.error(f"Error procesando canciones para podcast {podcast_id}: {e}")
             return 0
     
+    def replace_songs(self, podcast_id: int, rss_playlist: str) -> int:
+        """
+        Vuelve a generar las canciones de un podcast a partir de su playlist del RSS.
+        
+        Se usa cuando la playlist se edita en el feed: se eliminan las canciones
+        guardadas y se insertan las nuevas.
+        
+        Returns:
+            Número de canciones almacenadas (0 también si no se pudieron eliminar las anteriores)
+        """
+        if not self.db_manager.delete_songs(podcast_id):
+            self.logger.error(f"No se pudieron eliminar las canciones del podcast {podcast_id}")
+            return 0
+        return self.process_and_store_songs(podcast_id, rss_playlist=rss_playlist)
+    
     def validate_song_data(self, song: Dict) -> bool:
         """
         Valida que los datos de una canción sean correctos.
@@ -238,4 +181,13 @@ class SongProcessor:
             if re.search(pattern, text_to_check):
                 return False
         
-        return True 
\ No newline at end of file
+        return True
+
+
+def _rss_playlist_songs(rss_playlist: str) -> Optional[List[Dict]]:
+    """Canciones de la columna rss_playlist cuando ya está tokenizada (JSON), o None si es texto."""
+    try:
+        songs = json.loads(rss_playlist)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return songs if isinstance(songs, list) else None
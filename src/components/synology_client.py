@@ -5,29 +5,62 @@ Cliente reutilizable para Synology NAS.
 
 import requests
 import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+# Agregar el directorio src al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.bandwidth import get_bandwidth_governor, INGRESS, EGRESS
+from utils.multipart import MultipartFileEncoder
+from components.archive_backend import ArchiveBackend
 
 # Deshabilitar warnings de SSL
 requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
 
+# Códigos de error de la API que indican que el SID ya no es válido
+# 106: sesión caducada, 107: sesión interrumpida por otro login, 119: SID no encontrado.
+# El 105 (sin permiso) no se incluye: volver a iniciar sesión no lo resuelve.
+SESSION_ERROR_CODES = {106, 107, 119}
+SESSION_CACHE_FILENAME = "synology_session.json"
+
+# Bytes leídos por iteración en las descargas del NAS
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Segundos de margen al comparar fechas de modificación locales y del NAS
+SYNC_MTIME_TOLERANCE = 2
+
 
-class SynologyClient:
-    """Cliente para interactuar con Synology NAS."""
+class SynologyClient(ArchiveBackend):
+    """Cliente para interactuar con Synology NAS (backend de archivo por la API de FileStation)."""
     
-    def __init__(self, host=None, port=None, username=None, password=None):
+    def __init__(self, host=None, port=None, username=None, password=None, pool_size=10,
+                 session_cache_dir=None):
         """
         Inicializa el cliente.
         
+        Las peticiones comparten una sesión HTTP con pool de conexiones
+        keep-alive, así que varios hilos pueden usar el mismo cliente a la vez.
+        
         Args:
             host: IP del NAS (por defecto desde .env)
             port: Puerto del NAS (por defecto desde .env)
             username: Usuario (por defecto desde .env)
             password: Contraseña (por defecto desde .env)
+            pool_size: Conexiones simultáneas que se mantienen abiertas con el NAS
+            session_cache_dir: Carpeta donde guardar el SID para reutilizarlo entre
+                ejecuciones (None para no guardarlo)
         """
         load_dotenv()
         
         self.host = host or os.getenv("SYNOLOGY_IP")
-        self.port = port or int(os.getenv("SYNOLOGY_PORT", "5000"))
+        self.port = int(port or os.getenv("SYNOLOGY_PORT", "5000"))
         self.username = username or os.getenv("SYNOLOGY_USER")
         self.password = password or os.getenv("SYNOLOGY_PASS")
         self.sid = None
@@ -37,14 +70,36 @@ class SynologyClient:
         
         protocol = 'https' if self.port == 5001 else 'http'
         self.base_url = f"{protocol}://{self.host}:{self.port}/webapi"
+        
+        self.session = requests.Session()
+        self.session.verify = False
+        self.pool_size = pool_size
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount(f"{protocol}://", adapter)
+        
+        self.session_cache_path = Path(session_cache_dir) / SESSION_CACHE_FILENAME if session_cache_dir else None
+        self._login_lock = threading.Lock()
     
-    def login(self):
+    def login(self, force=False):
         """
         Autentica con el NAS y obtiene SID.
         
+        Si hay un SID guardado de una ejecución anterior se reutiliza sin llamar
+        al NAS; si resulta haber caducado, la primera petición vuelve a hacer login.
+        
+        Args:
+            force: Ignorar el SID guardado y autenticarse de nuevo
+            
         Returns:
             bool: True si la autenticación fue exitosa
         """
+        if not force:
+            cached_sid = self._load_cached_sid()
+            if cached_sid:
+                self.sid = cached_sid
+                print(f"✅ Reutilizando sesión guardada con {self.host}")
+                return True
+        
         auth_url = f"{self.base_url}/auth.cgi"
         params = {
             'api': 'SYNO.API.Auth',
@@ -57,12 +112,13 @@ class SynologyClient:
         }
         
         try:
-            response = requests.get(auth_url, params=params, verify=False, timeout=30)
+            response = self.session.get(auth_url, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             
             if data.get('success'):
                 self.sid = data['data']['sid']
+                self._save_cached_sid()
                 print(f"✅ Autenticación exitosa con {self.host}")
                 return True
             else:
@@ -73,9 +129,23 @@ class SynologyClient:
             print(f"❌ Error de conexión: {e}")
             return False
     
-    def logout(self):
-        """Cierra la sesión."""
+    def logout(self, forget=False):
+        """
+        Cierra la sesión.
+        
+        Con la caché de sesión activa el SID se conserva para la próxima
+        ejecución y solo se cierran las conexiones, salvo que se pida `forget`.
+        
+        Args:
+            forget: Cerrar la sesión en el NAS aunque esté guardada
+        """
         if not self.sid:
+            self.session.close()
+            return
+        
+        if self.session_cache_path and not forget:
+            self.sid = None
+            self.session.close()
             return
         
         logout_url = f"{self.base_url}/auth.cgi"
@@ -88,65 +158,107 @@ class SynologyClient:
         }
         
         try:
-            requests.get(logout_url, params=params, verify=False, timeout=10)
+            self.session.get(logout_url, params=params, timeout=10)
             print("✅ Sesión cerrada")
         except requests.exceptions.RequestException:
             pass
         finally:
             self.sid = None
+            self._clear_cached_sid()
+            self.session.close()
     
-    def upload_file(self, local_file_path, remote_folder="/mp3"):
+    def upload_file(self, local_file_path, remote_folder="/mp3", overwrite=False, progress_callback=None):
         """
         Sube un archivo al NAS.
         
         Args:
             local_file_path: Ruta del archivo local
             remote_folder: Carpeta de destino en el NAS (por defecto /mp3)
+            overwrite: Reemplazar el archivo si ya existe en el NAS
+            progress_callback: Función opcional llamada con (bytes_enviados, bytes_totales)
             
         Returns:
             bool: True si la subida fue exitosa
         """
+        return self.upload_file_streaming(local_file_path, remote_folder, overwrite, progress_callback)['success']
+    
+    def upload_file_streaming(self, local_file_path, remote_folder="/mp3", overwrite=False, progress_callback=None,
+                              mtime=None):
+        """
+        Sube un archivo al NAS enviándolo por bloques, sin cargarlo en memoria.
+        
+        El cuerpo multipart se genera en streaming con Content-Length, así que
+        el consumo de memoria es el mismo para un MP3 de 10 MB que de 500 MB, y
+        cada bloque pasa por el límite de salida del gobernador de ancho de banda.
+        
+        Args:
+            local_file_path: Ruta del archivo local
+            remote_folder: Carpeta de destino en el NAS (por defecto /mp3)
+            overwrite: Reemplazar el archivo si ya existe en el NAS
+            progress_callback: Función opcional llamada con (bytes_enviados, bytes_totales)
+            mtime: Fecha de modificación (epoch en segundos) que conservará el archivo en el NAS
+            
+        Returns:
+            dict: {'success': bool, 'bytes': int, 'seconds': float, 'mbps': float}
+        """
+        result = {'success': False, 'bytes': 0, 'seconds': 0.0, 'mbps': 0.0}
+        
         if not self.sid:
             print("❌ No hay sesión activa. Ejecuta login() primero.")
-            return False
+            return result
         
         if not os.path.exists(local_file_path):
             print(f"❌ El archivo local no existe: {local_file_path}")
-            return False
+            return result
         
-        upload_url = f"{self.base_url}/entry.cgi"
         params = {
             'api': 'SYNO.FileStation.Upload',
             'version': '2',
-            'method': 'upload',
-            '_sid': self.sid
+            'method': 'upload'
         }
-        data = {
+        fields = {
             'path': remote_folder,
-            'create_parents': 'true'
+            'create_parents': 'true',
+            'overwrite': 'true' if overwrite else 'false'
         }
+        if mtime is not None:
+            # FileStation espera milisegundos
+            fields['mtime'] = str(int(mtime * 1000))
         
+        filename = os.path.basename(local_file_path)
         try:
-            files = {'file': (os.path.basename(local_file_path), open(local_file_path, 'rb'))}
-            print(f"📤 Subiendo {os.path.basename(local_file_path)} a {remote_folder}...")
+            with get_bandwidth_governor().transfer(EGRESS, f"Subida {filename}") as meter:
+                def on_chunk(sent, total):
+                    # Si la subida se reintenta tras renovar el SID, no se cuenta dos veces
+                    if sent > meter.bytes:
+                        meter.add(sent - meter.bytes)
+                    if progress_callback:
+                        progress_callback(sent, total)
+                
+                body = MultipartFileEncoder(fields, 'file', local_file_path, callback=on_chunk)
+                print(f"📤 Subiendo {filename} a {remote_folder} ({body.file_size / 1024 / 1024:.1f} MB)...")
+                
+                # Timeout de conexión corto; el de lectura se aplica a cada bloque, no a toda la subida
+                response = self._request('POST', params, data=body,
+                                         headers={'Content-Type': body.content_type}, timeout=(10, 300))
+                data = response.json()
             
-            response = requests.post(upload_url, params=params, data=data, files=files, verify=False, timeout=120)
-            response.raise_for_status()
-            result = response.json()
+            result.update({
+                'bytes': body.file_size,
+                'seconds': round(meter.elapsed, 3),
+                'mbps': round(body.file_size * 8 / meter.elapsed / 1_000_000, 2),
+            })
             
-            if result.get('success'):
-                print(f"✅ Archivo subido exitosamente a {remote_folder}")
-                return True
+            if data.get('success'):
+                result['success'] = True
+                print(f"✅ Archivo subido exitosamente a {remote_folder} ({result['mbps']} Mbit/s)")
             else:
-                error_code = result.get('error', {}).get('code')
+                error_code = data.get('error', {}).get('code')
                 print(f"❌ Error al subir archivo (código {error_code})")
-                return False
+            return result
         except requests.exceptions.RequestException as e:
             print(f"❌ Error en la subida: {e}")
-            return False
-        finally:
-            if 'files' in locals():
-                files['file'][1].close()
+            return result
     
     def file_exists(self, remote_file_path: str) -> bool:
         """
@@ -159,18 +271,15 @@ class SynologyClient:
         if not self.sid:
             print("❌ No hay sesión activa. Ejecuta login() primero.")
             return False
-        getinfo_url = f"{self.base_url}/entry.cgi"
         params = {
             'api': 'SYNO.FileStation.List',
             'version': '2',
             'method': 'getinfo',
-            '_sid': self.sid,
             'path': f'["{remote_file_path}"]',
             'additional': 'size,time,owner,perm,type'
         }
         try:
-            response = requests.get(getinfo_url, params=params, verify=False, timeout=10)
-            response.raise_for_status()
+            response = self._request('GET', params, timeout=10)
             data = response.json()
             
             # Verificar si la respuesta es exitosa y no hay errores
@@ -186,35 +295,112 @@ class SynologyClient:
             print(f"❌ Error comprobando existencia de archivo: {e}")
             return False
 
-    def list_files(self, remote_folder="/mp3"):
+    def get_file_info(self, remote_file_path: str):
+        """
+        Obtiene tamaño y fecha de modificación de un archivo del NAS.
+        Args:
+            remote_file_path: Ruta completa del archivo en el NAS
+        Returns:
+            dict: {'size': int, 'mtime': int} o None si no existe o hay error
+        """
+        if not self.sid:
+            print("❌ No hay sesión activa. Ejecuta login() primero.")
+            return None
+        params = {
+            'api': 'SYNO.FileStation.List',
+            'version': '2',
+            'method': 'getinfo',
+            'path': f'["{remote_file_path}"]',
+            'additional': 'size,time'
+        }
+        try:
+            response = self._request('GET', params, timeout=10)
+            data = response.json()
+            
+            files = data.get('data', {}).get('files') if data.get('success') else None
+            if not files or files[0].get('code'):
+                return None
+            additional = files[0].get('additional', {})
+            return {
+                'size': additional.get('size'),
+                'mtime': additional.get('time', {}).get('mtime')
+            }
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error obteniendo información de archivo: {e}")
+            return None
+
+    def list_files(self, remote_folder="/mp3", offset=0, limit=1000):
         """
         Lista archivos en una carpeta.
         Args:
             remote_folder: Carpeta a listar (por defecto /mp3)
+            offset: Posición del primer elemento a devolver (paginación)
+            limit: Número máximo de elementos a devolver en esta página
         Returns:
             list: Lista de archivos o None si hay error
         """
+        page = self._list_page(remote_folder, offset, limit)
+        if page is None:
+            return None
+        return page['files']
+
+    def list_all_files(self, remote_folder="/mp3", page_size=1000):
+        """
+        Lista todos los archivos de una carpeta recorriendo todas las páginas.
+        
+        A diferencia de list_files(), no se trunca al llegar a `page_size`
+        elementos: avanza el offset hasta alcanzar el total que informa el NAS.
+        
+        Args:
+            remote_folder: Carpeta a listar
+            page_size: Número de elementos solicitados por página
+            
+        Returns:
+            list: Lista completa de archivos o None si hay error
+        """
+        all_files = []
+        offset = 0
+        
+        while True:
+            page = self._list_page(remote_folder, offset, page_size)
+            if page is None:
+                return None
+            
+            files = page['files']
+            all_files.extend(files)
+            offset += len(files)
+            
+            if not files or offset >= page['total']:
+                break
+        
+        return all_files
+
+    def _list_page(self, remote_folder, offset, limit):
+        """
+        Solicita una página del listado de una carpeta.
+        
+        Returns:
+            dict: {'files': [...], 'total': int} o None si hay error
+        """
         if not self.sid:
             print("❌ No hay sesión activa. Ejecuta login() primero.")
             return None
-        list_url = f"{self.base_url}/entry.cgi"
         params = {
             'api': 'SYNO.FileStation.List',
             'version': '2',
             'method': 'list',
-            '_sid': self.sid,
             'folder_path': remote_folder,
-            'limit': 1000,  # Aumentar el límite para obtener más archivos
+            'offset': offset,
+            'limit': limit,
             'additional': 'size,time,owner,perm,type'
         }
         try:
-            response = requests.get(list_url, params=params, verify=False, timeout=30)
-            response.raise_for_status()
+            response = self._request('GET', params, timeout=30)
             data = response.json()
             if data.get('success'):
-                files = data['data']['files']
-                # Eliminado el print masivo para evitar logs innecesarios
-                return files
+                files = data['data'].get('files', [])
+                total = data['data'].get('total', offset + len(files))
+                return {'files': files, 'total': total}
             else:
                 error_code = data.get('error', {}).get('code')
                 print(f"❌ Error al listar archivos (código {error_code})")
@@ -237,20 +423,17 @@ class SynologyClient:
             print("❌ No hay sesión activa. Ejecuta login() primero.")
             return False
         
-        create_url = f"{self.base_url}/entry.cgi"
         params = {
             'api': 'SYNO.FileStation.CreateFolder',
             'version': '2',
             'method': 'create',
-            '_sid': self.sid,
             'folder_path': os.path.dirname(folder_path),
             'name': os.path.basename(folder_path)
         }
         
         try:
             print(f"📁 Creando carpeta {folder_path}...")
-            response = requests.get(create_url, params=params, verify=False, timeout=30)
-            response.raise_for_status()
+            response = self._request('GET', params, timeout=30)
             data = response.json()
             
             if data.get('success'):
@@ -264,13 +447,19 @@ class SynologyClient:
             print(f"❌ Error al crear carpeta: {e}")
             return False
 
-    def download_file(self, remote_file_path, local_folder="downloads"):
+    def download_file(self, remote_file_path, local_folder="downloads", resume=True, remote_info=None):
         """
         Descarga un archivo del NAS.
         
+        Se descarga a <nombre>.part y se renombra al terminar; si la descarga se
+        corta, la siguiente llamada la reanuda con una petición Range.
+        
         Args:
             remote_file_path: Ruta del archivo en el NAS
             local_folder: Carpeta local de destino
+            resume: Reanudar una descarga parcial anterior
+            remote_info: {'size', 'mtime'} del archivo en el NAS, si ya se conocen
+                (para detectar descargas incompletas y conservar la fecha)
             
         Returns:
             bool: True si la descarga fue exitosa
@@ -279,33 +468,545 @@ class SynologyClient:
             print("❌ No hay sesión activa. Ejecuta login() primero.")
             return False
         
-        # Crear carpeta local si no existe
-        os.makedirs(local_folder, exist_ok=True)
+        print(f"📥 Descargando {os.path.basename(remote_file_path)}...")
+        part_path = Path(local_folder) / f"{os.path.basename(remote_file_path)}.part"
+        if resume and remote_info is None and part_path.exists():
+            # Sin el tamaño remoto no se puede saber si el .part corresponde al archivo actual
+            remote_info = self.get_file_info(remote_file_path)
+        if self._download_resumable(remote_file_path, Path(local_folder), resume, remote_info) is None:
+            return False
+        print(f"✅ Archivo descargado a {os.path.join(local_folder, os.path.basename(remote_file_path))}")
+        return True
+    
+    def download_many(self, remote_paths, local_folder="downloads", workers=4, skip_identical=True, retries=2):
+        """
+        Descarga varios archivos del NAS en paralelo.
+        
+        El tamaño y la fecha de cada archivo se obtienen con un listado por
+        carpeta. Los archivos locales con el mismo tamaño y mtime se omiten y
+        las descargas cortadas se reanudan (hasta `retries` veces) desde el
+        .part. Los workers comparten la sesión y su pool de conexiones.
+        
+        Args:
+            remote_paths: Rutas de los archivos en el NAS
+            local_folder: Carpeta local de destino
+            workers: Descargas simultáneas (como mucho, el tamaño del pool de conexiones)
+            skip_identical: Omitir los archivos que ya existen en local con el mismo tamaño y mtime
+            retries: Reintentos por archivo tras un fallo
+            
+        Returns:
+            dict: {'downloaded', 'skipped', 'failed', 'bytes', 'seconds', 'mbps', 'failures': [rutas]}
+        """
+        local_folder = Path(local_folder)
+        remote_paths = list(remote_paths)
+        remote_infos = self._get_remote_infos(remote_paths)
+        
+        def download_one(remote_path):
+            info = remote_infos.get(remote_path)
+            if info is None:
+                print(f"❌ No existe en el NAS: {remote_path}")
+                return 'failed', 0
+            
+            target = local_folder / os.path.basename(remote_path)
+            if skip_identical and target.is_file():
+                stat = target.stat()
+                if stat.st_size == info['size'] and (not info['mtime'] or int(stat.st_mtime) == info['mtime']):
+                    return 'skipped', 0
+            
+            for attempt in range(retries + 1):
+                nbytes = self._download_resumable(remote_path, local_folder, True, info)
+                if nbytes is not None:
+                    return 'downloaded', nbytes
+                if attempt < retries:
+                    print(f"🔄 Reintentando {os.path.basename(remote_path)} ({attempt + 1}/{retries})...")
+            return 'failed', 0
+        
+        summary = {'downloaded': 0, 'skipped': 0, 'failed': 0, 'bytes': 0, 'failures': []}
+        start = time.monotonic()
+        workers = max(1, min(workers, self.pool_size))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(download_one, remote_paths)
+            for remote_path, (status, nbytes) in zip(remote_paths, results, strict=True):
+                summary[status] += 1
+                summary['bytes'] += nbytes
+                if status == 'failed':
+                    summary['failures'].append(remote_path)
+        
+        summary['seconds'] = time.monotonic() - start
+        summary['mbps'] = summary['bytes'] / 1024 / 1024 / summary['seconds'] if summary['seconds'] else 0.0
+        print(f"📶 Descargas del NAS: {summary['downloaded']} descargados, {summary['skipped']} omitidos, "
+              f"{summary['failed']} fallidos - {summary['bytes'] / 1024 / 1024:.1f} MB en "
+              f"{summary['seconds']:.1f}s ({summary['mbps']:.2f} MB/s, {workers} workers)")
+        return summary
+    
+    def plan_sync(self, local_dir, remote_folder):
+        """
+        Compara una carpeta local (con sus subcarpetas) con una carpeta del NAS.
+        
+        Cada carpeta del NAS se lista una sola vez con paginación completa. Un
+        archivo se sube si falta en el NAS, si el tamaño es distinto o si la
+        copia local es más reciente. Se ignoran los archivos ocultos.
+        
+        Args:
+            local_dir: Carpeta local
+            remote_folder: Carpeta de destino en el NAS
+            
+        Returns:
+            list: [{'local_path', 'remote_folder', 'size', 'mtime', 'reason': 'new' | 'changed'}]
+        """
+        local_dir = Path(local_dir)
+        remote_folder = remote_folder.rstrip('/') or '/'
+        plan = []
+        
+        for current, dirs, files in os.walk(local_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            relative = Path(current).relative_to(local_dir).as_posix()
+            folder = remote_folder if relative == '.' else f"{remote_folder.rstrip('/')}/{relative}"
+            
+            # Si la carpeta no existe en el NAS (o no se puede listar) se sube todo su contenido
+            listing = self.list_all_files(folder) or []
+            remote = {item['name']: item.get('additional', {}) for item in listing if not item.get('isdir')}
+            
+            for name in sorted(files):
+                if name.startswith('.'):
+                    continue
+                stat = (Path(current) / name).stat()
+                additional = remote.get(name)
+                if additional is None:
+                    reason = 'new'
+                elif additional.get('size') != stat.st_size:
+                    reason = 'changed'
+                elif int(stat.st_mtime) > (additional.get('time', {}).get('mtime') or 0) + SYNC_MTIME_TOLERANCE:
+                    reason = 'changed'
+                else:
+                    continue
+                plan.append({
+                    'local_path': Path(current) / name,
+                    'remote_folder': folder,
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'reason': reason,
+                })
+        return plan
+    
+    def sync_directory(self, local_dir, remote_folder, workers=4, dry_run=False):
+        """
+        Sube a una carpeta del NAS solo los archivos nuevos o modificados de una carpeta local.
+        
+        Las subidas van en paralelo sobre la sesión compartida y conservan la
+        fecha de modificación local, así que una segunda sincronización sin
+        cambios no sube nada.
+        
+        Args:
+            local_dir: Carpeta local
+            remote_folder: Carpeta de destino en el NAS
+            workers: Subidas simultáneas (como mucho, el tamaño del pool de conexiones)
+            dry_run: Solo calcular y mostrar el plan
+            
+        Returns:
+            dict: {'plan', 'expected_bytes', 'uploaded', 'failed', 'bytes', 'seconds', 'mbps', 'failures'}
+        """
+        plan = self.plan_sync(local_dir, remote_folder)
+        expected_bytes = sum(item['size'] for item in plan)
+        summary = {'plan': plan, 'expected_bytes': expected_bytes, 'uploaded': 0, 'failed': 0,
+                   'bytes': 0, 'seconds': 0.0, 'mbps': 0.0, 'failures': []}
+        
+        print(f"🗂️ {len(plan)} archivos a subir ({expected_bytes / 1024 / 1024:.1f} MB)")
+        if dry_run:
+            for item in plan:
+                print(f"  {'➕' if item['reason'] == 'new' else '✏️'} {item['local_path']} -> "
+                      f"{item['remote_folder']} ({item['size'] / 1024 / 1024:.1f} MB)")
+            return summary
+        
+        def upload_one(item):
+            return self.upload_file_streaming(item['local_path'], item['remote_folder'],
+                                              overwrite=item['reason'] == 'changed', mtime=item['mtime'])
+        
+        start = time.monotonic()
+        workers = max(1, min(workers, self.pool_size))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for item, result in zip(plan, executor.map(upload_one, plan), strict=True):
+                if result['success']:
+                    summary['uploaded'] += 1
+                    summary['bytes'] += result['bytes']
+                else:
+                    summary['failed'] += 1
+                    summary['failures'].append(str(item['local_path']))
+        
+        summary['seconds'] = time.monotonic() - start
+        summary['mbps'] = summary['bytes'] / 1024 / 1024 / summary['seconds'] if summary['seconds'] else 0.0
+        print(f"📶 Sincronización: {summary['uploaded']} subidos, {summary['failed']} fallidos - "
+              f"{summary['bytes'] / 1024 / 1024:.1f} MB en {summary['seconds']:.1f}s "
+              f"({summary['mbps']:.2f} MB/s, {workers} workers)")
+        return summary
+    
+    def _get_remote_infos(self, remote_paths):
+        """
+        Obtiene {'size', 'mtime'} de varios archivos con un listado por carpeta.
+        
+        Returns:
+            dict: {ruta: {'size', 'mtime'}} solo con los archivos que existen
+        """
+        by_folder = {}
+        for remote_path in remote_paths:
+            by_folder.setdefault(os.path.dirname(remote_path), []).append(remote_path)
+        
+        infos = {}
+        for folder, paths in by_folder.items():
+            listing = self.list_all_files(folder) or []
+            entries = {item.get('name'): item.get('additional', {}) for item in listing if not item.get('isdir')}
+            for remote_path in paths:
+                additional = entries.get(os.path.basename(remote_path))
+                if additional is not None:
+                    infos[remote_path] = {
+                        'size': additional.get('size'),
+                        'mtime': additional.get('time', {}).get('mtime')
+                    }
+        return infos
+    
+    def _download_resumable(self, remote_file_path, local_folder, resume=True, remote_info=None):
+        """
+        Descarga un archivo a <nombre>.part (reanudando con Range) y lo renombra al completarse.
+        
+        Returns:
+            int: Bytes transferidos en esta llamada o None si la descarga falló
+        """
+        filename = os.path.basename(remote_file_path)
+        local_folder.mkdir(parents=True, exist_ok=True)
+        target = local_folder / filename
+        part_path = local_folder / f"{filename}.part"
+        expected_size = remote_info.get('size') if remote_info else None
+        
+        # Solo se reanuda un .part que cabe en el archivo remoto (sin su tamaño, se empieza de cero)
+        offset = part_path.stat().st_size if resume and part_path.exists() else 0
+        if expected_size is None or offset > expected_size:
+            offset = 0
         
-        download_url = f"{self.base_url}/entry.cgi"
         params = {
             'api': 'SYNO.FileStation.Download',
             'version': '2',
             'method': 'download',
-            '_sid': self.sid,
             'path': remote_file_path
         }
         
+        transferred = 0
+        if expected_size == 0:
+            # Archivo vacío: no hay nada que pedir al NAS
+            part_path.write_bytes(b'')
+        elif expected_size is None or offset < expected_size:
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+            try:
+                with self._request('GET', params, timeout=(10, 300), stream=True, headers=headers) as response:
+                    if 'json' in response.headers.get('Content-Type', ''):
+                        print(f"❌ Error en la descarga de {filename}: {response.json().get('error')}")
+                        return None
+                    if offset and response.status_code != 206:
+                        # El servidor ignoró el Range: se descarga completo
+                        offset = 0
+                    
+                    with get_bandwidth_governor().transfer(INGRESS, f"Descarga NAS {filename}") as meter, \
+                            open(part_path, 'ab' if offset else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            meter.add(len(chunk))
+                            f.write(chunk)
+                            transferred += len(chunk)
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 416:
+                    # El .part no corresponde al archivo actual: se empezará de cero
+                    part_path.unlink(missing_ok=True)
+                print(f"❌ Error en la descarga de {filename}: {e}")
+                return None
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Error en la descarga de {filename}: {e}")
+                return None
+        
+        size = part_path.stat().st_size
+        if expected_size is not None and size != expected_size:
+            print(f"❌ Descarga incompleta de {filename}: {size} de {expected_size} bytes")
+            return None
+        
+        os.replace(part_path, target)
+        if remote_info and remote_info.get('mtime'):
+            # Conservar la fecha del NAS para poder omitir el archivo en la próxima pasada
+            os.utime(target, (remote_info['mtime'], remote_info['mtime']))
+        return transferred
+    
+    def rename_file(self, remote_file_path, new_name):
+        """
+        Renombra un archivo o carpeta del NAS.
+        
+        Args:
+            remote_file_path: Ruta actual en el NAS
+            new_name: Nuevo nombre (sin carpeta)
+            
+        Returns:
+            bool: True si se renombró correctamente
+        """
+        if not self.sid:
+            print("❌ No hay sesión activa. Ejecuta login() primero.")
+            return False
+        params = {
+            'api': 'SYNO.FileStation.Rename',
+            'version': '2',
+            'method': 'rename',
+            'path': f'["{remote_file_path}"]',
+            'name': f'["{new_name}"]'
+        }
+        try:
+            response = self._request('GET', params, timeout=30)
+            data = response.json()
+            if data.get('success'):
+                return True
+            error_code = data.get('error', {}).get('code')
+            print(f"❌ Error al renombrar {remote_file_path} (código {error_code})")
+            return False
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error al renombrar archivo: {e}")
+            return False
+
+    def start_md5_task(self, remote_file_path):
+        """
+        Lanza en el NAS el cálculo del MD5 de un archivo (tarea en segundo plano).
+        
+        Args:
+            remote_file_path: Ruta del archivo en el NAS
+            
+        Returns:
+            str: ID de la tarea o None si hay error
+        """
+        if not self.sid:
+            print("❌ No hay sesión activa. Ejecuta login() primero.")
+            return None
+        params = {
+            'api': 'SYNO.FileStation.MD5',
+            'version': '2',
+            'method': 'start',
+            'file_path': f'"{remote_file_path}"'
+        }
         try:
-            print(f"📥 Descargando {os.path.basename(remote_file_path)}...")
-            response = requests.get(download_url, params=params, verify=False, timeout=60, stream=True)
-            response.raise_for_status()
+            response = self._request('GET', params, timeout=30)
+            data = response.json()
+            if data.get('success'):
+                return data['data']['taskid']
+            error_code = data.get('error', {}).get('code')
+            print(f"❌ Error al iniciar el MD5 de {remote_file_path} (código {error_code})")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error al iniciar el MD5: {e}")
+            return None
+
+    def get_md5_status(self, task_id):
+        """
+        Consulta una tarea de MD5 del NAS.
+        
+        Args:
+            task_id: ID devuelto por start_md5_task
             
-            local_file_path = os.path.join(local_folder, os.path.basename(remote_file_path))
-            with open(local_file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        Returns:
+            dict: {'finished': bool, 'md5': str | None} o None si hay error
+        """
+        params = {
+            'api': 'SYNO.FileStation.MD5',
+            'version': '2',
+            'method': 'status',
+            'taskid': f'"{task_id}"'
+        }
+        try:
+            response = self._request('GET', params, timeout=30)
+            data = response.json()
+            if data.get('success'):
+                return {'finished': bool(data['data'].get('finished')), 'md5': data['data'].get('md5')}
+            error_code = data.get('error', {}).get('code')
+            print(f"❌ Error al consultar la tarea de MD5 {task_id} (código {error_code})")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error al consultar la tarea de MD5: {e}")
+            return None
+
+    def stop_md5_task(self, task_id):
+        """Detiene y libera una tarea de MD5 del NAS."""
+        params = {
+            'api': 'SYNO.FileStation.MD5',
+            'version': '2',
+            'method': 'stop',
+            'taskid': f'"{task_id}"'
+        }
+        try:
+            self._request('GET', params, timeout=10)
+        except requests.exceptions.RequestException:
+            pass
+
+    def create_download_task(self, uri, destination):
+        """
+        Pide a Download Station que descargue una URL directamente en el NAS.
+        
+        Args:
+            uri: URL a descargar
+            destination: Carpeta de destino en el NAS (p. ej. /popcasting_marilyn/mp3)
             
-            print(f"✅ Archivo descargado a {local_file_path}")
-            return True
+        Returns:
+            bool: True si la tarea se creó
+        """
+        if not self.sid:
+            print("❌ No hay sesión activa. Ejecuta login() primero.")
+            return False
+        params = {
+            'api': 'SYNO.DownloadStation.Task',
+            'version': '1',
+            'method': 'create',
+            'uri': uri,
+            # Download Station espera la carpeta compartida sin barra inicial
+            'destination': destination.strip('/')
+        }
+        try:
+            response = self._request('POST', params, cgi="DownloadStation/task.cgi", timeout=30)
+            data = response.json()
+            if data.get('success'):
+                return True
+            error_code = data.get('error', {}).get('code')
+            print(f"❌ Error al crear tarea de Download Station (código {error_code})")
+            return False
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error en la descarga: {e}")
+            print(f"❌ Error al crear tarea de Download Station: {e}")
             return False
+
+    def list_download_tasks(self):
+        """
+        Lista las tareas de Download Station con su URL, destino y progreso.
+        
+        Returns:
+            list: Tareas ({'id', 'title', 'status', 'size', 'additional': {'detail', 'transfer'}})
+                o None si hay error
+        """
+        if not self.sid:
+            print("❌ No hay sesión activa. Ejecuta login() primero.")
+            return None
+        params = {
+            'api': 'SYNO.DownloadStation.Task',
+            'version': '1',
+            'method': 'list',
+            'additional': 'detail,transfer'
+        }
+        try:
+            response = self._request('GET', params, cgi="DownloadStation/task.cgi", timeout=30)
+            data = response.json()
+            if data.get('success'):
+                return data['data'].get('tasks', [])
+            error_code = data.get('error', {}).get('code')
+            print(f"❌ Error al listar tareas de Download Station (código {error_code})")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error al listar tareas de Download Station: {e}")
+            return None
+
+    def delete_download_tasks(self, task_ids):
+        """
+        Elimina tareas de Download Station (sin borrar los archivos descargados).
+        
+        Args:
+            task_ids: IDs de las tareas
+            
+        Returns:
+            bool: True si se eliminaron
+        """
+        if not self.sid or not task_ids:
+            return False
+        params = {
+            'api': 'SYNO.DownloadStation.Task',
+            'version': '1',
+            'method': 'delete',
+            'id': ','.join(task_ids),
+            'force_complete': 'false'
+        }
+        try:
+            response = self._request('GET', params, cgi="DownloadStation/task.cgi", timeout=30)
+            return bool(response.json().get('success'))
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error al eliminar tareas de Download Station: {e}")
+            return False
+    
+    def _request(self, method, params, cgi="entry.cgi", **kwargs):
+        """
+        Hace una petición a la API con el SID actual por la sesión compartida.
+        
+        Si el NAS responde que el SID ha caducado, vuelve a hacer login (una sola
+        vez aunque varios hilos lo detecten a la vez) y repite la petición.
+        
+        Args:
+            method: Método HTTP
+            params: Parámetros de la API (sin _sid)
+            cgi: Script de la API (entry.cgi por defecto)
+            **kwargs: Argumentos adicionales para requests (data, timeout, stream...)
+            
+        Returns:
+            requests.Response: Respuesta ya validada con raise_for_status()
+        """
+        url = f"{self.base_url}/{cgi}"
+        for attempt in range(2):
+            sid = self.sid
+            response = self.session.request(method, url, params={**params, '_sid': sid}, **kwargs)
+            response.raise_for_status()
+            
+            if attempt == 0 and self._is_session_error(response):
+                print("🔑 La sesión del NAS ha caducado, autenticando de nuevo...")
+                response.close()
+                self._relogin(sid)
+                continue
+            return response
+        return response
+    
+    def _is_session_error(self, response):
+        """Indica si la respuesta es un error de SID caducado o no válido."""
+        if 'json' not in response.headers.get('Content-Type', 'application/json'):
+            return False
+        try:
+            data = response.json()
+        except ValueError:
+            return False
+        return not data.get('success') and data.get('error', {}).get('code') in SESSION_ERROR_CODES
+    
+    def _relogin(self, stale_sid):
+        """Renueva el SID salvo que otro hilo ya lo haya hecho."""
+        with self._login_lock:
+            if self.sid == stale_sid:
+                self._clear_cached_sid()
+                self.login(force=True)
+    
+    def _load_cached_sid(self):
+        """Devuelve el SID guardado para este NAS y usuario, o None."""
+        if not self.session_cache_path or not self.session_cache_path.exists():
+            return None
+        try:
+            with open(self.session_cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if cached.get('base_url') == self.base_url and cached.get('username') == self.username:
+            return cached.get('sid')
+        return None
+    
+    def _save_cached_sid(self):
+        """Guarda el SID actual para reutilizarlo en la próxima ejecución."""
+        if not self.session_cache_path:
+            return
+        try:
+            self.session_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.session_cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'base_url': self.base_url, 'username': self.username, 'sid': self.sid,
+                           'saved_at': int(time.time())}, f)
+            os.chmod(tmp_path, 0o600)
+            tmp_path.replace(self.session_cache_path)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la sesión del NAS: {e}")
+    
+    def _clear_cached_sid(self):
+        """Elimina el SID guardado."""
+        if self.session_cache_path and self.session_cache_path.exists():
+            try:
+                self.session_cache_path.unlink()
+            except OSError:
+                pass
     
     def __enter__(self):
         """Context manager entry."""
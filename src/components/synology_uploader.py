@@ -2,6 +2,9 @@
 """
 Cliente de línea de comandos para subir archivos a Synology NAS
 utilizando la API de File Station.
+
+Con --sync sincroniza una carpeta local completa: solo se suben los archivos
+nuevos o modificados (ver SynologyClient.sync_directory).
 """
 
 import os
@@ -181,12 +184,14 @@ def main():
 Ejemplos de uso:
   python synology_uploader.py data/Especiales.json
   python synology_uploader.py --remote-path "/backup" data/Especiales.json
+  python synology_uploader.py --sync --remote-path "/backup/data" data/
+  python synology_uploader.py --sync --dry-run --remote-path "/backup/data" data/
         """
     )
     
     parser.add_argument(
         "file_path",
-        help="Ruta del archivo local a subir"
+        help="Ruta del archivo local a subir (o de la carpeta, con --sync)"
     )
     
     parser.add_argument(
@@ -206,6 +211,25 @@ Ejemplos de uso:
         help="Puerto del NAS (sobrescribe la configuración del .env)"
     )
     
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Sincronizar una carpeta: subir solo los archivos nuevos o modificados"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Subidas simultáneas en modo --sync (por defecto: 4)"
+    )
+    
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="En modo --sync, mostrar el plan y los bytes a subir sin subir nada"
+    )
+    
     args = parser.parse_args()
     
     # Cargar configuración desde .env
@@ -231,6 +255,10 @@ Ejemplos de uso:
         print(f"❌ El archivo no existe: {args.file_path}")
         sys.exit(1)
     
+    if args.sync:
+        sync_directory(args, host, port, username, password)
+        return
+    
     # Crear cliente y ejecutar operaciones
     uploader = SynologyUploader(host, port, username, password)
     
@@ -258,5 +286,42 @@ Ejemplos de uso:
         sys.exit(1)
 
 
+def sync_directory(args, host, port, username, password):
+    """
+    Modo --sync: sincroniza una carpeta local con una carpeta del NAS.
+    
+    Usa SynologyClient (una sesión compartida por todos los workers y SID
+    guardado en la carpeta de cachés de config.ini para no autenticarse en
+    cada ejecución).
+    """
+    if not os.path.isdir(args.file_path):
+        print(f"❌ Con --sync hay que indicar una carpeta: {args.file_path}")
+        sys.exit(1)
+    
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from components.config_manager import ConfigManager
+    from components.synology_client import SynologyClient
+    
+    client = SynologyClient(host, port, username, password, pool_size=max(args.workers, 1),
+                            session_cache_dir=ConfigManager().get_cache_dir())
+    try:
+        if not client.login():
+            sys.exit(1)
+        
+        summary = client.sync_directory(args.file_path, args.remote_path, workers=args.workers,
+                                        dry_run=args.dry_run)
+        if summary['failed']:
+            for local_path in summary['failures']:
+                print(f"   ❌ {local_path}")
+            sys.exit(1)
+        
+        print("🎉 Sincronización completada" if not args.dry_run else "🔍 Dry run: no se ha subido nada")
+    except KeyboardInterrupt:
+        print("\n⚠️ Sincronización cancelada por el usuario")
+        sys.exit(1)
+    finally:
+        client.logout()
+
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Gestor del almacenamiento temporal de descargas (temp_downloads).
+
+Reparte un presupuesto de bytes entre las descargas en curso: cada descarga
+reserva su Content-Length antes de escribir y, si no cabe, espera a que otra
+termine o se rechaza. Los archivos que quedan huérfanos (p. ej. tras un fallo
+de renombrado o de subida) se eliminan al cerrar la reserva y al arrancar.
+"""
+
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Set
+
+import sys
+
+# Agregar el directorio src al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import logger
+
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_TEMP_DIR = PROJECT_ROOT / "temp_downloads"
+DEFAULT_TMPFS_DIR = Path("/dev/shm")
+
+
+class TempReservation:
+    """
+    Espacio reservado para una operación (descarga + subida) en la carpeta temporal.
+
+    Se usa como context manager: al salir se eliminan los archivos que la
+    operación haya dejado y se libera el espacio reservado.
+    """
+
+    def __init__(self, manager: "TempStorageManager", label: str):
+        self.manager = manager
+        self.label = label
+        self.nbytes = 0
+        self.paths: Set[Path] = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def path_for(self, filename: str) -> Path:
+        """Devuelve la ruta de un archivo temporal y lo asocia a la reserva."""
+        path = self.manager.dir / filename
+        self.track(path)
+        return path
+
+    def track(self, path: Path) -> None:
+        """Asocia un archivo a la reserva para eliminarlo al liberarla."""
+        self.paths.add(Path(path))
+
+    def request(self, nbytes: int, wait: bool = True) -> bool:
+        """
+        Amplía la reserva hasta `nbytes` en total.
+
+        Args:
+            nbytes: Bytes totales que necesita la operación
+            wait: Esperar a que otras reservas liberen espacio
+
+        Returns:
+            bool: True si el espacio quedó reservado
+        """
+        if nbytes <= self.nbytes:
+            return True
+        return self.manager._grow(self, nbytes - self.nbytes, wait)
+
+    def release(self) -> None:
+        """Elimina los archivos asociados y libera el espacio reservado."""
+        for path in self.paths:
+            try:
+                if path.exists():
+                    path.unlink()
+                    logger.debug(f"🗑️ Archivo temporal eliminado: {path}")
+            except OSError as e:
+                logger.warning(f"⚠️ Error al eliminar archivo temporal {path}: {e}")
+        self.paths.clear()
+        self.manager._release(self)
+
+
+class TempStorageManager:
+    """
+    Carpeta temporal con presupuesto de bytes compartido entre hilos.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None, budget_bytes: Optional[int] = None,
+                 use_tmpfs: bool = False, orphan_max_age: float = 3600, wait_timeout: float = 600,
+                 min_free_bytes: int = 100 * 1024 * 1024):
+        """
+        Inicializa el gestor y limpia los archivos huérfanos de ejecuciones anteriores.
+
+        Args:
+            base_dir: Carpeta temporal (por defecto temp_downloads en la raíz del proyecto)
+            budget_bytes: Bytes máximos reservados a la vez (None sin límite propio)
+            use_tmpfs: Usar /dev/shm si existe (los MP3 no tocan el disco)
+            orphan_max_age: Segundos sin modificar tras los que un archivo se considera huérfano
+            wait_timeout: Segundos máximos esperando a que haya espacio
+            min_free_bytes: Espacio libre que se deja siempre en el sistema de archivos
+        """
+        self.budget_bytes = budget_bytes or None
+        self.orphan_max_age = orphan_max_age
+        self.wait_timeout = wait_timeout
+        self.min_free_bytes = min_free_bytes
+        self.dir = self._resolve_dir(Path(base_dir) if base_dir else DEFAULT_TEMP_DIR, use_tmpfs)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        self._condition = threading.Condition()
+        self._reserved = 0
+        self._active = 0
+        self._peak = 0
+        self._rejected = 0
+
+        self.cleanup_orphans()
+
+    def reservation(self, label: str = "") -> TempReservation:
+        """Crea una reserva vacía (usar con `with`)."""
+        return TempReservation(self, label)
+
+    def usage(self) -> dict:
+        """
+        Devuelve el uso actual de la carpeta temporal.
+
+        Returns:
+            dict: {'dir', 'budget_bytes', 'reserved_bytes', 'peak_bytes',
+                   'active_reservations', 'rejected', 'disk_bytes'}
+        """
+        with self._condition:
+            usage = {
+                'dir': str(self.dir),
+                'budget_bytes': self.budget_bytes,
+                'reserved_bytes': self._reserved,
+                'peak_bytes': self._peak,
+                'active_reservations': self._active,
+                'rejected': self._rejected,
+            }
+        usage['disk_bytes'] = sum(entry.stat().st_size for entry in os.scandir(self.dir) if entry.is_file())
+        return usage
+
+    def log_usage(self) -> None:
+        """Escribe en el log el uso de la carpeta temporal."""
+        usage = self.usage()
+        budget = f"{usage['budget_bytes'] / 1024 / 1024:.0f} MB" if usage['budget_bytes'] else "sin límite"
+        logger.info(
+            f"💽 Carpeta temporal {usage['dir']}: pico {usage['peak_bytes'] / 1024 / 1024:.1f} MB "
+            f"de {budget}, {usage['disk_bytes'] / 1024 / 1024:.1f} MB en disco, "
+            f"{usage['rejected']} descargas rechazadas por espacio"
+        )
+
+    def cleanup_orphans(self) -> int:
+        """
+        Elimina los archivos que llevan más de `orphan_max_age` segundos sin modificarse.
+
+        Se deja margen para no borrar descargas en curso de otro proceso que
+        comparta la carpeta.
+
+        Returns:
+            int: Número de archivos eliminados
+        """
+        removed = 0
+        cutoff = time.time() - self.orphan_max_age
+        for entry in os.scandir(self.dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"⚠️ No se pudo eliminar el archivo huérfano {entry.path}: {e}")
+        if removed:
+            logger.info(f"🧹 {removed} archivos huérfanos eliminados de {self.dir}")
+        return removed
+
+    def _resolve_dir(self, base_dir: Path, use_tmpfs: bool) -> Path:
+        """Elige la carpeta temporal, usando tmpfs si se pide y está disponible."""
+        if use_tmpfs:
+            if DEFAULT_TMPFS_DIR.is_dir() and os.access(DEFAULT_TMPFS_DIR, os.W_OK):
+                return DEFAULT_TMPFS_DIR / base_dir.name
+            logger.warning(f"⚠️ {DEFAULT_TMPFS_DIR} no está disponible, se usa {base_dir}")
+        return base_dir
+
+    def _fits(self, nbytes: int) -> bool:
+        """Indica si caben `nbytes` más (con el lock tomado)."""
+        if self.budget_bytes and self._reserved + nbytes > self.budget_bytes:
+            return False
+        free = shutil.disk_usage(self.dir).free
+        # Lo ya reservado puede no estar escrito todavía
+        return free - self.min_free_bytes >= nbytes + self._reserved
+
+    def _grow(self, reservation: TempReservation, nbytes: int, wait: bool) -> bool:
+        """Amplía una reserva en `nbytes`, esperando si hace falta."""
+        with self._condition:
+            if self.budget_bytes and nbytes + reservation.nbytes > self.budget_bytes:
+                self._rejected += 1
+                logger.warning(
+                    f"⚠️ {reservation.label or 'Descarga'} necesita {(nbytes + reservation.nbytes) / 1024 / 1024:.1f} MB, "
+                    f"más que el presupuesto temporal ({self.budget_bytes / 1024 / 1024:.0f} MB)"
+                )
+                return False
+
+            deadline = time.monotonic() + self.wait_timeout
+            while not self._fits(nbytes):
+                remaining = deadline - time.monotonic()
+                if not wait or remaining <= 0 or (self._active == 0 or
+                                                  (self._active == 1 and reservation.nbytes)):
+                    # Nadie más puede liberar espacio: no tiene sentido esperar
+                    self._rejected += 1
+                    logger.warning(f"⚠️ Sin espacio temporal para {reservation.label or 'la descarga'} ({nbytes} bytes)")
+                    return False
+                self._condition.wait(timeout=min(remaining, 5))
+
+            if reservation.nbytes == 0:
+                self._active += 1
+            reservation.nbytes += nbytes
+            self._reserved += nbytes
+            self._peak = max(self._peak, self._reserved)
+            return True
+
+    def _release(self, reservation: TempReservation) -> None:
+        """Libera el espacio de una reserva."""
+        with self._condition:
+            if reservation.nbytes:
+                self._reserved -= reservation.nbytes
+                self._active -= 1
+                reservation.nbytes = 0
+                self._condition.notify_all()
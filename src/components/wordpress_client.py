@@ -3,7 +3,8 @@ import sys
 import os
 import json
 import re
-import html
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 from pathlib import Path
@@ -12,19 +13,32 @@ from pathlib import Path
 current_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(current_dir))
 
+from utils.http_cache import CachedSession
 from utils.logger import logger
+from utils.playlist_tokenizer import clean_web_text, parse_web_song, tokenize_web_playlist
+
+
+class WordPressUnavailableError(Exception):
+    """No se pudo saber si un episodio tiene post: la API REST o la web no respondieron con claridad."""
 
 
 class WordPressClient:
-    def __init__(self, api_url: str):
+    def __init__(self, api_url: str, slug_template: str = 'popcasting-{number}'):
         """
         Inicializa el cliente de WordPress.
         
         Args:
             api_url: URL base de la API de WordPress (ej: https://popcastingpop.com/wp-json/wp/v2/)
+            slug_template: Slug de los posts de episodio; {number} es el número del programa
         """
         self.api_url = api_url.rstrip('/')
-        self.session = requests.Session()
+        self.slug_template = slug_template
+        prefix, _, rest = slug_template.partition('{number')
+        self._slug_pattern = re.compile(rf'^{re.escape(prefix)}(\d+){re.escape(rest.partition("}")[2])}$')
+        # Índice {número de programa: post de la API REST}, ver build_index()
+        self.post_index = None
+        # Las páginas y las respuestas de la API REST pasan por la caché HTTP en disco
+        self.session = CachedSession()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         })
@@ -68,6 +82,11 @@ class WordPressClient:
             logger.error(f"Error inesperado al buscar post '{slug}': {e}")
             return None
 
+    def post_slug(self, chapter_number) -> str:
+        """Slug del post de un episodio según slug_template (ej: popcasting-485)."""
+        number = int(chapter_number) if str(chapter_number).isdigit() else chapter_number
+        return self.slug_template.format(number=number)
+
     def get_post_details_by_date_and_number(self, date: str, chapter_number: str) -> dict | None:
         """
         Busca un post en WordPress por fecha y número de capítulo.
@@ -79,20 +98,191 @@ class WordPressClient:
         Returns:
             dict: Datos del post si se encuentra, None si no se encuentra o hay error
         """
+        full_url = self._build_post_url(date, chapter_number)
+        if not full_url:
+            return None
+        return self.get_post_details_by_url(full_url, date)
+
+    def find_post_by_number(self, date: str, chapter_number: str, nearby_days=(-1, 1, 2)) -> dict | None:
+        """
+        Localiza y extrae el post de un episodio haciendo las mínimas descargas de páginas.
+        
+        0. Si se ha construido el índice (build_index), se usa el post ya descargado.
+        1. Una consulta a la API REST por slug (posts?slug=...&_fields=link,date) da la URL exacta.
+        2. Si la API no responde o no lo encuentra, se comprueban a la vez con HEAD las URLs
+           de la fecha del RSS y de las fechas cercanas; la primera que existe gana y el
+           resto de comprobaciones pendientes se cancelan.
+        
+        En ambos casos solo se descarga y parsea una página completa.
+        
+        Args:
+            date: Fecha del episodio en el RSS (YYYY-MM-DD)
+            chapter_number: Número del capítulo
+            nearby_days: Desplazamientos en días que se prueban además de la fecha exacta
+            
+        Returns:
+            dict: Datos del post (ver get_post_details_by_url) o None si no existe: la API REST
+                no lo tiene o todas las URLs candidatas dan 404
+            
+        Raises:
+            WordPressUnavailableError: Si no se puede afirmar que no existe (errores de red,
+                5xx, o el post se localizó pero su página no se pudo descargar)
+        """
+        indexed = self.get_post_details_from_index(chapter_number)
+        if indexed:
+            return indexed
+        
         try:
-            # Construir la URL completa del sitio web con la fecha
-            date_parts = date.split('-')
-            if len(date_parts) != 3:
-                logger.error(f"Formato de fecha inválido: {date}. Debe ser YYYY-MM-DD")
-                return None
-                
-            year, month, day = date_parts
-            formatted_date = f"{year}/{month}/{day}"
+            post = self._resolve_post_by_slug(chapter_number)
+            rest_says_missing = post is None
+        except WordPressUnavailableError as e:
+            logger.warning(f"API REST no disponible para resolver el capítulo {chapter_number}, se prueban fechas: {e}")
+            post = None
+            rest_says_missing = False
+        if post:
+            return self._get_located_post(post['link'], post['date'])
+        
+        candidates = []
+        try:
+            base_date = datetime.strptime(date, '%Y-%m-%d')
+            for offset in (0,) + tuple(nearby_days):
+                candidate_date = (base_date + timedelta(days=offset)).strftime('%Y-%m-%d')
+                candidates.append((candidate_date, self._build_post_url(candidate_date, chapter_number)))
+        except ValueError:
+            logger.error(f"Formato de fecha inválido: {date}. Debe ser YYYY-MM-DD")
+            return None
+        
+        logger.info(f"Comprobando {len(candidates)} URLs candidatas para el capítulo {chapter_number}")
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        found = None
+        inconclusive = 0
+        try:
+            futures = {executor.submit(self._post_url_exists, url): (candidate_date, url)
+                       for candidate_date, url in candidates}
+            for future in as_completed(futures):
+                exists = future.result()
+                if exists:
+                    found = futures[future]
+                    break
+                if exists is None:
+                    inconclusive += 1
+        finally:
+            # Sin esperar a las comprobaciones que aún estén en curso
+            executor.shutdown(wait=False, cancel_futures=True)
+        if found:
+            candidate_date, url = found
+            logger.info(f"¡Encontrado en fecha {candidate_date}!")
+            return self._get_located_post(url, candidate_date)
+        
+        if inconclusive and not rest_says_missing:
+            raise WordPressUnavailableError(
+                f"{inconclusive} de {len(candidates)} URLs candidatas del capítulo {chapter_number} sin respuesta clara"
+            )
+        logger.warning(f"No se encontró post para el capítulo {chapter_number} en {len(candidates)} fechas")
+        return None
+    
+    def _get_located_post(self, url: str, date: str) -> dict:
+        """Descarga el post ya localizado; si falla, no se puede decir que el episodio no tenga post."""
+        post = self.get_post_details_by_url(url, date)
+        if post is None:
+            raise WordPressUnavailableError(f"No se pudo descargar el post localizado en {url}")
+        return post
+
+    def build_index(self, per_page: int = 100) -> dict:
+        """
+        Descarga el catálogo de posts de la API REST y lo indexa por número de programa.
+        
+        Pide solo los campos necesarios (_fields) en páginas de `per_page` posts,
+        así que unas pocas peticiones sustituyen a cientos de páginas HTML en los
+        rellenos masivos. Después find_post_by_number() resuelve cada episodio
+        con una búsqueda en el diccionario y el HTML de content.rendered.
+        
+        Args:
+            per_page: Posts por página (máximo 100 en WordPress)
             
-            # Construir la URL completa del sitio web
-            base_url = self.api_url.replace('/wp-json/wp/v2', '')  # Obtener la URL base
-            full_url = f"{base_url}/{formatted_date}/popcasting-{chapter_number}/"
+        Returns:
+            dict: {número de programa: post} (también queda en self.post_index)
+        """
+        fields = 'id,slug,link,date,modified,title,content,jetpack_featured_media_url'
+        index = {}
+        page = 1
+        total_pages = None
+        
+        while total_pages is None or page <= total_pages:
+            try:
+                response = self.session.get(f"{self.api_url}/posts", timeout=30, params={
+                    'per_page': per_page, 'page': page, '_fields': fields, 'orderby': 'date', 'order': 'desc'
+                })
+                if response.status_code == 400 and page > 1:
+                    break  # Página fuera de rango (rest_post_invalid_page_number)
+                response.raise_for_status()
+                posts = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Error al descargar la página {page} del catálogo de WordPress: {e}")
+                break
+            
+            if not posts:
+                break
+            for post in posts:
+                number = self._number_from_slug(post.get('slug', ''))
+                if number is not None:
+                    index.setdefault(number, post)
+            total_pages = int(response.headers.get('X-WP-TotalPages', page))
+            page += 1
+        
+        self.post_index = index
+        logger.info(f"📚 Índice de WordPress: {len(index)} episodios en {page - 1} páginas de la API REST")
+        return index
+
+    def get_post_details_from_index(self, chapter_number) -> dict | None:
+        """
+        Datos de un post a partir del índice de build_index(), sin descargar su página.
+        
+        Returns:
+            dict: Mismos campos que get_post_details_by_url, o None si no hay índice o no está
+        """
+        if not self.post_index or not str(chapter_number).isdigit():
+            return None
+        post = self.post_index.get(int(chapter_number))
+        if not post:
+            return None
+        
+        link = post.get('link', '')
+        content = (post.get('content') or {}).get('rendered', '')
+        # content.rendered es el cuerpo del post: se envuelve como en la página completa
+        soup = BeautifulSoup(f'<div class="entry-content">{content}</div>', 'html.parser')
+        title = (post.get('title') or {}).get('rendered', '')
+        
+        extracted_data = {
+            "wordpress_url": link,
+            "cover_image_url": post.get('jetpack_featured_media_url') or self._extract_cover_image(soup, link),
+            "web_extra_links": self._extract_extra_links(soup),
+            "web_playlist": self._extract_playlist(soup),
+            "content_length": len(content),
+            "title": self._clean_unicode_text(title) if title else "Sin título",
+            "date": (post.get('date') or '')[:10]
+        }
+        logger.info(f"Post del capítulo {chapter_number} tomado del índice: "
+                    f"{len(extracted_data['web_playlist'])} canciones")
+        return extracted_data
+
+    def _number_from_slug(self, slug: str) -> int | None:
+        """Número de programa de un slug según slug_template (popcasting-485 -> 485)."""
+        match = self._slug_pattern.match(slug or '')
+        return int(match.group(1)) if match else None
+
+    def get_post_details_by_url(self, full_url: str, date: str) -> dict | None:
+        """
+        Descarga la página de un post y extrae sus datos.
+        
+        Args:
+            full_url: URL de la página del post
+            date: Fecha del post (YYYY-MM-DD)
             
+        Returns:
+            dict: Datos del post si se encuentra, None si no se encuentra o hay error
+        """
+        try:
             logger.info(f"Buscando post en URL: {full_url}")
             
             # Hacer la petición a la página web
@@ -130,12 +320,71 @@ class WordPressClient:
                 return None
                 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error de conexión al buscar post en URL: {full_url if 'full_url' in locals() else 'URL no construida'}: {e}")
+            logger.error(f"Error de conexión al buscar post en URL: {full_url}: {e}")
             return None
         except Exception as e:
             logger.error(f"Error inesperado al buscar post: {e}")
             return None
 
+    def _build_post_url(self, date: str, chapter_number: str) -> str | None:
+        """URL de la página de un episodio: <sitio>/YYYY/MM/DD/<slug>/ (None si la fecha no es válida)."""
+        date_parts = date.split('-')
+        if len(date_parts) != 3:
+            logger.error(f"Formato de fecha inválido: {date}. Debe ser YYYY-MM-DD")
+            return None
+        year, month, day = date_parts
+        base_url = self.api_url.replace('/wp-json/wp/v2', '')  # Obtener la URL base
+        return f"{base_url}/{year}/{month}/{day}/{self.post_slug(chapter_number)}/"
+
+    def _resolve_post_by_slug(self, chapter_number: str) -> dict | None:
+        """
+        Busca la URL y la fecha del post de un episodio con una sola llamada a la API REST.
+        
+        Returns:
+            dict: {'link', 'date' (YYYY-MM-DD)} o None si la API no tiene ese slug
+            
+        Raises:
+            WordPressUnavailableError: Si la API no responde o la respuesta no es válida
+        """
+        slug = self.post_slug(chapter_number)
+        try:
+            response = self.session.get(f"{self.api_url}/posts",
+                                        params={'slug': slug, '_fields': 'link,date'}, timeout=10)
+            response.raise_for_status()
+            posts = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise WordPressUnavailableError(f"API REST sin respuesta para '{slug}': {e}") from e
+        
+        if not posts or not isinstance(posts, list) or not posts[0].get('link'):
+            logger.info(f"La API REST no tiene post con slug '{slug}'")
+            return None
+        logger.info(f"Post '{slug}' resuelto por la API REST: {posts[0]['link']}")
+        return {'link': posts[0]['link'], 'date': (posts[0].get('date') or '')[:10]}
+
+    def _post_url_exists(self, url: str) -> bool | None:
+        """
+        Comprueba con una petición HEAD (sin descargar la página) si existe la URL de un post.
+        
+        Returns:
+            bool: True si existe, False si el servidor responde 404/410, None si no se sabe
+                (error de red, 5xx u otra respuesta)
+        """
+        try:
+            response = self.session.head(url, timeout=10, allow_redirects=True)
+            if response.status_code in (405, 501):
+                # Servidor sin HEAD: GET sin leer el cuerpo
+                response = self.session.get(url, timeout=10, stream=True)
+                response.close()
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"Error al comprobar {url}: {e}")
+            return None
+        if response.status_code == 200:
+            return True
+        if response.status_code in (404, 410):
+            return False
+        logger.debug(f"Respuesta {response.status_code} al comprobar {url}")
+        return None
+
     def _extract_title(self, soup: BeautifulSoup) -> str:
         """Extrae el título del post."""
         title_elem = soup.find('title')
@@ -250,7 +499,7 @@ class WordPressClient:
                         text = item.get_text(strip=True)
                         # Limpiar caracteres Unicode del texto extraído
                         text = self._clean_unicode_text(text)
-                        song_info = self._parse_song_text(text)
+                        song_info = parse_web_song(text)
                         if song_info and self._is_valid_song(song_info):
                             playlist.append({
                                 "position": i + 1,
@@ -280,7 +529,7 @@ class WordPressClient:
                                 position += 1
                                 logger.info(f"Canción encontrada (párrafo): {song['artist']} - {song['title']}")
                     else:
-                        song_info = self._parse_song_text(text)
+                        song_info = parse_web_song(text)
                         if song_info and self._is_valid_song(song_info):
                             playlist.append({
                                 "position": position,
@@ -312,7 +561,7 @@ class WordPressClient:
                                 logger.info(f"Canción encontrada (span): {song['artist']} - {song['title']}")
                         break  # Si encontramos canciones en un span, no buscar más
                     else:
-                        song_info = self._parse_song_text(text)
+                        song_info = parse_web_song(text)
                         if song_info and self._is_valid_song(song_info):
                             playlist.append({
                                 "position": position,
@@ -326,19 +575,8 @@ class WordPressClient:
         return playlist
 
     def _parse_popcasting_playlist_text(self, text: str) -> list[dict]:
-        """Parsea texto específico de Popcasting con múltiples canciones separadas por ::"""
-        songs = []
-        
-        if "::" in text:
-            parts = text.split("::")
-            for part in parts:
-                part = part.strip()
-                if part:
-                    song_info = self._parse_song_text(part)
-                    if song_info:
-                        songs.append(song_info)
-        
-        return songs
+        """Parsea texto específico de Popcasting (ya limpio con _clean_unicode_text) con múltiples canciones separadas por ::"""
+        return tokenize_web_playlist(text)
 
     def _clean_unicode_text(self, text: str) -> str:
         """
@@ -347,51 +585,14 @@ class WordPressClient:
         if not text:
             return text
         try:
-            # Si detectamos patrones típicos de mala codificación, intentamos decodificar
-            if 'Ã' in text or 'Â' in text:
-                try:
-                    text = text.encode('latin-1').decode('utf-8')
-                except Exception:
-                    pass
-            
-            # Limpiar caracteres Unicode problemáticos específicos
-            text = text.replace('┬Ę', '·')  # Punto medio Unicode
-            text = text.replace('┬Ā', ' ')  # Espacio no separador Unicode
-            text = text.replace('┬', '')    # Otros caracteres Unicode problemáticos
-            text = text.replace('•', '·')   # Punto medio Unicode alternativo
-            text = text.replace('–', '-')   # Guión medio Unicode
-            text = text.replace('—', '-')   # Guión largo Unicode
-            
-            text = html.unescape(text)
-            return text.strip()
+            return clean_web_text(text)
         except Exception as e:
             logger.warning(f'Error al limpiar texto Unicode: {e}')
             return text.strip()
 
     def _parse_song_text(self, text: str) -> dict | None:
         """Parsea texto para extraer artista y título de una canción."""
-        # Limpiar caracteres Unicode antes de procesar
-        cleaned_text = self._clean_unicode_text(text)
-        
-        patterns = [
-            r"^(.+?)\s*[-–—]\s*(.+)$",  # Artista - Título
-            r"^(.+?)\s*:\s*(.+)$",      # Artista: Título
-            r'^(.+?)\s*"\s*(.+?)\s*"$', # Artista "Título"
-            r"^(.+?)\s*·\s*(.+)$",      # Artista · Título (formato Popcasting)
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, cleaned_text.strip())
-            if match:
-                artist = self._clean_unicode_text(match.group(1).strip())
-                title = self._clean_unicode_text(match.group(2).strip())
-                
-                # Filtrar texto que no parece ser una canción
-                if (len(artist) > 1 and len(title) > 1 and
-                    not any(word in artist.lower() for word in ['comentarios', 'compartir', 'twitter', 'facebook', 'popcasting'])):
-                    return {"artist": artist, "title": title}
-        
-        return None
+        return parse_web_song(self._clean_unicode_text(text))
 
     def _is_valid_song(self, song: dict) -> bool:
         """Verifica si una canción extraída es válida (no es una URL o texto no musical)."""
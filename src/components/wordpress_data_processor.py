@@ -9,6 +9,7 @@ current_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(current_dir))
 
 from utils.logger import logger
+from components.models import WordPressPost
 
 
 class WordPressDataProcessor:
@@ -22,7 +23,7 @@ class WordPressDataProcessor:
         """
         logger.info("WordPressDataProcessor inicializado")
     
-    def process_post_data(self, wordpress_data: Dict) -> Dict:
+    def process_post_data(self, wordpress_data: Dict) -> Optional[WordPressPost]:
         """
         Procesa los datos de un post de WordPress.
         
@@ -30,64 +31,56 @@ class WordPressDataProcessor:
             wordpress_data: Datos del post obtenidos de la API de WordPress o extracción HTML
             
         Returns:
-            Dict: Datos procesados del post
+            WordPressPost: Datos procesados del post (None si no hay datos o hay un error)
         """
         try:
             if not wordpress_data:
                 logger.warning("No se proporcionaron datos de WordPress para procesar")
-                return {}
+                return None
             
             # Detectar el tipo de datos (API REST vs HTML)
             if isinstance(wordpress_data.get('title'), dict):
                 # Formato API REST
-                processed_data = {
-                    'wordpress_id': wordpress_data.get('id'),
-                    'title': wordpress_data.get('title', {}).get('rendered', ''),
-                    'content': wordpress_data.get('content', {}).get('rendered', ''),
-                    'excerpt': wordpress_data.get('excerpt', {}).get('rendered', ''),
-                    'slug': wordpress_data.get('slug', ''),
-                    'date': wordpress_data.get('date'),
-                    'modified': wordpress_data.get('modified'),
-                    'featured_image_url': wordpress_data.get('jetpack_featured_media_url'),
-                    'author': wordpress_data.get('author'),
-                    'status': wordpress_data.get('status'),
-                    'link': wordpress_data.get('link', ''),
-                    'categories': self._extract_categories(wordpress_data),
-                    'tags': self._extract_tags(wordpress_data),
-                    'playlist_data': self._extract_playlist_data(wordpress_data)
-                }
+                processed_data = WordPressPost(
+                    wordpress_id=wordpress_data.get('id'),
+                    title=wordpress_data.get('title', {}).get('rendered', ''),
+                    content=wordpress_data.get('content', {}).get('rendered', ''),
+                    excerpt=wordpress_data.get('excerpt', {}).get('rendered', ''),
+                    slug=wordpress_data.get('slug', ''),
+                    date=wordpress_data.get('date'),
+                    modified=wordpress_data.get('modified'),
+                    featured_image_url=wordpress_data.get('jetpack_featured_media_url'),
+                    author=wordpress_data.get('author'),
+                    status=wordpress_data.get('status'),
+                    link=wordpress_data.get('link', ''),
+                    categories=self._extract_categories(wordpress_data),
+                    tags=self._extract_tags(wordpress_data),
+                    playlist_data=self._extract_playlist_data(wordpress_data)
+                )
             else:
-                # Formato HTML (extracción directa)
-                processed_data = {
-                    'wordpress_id': None,  # No disponible en extracción HTML
-                    'title': wordpress_data.get('title', ''),
-                    'content': '',  # No extraído en HTML
-                    'excerpt': '',  # No extraído en HTML
-                    'slug': '',  # No disponible
-                    'date': wordpress_data.get('date', ''),
-                    'modified': None,
-                    'featured_image_url': wordpress_data.get('cover_image_url', ''),
-                    'author': None,
-                    'status': None,
-                    'link': wordpress_data.get('wordpress_url', ''),
-                    'categories': [],
-                    'tags': [],
-                    'playlist_data': {
+                # Formato HTML (extracción directa): sin id, contenido, extracto ni slug
+                web_playlist = wordpress_data.get('web_playlist', [])
+                processed_data = WordPressPost(
+                    title=wordpress_data.get('title', ''),
+                    date=wordpress_data.get('date', ''),
+                    featured_image_url=wordpress_data.get('cover_image_url', ''),
+                    link=wordpress_data.get('wordpress_url', ''),
+                    playlist_data={
                         'raw_content': '',
-                        'has_playlist': len(wordpress_data.get('web_playlist', [])) > 0,
-                        'songs_count': len(wordpress_data.get('web_playlist', [])),
-                        'songs': self._clean_playlist_songs(wordpress_data.get('web_playlist', []))
+                        'has_playlist': len(web_playlist) > 0,
+                        'songs_count': len(web_playlist),
+                        'songs': self._clean_playlist_songs(web_playlist)
                     },
-                    'web_extra_links': wordpress_data.get('web_extra_links', []),
-                    'content_length': wordpress_data.get('content_length', 0)
-                }
+                    web_extra_links=wordpress_data.get('web_extra_links', []),
+                    content_length=wordpress_data.get('content_length', 0)
+                )
             
-            logger.debug(f"Post de WordPress procesado: {processed_data.get('title', 'Sin título')}")
+            logger.debug(f"Post de WordPress procesado: {processed_data.title or 'Sin título'}")
             return processed_data
             
         except Exception as e:
             logger.error(f"Error al procesar datos de WordPress: {e}")
-            return {}
+            return None
     
     def extract_slug_from_url(self, url: str) -> str:
         """
@@ -0,0 +1,124 @@
+"""
+Mapa persistente número de programa -> URL del post de WordPress.
+
+Evita repetir en cada ejecución (y en cada script) la búsqueda del post de un
+episodio: los posts encontrados se recuerdan con su URL y su fecha, y los
+episodios sin post se recuerdan como "no encontrado" hasta una hora de
+reintento, así que no se vuelven a probar las fechas candidatas (cuatro 404)
+mientras no caduque.
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class WordPressURLMap:
+    """
+    Resolución de episodios a posts de WordPress, guardada en disco.
+
+    Cada entrada es {'url', 'date', 'resolved_at'} para un post encontrado o
+    {'url': None, 'misses', 'retry_after'} para un episodio sin post. Cada
+    fallo consecutivo duplica la espera hasta el siguiente intento (hasta
+    MAX_RETRY_FACTOR veces miss_retry_seconds).
+    """
+
+    CACHE_FILENAME = "wordpress_urls.json"
+    MAX_RETRY_FACTOR = 16
+
+    def __init__(self, cache_dir: Optional[Path] = None, miss_retry_seconds: int = 86400,
+                 cache_filename: Optional[str] = None):
+        """
+        Inicializa el mapa.
+
+        Args:
+            cache_dir: Carpeta donde persistir el mapa (None para mantenerlo solo en memoria)
+            miss_retry_seconds: Segundos hasta volver a buscar un episodio sin post
+            cache_filename: Nombre del archivo (uno por programa)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.miss_retry_seconds = miss_retry_seconds
+        self.cache_path = Path(cache_dir) / (cache_filename or self.CACHE_FILENAME) if cache_dir else None
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._load_cache()
+
+    def get(self, program_number) -> Optional[Dict]:
+        """Entrada de un episodio, o None si nunca se ha buscado."""
+        with self._lock:
+            entry = self._entries.get(str(program_number))
+            return dict(entry) if entry else None
+
+    def get_url(self, program_number) -> Optional[Dict]:
+        """{'url', 'date'} del post ya resuelto de un episodio, o None."""
+        entry = self.get(program_number)
+        if entry and entry.get('url'):
+            return {'url': entry['url'], 'date': entry.get('date')}
+        return None
+
+    def is_missing(self, program_number) -> bool:
+        """Indica si el episodio no tenía post y aún no toca volver a buscarlo."""
+        entry = self.get(program_number)
+        return bool(entry and not entry.get('url') and entry.get('retry_after', 0) > time.time())
+
+    def record_found(self, program_number, url: str, date: Optional[str] = None) -> None:
+        """Guarda la URL (y la fecha) del post de un episodio."""
+        with self._lock:
+            self._entries[str(program_number)] = {'url': url, 'date': date, 'resolved_at': time.time()}
+            self._save_cache()
+
+    def record_missing(self, program_number) -> float:
+        """
+        Anota que el episodio no tiene post.
+
+        Returns:
+            float: Momento (timestamp) a partir del cual se volverá a buscar
+        """
+        with self._lock:
+            previous = self._entries.get(str(program_number)) or {}
+            misses = 0 if previous.get('url') else previous.get('misses', 0)
+            misses += 1
+            factor = min(2 ** (misses - 1), self.MAX_RETRY_FACTOR)
+            retry_after = time.time() + self.miss_retry_seconds * factor
+            self._entries[str(program_number)] = {'url': None, 'misses': misses, 'retry_after': retry_after}
+            self._save_cache()
+            return retry_after
+
+    def forget(self, program_number) -> None:
+        """Elimina la entrada de un episodio (p. ej. el post ha cambiado de URL)."""
+        with self._lock:
+            if self._entries.pop(str(program_number), None) is not None:
+                self._save_cache()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load_cache(self) -> None:
+        """Carga el mapa persistido en disco, si existe."""
+        if not self.cache_path or not self.cache_path.exists():
+            return
+
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                self._entries = json.load(f).get('episodes', {})
+            self.logger.debug(f"📦 Mapa de URLs de WordPress cargado desde {self.cache_path}")
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"⚠️ No se pudo cargar el mapa de URLs de WordPress: {e}")
+            self._entries = {}
+
+    def _save_cache(self) -> None:
+        """Persiste el mapa en disco de forma atómica (con el lock tomado)."""
+        if not self.cache_path:
+            return
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'episodes': self._entries}, f)
+            tmp_path.replace(self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ No se pudo guardar el mapa de URLs de WordPress: {e}")
@@ -14,23 +14,181 @@ current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
 from components.config_manager import ConfigManager
-from components.database_manager import DatabaseManager
+from components.database_manager import DatabaseManager, MissingColumnsError
 from components.rss_data_processor import RSSDataProcessor
 from components.wordpress_data_processor import WordPressDataProcessor
 from components.wordpress_client import WordPressClient
 from components.data_processor import DataProcessor
+from components.wordpress_url_map import WordPressURLMap
 from components.song_processor import SongProcessor
 from components.audio_manager import AudioManager
-from components.synology_client import SynologyClient
+from components.temp_storage import TempStorageManager
+from components.archive_backend import create_archive_backend, create_archive_mirrors
+from components.nas_inventory import NASInventory
+from components.episode_change_detector import EpisodeChangeDetector
 from utils.logger import logger
+from utils.bandwidth import get_bandwidth_governor
+from utils.fair_scheduler import FairScheduler
+from utils.http_cache import get_http_cache
+
+
+# A partir de estos episodios nuevos en un feed (p. ej. BD vacía o huecos antiguos) se descarga el
+# catálogo de WordPress por la API REST en lugar de una página HTML por episodio
+WORDPRESS_INDEX_MIN_EPISODES = 10
+
+
+def create_feed_sync(feed: dict, db_manager, archive_backend, nas_inventory, temp_storage, archive_mirrors,
+                     url_map_config: dict = None) -> dict:
+    """
+    Crea los componentes de un programa (feed) sobre la infraestructura compartida.
+    
+    Args:
+        feed: Programa de ConfigManager.get_feeds()
+        db_manager: Conexión a Supabase (se usan las tablas del programa)
+        archive_backend, nas_inventory, temp_storage, archive_mirrors: Archivo de audio compartido
+        url_map_config: ConfigManager.get_wordpress_url_map_config() (None para no recordar las URLs)
+        
+    Returns:
+        dict: {'name', 'db_manager', 'rss_processor', 'wordpress_client', 'data_processor', 'audio_manager'}
+    """
+    feed_db = db_manager.for_tables(feed['podcasts_table'], feed['songs_table'])
+    rss_processor = RSSDataProcessor(feed['rss_url'], feed['parser'], title_prefix=feed['title_prefix'])
+    wordpress_client = None
+    url_map = None
+    if feed['wordpress_api_url']:
+        wordpress_client = WordPressClient(feed['wordpress_api_url'], feed['post_slug_template'])
+        if url_map_config and url_map_config['cache_dir']:
+            url_map = WordPressURLMap(url_map_config['cache_dir'], url_map_config['miss_retry_seconds'],
+                                      cache_filename=f"wordpress_urls_{feed['name']}.json")
+    
+    return {
+        'name': feed['name'],
+        'db_manager': feed_db,
+        'rss_processor': rss_processor,
+        'wordpress_client': wordpress_client,
+        'data_processor': DataProcessor(rss_processor, WordPressDataProcessor(), url_map),
+        'audio_manager': AudioManager(feed_db, archive_backend, feed['archive'], nas_inventory, temp_storage,
+                                      archive_mirrors),
+    }
+
+
+def find_new_episodes(feed_sync: dict):
+    """
+    Lee el feed de un programa, actualiza los episodios editados y devuelve los que faltan en la BD.
+    
+    Returns:
+        tuple: (episodios del RSS, episodios a procesar, resumen de episodios editados)
+    """
+    name = feed_sync['name']
+    
+    # 1. Cargar en una sola consulta los números de programa (y hashes) ya guardados.
+    # Si la consulta falla se propaga el error: sin el índice no se sabe qué episodios faltan
+    logger.info(f"📊 [{name}] Cargando los episodios guardados en la base de datos...")
+    change_detector = EpisodeChangeDetector(feed_sync['db_manager'])
+    db_index = change_detector.load_index()
+    
+    if db_index:
+        latest_program_number = max(db_index)
+        latest_title = db_index[latest_program_number].get('title') or 'Sin título'
+        logger.info(f"📅 [{name}] Episodio más reciente en BD: {latest_title} (Número: {latest_program_number})")
+    else:
+        logger.info(f"📅 [{name}] No hay episodios en la base de datos, se procesarán todos")
+    
+    # 2. Obtener episodios del RSS
+    rss_episodes = feed_sync['rss_processor'].get_snapshot().episodes
+    logger.info(f"📻 [{name}] Encontrados {len(rss_episodes)} episodios en el RSS")
+    
+    # 2b. Actualizar los episodios ya guardados que se han editado en el RSS
+    # (solo las columnas que cambian, comparando el content_hash de cada entrada)
+    edited_summary = change_detector.sync(rss_episodes, db_index)
+    
+    # 3. Encolar los episodios del RSS que no están en la BD (nuevos y huecos de
+    # ejecuciones anteriores que fallaron)
+    if db_index:
+        logger.info(f"📊 [{name}] Comparando números de episodio: {len(db_index)} en BD")
+        new_episodes = change_detector.find_missing(rss_episodes, db_index)
+    else:
+        # Si no hay episodios en BD, procesar todos
+        new_episodes = rss_episodes
+    logger.info(f"🆕 [{name}] Encontrados {len(new_episodes)} episodios nuevos para procesar")
+    
+    return rss_episodes, new_episodes, edited_summary
+
+
+def process_new_episode(feed_sync: dict, rss_episode) -> bool:
+    """
+    Enriquece un episodio nuevo con WordPress, lo guarda con sus canciones y archiva su audio.
+    
+    Returns:
+        bool: True si el episodio se guardó correctamente
+        
+    Raises:
+        MissingColumnsError: Si a la tabla le faltan columnas (fallarían todos los episodios)
+    """
+    name = feed_sync['name']
+    db_manager = feed_sync['db_manager']
+    episode_title = rss_episode.get('title', 'Sin título')
+    episode_date = rss_episode.get('date', 'Sin fecha')
+    
+    logger.info(f"📝 [{name}] Procesando episodio nuevo: {episode_title} ({episode_date})")
+    
+    try:
+        # Enriquecer y unificar datos con WordPress (si el programa tiene web)
+        if feed_sync['wordpress_client']:
+            logger.info(f"🔗 Enriqueciendo datos con WordPress para: {episode_title}")
+            episode_data = feed_sync['data_processor'].process_single_episode(
+                rss_episode=rss_episode,
+                wordpress_client=feed_sync['wordpress_client']
+            )
+        else:
+            episode_data = rss_episode
+        
+        if not episode_data:
+            logger.warning(f"⚠️ No se pudieron obtener datos unificados para: {episode_title}")
+            return False
+        
+        # Insertar en la base de datos
+        logger.info(f"💾 Guardando episodio en la BD: {episode_title}")
+        new_podcast_id = db_manager.insert_full_podcast(episode_data)
+        
+        # Procesar y almacenar canciones con SongProcessor
+        logger.info(f"🎵 Procesando canciones para: {episode_title}")
+        song_processor = SongProcessor(db_manager)
+        
+        # Canciones de la playlist web del post de WordPress, si existe
+        web_playlist = episode_data.wordpress.playlist_songs if episode_data.wordpress else None
+        
+        stored_songs_count = song_processor.process_and_store_songs(
+            podcast_id=new_podcast_id,
+            web_playlist=web_playlist,
+            rss_playlist=episode_data.rss_playlist
+        )
+        
+        # Iniciar el proceso de archivado de audio
+        logger.info(f"Iniciando el proceso de archivado de audio para el podcast ID: {new_podcast_id}")
+        feed_sync['audio_manager'].archive_podcast_audio(podcast_id=new_podcast_id)
+        
+        logger.info(f"✅ Episodio guardado exitosamente: {episode_title} ({stored_songs_count} canciones)")
+        return True
+        
+    except MissingColumnsError:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error al procesar episodio '{episode_title}': {e}")
+        return False
 
 
 def main():
     """
     Función principal que orquesta todo el proceso de sincronización.
+    
+    Sincroniza todos los programas de config.ini ([feed:*], o el feed de [rss]
+    si no hay ninguno) en un solo proceso. Los episodios nuevos de todos los
+    feeds se reparten por turnos entre los [sync] max_workers workers.
     """
     logger.info("🚀 Iniciando sincronizador RSS")
     
+    db_manager = None
     try:
         # Inicialización de componentes
         logger.info("📋 Inicializando componentes...")
@@ -38,162 +196,103 @@ def main():
         # 1. Cargar configuración
         config_manager = ConfigManager()
         supabase_credentials = config_manager.get_supabase_credentials()
-        rss_url = config_manager.get_rss_url()
-        wordpress_config = config_manager.get_wordpress_config()
+        feeds = config_manager.get_feeds()
+        sync_config = config_manager.get_sync_config()
         
-        logger.info("✅ Configuración cargada correctamente")
+        logger.info(f"✅ Configuración cargada correctamente ({len(feeds)} feeds: "
+                    f"{', '.join(feed['name'] for feed in feeds)})")
         
-        # 2. Inicializar gestor de base de datos
+        # 2. Inicializar gestor de base de datos (una conexión para todos los programas)
         db_manager = DatabaseManager(
             supabase_url=supabase_credentials["url"],
             supabase_key=supabase_credentials["key"]
         )
         
-        # 3. Inicializar cliente de WordPress
-        wordpress_client = WordPressClient(wordpress_config['api_url'])
-        
-        # 4. Inicializar procesadores de datos
-        rss_processor = RSSDataProcessor(rss_url)
-        wordpress_processor = WordPressDataProcessor()
-        
-        # 5. Inicializar procesador principal (orquestador)
-        data_processor = DataProcessor(rss_processor, wordpress_processor)
-        
-        # 6. Inicializar cliente de Synology y gestor de audio
-        logger.info("Inicializando cliente de Synology...")
-        synology_credentials = config_manager.get_synology_credentials()
-        synology_client = SynologyClient(
-            host=synology_credentials["ip"],
-            port=synology_credentials["port"],
-            username=synology_credentials["user"],
-            password=synology_credentials["password"]
-        )
+        # 3. Inicializar backend del archivo (Synology o carpeta montada), compartido por los programas
+        logger.info("Inicializando backend del archivo de audio...")
+        archive_backend = create_archive_backend(config_manager)
 
-        # Hacer login al Synology
-        if not synology_client.login():
-            raise Exception("No se pudo conectar al NAS Synology")
+        # Hacer login al Synology (o comprobar el montaje)
+        if not archive_backend.login():
+            raise Exception("No se pudo conectar con el archivo de audio")
 
-        logger.info("Inicializando gestor de audio...")
-        audio_manager = AudioManager(db_manager, synology_client)
+        # Límites de ancho de banda compartidos por descargas y subidas
+        bandwidth_governor = get_bandwidth_governor()
+        bandwidth_governor.configure(**config_manager.get_bandwidth_config())
+
+        # Caché HTTP en disco para el feed RSS y las páginas y la API REST de WordPress
+        http_cache = get_http_cache()
+        http_cache.configure(**config_manager.get_http_cache_config())
+
+        archive_config = config_manager.get_archive_config()
+        nas_inventory = NASInventory(
+            archive_backend,
+            cache_dir=config_manager.get_cache_dir(),
+            ttl_seconds=archive_config['inventory_ttl']
+        )
+        temp_storage = TempStorageManager(**config_manager.get_temp_storage_config())
+        # Réplicas opcionales del archivo (p. ej. un bucket S3)
+        archive_mirrors = [m for m in create_archive_mirrors(config_manager) if m['backend'].login()]
+        
+        # 4. Componentes de cada programa (RSS, WordPress, tablas y carpeta del NAS)
+        url_map_config = config_manager.get_wordpress_url_map_config()
+        feed_syncs = [
+            create_feed_sync(feed, db_manager, archive_backend, nas_inventory, temp_storage, archive_mirrors,
+                             url_map_config)
+            for feed in feeds
+        ]
         
         logger.info("✅ Todos los componentes inicializados correctamente")
         
         # Lógica principal de sincronización
         logger.info("🔄 Iniciando proceso de sincronización...")
         
-        # 1. Obtener el episodio más reciente de la base de datos
-        logger.info("📊 Verificando episodio más reciente en la base de datos...")
-        latest_podcast = db_manager.get_latest_podcast()
-        
-        if latest_podcast:
-            latest_program_number = latest_podcast.get('program_number', 0)
-            latest_title = latest_podcast.get('title', 'Sin título')
-            logger.info(f"📅 Episodio más reciente en BD: {latest_title} (Número: {latest_program_number})")
-        else:
-            logger.info("📅 No hay episodios en la base de datos, se procesarán todos")
-            latest_program_number = 0
-        
-        # 2. Obtener episodios del RSS
-        rss_episodes = rss_processor.fetch_and_process_entries()
-        logger.info(f"📻 Encontrados {len(rss_episodes)} episodios en el RSS")
-        
-        # 3. Filtrar solo episodios nuevos (con número mayor al último en BD)
-        new_episodes = []
-        if latest_program_number > 0:
-            logger.info(f"📊 Comparando por número de episodio: último en BD = {latest_program_number}")
-            
-            for episode in rss_episodes:
-                episode_program_number = episode.get('program_number', 0)
-                episode_title = episode.get('title', 'Sin título')
-                
-                if episode_program_number > latest_program_number:
-                    new_episodes.append(episode)
-                    logger.debug(f"🆕 Episodio nuevo encontrado: {episode_title} (Número: {episode_program_number})")
-                else:
-                    # Los episodios están ordenados por número, podemos parar aquí
-                    logger.debug(f"⏭️ Episodio ya existe: {episode_title} (Número: {episode_program_number})")
-                    break
-            
-            logger.info(f"🆕 Encontrados {len(new_episodes)} episodios nuevos para procesar")
-        else:
-            # Si no hay episodios en BD, procesar todos
-            new_episodes = rss_episodes
-            logger.info(f"🆕 Procesando todos los {len(new_episodes)} episodios (BD vacía)")
-        
-        # 4. Si no hay episodios nuevos, terminar
-        if not new_episodes:
-            logger.info("✅ No hay episodios nuevos. Sincronización completada.")
-            return
-        
-        # 5. Procesar solo los episodios nuevos
-        logger.info(f"🚀 Procesando {len(new_episodes)} episodios nuevos...")
-        
-        # Contadores para el reporte
-        total_new_episodes = len(new_episodes)
-        processed_episodes = 0
-        error_episodes = 0
-        
-        # Procesar cada episodio nuevo
-        for i, rss_episode in enumerate(new_episodes, 1):
-            episode_title = rss_episode.get('title', 'Sin título')
-            episode_date = rss_episode.get('date', 'Sin fecha')
-            
-            logger.info(f"📝 Procesando episodio nuevo {i}/{total_new_episodes}: {episode_title} ({episode_date})")
-            
+        # 5. Leer los feeds y encolar los episodios nuevos de cada uno
+        reports = {}
+        queues = {}
+        for feed_sync in feed_syncs:
+            name = feed_sync['name']
             try:
-                # Enriquecer y unificar datos con WordPress
-                logger.info(f"🔗 Enriqueciendo datos con WordPress para: {episode_title}")
-                episode_data = data_processor.process_single_episode(
-                    rss_episode=rss_episode,
-                    wordpress_client=wordpress_client
-                )
-                
-                if not episode_data:
-                    logger.warning(f"⚠️ No se pudieron obtener datos unificados para: {episode_title}")
-                    error_episodes += 1
-                    continue
-                
-                # Insertar en la base de datos
-                logger.info(f"💾 Guardando episodio en la BD: {episode_title}")
-                new_podcast_id = db_manager.insert_full_podcast(episode_data)
-                
-                # Procesar y almacenar canciones con SongProcessor
-                logger.info(f"🎵 Procesando canciones para: {episode_title}")
-                song_processor = SongProcessor(db_manager)
-                
-                # Extraer canciones de wordpress_playlist_data si existe
-                web_playlist = None
-                if episode_data.get('wordpress_playlist_data'):
-                    playlist_data = episode_data['wordpress_playlist_data']
-                    if isinstance(playlist_data, dict) and 'songs' in playlist_data:
-                        web_playlist = playlist_data['songs']
-                    elif isinstance(playlist_data, list):
-                        web_playlist = playlist_data
-                
-                stored_songs_count = song_processor.process_and_store_songs(
-                    podcast_id=new_podcast_id,
-                    web_playlist=web_playlist,
-                    rss_playlist=episode_data.get('rss_playlist')
-                )
-                
-                # Iniciar el proceso de archivado de audio
-                logger.info(f"Iniciando el proceso de archivado de audio para el podcast ID: {new_podcast_id}")
-                audio_manager.archive_podcast_audio(podcast_id=new_podcast_id)
-                
-                logger.info(f"✅ Episodio guardado exitosamente: {episode_title} ({stored_songs_count} canciones)")
-                processed_episodes += 1
-                
+                rss_episodes, new_episodes, edited_summary = find_new_episodes(feed_sync)
+            except MissingColumnsError:
+                raise
             except Exception as e:
-                logger.error(f"❌ Error al procesar episodio '{episode_title}': {e}")
-                error_episodes += 1
+                logger.error(f"❌ [{name}] Error al leer el feed: {e}")
+                reports[name] = {'rss': 0, 'new': 0, 'processed': 0, 'errors': 1, 'edited': 0}
                 continue
+            reports[name] = {'rss': len(rss_episodes), 'new': len(new_episodes), 'processed': 0,
+                             'errors': 0, 'edited': edited_summary['updated']}
+            queues[name] = new_episodes
+            if feed_sync['wordpress_client'] and len(new_episodes) >= WORDPRESS_INDEX_MIN_EPISODES:
+                feed_sync['wordpress_client'].build_index()
+        
+        # 6. Procesar los episodios nuevos de todos los feeds con el presupuesto global de workers
+        total_new_episodes = sum(len(episodes) for episodes in queues.values())
+        if total_new_episodes:
+            logger.info(f"🚀 Procesando {total_new_episodes} episodios nuevos "
+                        f"({sync_config['max_workers']} workers para {len(queues)} feeds)...")
+            feed_syncs_by_name = {feed_sync['name']: feed_sync for feed_sync in feed_syncs}
+            results = FairScheduler(sync_config['max_workers']).run(
+                queues, lambda name, episode: process_new_episode(feed_syncs_by_name[name], episode),
+                stop_on=(MissingColumnsError,)
+            )
+            for name, feed_results in results.items():
+                reports[name]['processed'] = sum(1 for result in feed_results if result is True)
+                reports[name]['errors'] += len(feed_results) - reports[name]['processed']
+        else:
+            logger.info("✅ No hay episodios nuevos.")
         
         # Reporte final
         logger.info("📊 === REPORTE FINAL DE SINCRONIZACIÓN ===")
-        logger.info(f"📻 Total de episodios en RSS: {len(rss_episodes)}")
-        logger.info(f"🆕 Episodios nuevos encontrados: {total_new_episodes}")
-        logger.info(f"✅ Episodios procesados exitosamente: {processed_episodes}")
-        logger.info(f"❌ Episodios con errores: {error_episodes}")
+        for name, report in reports.items():
+            logger.info(f"📻 [{name}] Total de episodios en RSS: {report['rss']}")
+            logger.info(f"🆕 [{name}] Episodios nuevos encontrados: {report['new']}")
+            logger.info(f"✅ [{name}] Episodios procesados exitosamente: {report['processed']}")
+            logger.info(f"❌ [{name}] Episodios con errores: {report['errors']}")
+            logger.info(f"✏️ [{name}] Episodios editados actualizados: {report['edited']}")
+        bandwidth_governor.log_summary()
+        http_cache.log_summary()
+        temp_storage.log_usage()
         logger.info("🎉 Sincronización completada")
         
     except Exception as e:
@@ -201,9 +300,12 @@ def main():
         raise
     
     finally:
+        # Guardar las fechas de uso de la caché HTTP (para el LRU)
+        get_http_cache().save()
         # Cerrar conexión a la base de datos
-        logger.info("🔒 Cerrando conexión a la base de datos...")
-        db_manager.close()
+        if db_manager:
+            logger.info("🔒 Cerrando conexión a la base de datos...")
+            db_manager.close()
         logger.info("✅ Sincronizador finalizado correctamente")
 
 
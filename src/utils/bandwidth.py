@@ -0,0 +1,281 @@
+# Control de ancho de banda compartido para descargas y subidas
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import logger
+
+
+INGRESS = "ingress"
+EGRESS = "egress"
+
+# Segundos entre comprobaciones de la franja horaria vigente durante una transferencia
+SCHEDULE_CHECK_SECONDS = 1.0
+
+
+class TokenBucket:
+    """
+    Cubo de tokens (bytes) compartido entre hilos.
+
+    Un límite de None o 0 significa sin límite. El consumo puede dejar el cubo
+    en negativo: el hilo que lo hace espera lo necesario para saldar la deuda,
+    de modo que varios hilos se reparten el caudal sin superar el límite.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        """
+        Args:
+            rate: Bytes por segundo (None o 0 para sin límite)
+            burst: Máximo de bytes acumulables (por defecto, un segundo de caudal)
+        """
+        self._lock = threading.Lock()
+        self._rate = None
+        self._burst = None
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self.set_rate(rate, burst)
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    def set_rate(self, rate: Optional[float], burst: Optional[float] = None) -> None:
+        """Cambia el límite del cubo (None o 0 para sin límite)."""
+        with self._lock:
+            self._refill()
+            self._rate = rate if rate else None
+            self._burst = burst or self._rate
+            if self._burst is not None:
+                self._tokens = min(self._tokens, self._burst)
+
+    def consume(self, nbytes: int) -> float:
+        """
+        Consume `nbytes` tokens, esperando si no hay suficientes.
+
+        Returns:
+            float: Segundos esperados
+        """
+        with self._lock:
+            if self._rate is None:
+                return 0.0
+            self._refill()
+            self._tokens -= nbytes
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def _refill(self) -> None:
+        """Añade los tokens acumulados desde la última llamada (con el lock tomado)."""
+        now = time.monotonic()
+        if self._rate is not None:
+            self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+
+class TransferMeter:
+    """
+    Medidor de una transferencia concreta: aplica el límite y calcula el caudal.
+
+    Se usa como context manager; al cerrarse registra el caudal en el log y en
+    las estadísticas del gobernador.
+    """
+
+    def __init__(self, governor: "BandwidthGovernor", direction: str, label: str):
+        self.governor = governor
+        self.direction = direction
+        self.label = label
+        self.bytes = 0
+        self.throttled_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    def __enter__(self):
+        self.started_at = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.finished_at = time.monotonic()
+        self.governor._record(self)
+        if exc_type is None and self.bytes:
+            logger.info(
+                f"📶 {self.label}: {self.bytes / 1024 / 1024:.1f} MB en {self.elapsed:.1f}s "
+                f"({self.throughput / 1024 / 1024:.2f} MB/s, {self.throttled_seconds:.1f}s en espera)"
+            )
+
+    def add(self, nbytes: int) -> None:
+        """Registra `nbytes` transferidos, esperando si se supera el límite."""
+        self.bytes += nbytes
+        self.throttled_seconds += self.governor.throttle(self.direction, nbytes)
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(end - (self.started_at or end), 1e-9)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes por segundo."""
+        return self.bytes / self.elapsed
+
+    def as_dict(self) -> Dict:
+        return {
+            'label': self.label,
+            'direction': self.direction,
+            'bytes': self.bytes,
+            'seconds': round(self.elapsed, 3),
+            'bytes_per_second': round(self.throughput, 1),
+            'throttled_seconds': round(self.throttled_seconds, 3),
+        }
+
+
+class BandwidthGovernor:
+    """
+    Gobernador de ancho de banda para todo el proceso.
+
+    Mantiene un cubo de tokens para la entrada (descargas) y otro para la salida
+    (subidas). Opcionalmente aplica franjas horarias con límites propios, p. ej.
+    sin límite de noche.
+    """
+
+    def __init__(self, ingress_limit: Optional[float] = None, egress_limit: Optional[float] = None,
+                 schedule: Optional[List[Tuple[int, int, Optional[float], Optional[float]]]] = None):
+        """
+        Args:
+            ingress_limit: Bytes/s de entrada fuera de las franjas (None sin límite)
+            egress_limit: Bytes/s de salida fuera de las franjas (None sin límite)
+            schedule: Franjas [(minuto_inicio, minuto_fin, ingress, egress)] en hora local
+        """
+        self.buckets = {INGRESS: TokenBucket(), EGRESS: TokenBucket()}
+        self._limits_checked_at = 0.0
+        self._stats_lock = threading.Lock()
+        self._transfers: List[Dict] = []
+        self.configure(ingress_limit, egress_limit, schedule)
+
+    def configure(self, ingress_limit: Optional[float] = None, egress_limit: Optional[float] = None,
+                  schedule: Optional[List[Tuple[int, int, Optional[float], Optional[float]]]] = None) -> None:
+        """Cambia los límites base y las franjas horarias."""
+        self.default_limits = {INGRESS: ingress_limit or None, EGRESS: egress_limit or None}
+        self.schedule = schedule or []
+        self._apply_limits()
+
+    def current_limits(self, now: Optional[datetime] = None) -> Dict[str, Optional[float]]:
+        """
+        Devuelve los límites vigentes según la hora.
+
+        Returns:
+            dict: {'ingress': bytes/s | None, 'egress': bytes/s | None}
+        """
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        for start, end, ingress, egress in self.schedule:
+            in_slot = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if in_slot:
+                return {INGRESS: ingress or None, EGRESS: egress or None}
+        return dict(self.default_limits)
+
+    def throttle(self, direction: str, nbytes: int) -> float:
+        """
+        Descuenta `nbytes` del cubo de la dirección indicada.
+
+        Con franjas horarias, la vigente se comprueba como mucho una vez cada
+        SCHEDULE_CHECK_SECONDS, no en cada bloque transferido.
+
+        Returns:
+            float: Segundos esperados
+        """
+        if self.schedule and time.monotonic() - self._limits_checked_at >= SCHEDULE_CHECK_SECONDS:
+            self._apply_limits()
+        return self.buckets[direction].consume(nbytes)
+
+    def transfer(self, direction: str, label: str) -> TransferMeter:
+        """Crea un medidor para una transferencia (usar con `with`)."""
+        return TransferMeter(self, direction, label)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Resume las transferencias registradas por dirección.
+
+        Returns:
+            dict: {dirección: {'transfers', 'bytes', 'seconds', 'bytes_per_second'}}
+        """
+        with self._stats_lock:
+            transfers = list(self._transfers)
+
+        summary = {}
+        for direction in (INGRESS, EGRESS):
+            items = [t for t in transfers if t['direction'] == direction]
+            total_bytes = sum(t['bytes'] for t in items)
+            total_seconds = sum(t['seconds'] for t in items)
+            summary[direction] = {
+                'transfers': len(items),
+                'bytes': total_bytes,
+                'seconds': round(total_seconds, 3),
+                'bytes_per_second': round(total_bytes / total_seconds, 1) if total_seconds else 0.0,
+            }
+        return summary
+
+    def transfers(self) -> List[Dict]:
+        """Devuelve el detalle de todas las transferencias registradas."""
+        with self._stats_lock:
+            return list(self._transfers)
+
+    def log_summary(self) -> None:
+        """Escribe en el log el resumen de caudal por dirección."""
+        names = {INGRESS: "📥 Descargas", EGRESS: "📤 Subidas"}
+        for direction, data in self.summary().items():
+            if data['transfers']:
+                logger.info(
+                    f"{names[direction]}: {data['transfers']} transferencias, "
+                    f"{data['bytes'] / 1024 / 1024:.1f} MB, {data['bytes_per_second'] / 1024 / 1024:.2f} MB/s de media"
+                )
+
+    def _apply_limits(self) -> None:
+        """Ajusta los cubos a los límites de la franja horaria actual."""
+        self._limits_checked_at = time.monotonic()
+        limits = self.current_limits()
+        for direction, bucket in self.buckets.items():
+            if bucket.rate != limits[direction]:
+                bucket.set_rate(limits[direction])
+
+    def _record(self, meter: TransferMeter) -> None:
+        with self._stats_lock:
+            self._transfers.append(meter.as_dict())
+
+
+def parse_schedule(text: str) -> List[Tuple[int, int, Optional[float], Optional[float]]]:
+    """
+    Parsea franjas horarias del tipo "01:00-07:00 0/0, 19:00-23:00 2048/512".
+
+    Cada franja es "HH:MM-HH:MM entrada/salida" con los límites en KB/s (0 = sin
+    límite). Las franjas pueden cruzar la medianoche.
+
+    Returns:
+        list: [(minuto_inicio, minuto_fin, bytes/s entrada | None, bytes/s salida | None)]
+    """
+    schedule = []
+    for slot in filter(None, (s.strip() for s in (text or '').split(','))):
+        try:
+            hours, limits = slot.split()
+            start, end = (_parse_minute(h) for h in hours.split('-'))
+            ingress, egress = (float(v) * 1024 or None for v in limits.split('/'))
+        except ValueError as e:
+            raise ValueError(f"Franja de ancho de banda inválida: '{slot}' (formato HH:MM-HH:MM entrada/salida)") from e
+        schedule.append((start, end, ingress, egress))
+    return schedule
+
+
+def _parse_minute(hhmm: str) -> int:
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+# Gobernador compartido por todo el proceso (sin límites hasta que se configure)
+_governor = BandwidthGovernor()
+
+
+def get_bandwidth_governor() -> BandwidthGovernor:
+    """Devuelve el gobernador de ancho de banda del proceso."""
+    return _governor
@@ -0,0 +1,94 @@
+# Reparto justo de un número fijo de workers entre varias colas (un feed por cola)
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Type
+
+from utils.logger import logger
+
+
+class FairScheduler:
+    """
+    Ejecuta las tareas de varias colas con un presupuesto global de workers.
+
+    Cada vez que un worker queda libre toma la siguiente tarea de la cola con
+    menos tareas en curso (y, a igualdad, la que lleva más tiempo sin turno),
+    de modo que un feed con cientos de episodios pendientes no deja sin
+    workers a los demás. Dentro de cada cola se respeta el orden.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        """
+        Args:
+            max_workers: Tareas en curso a la vez entre todas las colas
+        """
+        self.max_workers = max(1, max_workers)
+
+    def run(self, queues: Dict[Hashable, List], worker: Callable[[Hashable, Any], Any],
+            stop_on: Tuple[Type[BaseException], ...] = ()) -> Dict[Hashable, List]:
+        """
+        Procesa todas las colas.
+
+        Args:
+            queues: {nombre de la cola: [tareas en orden]}
+            worker: Función worker(nombre, tarea); una excepción cuenta como resultado
+            stop_on: Excepciones que detienen el reparto (p. ej. un error de esquema de la BD
+                que haría fallar todas las tareas); se relanza la primera al terminar las tareas en curso
+
+        Returns:
+            dict: {nombre de la cola: [resultado de cada tarea, en el orden de la cola]}
+        """
+        pending = {name: deque(enumerate(items)) for name, items in queues.items() if items}
+        results = {name: [None] * len(items) for name, items in queues.items()}
+        in_flight = dict.fromkeys(pending, 0)
+        last_turn = dict.fromkeys(pending, -1)
+        turn = [0]
+        stopped = []
+        lock = threading.Lock()
+
+        def next_task():
+            with lock:
+                if stopped:
+                    return None
+                candidates = [name for name, items in pending.items() if items]
+                if not candidates:
+                    return None
+                name = min(candidates, key=lambda n: (in_flight[n], last_turn[n]))
+                index, item = pending[name].popleft()
+                in_flight[name] += 1
+                last_turn[name] = turn[0]
+                turn[0] += 1
+                return name, index, item
+
+        def loop():
+            while True:
+                task = next_task()
+                if task is None:
+                    return
+                name, index, item = task
+                try:
+                    results[name][index] = worker(name, item)
+                except stop_on as e:
+                    with lock:
+                        stopped.append(e)
+                    results[name][index] = e
+                except Exception as e:
+                    logger.error(f"❌ Error en una tarea de '{name}': {e}")
+                    results[name][index] = e
+                finally:
+                    with lock:
+                        in_flight[name] -= 1
+
+        total = sum(len(items) for items in pending.values())
+        workers = min(self.max_workers, total)
+        if workers <= 1:
+            loop()
+        else:
+            threads = [threading.Thread(target=loop, name=f"sync-worker-{i}", daemon=True) for i in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        if stopped:
+            raise stopped[0]
+        return results
+
@@ -0,0 +1,307 @@
+# Caché HTTP en disco compartida por todas las peticiones GET (WordPress, API REST, feed RSS)
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.logger import logger
+
+
+CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+
+class HTTPCache:
+    """
+    Respuestas GET guardadas en disco entre ejecuciones.
+
+    - Cada entrada se identifica por la URL (con sus parámetros) y las cabeceras
+      de la petición; el cuerpo va en <clave>.body y los metadatos en index.json.
+    - Las entradas con ETag/Last-Modified se revalidan con una petición
+      condicional: un 304 sirve el cuerpo guardado sin volver a descargarlo.
+      Si la respuesta trae Cache-Control: max-age, se sirve sin red mientras
+      siga vigente.
+    - Con un tamaño máximo se eliminan las entradas usadas hace más tiempo (LRU).
+    - En modo sin conexión solo se sirve lo que hay en la caché.
+
+    Sin carpeta (cache_dir=None) está desactivada y las peticiones pasan tal cual.
+    """
+
+    INDEX_FILENAME = "index.json"
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None, offline: bool = False):
+        """
+        Args:
+            cache_dir: Carpeta de la caché (None para desactivarla)
+            max_bytes: Tamaño máximo de los cuerpos guardados (None o 0 = sin límite)
+            offline: Servir solo desde la caché, sin red
+        """
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = False
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stale': 0}
+        self.configure(cache_dir, max_bytes, offline)
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    def configure(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None,
+                  offline: bool = False) -> None:
+        """Cambia la carpeta, el tamaño máximo y el modo sin conexión (carga el índice de la carpeta)."""
+        with self._lock:
+            self.cache_dir = Path(cache_dir) if cache_dir else None
+            self.max_bytes = max_bytes or None
+            self.offline = offline
+            self._entries = {}
+            self._dirty = False
+            if self.cache_dir:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._load_index()
+                self._evict()
+
+    def request(self, send, method: str, url: str, session_headers=None, **kwargs) -> requests.Response:
+        """
+        Hace una petición pasando por la caché.
+
+        Args:
+            send: Función send(**kwargs) que hace la petición real
+            method: GET o HEAD (HEAD solo se responde desde la caché en modo sin conexión)
+            url: URL sin los parámetros (van en kwargs['params'])
+            session_headers: Cabeceras de la sesión, que forman parte de la clave
+            **kwargs: Argumentos de requests (params, headers, timeout...)
+        """
+        headers = CaseInsensitiveDict(session_headers or {})
+        headers.update(kwargs.get('headers') or {})
+        key, full_url = self._key(url, kwargs.get('params'), headers)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry['accessed'] = time.time()
+                self._dirty = True
+
+        if self.offline:
+            if entry is None:
+                raise requests.exceptions.ConnectionError(f"Modo sin conexión: {full_url} no está en la caché")
+            self._count('hits')
+            return self._cached_response(key, entry, method)
+
+        if method == 'HEAD':
+            return send(**kwargs)
+
+        caller_conditional = any(name in headers for name in CONDITIONAL_HEADERS)
+        if entry and not caller_conditional:
+            if entry.get('expires') and entry['expires'] > time.time():
+                self._count('hits')
+                return self._cached_response(key, entry, method)
+            conditional = {}
+            if entry.get('etag'):
+                conditional['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                conditional['If-Modified-Since'] = entry['last_modified']
+            if conditional:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **conditional}
+
+        try:
+            response = send(**kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if entry is None or caller_conditional:
+                raise
+            logger.warning(f"⚠️ Sin respuesta de {full_url}, se usa la copia de la caché: {e}")
+            self._count('stale')
+            return self._cached_response(key, entry, method)
+
+        if response.status_code == 304 and entry:
+            self._count('revalidated')
+            if caller_conditional:
+                # Quien pregunta ya tiene su copia: se le devuelve el 304 tal cual
+                return response
+            with self._lock:
+                entry['expires'] = _expires(response.headers) or entry.get('expires')
+            return self._cached_response(key, entry, method)
+
+        self._count('misses')
+        if response.status_code == 200:
+            self._store(key, full_url, response)
+        return response
+
+    def hit_ratio(self) -> float:
+        """Fracción de las peticiones respondidas con la copia guardada (directamente o tras un 304)."""
+        with self._lock:
+            served = self.stats['hits'] + self.stats['revalidated'] + self.stats['stale']
+            total = served + self.stats['misses']
+        return served / total if total else 0.0
+
+    def log_summary(self) -> None:
+        """Escribe en el log los aciertos de la caché y su tamaño."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = dict(self.stats)
+            size = sum(entry['size'] for entry in self._entries.values())
+            count = len(self._entries)
+        if not sum(stats.values()):
+            return
+        mode = " (sin conexión)" if self.offline else ""
+        logger.info(
+            f"🗄️ Caché HTTP{mode}: {self.hit_ratio():.0%} de aciertos "
+            f"({stats['hits']} directos, {stats['revalidated']} revalidados con 304, "
+            f"{stats['stale']} sin red, {stats['misses']} descargas); "
+            f"{count} entradas, {size / 1024 / 1024:.1f} MB"
+        )
+
+    def save(self) -> None:
+        """Guarda el índice (fechas de uso para el LRU) si ha cambiado."""
+        with self._lock:
+            if self.enabled and self._dirty:
+                self._save_index()
+
+    def _key(self, url: str, params, headers: CaseInsensitiveDict):
+        prepared = PreparedRequest()
+        prepared.prepare_url(url, params)
+        varying = sorted((name.lower(), str(value)) for name, value in headers.items()
+                         if name not in CONDITIONAL_HEADERS)
+        raw = json.dumps([prepared.url, varying], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest(), prepared.url
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _cached_response(self, key: str, entry: Dict, method: str) -> requests.Response:
+        """Respuesta 200 reconstruida a partir de la copia en disco."""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry.get('headers') or {})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = b'' if method == 'HEAD' else self._body_path(key).read_bytes()
+        response.from_cache = True
+        return response
+
+    def _store(self, key: str, url: str, response: requests.Response) -> None:
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control:
+            return
+        body = response.content
+        if self.max_bytes and len(body) > self.max_bytes:
+            return
+
+        path = self._body_path(key)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            tmp_path.write_bytes(body)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo guardar {url} en la caché HTTP: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'expires': _expires(response.headers),
+                'headers': {name: value for name, value in response.headers.items()
+                            if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')},
+                'size': len(body),
+                'stored': now,
+                'accessed': now,
+            }
+            self._evict()
+            self._save_index()
+
+    def _evict(self) -> None:
+        """Elimina las entradas usadas hace más tiempo hasta quedar bajo max_bytes (con el lock tomado)."""
+        if not self.max_bytes:
+            return
+        total = sum(entry['size'] for entry in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k]['accessed']):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key)['size']
+            self._body_path(key).unlink(missing_ok=True)
+            self._dirty = True
+
+    def _body_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.body"
+
+    def _load_index(self) -> None:
+        index_path = self.cache_dir / self.INDEX_FILENAME
+        if not index_path.exists():
+            return
+        try:
+            with open(index_path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Índice de la caché HTTP ilegible, se empieza de cero: {e}")
+            return
+        self._entries = {key: entry for key, entry in entries.items() if self._body_path(key).exists()}
+
+    def _save_index(self) -> None:
+        index_path = self.cache_dir / self.INDEX_FILENAME
+        try:
+            tmp_path = index_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            tmp_path.replace(index_path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo guardar el índice de la caché HTTP: {e}")
+
+
+def _expires(headers) -> Optional[float]:
+    """Momento hasta el que la respuesta es válida sin revalidar (Cache-Control: max-age), o None."""
+    cache_control = headers.get('Cache-Control', '').lower()
+    if 'no-cache' in cache_control or 'no-store' in cache_control:
+        return None
+    match = re.search(r'max-age=(\d+)', cache_control)
+    if not match or int(match.group(1)) <= 0:
+        return None
+    return time.time() + int(match.group(1))
+
+
+class CachedSession(requests.Session):
+    """
+    requests.Session cuyas peticiones GET pasan por la caché HTTP del proceso.
+
+    Las descargas en streaming y el resto de métodos no se cachean; HEAD solo
+    se responde desde la caché en modo sin conexión.
+    """
+
+    def __init__(self, cache: Optional[HTTPCache] = None):
+        """
+        Args:
+            cache: Caché a usar (por defecto, la del proceso: get_http_cache())
+        """
+        super().__init__()
+        self.cache = cache
+
+    def request(self, method, url, **kwargs):
+        cache = self.cache or get_http_cache()
+        method = method.upper()
+        if not cache.enabled or kwargs.get('stream') or method not in ('GET', 'HEAD'):
+            return super().request(method, url, **kwargs)
+
+        def send(**send_kwargs):
+            return super(CachedSession, self).request(method, url, **send_kwargs)
+
+        return cache.request(send, method, url, session_headers=self.headers, **kwargs)
+
+
+# Caché compartida por todo el proceso (desactivada hasta que se configure)
+_http_cache = HTTPCache()
+
+
+def get_http_cache() -> HTTPCache:
+    """Devuelve la caché HTTP del proceso."""
+    return _http_cache
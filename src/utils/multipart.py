@@ -0,0 +1,81 @@
+# Codificador multipart/form-data en streaming para subidas grandes
+import os
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class MultipartFileEncoder:
+    """
+    Cuerpo multipart/form-data con campos de texto y un único archivo al final.
+
+    Se pasa como `data` a requests: al tener `__len__` se envía con
+    Content-Length (sin chunked encoding) y al ser iterable se transmite por
+    bloques de `chunk_size` bytes, de modo que la memoria usada no depende del
+    tamaño del archivo.
+    """
+
+    def __init__(self, fields: Dict[str, str], file_field: str, file_path, filename: Optional[str] = None,
+                 content_type: str = "application/octet-stream", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 callback: Optional[Callable[[int, int], None]] = None):
+        """
+        Args:
+            fields: Campos de texto, en el orden en que se envían (antes del archivo)
+            file_field: Nombre del campo del archivo
+            file_path: Ruta del archivo local
+            filename: Nombre con el que se envía (por defecto el del archivo)
+            content_type: Content-Type de la parte del archivo
+            chunk_size: Bytes leídos del archivo en cada bloque
+            callback: Función llamada tras cada bloque con (bytes_enviados, bytes_totales)
+        """
+        self.file_path = Path(file_path)
+        self.chunk_size = chunk_size
+        self.callback = callback
+        self.boundary = uuid.uuid4().hex
+        self.file_size = os.path.getsize(self.file_path)
+
+        filename = (filename or self.file_path.name).replace('"', '%22')
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        parts.append(
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+        self._preamble = ''.join(parts).encode('utf-8')
+        self._epilogue = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self.bytes_sent = 0
+
+    @property
+    def content_type(self) -> str:
+        """Valor de la cabecera Content-Type de la petición."""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return len(self._preamble) + self.file_size + len(self._epilogue)
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.bytes_sent = 0
+        yield self._sent(self._preamble)
+        with open(self.file_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield self._sent(chunk)
+        yield self._sent(self._epilogue)
+
+    def _sent(self, data: bytes) -> bytes:
+        """Contabiliza un bloque y avisa al callback de progreso."""
+        self.bytes_sent += len(data)
+        if self.callback:
+            self.callback(self.bytes_sent, len(self))
+        return data
@@ -0,0 +1,241 @@
+"""
+Tokenizador de playlists de Popcasting ("artista · título :: artista · título ...").
+
+Lo comparten los tres parsers de playlists del proyecto, cada uno con sus
+reglas de siempre:
+
+- RSS (RSSDataProcessor): descripción del feed, separadores · - : "
+- Canciones (SongProcessor): playlist del RSS guardada en la base de datos
+- Web (WordPressClient): párrafos del post, con arreglo de caracteres Unicode
+
+Todas las expresiones regulares se compilan una sola vez al importar el
+módulo, los arreglos de caracteres salen de una única tabla y cada playlist
+se limpia una vez y se recorre en una sola pasada (cada canción se prueba
+solo contra los patrones cuyo separador contiene).
+"""
+
+import html
+import re
+from typing import Dict, Iterator, List, Optional
+
+
+SONG_SEPARATOR = '::'
+
+# Patrones artista/título: (separadores que tiene que contener el texto, patrón).
+# La búsqueda del separador descarta en C los patrones que no pueden coincidir.
+_DOT_PATTERN = (re.compile('·'), re.compile(r'^(.+?)\s*·\s*(.+)$'))              # Artista · Título (formato Popcasting)
+_DASH_PATTERN = (re.compile('[-–—]'), re.compile(r'^(.+?)\s*[-–—]\s*(.+)$'))     # Artista - Título
+_COLON_PATTERN = (re.compile(':'), re.compile(r'^(.+?)\s*:\s*(.+)$'))            # Artista: Título
+_QUOTE_PATTERN = (re.compile('"'), re.compile(r'^(.+?)\s*"\s*(.+?)\s*"$'))       # Artista "Título"
+
+
+def _words(*words):
+    """Expresión que encuentra cualquiera de las palabras (en minúsculas)."""
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+# --- RSS (RSSDataProcessor) ---
+
+# Cada patrón elimina desde su coincidencia hasta el final del texto
+_RSS_TRAILERS = tuple(re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+    r'::::::\s*invita a Popcasting a café\s*https://ko-fi\.com/popcasting.*',
+    r'::::::\s*invita a Popcasting a café.*',
+    r'https://ko-fi\.com/popcasting.*',
+    r'@rss_data_processor\.py.*',
+    r'@.*\.py.*',
+))
+_RSS_PATTERNS = (_DOT_PATTERN, _DASH_PATTERN, _COLON_PATTERN, _QUOTE_PATTERN)
+_RSS_REJECTED_ARTISTS = _words('comentarios', 'compartir', 'twitter', 'facebook', 'popcasting', 'ko-fi', 'invita')
+
+# --- Canciones (SongProcessor) ---
+
+_SONG_PROCESSOR_REMOVALS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"::::::\s*invita a Popcasting a café\s*https://ko-fi\.com/popcasting.*$",
+    r"@rss_data_processor\.py.*$",
+    r"https?://[^\s]+",
+    r"invita a popcasting.*$",
+    r"flor de pasión.*$",
+    r"my favourite.*$",
+    r"las felindras.*$",
+    r"revisionist history.*$",
+    r"ko-fi\.com.*$",
+    r"youtu\.be.*$",
+))
+_SONG_PROCESSOR_SEPARATORS = (' · ', ' • ', ' - ', ': ', ' "', '" ')
+
+# --- Web (WordPressClient) ---
+
+_WEB_PATTERNS = (_DASH_PATTERN, _COLON_PATTERN, _QUOTE_PATTERN, _DOT_PATTERN)
+_WEB_REJECTED_ARTISTS = _words('comentarios', 'compartir', 'twitter', 'facebook', 'popcasting')
+
+# Caracteres Unicode problemáticos del HTML de WordPress, en orden: '┬Ę' y
+# '┬Ā' (punto medio y espacio no separador mal codificados) antes que '┬'
+# suelto. Se aplican con str.replace, que busca cada carácter en C: con texto
+# no ASCII es bastante más rápido que str.translate, que consulta la tabla
+# carácter a carácter.
+_WEB_CHAR_FIXES = (
+    ('┬Ę', '·'),  # Punto medio Unicode
+    ('┬Ā', ' '),  # Espacio no separador Unicode
+    ('┬', ''),    # Otros caracteres Unicode problemáticos
+    ('•', '·'),   # Punto medio Unicode alternativo
+    ('–', '-'),   # Guión medio Unicode
+    ('—', '-'),   # Guión largo Unicode
+)
+
+
+def split_songs(text: str) -> Iterator[str]:
+    """Trozos no vacíos (sin espacios en los extremos) de una playlist separada por '::'."""
+    for part in text.split(SONG_SEPARATOR):
+        part = part.strip()
+        if part:
+            yield part
+
+
+def _match_artist_title(text: str, patterns, rejected_artists) -> Optional[Dict[str, str]]:
+    """Prueba los patrones en orden y devuelve el primer artista/título válido."""
+    for separators, pattern in patterns:
+        if not separators.search(text):
+            continue
+        match = pattern.match(text)
+        if match:
+            artist = match.group(1).strip()
+            title = match.group(2).strip()
+            if len(artist) > 1 and len(title) > 1 and not rejected_artists.search(artist.lower()):
+                return {'artist': artist, 'title': title}
+    return None
+
+
+def _positioned(songs_raw: Iterator[str], parse_song) -> List[Dict]:
+    """Parsea cada canción; la posición cuenta también los trozos que no se pueden parsear."""
+    songs = []
+    for position, song_raw in enumerate(songs_raw, 1):
+        song = parse_song(song_raw)
+        if song:
+            songs.append({'position': position, 'artist': song['artist'], 'title': song['title']})
+    return songs
+
+
+# --- RSS ---
+
+def clean_rss_playlist(text: str) -> str:
+    """Quita el texto de Ko-fi y similares del final de la descripción y normaliza los espacios."""
+    if not text:
+        return ""
+    for trailer in _RSS_TRAILERS:
+        match = trailer.search(text)
+        if match:
+            text = text[:match.start()]
+    return ' '.join(text.split())
+
+
+def parse_rss_song(text: str) -> Optional[Dict[str, str]]:
+    """Artista y título de una canción del RSS, o None si no se puede parsear."""
+    if not text:
+        return None
+    return _match_artist_title(text.strip(), _RSS_PATTERNS, _RSS_REJECTED_ARTISTS)
+
+
+def tokenize_rss_playlist(text: str) -> List[Dict]:
+    """
+    Convierte la playlist de la descripción del RSS en canciones.
+
+    Returns:
+        list: [{'position': int, 'artist': str, 'title': str}]
+    """
+    return _positioned(split_songs(clean_rss_playlist(text)), parse_rss_song)
+
+
+# --- Canciones ---
+
+def clean_song_processor_playlist(text: str) -> str:
+    """Elimina Ko-fi, URLs y textos extra de la playlist y normaliza los espacios."""
+    if not text:
+        return ""
+    for pattern in _SONG_PROCESSOR_REMOVALS:
+        text = pattern.sub("", text)
+    return ' '.join(text.split())
+
+
+def parse_song_processor_song(text: str) -> Optional[Dict[str, str]]:
+    """Artista y título por separadores literales; sin separador válido todo es el título."""
+    if not text or len(text.strip()) < 3:
+        return None
+    text = text.strip()
+
+    for separator in _SONG_PROCESSOR_SEPARATORS:
+        if separator in text:
+            artist, title = text.split(separator, 1)
+            artist = artist.strip()
+            title = title.strip()
+            if 2 <= len(artist) < 100 and 2 <= len(title) < 100:
+                return {'artist': artist, 'title': title}
+
+    if 2 <= len(text) < 100:
+        return {'artist': 'Unknown', 'title': text}
+    return None
+
+
+def tokenize_song_processor_playlist(text: str) -> List[Dict]:
+    """
+    Convierte la playlist del RSS guardada en la base de datos en canciones.
+
+    Returns:
+        list: [{'position': int, 'artist': str, 'title': str}]
+    """
+    if not text:
+        return []
+    return _positioned(split_songs(clean_song_processor_playlist(text)), parse_song_processor_song)
+
+
+# --- Web ---
+
+def clean_web_text(text: str) -> str:
+    """
+    Arregla la codificación de un texto extraído del HTML de WordPress.
+
+    Deshace el doble UTF-8 ('Ã', 'Â'), normaliza puntos medios y guiones y
+    decodifica las entidades HTML. Es la única limpieza que necesita cada
+    texto: el resultado ya se puede pasar a parse_web_song/tokenize_web_playlist.
+    """
+    if not text:
+        return text
+    # Si detectamos patrones típicos de mala codificación, intentamos decodificar
+    if 'Ã' in text or 'Â' in text:
+        try:
+            text = text.encode('latin-1').decode('utf-8')
+        except UnicodeError:
+            pass
+    text = _fix_web_chars(text)
+    if '&' in text:
+        # Las entidades pueden traer guiones o puntos medios Unicode
+        text = _fix_web_chars(html.unescape(text))
+    return text.strip()
+
+
+def _fix_web_chars(text: str) -> str:
+    for broken, fixed in _WEB_CHAR_FIXES:
+        if broken in text:
+            text = text.replace(broken, fixed)
+    return text
+
+
+def parse_web_song(text: str) -> Optional[Dict[str, str]]:
+    """Artista y título de un texto ya limpio con clean_web_text, o None."""
+    if not text:
+        return None
+    return _match_artist_title(text.strip(), _WEB_PATTERNS, _WEB_REJECTED_ARTISTS)
+
+
+def tokenize_web_playlist(text: str) -> List[Dict[str, str]]:
+    """
+    Canciones de un párrafo de la web con varias canciones separadas por '::'.
+
+    Args:
+        text: Texto ya limpio con clean_web_text
+
+    Returns:
+        list: [{'artist': str, 'title': str}] (vacía si el texto no tiene '::')
+    """
+    if SONG_SEPARATOR not in text:
+        return []
+    return [song for song in map(parse_web_song, split_songs(text)) if song]
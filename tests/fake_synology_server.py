@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Servidor falso de la API de Synology para pruebas sin NAS.
+
+Implementa lo que usa SynologyClient: autenticación, FileStation (List,
+Upload, Rename, CreateFolder, Download, MD5) y las tareas de Download Station.
+Los archivos del "NAS" se guardan en una carpeta local y las descargas de
+Download Station se hacen de verdad, por HTTP, en un hilo aparte. El propio
+servidor publica enclosures de prueba en /enclosures/<nombre>.
+
+Las subidas multipart se procesan en streaming (directamente a disco) y las
+descargas se envían por bloques, así que sirve también para medir
+rendimiento con archivos grandes (ver scripts/benchmark_synology_transfers.py).
+Se puede simular la latencia de cada petición y el ancho de banda por conexión.
+
+Uso manual:
+    python tests/fake_synology_server.py --port 5000 --root /tmp/fake_nas
+    python tests/fake_synology_server.py --latency-ms 20 --bandwidth-mbps 100
+"""
+
+import json
+import os
+import re
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, unquote
+
+
+# Bytes leídos o escritos por iteración en las transferencias de archivos
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class FakeSynologyServer:
+    """Servidor falso de la API de Synology en un hilo aparte."""
+
+    def __init__(self, root_dir, username="admin", password="secret", host="127.0.0.1", port=0,
+                 latency=0.0, bandwidth=None, max_list_limit=None):
+        """
+        Args:
+            root_dir: Carpeta local que hace de raíz del NAS
+            username: Usuario aceptado por el login
+            password: Contraseña aceptada por el login
+            host: Dirección en la que escuchar
+            port: Puerto (0 para elegir uno libre)
+            latency: Segundos de espera antes de responder cada petición
+            bandwidth: Bytes por segundo por conexión en subidas y descargas (None = sin límite)
+            max_list_limit: Elementos máximos por página de FileStation.List, aunque se pidan más
+        """
+        self.root_dir = Path(root_dir)
+        self.max_list_limit = max_list_limit
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._spool_dir = tempfile.mkdtemp(prefix="fake_synology_")
+        self.username = username
+        self.password = password
+        self.enclosures = {}
+        self.tasks = {}
+        self.md5_tasks = {}
+        self.request_counts = Counter()
+        self.logins = 0
+        self._sids = set()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def add_enclosure(self, name, data):
+        """Publica un archivo en /enclosures/<name> y devuelve su URL."""
+        self.enclosures[name] = data
+        return f"{self.url}/enclosures/{name}"
+
+    def expire_sessions(self):
+        """Invalida todos los SID (simula que la sesión ha caducado)."""
+        with self._lock:
+            self._sids.clear()
+
+    def nas_path(self, path):
+        """Ruta local de un archivo o carpeta del NAS."""
+        return self.root_dir / unquote(path).strip('/')
+
+    # --- Lógica de la API ---
+
+    def login(self, params):
+        if params.get('account') != self.username or params.get('passwd') != self.password:
+            return _error(400)
+        with self._lock:
+            self.logins += 1
+            sid = f"sid-{self.logins}"
+            self._sids.add(sid)
+        return {'success': True, 'data': {'sid': sid}}
+
+    def is_valid_sid(self, sid):
+        with self._lock:
+            return sid in self._sids
+
+    def file_info(self, path, name=None):
+        local = self.nas_path(path)
+        stat = local.stat()
+        return {
+            'name': name or local.name,
+            'path': path,
+            'isdir': local.is_dir(),
+            'additional': {'size': 0 if local.is_dir() else stat.st_size, 'time': {'mtime': int(stat.st_mtime)}},
+        }
+
+    def list_folder(self, params):
+        folder = params.get('folder_path', '/').rstrip('/') or '/'
+        local = self.nas_path(folder)
+        if not local.is_dir():
+            return _error(408)
+        entries = sorted(local.iterdir(), key=lambda p: p.name)
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', 0)) or len(entries)
+        if self.max_list_limit:
+            limit = min(limit, self.max_list_limit)
+        files = [self.file_info(f"{folder.rstrip('/')}/{p.name}") for p in entries[offset:offset + limit]]
+        return {'success': True, 'data': {'files': files, 'offset': offset, 'total': len(entries)}}
+
+    def getinfo(self, params):
+        files = []
+        for path in json.loads(params.get('path', '[]')):
+            if self.nas_path(path).exists():
+                files.append(self.file_info(path))
+            else:
+                files.append({'code': 408, 'path': path})
+        return {'success': True, 'data': {'files': files}}
+
+    def upload(self, fields, filename, source):
+        folder = self.nas_path(fields.get('path', '/'))
+        if not folder.is_dir():
+            if fields.get('create_parents') != 'true':
+                return _error(408)
+            folder.mkdir(parents=True)
+        target = folder / filename
+        if target.exists() and fields.get('overwrite') != 'true':
+            return _error(414)
+        shutil.move(source, target)
+        if fields.get('mtime'):
+            mtime = int(fields['mtime']) / 1000
+            os.utime(target, (mtime, mtime))
+        return {'success': True, 'data': {}}
+
+    def rename(self, params):
+        path = json.loads(params['path'])[0]
+        name = json.loads(params['name'])[0]
+        source = self.nas_path(path)
+        target = source.parent / name
+        if not source.exists():
+            return _error(408)
+        if target.exists():
+            return _error(414)
+        source.rename(target)
+        return {'success': True, 'data': {'files': [self.file_info(str(Path(path).parent / name))]}}
+
+    def create_folder(self, params):
+        folder = self.nas_path(f"{params.get('folder_path', '')}/{params.get('name', '')}")
+        folder.mkdir(parents=True, exist_ok=True)
+        return {'success': True, 'data': {}}
+
+    def create_task(self, params):
+        uri = params.get('uri')
+        destination = params.get('destination', '').strip('/')
+        if not uri or not self.nas_path(destination).is_dir():
+            return _error(403)
+        with self._lock:
+            task_id = f"dbid_{len(self.tasks) + 1}"
+            title = unquote(urlparse(uri).path.rsplit('/', 1)[-1]) or task_id
+            self.tasks[task_id] = {
+                'id': task_id, 'title': title, 'status': 'waiting', 'size': 0, 'type': 'http',
+                'status_extra': {},
+                'additional': {'detail': {'uri': uri, 'destination': destination},
+                               'transfer': {'size_downloaded': 0}},
+            }
+        threading.Thread(target=self._run_task, args=(task_id,), daemon=True).start()
+        return {'success': True}
+
+    def _run_task(self, task_id):
+        task = self.tasks[task_id]
+        detail = task['additional']['detail']
+        task['status'] = 'downloading'
+        try:
+            target = self.nas_path(detail['destination']) / task['title']
+            with urllib.request.urlopen(detail['uri'], timeout=30) as response, open(target, 'wb') as f:
+                shutil.copyfileobj(response, f)
+            task['size'] = target.stat().st_size
+            task['additional']['transfer']['size_downloaded'] = task['size']
+            task['status'] = 'finished'
+        except Exception as e:
+            task['status'] = 'error'
+            task['status_extra'] = {'error_detail': str(e)}
+
+    def start_md5(self, params):
+        path = json.loads(params.get('file_path', '""'))
+        local = self.nas_path(path)
+        if not local.is_file():
+            return _error(408)
+        with self._lock:
+            task_id = f"MD5_{len(self.md5_tasks) + 1}"
+            self.md5_tasks[task_id] = {'finished': False, 'md5': None}
+        threading.Thread(target=self._run_md5, args=(task_id, local), daemon=True).start()
+        return {'success': True, 'data': {'taskid': task_id}}
+
+    def _run_md5(self, task_id, local):
+        digest = hashlib.md5()
+        with open(local, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        self.md5_tasks[task_id].update({'finished': True, 'md5': digest.hexdigest()})
+
+    def md5_status(self, params):
+        task = self.md5_tasks.get(json.loads(params.get('taskid', '""')))
+        if task is None:
+            return _error(599)
+        return {'success': True, 'data': dict(task)}
+
+    def stop_md5(self, params):
+        with self._lock:
+            self.md5_tasks.pop(json.loads(params.get('taskid', '""')), None)
+        return {'success': True}
+
+    def list_tasks(self):
+        with self._lock:
+            tasks = [json.loads(json.dumps(task)) for task in self.tasks.values()]
+        return {'success': True, 'data': {'tasks': tasks, 'offset': 0, 'total': len(tasks)}}
+
+    def delete_tasks(self, params):
+        with self._lock:
+            for task_id in params.get('id', '').split(','):
+                self.tasks.pop(task_id, None)
+        return {'success': True, 'data': []}
+
+
+def _error(code):
+    return {'success': False, 'error': {'code': code}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        content_type = self.headers.get('Content-Type', '')
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        # Las subidas se leen en streaming; el resto de cuerpos son pequeños
+        streaming_upload = (params.get('api') == 'SYNO.FileStation.Upload'
+                            and content_type.startswith('multipart/form-data'))
+        body = b'' if streaming_upload else self._read_body()
+
+        if url.path.startswith('/enclosures/'):
+            data = fake.enclosures.get(unquote(url.path[len('/enclosures/'):]))
+            if data is None:
+                return self._send_bytes(b'not found', 'text/plain', status=404)
+            return self._send_bytes(data, 'audio/mpeg')
+
+        if body and content_type.startswith('application/x-www-form-urlencoded'):
+            params.update({key: values[0] for key, values in parse_qs(body.decode('utf-8')).items()})
+
+        api = params.get('api', '')
+        method = params.get('method', '')
+        with fake._lock:
+            fake.request_counts[(api, method)] += 1
+
+        if url.path == '/webapi/auth.cgi':
+            if method == 'login':
+                return self._send_json(fake.login(params))
+            return self._send_json({'success': True})
+
+        if not fake.is_valid_sid(params.get('_sid')):
+            if streaming_upload:
+                self._discard_body()
+            return self._send_json(_error(119))
+
+        if url.path == '/webapi/DownloadStation/task.cgi':
+            handlers = {'create': fake.create_task, 'list': lambda p: fake.list_tasks(),
+                        'delete': fake.delete_tasks}
+            return self._send_json(handlers[method](params) if method in handlers else _error(103))
+
+        if api == 'SYNO.FileStation.Upload':
+            fields, filename, spooled = self._receive_multipart(content_type, fake._spool_dir)
+            try:
+                return self._send_json(fake.upload(fields, filename, spooled))
+            finally:
+                if os.path.exists(spooled):
+                    os.unlink(spooled)
+        if api == 'SYNO.FileStation.Download':
+            local = fake.nas_path(params.get('path', ''))
+            if not local.is_file():
+                return self._send_json(_error(408))
+            return self._send_file(local, self.headers.get('Range', ''))
+
+        handlers = {
+            ('SYNO.FileStation.List', 'list'): fake.list_folder,
+            ('SYNO.FileStation.List', 'getinfo'): fake.getinfo,
+            ('SYNO.FileStation.Rename', 'rename'): fake.rename,
+            ('SYNO.FileStation.CreateFolder', 'create'): fake.create_folder,
+            ('SYNO.FileStation.MD5', 'start'): fake.start_md5,
+            ('SYNO.FileStation.MD5', 'status'): fake.md5_status,
+            ('SYNO.FileStation.MD5', 'stop'): fake.stop_md5,
+        }
+        handler = handlers.get((api, method))
+        self._send_json(handler(params) if handler else _error(102))
+
+    def _pace(self, nbytes):
+        """Simula el ancho de banda configurado esperando lo que tardaría `nbytes`."""
+        bandwidth = self.server.fake.bandwidth
+        if bandwidth:
+            time.sleep(nbytes / bandwidth)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _discard_body(self, remaining=None):
+        if remaining is None:
+            remaining = int(self.headers.get('Content-Length') or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+    def _receive_multipart(self, content_type, spool_dir):
+        """
+        Lee un cuerpo multipart/form-data por bloques.
+
+        Los campos de texto se devuelven en un dict; el contenido del archivo se
+        escribe directamente en un temporal de `spool_dir`, sin tenerlo nunca
+        completo en memoria.
+
+        Returns:
+            tuple: (campos, nombre del archivo, ruta del temporal)
+        """
+        boundary = re.search(r'boundary="?([^";]+)"?', content_type).group(1).encode('latin-1')
+        delimiter = b'\r\n--' + boundary
+        remaining = int(self.headers.get('Content-Length') or 0)
+
+        def read_more():
+            nonlocal remaining
+            chunk = self.rfile.read(min(STREAM_CHUNK_SIZE, remaining)) if remaining > 0 else b''
+            remaining -= len(chunk)
+            self._pace(len(chunk))
+            return chunk
+
+        fields, filename = {}, None
+        fd, spooled = tempfile.mkstemp(dir=spool_dir)
+        os.close(fd)
+
+        # Con el \r\n inicial el primer separador tiene la misma forma que los demás
+        buffer = b'\r\n'
+        while True:
+            # Avanzar hasta el siguiente separador y ver si es el de cierre
+            while (index := buffer.find(delimiter)) < 0 or len(buffer) < index + len(delimiter) + 2:
+                chunk = read_more()
+                if not chunk:
+                    return fields, filename, spooled
+                buffer += chunk
+            buffer = buffer[index + len(delimiter):]
+            if buffer.startswith(b'--'):
+                self._discard_body(remaining)
+                return fields, filename, spooled
+
+            while b'\r\n\r\n' not in buffer:
+                buffer += read_more()
+            raw_headers, buffer = buffer[2:].split(b'\r\n\r\n', 1)
+            disposition = raw_headers.decode('utf-8', 'replace')
+            name = re.search(r'\bname="([^"]*)"', disposition)
+            part_filename = re.search(r'filename="([^"]*)"', disposition)
+
+            # Copiar el contenido hasta el siguiente separador (guardando una cola por si queda partido)
+            sink = open(spooled, 'wb') if part_filename else None
+            value = bytearray()
+            write = sink.write if sink else value.extend
+            while (index := buffer.find(delimiter)) < 0:
+                keep = len(delimiter)
+                write(buffer[:-keep])
+                buffer = buffer[-keep:]
+                chunk = read_more()
+                if not chunk:
+                    break
+                buffer += chunk
+            else:
+                write(buffer[:index])
+                buffer = buffer[index:]
+
+            if sink:
+                sink.close()
+                filename = part_filename.group(1)
+            elif name:
+                fields[name.group(1)] = value.decode('utf-8')
+
+    def _send_file(self, path, byte_range=''):
+        """Envía un archivo por bloques, con soporte de Range: bytes=N-."""
+        size = path.stat().st_size
+        start = 0
+        if byte_range.startswith('bytes='):
+            start = int(byte_range[len('bytes='):].split('-')[0])
+            if start >= size:
+                return self._send_bytes(b'', 'text/plain', status=416)
+
+        self.send_response(206 if start else 200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(size - start))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._pace(len(chunk))
+                self.wfile.write(chunk)
+
+    def _send_json(self, payload):
+        self._send_bytes(json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def _send_bytes(self, data, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self._pace(len(data))
+        self.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor falso de la API de Synology")
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--root', default='fake_nas', help='Carpeta local que hace de raíz del NAS')
+    parser.add_argument('--user', default='admin')
+    parser.add_argument('--password', default='secret')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latencia añadida a cada petición')
+    parser.add_argument('--bandwidth-mbps', type=float, default=0,
+                        help='Ancho de banda por conexión en Mbit/s (0 = sin límite)')
+    args = parser.parse_args()
+
+    Path(args.root).mkdir(parents=True, exist_ok=True)
+    server = FakeSynologyServer(args.root, args.user, args.password, port=args.port,
+                                latency=args.latency_ms / 1000,
+                                bandwidth=args.bandwidth_mbps * 1_000_000 / 8 or None)
+    print(f"🧪 Synology falso escuchando en {server.url} (raíz: {args.root})", flush=True)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
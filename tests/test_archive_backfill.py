@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de scripts/archive_backfill.py: planificación, estado entre
+ejecuciones (reanudación y reintentos) y presupuesto de tiempo, con una base
+de datos y un archivo simulados.
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Agregar el directorio src y scripts al path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir.parent / "src"))
+sys.path.insert(0, str(current_dir.parent / "scripts"))
+
+from archive_backfill import ArchiveBackfill
+
+
+class MockDatabaseManager:
+    """Base de datos simulada con los podcasts que tienen URL de descarga."""
+
+    def __init__(self, numbers):
+        self.podcasts = [{'id': n, 'program_number': n, 'title': f"Popcasting{n}",
+                          'download_url': f"https://example.com/{n}.mp3"} for n in numbers]
+
+    def get_archive_candidates(self):
+        return [dict(p) for p in self.podcasts]
+
+
+class MockAudioManager:
+    """Archivo simulado: `archived` ya está en el NAS; `failing` falla y `broken` lanza una excepción."""
+
+    download_station = None
+
+    def __init__(self, archived=(), failing=(), broken=(), delay=0.0):
+        self.archived = set(archived)
+        self.failing = set(failing)
+        self.broken = set(broken)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def needs_archiving(self, podcast):
+        return podcast['program_number'] not in self.archived
+
+    def archive_podcast(self, podcast):
+        number = podcast['program_number']
+        with self._lock:
+            self.calls.append(number)
+        time.sleep(self.delay)
+        if number in self.broken:
+            raise RuntimeError("NAS sin espacio")
+        if number in self.failing:
+            return False
+        with self._lock:
+            self.archived.add(number)
+        return True
+
+
+def _numbers(pending):
+    return [p['program_number'] for p in pending]
+
+
+def test_plan_orders_and_skips():
+    """Se omite lo que ya está archivado y lo abandonado; lo nunca intentado va antes que los reintentos."""
+    with tempfile.TemporaryDirectory() as state_dir:
+        state = {'episodes': {
+            '4': {'status': 'failed', 'attempts': 1},
+            '5': {'status': 'failed', 'attempts': 3},
+        }}
+        (Path(state_dir) / ArchiveBackfill.STATE_FILENAME).write_text(json.dumps(state))
+
+        backfill = ArchiveBackfill(MockAudioManager(archived={2}), MockDatabaseManager(range(1, 7)), state_dir)
+        assert _numbers(backfill.plan(order="newest")) == [6, 3, 1, 4]
+        assert _numbers(backfill.plan(order="oldest")) == [1, 3, 6, 4]
+        assert _numbers(backfill.plan(order="oldest", max_attempts=4)) == [1, 3, 6, 4, 5]
+
+
+def test_run_records_state_and_resumes():
+    """El resultado de cada episodio se guarda; la siguiente ejecución solo reintenta los fallidos."""
+    with tempfile.TemporaryDirectory() as state_dir:
+        db = MockDatabaseManager(range(1, 6))
+        audio_manager = MockAudioManager(failing={3}, broken={5})
+        backfill = ArchiveBackfill(audio_manager, db, state_dir)
+        stats = backfill.run(backfill.plan(order="oldest"), workers=2)
+        assert stats == {'total': 5, 'archived': 3, 'failed': 2, 'not_started': 0}
+        assert sorted(audio_manager.calls) == [1, 2, 3, 4, 5]
+
+        # Nueva ejecución: el estado se lee de disco
+        resumed = ArchiveBackfill(audio_manager, db, state_dir)
+        episodes = resumed.state['episodes']
+        assert (episodes['1']['status'], episodes['1']['attempts'], episodes['1']['last_error']) == ('archived', 0, None)
+        assert episodes['3']['status'] == 'failed' and episodes['3']['attempts'] == 1
+        assert episodes['5']['last_error'] == "NAS sin espacio"
+
+        audio_manager.failing.clear()
+        audio_manager.calls = []
+        pending = resumed.plan(order="oldest")
+        assert _numbers(pending) == [3, 5]
+        assert resumed.run(pending, workers=2)['failed'] == 1
+        assert sorted(audio_manager.calls) == [3, 5]
+        assert resumed.state['episodes']['3']['status'] == 'archived'
+        assert resumed.state['episodes']['5']['attempts'] == 2
+
+        # Tras max_attempts fallos el episodio deja de planificarse
+        resumed.run(resumed.plan(), workers=1)
+        assert _numbers(resumed.plan(max_attempts=3)) == []
+
+
+def test_run_stops_launching_when_out_of_time():
+    """Agotado el presupuesto no se lanzan más episodios; los que quedan se cuentan para la próxima vez."""
+    with tempfile.TemporaryDirectory() as state_dir:
+        audio_manager = MockAudioManager(delay=0.1)
+        backfill = ArchiveBackfill(audio_manager, MockDatabaseManager(range(1, 6)), state_dir)
+        stats = backfill.run(backfill.plan(order="newest"), workers=1, max_runtime=0.05)
+        assert stats == {'total': 5, 'archived': 1, 'failed': 0, 'not_started': 4}
+        assert audio_manager.calls == [5]
+        assert _numbers(backfill.plan(order="newest")) == [4, 3, 2, 1]
+
+
+if __name__ == "__main__":
+    test_plan_orders_and_skips()
+    test_run_records_state_and_resumes()
+    test_run_stops_launching_when_out_of_time()
+    print("✅ Pruebas del backfill del archivo de audio completadas")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la huella del MP3 archivado (mp3_sha256, mp3_md5, mp3_size):
+subidas idénticas que se omiten y error claro si faltan las columnas en la BD.
+"""
+
+import hashlib
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir))
+
+from fake_synology_server import FakeSynologyServer
+from components import database_manager
+from components.database_manager import DatabaseManager, MissingColumnsError
+from components.local_archive_backend import LocalArchiveBackend
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from components.temp_storage import TempStorageManager
+
+
+class MockDatabaseManager:
+    """Base de datos simulada que solo registra las huellas guardadas."""
+
+    def __init__(self):
+        self.fingerprints = {}
+
+    def update_podcast_audio_fingerprint(self, podcast_id, sha256, size_in_bytes, md5=None):
+        self.fingerprints[podcast_id] = (sha256, size_in_bytes, md5)
+        return True
+
+    def update_podcast_mp3_duration(self, podcast_id, duration):
+        return True
+
+
+class CountingBackend(LocalArchiveBackend):
+    """Backend local que anota cada subida (y si reemplaza la copia existente)."""
+
+    def __init__(self, root_dir):
+        super().__init__(root_dir)
+        self.uploads = []
+
+    def upload_file(self, local_file_path, remote_folder: str = "/mp3", overwrite: bool = False,
+                    progress_callback=None) -> bool:
+        self.uploads.append(overwrite)
+        return super().upload_file(local_file_path, remote_folder, overwrite, progress_callback)
+
+
+class FailingQuery:
+    """Consulta de supabase-py cuyo execute() lanza el error indicado."""
+
+    def __init__(self, error):
+        self.error = error
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def execute(self):
+        raise self.error
+
+
+class FailingClient:
+    def __init__(self, error):
+        self.error = error
+
+    def table(self, name):
+        return FailingQuery(self.error)
+
+
+def _database(error):
+    original = database_manager.create_client
+    database_manager.create_client = lambda url, key: FailingClient(error)
+    try:
+        return DatabaseManager("http://localhost", "key")
+    finally:
+        database_manager.create_client = original
+
+
+def test_identical_nas_copy_is_not_uploaded():
+    """Con el tamaño del RSS desfasado se descarga para comprobar, pero una copia idéntica no se sube."""
+    data = b"n" * 2000
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "origin") as server:
+            nas = CountingBackend(Path(root) / "nas")
+            nas.create_folder('/popcasting/mp3')
+            (Path(root) / "nas/popcasting/mp3/popcasting_0485.mp3").write_bytes(data)
+
+            db = MockDatabaseManager()
+            audio_manager = AudioManager(db, nas, {'nas_folder': '/popcasting/mp3'},
+                                         NASInventory(nas), TempStorageManager(Path(root) / "temp"))
+            podcast = {'id': 1, 'program_number': 485, 'file_size': 1990,
+                       'download_url': server.add_enclosure("ivoox_485.mp3", data)}
+            assert audio_manager.needs_archiving(podcast)
+            assert audio_manager.archive_podcast(podcast)
+            assert nas.uploads == []
+            assert db.fingerprints[1] == (hashlib.sha256(data).hexdigest(), 2000, hashlib.md5(data).hexdigest())
+
+            # Si el SHA-256 registrado no coincide con la descarga, la copia del NAS se reemplaza
+            podcast['mp3_sha256'] = "0" * 64
+            assert audio_manager.archive_podcast(podcast)
+            assert nas.uploads == [True]
+
+
+def test_missing_fingerprint_columns_fail_loudly():
+    """Sin las columnas de la huella se lanza MissingColumnsError en lugar de devolver False o []."""
+    db = _database(Exception("{'code': '42703', 'message': 'column podcasts.mp3_sha256 does not exist'}"))
+    with pytest.raises(MissingColumnsError, match="mp3_sha256"):
+        db.get_archive_candidates()
+
+    db = _database(Exception("{'code': 'PGRST204', 'message': \"Could not find the 'mp3_md5' column "
+                             "of 'podcasts' in the schema cache\"}"))
+    with pytest.raises(MissingColumnsError, match="mp3_md5"):
+        db.update_podcast_audio_fingerprint(1, "a" * 64, 2000, "b" * 32)
+
+    # El resto de errores se siguen registrando sin interrumpir
+    db = _database(Exception("timeout"))
+    assert db.get_archive_candidates() == []
+    assert db.update_podcast_audio_fingerprint(1, "a" * 64, 2000) is False
+
+
+if __name__ == "__main__":
+    test_identical_nas_copy_is_not_uploaded()
+    test_missing_fingerprint_columns_fail_loudly()
+    print("✅ Pruebas de la huella del MP3 archivado completadas")
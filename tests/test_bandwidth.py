@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del control de ancho de banda: cubo de tokens compartido
+entre hilos, franjas horarias (también las que cruzan la medianoche) y el
+gobernador que aplica los límites a cada transferencia.
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from utils.bandwidth import EGRESS, INGRESS, BandwidthGovernor, TokenBucket, parse_schedule
+
+
+def test_token_bucket_limits_shared_rate():
+    """Sin límite no se espera; con límite, varios hilos juntos no superan el caudal."""
+    assert TokenBucket().consume(10 * 1024 * 1024) == 0.0
+
+    bucket = TokenBucket(1_000_000)
+    waited = bucket.consume(200_000)
+    assert 0.15 < waited < 0.3
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.consume, args=(100_000,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started >= 0.35
+
+    # Lo acumulado en reposo no pasa del burst
+    bucket.set_rate(1_000_000, burst=100_000)
+    time.sleep(0.3)
+    assert bucket.consume(300_000) > 0.15
+
+    bucket.set_rate(None)
+    assert bucket.rate is None and bucket.consume(10_000_000) == 0.0
+
+
+def test_parse_schedule():
+    """Las franjas se convierten a minutos y bytes/s; 0 significa sin límite."""
+    assert parse_schedule("01:00-07:00 0/0, 19:00-23:00 2048/512") == [
+        (60, 420, None, None),
+        (1140, 1380, 2048 * 1024, 512 * 1024),
+    ]
+    assert parse_schedule("") == []
+    with pytest.raises(ValueError, match="Franja de ancho de banda inválida"):
+        parse_schedule("19:00-23:00 2048")
+    with pytest.raises(ValueError):
+        parse_schedule("7h-9h 10/10")
+
+
+def test_schedule_across_midnight():
+    """Una franja 23:00-02:00 se aplica a ambos lados de la medianoche y no fuera de ella."""
+    governor = BandwidthGovernor(ingress_limit=50 * 1024, schedule=parse_schedule("23:00-02:00 100/0"))
+    night = {INGRESS: 100 * 1024, EGRESS: None}
+    day = {INGRESS: 50 * 1024, EGRESS: None}
+    assert governor.current_limits(datetime(2025, 7, 24, 23, 0)) == night
+    assert governor.current_limits(datetime(2025, 7, 24, 23, 59)) == night
+    assert governor.current_limits(datetime(2025, 7, 25, 0, 30)) == night
+    assert governor.current_limits(datetime(2025, 7, 25, 1, 59)) == night
+    assert governor.current_limits(datetime(2025, 7, 25, 2, 0)) == day
+    assert governor.current_limits(datetime(2025, 7, 24, 22, 59)) == day
+
+
+def test_governor_checks_schedule_once_per_second():
+    """throttle() no consulta la franja en cada bloque, pero aplica un cambio de franja en un segundo."""
+    governor = BandwidthGovernor(schedule=parse_schedule("00:00-23:59 0/0"))
+    limits = {INGRESS: None, EGRESS: None}
+    checks = []
+
+    def current_limits(now=None):
+        checks.append(now)
+        return dict(limits)
+
+    governor.current_limits = current_limits
+    for _ in range(1000):
+        governor.throttle(INGRESS, 64 * 1024)
+    assert len(checks) <= 1
+
+    # Empieza una franja con límite: se aplica en la siguiente comprobación
+    limits[INGRESS] = 1_000_000
+    governor._limits_checked_at -= 1.0
+    governor.throttle(INGRESS, 1)
+    assert governor.buckets[INGRESS].rate == 1_000_000
+
+    with governor.transfer(INGRESS, "Episodio 485") as meter:
+        meter.add(100_000)
+    assert meter.throttled_seconds > 0.05
+    assert governor.summary()[INGRESS]['bytes'] == 100_000
+    assert governor.summary()[EGRESS]['transfers'] == 0
+
+
+if __name__ == "__main__":
+    test_token_bucket_limits_shared_rate()
+    test_parse_schedule()
+    test_schedule_across_midnight()
+    test_governor_checks_schedule_once_per_second()
+    print("✅ Pruebas del control de ancho de banda completadas")
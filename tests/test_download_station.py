@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la estrategia de archivo con Download Station.
+No necesita NAS: usa el servidor falso de tests/fake_synology_server.py.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir))
+
+from fake_synology_server import FakeSynologyServer
+from components.synology_client import SynologyClient
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from components.temp_storage import TempStorageManager
+
+
+class MockDatabaseManager:
+    """Base de datos simulada que solo registra las huellas guardadas."""
+
+    def __init__(self):
+        self.fingerprints = {}
+
+    def update_podcast_audio_fingerprint(self, podcast_id, sha256, size_in_bytes):
+        self.fingerprints[podcast_id] = (sha256, size_in_bytes)
+        return True
+
+
+def _audio_manager(server, root, db_manager):
+    client = SynologyClient(server.host, server.port, server.username, server.password)
+    assert client.login()
+    archive_config = {
+        'nas_folder': '/popcasting/mp3',
+        'layout': 'hundreds',
+        'strategy': 'download_station',
+        'download_station_poll': 0.05,
+        'download_station_timeout': 10,
+    }
+    temp_storage = TempStorageManager(Path(root) / "temp")
+    return AudioManager(db_manager, client, archive_config, NASInventory(client), temp_storage)
+
+
+def test_nas_downloads_and_renames():
+    """El NAS descarga cada enclosure, se renombra a popcasting_NNNN.mp3 y se borran las tareas."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas") as server:
+            server.nas_path('/popcasting/mp3').mkdir(parents=True)
+            podcasts = [
+                {'id': n, 'program_number': n, 'file_size': 1000 + n,
+                 'download_url': server.add_enclosure(f"ivoox_{n}_feed.mp3", b"x" * (1000 + n))}
+                for n in (99, 485, 486)
+            ]
+            db_manager = MockDatabaseManager()
+            audio_manager = _audio_manager(server, root, db_manager)
+
+            results = audio_manager.archive_podcasts(podcasts)
+
+            assert results == {99: True, 485: True, 486: True}
+            assert server.nas_path('/popcasting/mp3/0400/popcasting_0485.mp3').stat().st_size == 1485
+            assert server.nas_path('/popcasting/mp3/0000/popcasting_0099.mp3').exists()
+            assert not server.nas_path('/popcasting/mp3/0400/ivoox_485_feed.mp3').exists()
+            assert db_manager.fingerprints[486] == (None, 1486)
+            assert server.tasks == {}
+            assert audio_manager.check_podcast_in_nas(486)
+
+            # Una segunda pasada no crea tareas nuevas
+            creates = server.request_counts[('SYNO.DownloadStation.Task', 'create')]
+            assert audio_manager.archive_podcasts(podcasts) == {99: True, 485: True, 486: True}
+            assert server.request_counts[('SYNO.DownloadStation.Task', 'create')] == creates
+
+
+def test_failed_task_is_reported():
+    """Una tarea que termina en error se marca como fallida."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas") as server:
+            server.nas_path('/popcasting/mp3').mkdir(parents=True)
+            podcast = {'id': 1, 'program_number': 1, 'download_url': f"{server.url}/enclosures/missing.mp3"}
+            audio_manager = _audio_manager(server, root, MockDatabaseManager())
+
+            assert audio_manager.archive_podcast(podcast) is False
+            assert not server.nas_path('/popcasting/mp3/0000/popcasting_0001.mp3').exists()
+
+
+def test_expired_session_is_renewed():
+    """Si el SID caduca, el cliente vuelve a hacer login y repite la petición."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas") as server:
+            server.nas_path('/popcasting/mp3').mkdir(parents=True)
+            client = SynologyClient(server.host, server.port, server.username, server.password)
+            assert client.login()
+
+            server.expire_sessions()
+
+            assert client.list_files('/popcasting/mp3') == []
+            assert server.logins == 2
+
+
+if __name__ == "__main__":
+    test_nas_downloads_and_renames()
+    test_failed_task_is_reported()
+    test_expired_session_is_renewed()
+    print("✅ Pruebas de Download Station completadas")
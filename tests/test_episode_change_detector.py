@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la detección de episodios editados en el RSS (content_hash).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components import database_manager
+from components.database_manager import DatabaseManager, MissingColumnsError
+from components.episode_change_detector import EpisodeChangeDetector
+from components.models import CONTENT_HASH_FIELDS
+from components.rss_data_processor import RSSDataProcessor
+
+
+class InMemoryPodcasts:
+    """Tabla podcasts en memoria con la misma interfaz que DatabaseManager."""
+
+    def __init__(self, rows):
+        self.rows = {row['id']: row for row in rows}
+        self.index_queries = 0
+        self.updates = []
+        self.songs = {}
+
+    def get_podcast_content_index(self, columns, page_size=1000):
+        self.index_queries += 1
+        return {row['program_number']: dict(row) for row in self.rows.values()}
+
+    def update_podcast_fields(self, podcast_id, fields):
+        self.updates.append((podcast_id, fields))
+        self.rows[podcast_id].update(fields)
+        return True
+
+    def get_podcast_by_id(self, podcast_id):
+        return self.rows.get(podcast_id)
+
+    def delete_songs(self, podcast_id):
+        self.songs.pop(podcast_id, None)
+        return True
+
+    def insert_songs_batch(self, songs):
+        for song in songs:
+            self.songs.setdefault(song.podcast_id, []).append((song.artist, song.title))
+        return len(songs)
+
+
+class FailingClient:
+    """Cliente de supabase-py cuyas consultas lanzan el error indicado al ejecutarse."""
+
+    def __init__(self, error):
+        self.error = error
+
+    def table(self, name):
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        raise self.error
+
+
+def _database(error):
+    original = database_manager.create_client
+    database_manager.create_client = lambda url, key: FailingClient(error)
+    try:
+        return DatabaseManager("http://localhost", "key")
+    finally:
+        database_manager.create_client = original
+
+
+def _episode(number, **overrides):
+    episode = {
+        'title': f"Popcasting{number}",
+        'date': "2025-07-24T18:00:00",
+        'url': f"https://popcastingpop.com/{number}",
+        'download_url': f"https://www.ivoox.com/{number}.mp3",
+        'file_size': 1000 + (number or 0),
+        'rss_playlist': json.dumps([{'position': 1, 'artist': 'A', 'title': 'B'}]),
+        'duration': 3600,
+        'program_number': number,
+        'comments': None,
+    }
+    episode.update(overrides)
+    episode['content_hash'] = RSSDataProcessor.compute_content_hash(episode)
+    return episode
+
+
+def test_only_changed_columns_are_sent():
+    """Título y enclosure editados; el resto de episodios no genera escrituras."""
+    stored = [_episode(n) for n in (1, 2, 3)]
+    db = InMemoryPodcasts([dict(e, id=n * 10) for n, e in zip((1, 2, 3), stored, strict=True)])
+
+    feed = [_episode(1), _episode(2, title="Popcasting2 (corregido)", download_url="https://nuevo/2.mp3"), _episode(3),
+            _episode(4)]
+    summary = EpisodeChangeDetector(db).sync(feed)
+
+    assert db.index_queries == 1
+    assert summary == {'updated': 1, 'hashed': 0, 'failed': 0}
+    assert db.updates == [(20, {'title': "Popcasting2 (corregido)", 'download_url': "https://nuevo/2.mp3",
+                                'content_hash': feed[1]['content_hash']})]
+
+    # Segunda pasada: todo coincide, nada que escribir
+    assert EpisodeChangeDetector(db).sync(feed) == {'updated': 0, 'hashed': 0, 'failed': 0}
+
+
+def test_legacy_rows_get_hash_without_spurious_edits():
+    """Filas sin hash con tipos de Supabase (fecha con zona, playlist jsonb) solo reciben el hash."""
+    episode = _episode(7)
+    row = {field: episode[field] for field in CONTENT_HASH_FIELDS}
+    row.update(id=70, content_hash=None, date="2025-07-24T18:00:00+00:00",
+               rss_playlist=json.loads(episode['rss_playlist']), file_size=str(episode['file_size']))
+    db = InMemoryPodcasts([row])
+
+    summary = EpisodeChangeDetector(db).sync([episode])
+    assert summary == {'updated': 0, 'hashed': 1, 'failed': 0}
+    assert db.updates == [(70, {'content_hash': episode['content_hash']})]
+
+
+def test_legacy_row_with_old_playlist_format_only_gets_hash():
+    """Una fila sin hash cuya playlist guardada solo difiere en formato no se reescribe ni regenera canciones."""
+    episode = _episode(8, rss_playlist=json.dumps([{'position': 1, 'artist': 'Vainica Doble', 'title': 'Caramelo'}]))
+    row = dict(episode, id=80, content_hash=None,
+               rss_playlist=json.dumps([{'position': 1, 'artist': 'Vainica Doble ', 'title': 'Caramelo.'}]))
+    db = InMemoryPodcasts([row])
+    db.songs = {80: [('Vainica Doble ', 'Caramelo.')]}
+
+    summary = EpisodeChangeDetector(db).sync([episode])
+    assert summary == {'updated': 0, 'hashed': 1, 'failed': 0}
+    assert db.updates == [(80, {'content_hash': episode['content_hash']})]
+    assert db.songs == {80: [('Vainica Doble ', 'Caramelo.')]}
+
+
+def test_edited_rss_playlist_regenerates_songs():
+    """Playlist editada en el RSS: se regeneran las canciones salvo si el episodio tiene playlist web."""
+    edited = json.dumps([{'position': 1, 'artist': 'Vainica Doble', 'title': 'Caramelo'},
+                         {'position': 2, 'artist': 'Nick Lowe', 'title': 'Cruel to be kind'}])
+    db = InMemoryPodcasts([dict(_episode(5), id=50), dict(_episode(6), id=60, web_playlist='[{"artist": "W"}]')])
+    db.songs = {50: [('A', 'B')], 60: [('W', 'X')]}
+
+    summary = EpisodeChangeDetector(db).sync([_episode(5, rss_playlist=edited), _episode(6, rss_playlist=edited)])
+    assert summary == {'updated': 2, 'hashed': 0, 'failed': 0}
+    assert db.songs[50] == [('Vainica Doble', 'Caramelo'), ('Nick Lowe', 'Cruel to be kind')]
+    assert db.songs[60] == [('W', 'X')]
+
+
+def test_missing_episodes_include_old_gaps():
+    """Un episodio que falló (486) se vuelve a encolar aunque el 487 ya esté guardado."""
+    db = InMemoryPodcasts([dict(_episode(n), id=n) for n in (484, 485, 487)])
+    feed = [_episode(n) for n in (488, 487, 486, 485, 484, 483)] + [_episode(None, title="Especial")]
+
+    detector = EpisodeChangeDetector(db)
+    missing = detector.find_missing(feed, detector.load_index())
+    assert [episode['program_number'] for episode in missing] == [488, 486, 483]
+
+
+def test_index_errors_are_not_swallowed():
+    """Sin el índice no se sabe qué falta: la columna ausente o un fallo de la consulta se propagan."""
+    db = _database(Exception("{'code': '42703', 'message': 'column podcasts.content_hash does not exist'}"))
+    with pytest.raises(MissingColumnsError, match="content_hash"):
+        EpisodeChangeDetector(db).load_index()
+    with pytest.raises(MissingColumnsError, match="content_hash"):
+        db.insert_full_podcast(_episode(9))
+
+    with pytest.raises(Exception, match="timeout"):
+        EpisodeChangeDetector(_database(Exception("timeout"))).load_index()
+
+
+if __name__ == "__main__":
+    test_only_changed_columns_are_sent()
+    test_legacy_rows_get_hash_without_spurious_edits()
+    test_legacy_row_with_old_playlist_format_only_gets_hash()
+    test_edited_rss_playlist_regenerates_songs()
+    test_missing_episodes_include_old_gaps()
+    test_index_errors_are_not_swallowed()
+    print("✅ Pruebas de detección de episodios editados completadas")
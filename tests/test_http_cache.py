@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la caché HTTP en disco: revalidación con ETag (304),
+persistencia entre ejecuciones, límite de tamaño con LRU y modo sin conexión.
+"""
+
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+import pytest
+import requests
+
+from utils.http_cache import CachedSession, HTTPCache
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Páginas de 1 KB con ETag; responde 304 si el cliente ya tiene la versión actual."""
+    requests = []
+
+    def do_GET(self):
+        PageHandler.requests.append((self.path, self.headers.get('If-None-Match')))
+        etag = f'"{self.path}-v1"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = self.path.encode().ljust(1024, b'.')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def test_revalidation_and_persistence():
+    """La segunda ejecución revalida con If-None-Match y sirve el cuerpo guardado tras el 304."""
+    server, base = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as work:
+            PageHandler.requests = []
+            first = CachedSession(HTTPCache(work)).get(f"{base}/487/", timeout=5)
+            assert first.status_code == 200 and not getattr(first, 'from_cache', False)
+
+            # Nueva "ejecución": otra caché sobre la misma carpeta
+            cache = HTTPCache(work)
+            second = CachedSession(cache).get(f"{base}/487/", timeout=5)
+            assert second.status_code == 200 and second.from_cache and second.content == first.content
+            assert PageHandler.requests == [("/487/", None), ("/487/", '"/487/-v1"')]
+            assert cache.stats['revalidated'] == 1 and cache.hit_ratio() == 1.0
+
+            # Quien envía su propia petición condicional recibe el 304 tal cual
+            unchanged = CachedSession(cache).get(f"{base}/487/", headers={'If-None-Match': '"/487/-v1"'})
+            assert unchanged.status_code == 304
+
+            # Los parámetros y las cabeceras forman parte de la clave
+            CachedSession(cache).get(f"{base}/487/", params={'page': 2})
+            assert PageHandler.requests[-1] == ("/487/?page=2", None)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_lru_eviction_and_offline():
+    """Con sitio para dos páginas se elimina la menos usada; sin conexión solo se sirve la caché."""
+    server, base = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as work:
+            cache = HTTPCache(work, max_bytes=2048)
+            session = CachedSession(cache)
+            session.get(f"{base}/1/")
+            session.get(f"{base}/2/")
+            session.get(f"{base}/1/")  # /1/ pasa a ser la más reciente
+            session.get(f"{base}/3/")
+            assert sorted(entry['url'] for entry in cache._entries.values()) == [f"{base}/1/", f"{base}/3/"]
+            assert len(list(Path(work).glob("*.body"))) == 2
+            cache.save()
+
+            offline = CachedSession(HTTPCache(work, offline=True))
+            PageHandler.requests = []
+            assert offline.get(f"{base}/3/").content.startswith(b"/3/")
+            assert offline.head(f"{base}/1/").status_code == 200
+            with pytest.raises(requests.exceptions.ConnectionError):
+                # Sin conexión, lo que no está en la caché debe fallar
+                offline.get(f"{base}/2/")
+            assert PageHandler.requests == []
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_revalidation_and_persistence()
+    test_lru_eviction_and_offline()
+    print("✅ Pruebas de la caché HTTP completadas")
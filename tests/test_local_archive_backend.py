@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del backend de archivo local (carpeta o recurso del NAS montado).
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components.local_archive_backend import LocalArchiveBackend
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from components.temp_storage import TempStorageManager
+
+
+def test_upload_is_atomic_and_listed():
+    """La copia se coloca con rename (sin temporales visibles) y aparece en el inventario."""
+    with tempfile.TemporaryDirectory() as root:
+        mount = Path(root) / "mnt"
+        mount.mkdir()
+        source = Path(root) / "popcasting_0485.mp3"
+        source.write_bytes(b"a" * 3_000_000)
+
+        backend = LocalArchiveBackend(mount)
+        assert backend.login()
+        progress = []
+        assert backend.upload_file(source, "/popcasting/mp3/0400", progress_callback=lambda c, t: progress.append(c))
+
+        target = mount / "popcasting/mp3/0400/popcasting_0485.mp3"
+        assert target.read_bytes() == source.read_bytes()
+        assert progress[-1] == 3_000_000
+        assert [p.name for p in target.parent.iterdir()] == ["popcasting_0485.mp3"]
+
+        # Sin overwrite no se reemplaza una copia existente
+        source.write_bytes(b"b" * 10)
+        assert not backend.upload_file(source, "/popcasting/mp3/0400")
+        assert backend.upload_file(source, "/popcasting/mp3/0400", overwrite=True)
+        assert backend.get_file_info("/popcasting/mp3/0400/popcasting_0485.mp3")['size'] == 10
+
+        inventory = NASInventory(backend)
+        audio_manager = AudioManager(None, backend, {'nas_folder': '/popcasting/mp3', 'layout': 'hundreds'},
+                                     inventory, TempStorageManager(Path(root) / "temp"))
+        assert audio_manager.check_podcast_in_nas(485)
+        assert not audio_manager.check_podcast_in_nas(486)
+        assert set(inventory.get_tree('/popcasting/mp3')) == {'/popcasting/mp3', '/popcasting/mp3/0400'}
+
+
+def test_missing_mount_fails_login():
+    """Si el recurso no está montado, login() falla."""
+    assert not LocalArchiveBackend("/nonexistent/mount").login()
+
+
+if __name__ == "__main__":
+    test_upload_is_atomic_and_listed()
+    test_missing_mount_fails_login()
+    print("✅ Pruebas de LocalArchiveBackend completadas")
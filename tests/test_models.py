@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de los modelos con __slots__ (Episode, WordPressPost, Song).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components.data_processor import DataProcessor
+from components.models import Episode, Song, compute_content_hash
+from components.rss_data_processor import RSSDataProcessor
+from components.song_processor import SongProcessor
+from components.wordpress_data_processor import WordPressDataProcessor
+
+
+SONGS = [{'position': 1, 'artist': 'Vainica Doble', 'title': 'Caramelo'},
+         {'position': 2, 'artist': 'Nick Lowe', 'title': 'Cruel to be kind'}]
+
+
+class FakeWordPressClient:
+    """Devuelve un post extraído del HTML para cualquier fecha."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def find_post_by_number(self, date, number):
+        self.calls += 1
+        return {'title': f"Popcasting{number}", 'wordpress_url': f"https://popcastingpop.com/{number}",
+                'cover_image_url': "https://popcastingpop.com/cover.jpg",
+                'web_playlist': SONGS, 'web_extra_links': [{'url': "https://ejemplo.com"}]}
+
+
+class FakeSongsTable:
+    def __init__(self):
+        self.batches = []
+
+    def insert_songs_batch(self, songs):
+        self.batches.append(songs)
+        return len(songs)
+
+
+def _episode():
+    return Episode(title="Popcasting487", date="2025-07-24T18:00:00", url="https://popcastingpop.com/487",
+                   download_url="https://www.ivoox.com/487.mp3", file_size=1487, rss_songs=list(SONGS),
+                   duration=3600, entry_id="guid-487", program_number=487)
+
+
+def test_episode_reads_like_the_old_dict():
+    """Lectura tipo dict, JSON perezoso y el mismo content_hash que el diccionario antiguo."""
+    episode = _episode()
+    assert not hasattr(episode, '__dict__')
+    assert episode['title'] == episode.get('title') == "Popcasting487"
+    assert episode.get('wordpress_link', 'x') == 'x' and 'guid' in episode
+    assert episode.rss_playlist == json.dumps(SONGS, ensure_ascii=False)
+
+    legacy = {field: episode[field] for field in episode.keys()}
+    assert episode.content_hash == compute_content_hash(legacy) == RSSDataProcessor.compute_content_hash(legacy)
+    assert Episode.from_dict(legacy) == episode
+
+
+def test_unification_links_post_without_touching_the_feed_episode():
+    """El episodio del feed queda intacto y la fila de la BD lleva la playlist web en JSON."""
+    episode = _episode()
+    processor = DataProcessor(RSSDataProcessor(""), WordPressDataProcessor())
+    unified = processor.process_single_episode(episode, FakeWordPressClient())
+
+    assert episode.wordpress is None and unified.wordpress is not None
+    assert unified.content_hash == episode.content_hash
+
+    row = unified.to_podcast_row()
+    assert row['wordpress_url'] == "https://popcastingpop.com/487"
+    assert row['cover_image_url'] == "https://popcastingpop.com/cover.jpg"
+    assert json.loads(row['web_playlist']) == SONGS and row['web_songs_count'] == 2
+    assert json.loads(row['web_extra_links']) == [{'url': "https://ejemplo.com"}]
+    assert set(row) >= {'title', 'rss_playlist', 'content_hash'} and 'entry_id' not in row
+
+    # Con el diccionario antiguo se genera la misma fila
+    assert Episode.from_dict(Episode.to_dict(unified) | {
+        'wordpress_link': unified.wordpress.link, 'featured_image_url': unified.wordpress.featured_image_url,
+        'wordpress_playlist_data': unified.wordpress.playlist_data,
+        'web_extra_links': unified.wordpress.web_extra_links}).to_podcast_row() == row
+
+
+def test_songs_are_stored_as_records():
+    """SongProcessor envía Songs con el podcast_id, sin copiar los diccionarios de la playlist."""
+    table = FakeSongsTable()
+    assert SongProcessor(table).process_and_store_songs(podcast_id=9, web_playlist=SONGS) == 2
+    assert table.batches[0] == [Song(1, 'Vainica Doble', 'Caramelo', 9), Song(2, 'Nick Lowe', 'Cruel to be kind', 9)]
+    assert table.batches[0][0].to_row() == {'podcast_id': 9, 'position': 1, 'artist': 'Vainica Doble',
+                                            'title': 'Caramelo'}
+    assert not Song(None, 'A', 'B', 9).is_complete()
+
+
+if __name__ == "__main__":
+    test_episode_reads_like_the_old_dict()
+    test_unification_links_post_without_touching_the_feed_episode()
+    test_songs_are_stored_as_records()
+    print("✅ Pruebas de los modelos de episodio, post y canción completadas")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la sincronización de varios programas: secciones [feed:*]
+de config.ini, plantillas por programa y reparto justo de los workers.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir.parent / "scripts"))
+
+from components.audio_manager import AudioManager
+from components.config_manager import ConfigManager
+from components.rss_data_processor import RSSDataProcessor
+from components.temp_storage import TempStorageManager
+from components.wordpress_client import WordPressClient
+from utils.fair_scheduler import FairScheduler
+from overwrite_episode import select_feed
+
+
+CONFIG = """
+[rss]
+url = https://feeds.feedburner.com/Popcasting
+
+[archive]
+nas_folder = /popcasting_marilyn/mp3
+
+[feed:popcasting]
+url = https://feeds.feedburner.com/Popcasting
+wordpress_url = https://popcastingpop.com
+nas_folder = /popcasting_marilyn/mp3
+file_template = popcasting_{number:04d}.mp3
+
+[feed:discopolis]
+url = https://example.com/discopolis.xml
+parser = lxml
+nas_folder = /discopolis/mp3/
+podcasts_table = discopolis_podcasts
+songs_table = discopolis_songs
+
+[sync]
+max_workers = 3
+"""
+
+
+def _config(text):
+    work = tempfile.mkdtemp()
+    path = Path(work) / "config.ini"
+    path.write_text(text)
+    return ConfigManager(config_path=path)
+
+
+def test_feed_sections():
+    """Cada [feed:*] con sus plantillas, carpeta y tablas; sin secciones, el feed de [rss]."""
+    config = _config(CONFIG)
+    popcasting, discopolis = config.get_feeds()
+    assert popcasting['wordpress_api_url'] == "https://popcastingpop.com/wp-json/wp/v2"
+    assert popcasting['podcasts_table'] == 'podcasts'
+    assert discopolis['wordpress_api_url'] is None and discopolis['parser'] == 'lxml'
+    assert discopolis['archive']['nas_folder'] == "/discopolis/mp3"
+    assert discopolis['archive']['file_template'] == "discopolis_{number:04d}.mp3"
+    assert discopolis['post_slug_template'] == "discopolis-{number}"
+    assert config.get_sync_config() == {'max_workers': 3}
+
+    [single] = _config("[rss]\nurl = https://feeds.feedburner.com/Popcasting\n").get_feeds()
+    assert single['name'] == 'popcasting' and single['wordpress_api_url'] is None
+
+    # Dos programas no pueden compartir la tabla podcasts
+    with pytest.raises(ValueError):
+        _config(CONFIG.replace("discopolis_podcasts", "podcasts")).get_feeds()
+
+
+def test_overwrite_selects_feed():
+    """overwrite_episode.py usa el programa de --feed; con varios programas es obligatorio."""
+    config = _config(CONFIG)
+    assert select_feed(config, 'discopolis')['podcasts_table'] == 'discopolis_podcasts'
+    with pytest.raises(ValueError, match="--feed"):
+        select_feed(config)
+    with pytest.raises(ValueError, match="no_existe"):
+        select_feed(config, 'no_existe')
+
+    single = _config("[rss]\nurl = https://feeds.feedburner.com/Popcasting\n")
+    assert select_feed(single)['name'] == 'popcasting'
+
+
+def test_templates_per_feed():
+    """Número de programa, slug de WordPress y archivo en el NAS según las plantillas del programa."""
+    processor = RSSDataProcessor("", title_prefix="Discópolis")
+    assert processor._extract_program_number("Discópolis 1234 (especial)") == 1234
+    assert processor._extract_comments("Discópolis 1234 (especial)") == "especial"
+
+    client = WordPressClient("https://example.com/wp-json/wp/v2", "programa-{number:04d}")
+    assert client.post_slug("12") == "programa-0012"
+
+    with tempfile.TemporaryDirectory() as work:
+        audio_manager = AudioManager(None, object(), {'nas_folder': "/discopolis/mp3", 'layout': 'hundreds',
+                                                      'file_template': "discopolis_{number}.mp3"},
+                                     temp_storage=TempStorageManager(base_dir=Path(work)))
+        assert audio_manager.get_nas_location(1234) == ("/discopolis/mp3/1200", "discopolis_1234.mp3")
+
+
+def test_fair_scheduler():
+    """Un feed con muchos pendientes no acapara los workers y cada cola conserva su orden."""
+    order = []
+    lock = threading.Lock()
+
+    def worker(name, item):
+        with lock:
+            order.append((name, item))
+        time.sleep(0.01)
+        return item * 10
+
+    queues = {'grande': list(range(8)), 'pequeño': [0, 1], 'vacío': []}
+    results = FairScheduler(max_workers=2).run(queues, worker)
+    assert results == {'grande': [i * 10 for i in range(8)], 'pequeño': [0, 10], 'vacío': []}
+    assert ('pequeño', 1) in order[:4]
+    assert [item for name, item in order if name == 'grande'] == list(range(8))
+
+    failed = FairScheduler(max_workers=1).run({'a': [1]}, lambda name, item: 1 / 0)
+    assert isinstance(failed['a'][0], ZeroDivisionError)
+
+    # Una excepción de stop_on detiene el reparto y se relanza al terminar
+    calls = []
+
+    def broken(name, item):
+        calls.append(item)
+        raise LookupError("falta la columna")
+
+    with pytest.raises(LookupError):
+        FairScheduler(max_workers=1).run({'a': [1, 2, 3]}, broken, stop_on=(LookupError,))
+    assert calls == [1]
+
+
+if __name__ == "__main__":
+    test_feed_sections()
+    test_overwrite_selects_feed()
+    test_templates_per_feed()
+    test_fair_scheduler()
+    print("✅ Pruebas de la sincronización de varios programas completadas")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del codificador multipart/form-data en streaming
+(utils/multipart.py) que usa SynologyClient para las subidas.
+"""
+
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import requests
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from utils.multipart import MultipartFileEncoder
+
+
+FIELDS = {'api': 'SYNO.FileStation.Upload', 'version': '2', 'method': 'upload',
+          'path': '/popcasting/mp3/0400', 'create_parents': 'true', 'overwrite': 'false'}
+
+
+def test_body_matches_requests():
+    """Para un archivo pequeño el cuerpo es idéntico, byte a byte, al que genera requests con files=."""
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "popcasting_0485.mp3"
+        path.write_bytes(bytes(range(256)) * 40)
+
+        encoder = MultipartFileEncoder(FIELDS, 'file', path)
+        body = b"".join(encoder)
+
+        with open(path, 'rb') as f:
+            prepared = requests.Request(
+                'POST', "http://nas.local/webapi/entry.cgi", data=FIELDS,
+                files={'file': (path.name, f, "application/octet-stream")}
+            ).prepare()
+        boundary = prepared.headers['Content-Type'].split("boundary=")[1]
+        assert body == prepared.body.replace(boundary.encode(), encoder.boundary.encode())
+        assert encoder.content_type == f"multipart/form-data; boundary={encoder.boundary}"
+        assert len(encoder) == len(body)
+
+
+def test_length_and_progress():
+    """len() coincide con los bytes producidos y el callback llega al total; se puede iterar de nuevo."""
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / 'audio "final".mp3'
+        path.write_bytes(b"a" * 10_001)
+        progress = []
+        encoder = MultipartFileEncoder({'path': '/mp3'}, 'file', path, chunk_size=4096,
+                                       callback=lambda sent, total: progress.append((sent, total)))
+
+        chunks = list(encoder)
+        assert sum(len(c) for c in chunks) == len(encoder) == encoder.bytes_sent
+        assert max(len(c) for c in chunks[1:-1]) == 4096
+        assert progress[-1] == (len(encoder), len(encoder))
+        assert b'filename="audio %22final%22.mp3"' in chunks[0]
+
+        # Un reintento vuelve a enviar el cuerpo completo
+        assert b"".join(encoder) == b"".join(chunks)
+
+
+def test_large_file_uses_constant_memory():
+    """Un archivo de 64 MB se codifica sin cargarlo en memoria: el pico depende solo de chunk_size."""
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "large.mp3"
+        with open(path, 'wb') as f:
+            f.truncate(64 * 1024 * 1024)
+
+        encoder = MultipartFileEncoder(FIELDS, 'file', path)
+        tracemalloc.start()
+        try:
+            produced = sum(len(chunk) for chunk in encoder)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert encoder.file_size == 64 * 1024 * 1024 and produced == len(encoder)
+        assert peak < 4 * encoder.chunk_size
+
+
+if __name__ == "__main__":
+    test_body_matches_requests()
+    test_length_and_progress()
+    test_large_file_uses_constant_memory()
+    print("✅ Pruebas del codificador multipart completadas")
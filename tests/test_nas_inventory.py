@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el inventario del NAS (NASInventory).
+No necesita conexión al NAS: usa SynologyClient contra el servidor falso de
+tests/fake_synology_server.py, que devuelve los listados en páginas de dos
+elementos para que se recorra la paginación real de list_all_files().
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir))
+
+from fake_synology_server import FakeSynologyServer
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from components.synology_client import SynologyClient
+
+
+LIST_PAGE = ('SYNO.FileStation.List', 'list')
+
+
+def _client(server):
+    client = SynologyClient(server.host, server.port, server.username, server.password)
+    assert client.login()
+    return client
+
+
+def _write(server, path, size):
+    local = server.nas_path(path)
+    local.parent.mkdir(parents=True, exist_ok=True)
+    local.write_bytes(b"x" * size)
+
+
+def test_list_all_files_walks_every_page():
+    """Con páginas de dos elementos, list_all_files pide tres páginas y devuelve los cinco archivos."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas", max_list_limit=2) as server:
+            for n in range(1, 6):
+                _write(server, f"/mp3/popcasting_{n:04d}.mp3", 1000 + n)
+            client = _client(server)
+
+            files = client.list_all_files('/mp3')
+            assert [f['name'] for f in files] == [f"popcasting_{n:04d}.mp3" for n in range(1, 6)]
+            assert [f['additional']['size'] for f in files] == [1001, 1002, 1003, 1004, 1005]
+            assert server.request_counts[LIST_PAGE] == 3
+
+            # list_files se queda con la primera página
+            assert len(client.list_files('/mp3')) == 2
+            assert client.list_all_files('/no_existe') is None
+
+
+def test_inventory_answers_from_memory():
+    """El inventario lista la carpeta una vez (todas sus páginas) y responde desde memoria."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas", max_list_limit=2) as server:
+            for n in range(1, 6):
+                _write(server, f"/mp3/popcasting_{n:04d}.mp3", 1000 + n)
+            inventory = NASInventory(_client(server), cache_dir=None, ttl_seconds=3600)
+
+            assert inventory.exists('popcasting_0003.mp3', '/mp3')
+            assert inventory.get_size('popcasting_0005.mp3', '/mp3') == 1005
+            assert not inventory.exists('popcasting_0099.mp3', '/mp3')
+            assert server.request_counts[LIST_PAGE] == 3
+
+
+def test_inventory_persists_and_expires():
+    """El inventario se recarga desde disco y vuelve a listar al caducar."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas", max_list_limit=2) as server:
+            _write(server, '/mp3/popcasting_0001.mp3', 10)
+            client = _client(server)
+            cache_dir = Path(root) / "cache"
+
+            NASInventory(client, cache_dir=cache_dir).get_folder('/mp3')
+            reloaded = NASInventory(client, cache_dir=cache_dir)
+            assert reloaded.exists('popcasting_0001.mp3', '/mp3')
+            assert server.request_counts[LIST_PAGE] == 1
+
+            expired = NASInventory(client, cache_dir=cache_dir, ttl_seconds=-1)
+            expired.get_folder('/mp3')
+            assert server.request_counts[LIST_PAGE] == 2
+
+
+def test_hundreds_layout():
+    """Con layout 'hundreds' se usan subcarpetas y se acepta la ubicación plana anterior."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas", max_list_limit=2) as server:
+            _write(server, '/mp3/popcasting_0099.mp3', 10)
+            _write(server, '/mp3/popcasting_0100.mp3', 10)
+            _write(server, '/mp3/0400/popcasting_0485.mp3', 20)
+            client = _client(server)
+            inventory = NASInventory(client)
+            audio_manager = AudioManager(None, client, {'nas_folder': '/mp3', 'layout': 'hundreds'}, inventory)
+
+            assert audio_manager.get_nas_path_for_podcast(485) == '/mp3/0400/popcasting_0485.mp3'
+            assert audio_manager.check_podcast_in_nas(485)
+            assert audio_manager.check_podcast_in_nas(99)
+            assert not audio_manager.check_podcast_in_nas(486)
+
+            tree = inventory.get_tree('/mp3')
+            assert set(tree) == {'/mp3', '/mp3/0400'}
+            assert 'popcasting_0485.mp3' in tree['/mp3/0400']
+            assert set(tree['/mp3']) >= {'popcasting_0099.mp3', 'popcasting_0100.mp3'}
+
+
+if __name__ == "__main__":
+    test_list_all_files_walks_every_page()
+    test_inventory_answers_from_memory()
+    test_inventory_persists_and_expires()
+    test_hundreds_layout()
+    print("✅ Pruebas de NASInventory completadas")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del tokenizador de playlists compartido por RSSDataProcessor,
+SongProcessor y WordPressClient.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components.rss_data_processor import RSSDataProcessor
+from components.song_processor import SongProcessor
+from components.wordpress_client import WordPressClient
+
+
+RSS_PLAYLIST = (
+    "the beatles · rain :: Los Planetas - Segundo premio :: "
+    "Comentarios · tres :: Vainica Doble: Caramelo ::  :: x :: "
+    "Nick Lowe \"Cruel to be kind\" :::::: invita a Popcasting a café https://ko-fi.com/popcasting"
+)
+
+
+def test_rss_playlist():
+    """Separadores del RSS, posiciones con huecos y pie de Ko-fi eliminado."""
+    songs = json.loads(RSSDataProcessor("")._process_rss_playlist(RSS_PLAYLIST))
+    assert songs == [
+        {'position': 1, 'artist': 'the beatles', 'title': 'rain'},
+        {'position': 2, 'artist': 'Los Planetas', 'title': 'Segundo premio'},
+        {'position': 4, 'artist': 'Vainica Doble', 'title': 'Caramelo'},
+        {'position': 6, 'artist': 'Nick Lowe', 'title': 'Cruel to be kind'},
+    ]
+    assert RSSDataProcessor("")._process_rss_playlist("") == "[]"
+
+
+def test_song_processor_playlist():
+    """URLs eliminadas y canciones sin separador como título de 'Unknown'."""
+    songs = SongProcessor(None)._parse_rss_playlist_string(
+        "the beatles · rain :: https://example.com/x Solo título :: ab · cd :: my favourite things"
+    )
+    assert songs == [
+        {'position': 1, 'artist': 'the beatles', 'title': 'rain'},
+        {'position': 2, 'artist': 'Unknown', 'title': 'Solo título'},
+        {'position': 3, 'artist': 'ab', 'title': 'cd'},
+    ]
+
+
+def test_web_playlist():
+    """Caracteres Unicode y entidades de WordPress se limpian una sola vez."""
+    client = WordPressClient("https://popcastingpop.com/wp-json/wp/v2/")
+    text = client._clean_unicode_text("  Nick Lowe┬Ę Cruel &amp; Kind :: Los Planetas — Segundo premio :: Twitter · x  ")
+    assert text == "Nick Lowe· Cruel & Kind :: Los Planetas - Segundo premio :: Twitter · x"
+    assert client._parse_popcasting_playlist_text(text) == [
+        {'artist': 'Nick Lowe', 'title': 'Cruel & Kind'},
+        {'artist': 'Los Planetas', 'title': 'Segundo premio'},
+    ]
+    assert client._parse_popcasting_playlist_text("Sin separador · de canciones") == []
+    assert client._parse_song_text("Vainica Doble &#8211; Caramelo") == {'artist': 'Vainica Doble', 'title': 'Caramelo'}
+
+
+if __name__ == "__main__":
+    test_rss_playlist()
+    test_song_processor_playlist()
+    test_web_playlist()
+    print("✅ Pruebas del tokenizador de playlists completadas")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la instantánea del feed de RSSDataProcessor: índices,
+TTL y revalidación condicional (ETag / 304).
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components.rss_data_processor import RSSDataProcessor
+
+
+def _feed(numbers) -> bytes:
+    items = ''.join(
+        f"<item><title>Popcasting{n}</title><link>https://popcastingpop.com/{n}</link>"
+        f"<guid>guid-{n}</guid><enclosure url=\"https://www.ivoox.com/{n}.mp3\" length=\"{n}\" type=\"audio/mpeg\"/>"
+        f"<description>Artista {n} · Canción :: Otro · Tema</description></item>"
+        for n in numbers
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>'.encode()
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Sirve el feed con ETag y responde 304 si no ha cambiado."""
+    body = _feed([3, 2, 1])
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        FeedHandler.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == FeedHandler.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', FeedHandler.etag)
+        self.send_header('Content-Length', str(len(FeedHandler.body)))
+        self.end_headers()
+        self.wfile.write(FeedHandler.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_indexes_and_local_file_revalidation():
+    """Índices O(1) y, con un archivo local, nuevo parseo solo si cambia su fecha de modificación."""
+    with tempfile.TemporaryDirectory() as work:
+        path = Path(work) / "feed.xml"
+        path.write_bytes(_feed([12, 11, 10]))
+        processor = RSSDataProcessor(str(path), 'lxml', snapshot_ttl=0)
+
+        snapshot = processor.get_snapshot()
+        assert len(snapshot) == 3
+        assert snapshot.get_by_program_number(11)['entry_id'] == "guid-11"
+        assert snapshot.get_by_guid("guid-12")['program_number'] == 12
+        assert snapshot.get_by_enclosure("https://www.ivoox.com/10.mp3")['program_number'] == 10
+        assert processor.get_episode_by_title("POPCASTING10")['program_number'] == 10
+        assert snapshot.raw_playlist(12) == "Artista 12 · Canción :: Otro · Tema"
+
+        # TTL vencido pero archivo sin cambios: misma instantánea
+        assert processor.get_snapshot() is snapshot
+
+        path.write_bytes(_feed([13, 12, 11, 10]))
+        os.utime(path, (1, 1))
+        assert processor.get_episode_by_program_number(13)['title'] == "Popcasting13"
+
+
+def test_http_conditional_revalidation():
+    """Dentro del TTL no hay peticiones; después se revalida con If-None-Match y un 304 no reparsea."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        FeedHandler.requests = []
+        processor = RSSDataProcessor(f"http://127.0.0.1:{server.server_port}/feed", 'lxml', snapshot_ttl=3600)
+        snapshot = processor.get_snapshot()
+        assert processor.get_snapshot() is snapshot
+        assert FeedHandler.requests == [None]
+
+        assert processor.get_snapshot(force_refresh=True) is snapshot
+        assert FeedHandler.requests == [None, '"v1"']
+
+        FeedHandler.body, FeedHandler.etag = _feed([4, 3, 2, 1]), '"v2"'
+        refreshed = processor.get_snapshot(force_refresh=True)
+        assert refreshed is not snapshot and refreshed.get_by_program_number(4)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_indexes_and_local_file_revalidation()
+    test_http_conditional_revalidation()
+    print("✅ Pruebas de la instantánea del feed RSS completadas")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del motor de parseo RSS con lxml: debe producir los mismos
+episodios que feedparser.
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components.rss_data_processor import RSSDataProcessor
+from components.rss_feed_parser import parse_entries
+
+
+TRICKY_FEED = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
+<channel><title>Popcasting</title>
+<item>
+  <title>  Popcasting 12 (especial &amp; cosas) </title>
+  <guid>https://popcastingpop.com/12</guid>
+  <pubDate>Tue, 01 Feb 2011 10:00:00 +0100</pubDate>
+  <description><![CDATA[Ramones · Blitzkrieg Bop :: Vainica Doble · Caramelo]]></description>
+  <itunes:image href="https://cdn.popcastingpop.com/12.jpg"/>
+  <itunes:duration> 55:10 </itunes:duration>
+</item>
+<item>
+  <title>Popcasting13</title>
+  <link>https://popcastingpop.com/13</link>
+  <guid isPermaLink="false">g13</guid>
+  <itunes:summary>Solo itunes · summary :: Otro · Tema</itunes:summary>
+  <enclosure url="https://www.ivoox.com/13.mp3" length="123" type="audio/mpeg"/>
+</item>
+<item>
+  <title>Popcasting14</title>
+  <description>Los Planetas &lt;b&gt;·&lt;/b&gt; Segundo premio :: C · D</description>
+  <itunes:summary>ignorado</itunes:summary>
+  <enclosure url="https://www.ivoox.com/14.mp3"/>
+</item>
+<item><title></title></item>
+</channel></rss>'''.encode('utf-8')
+
+
+def _process(source, engine):
+    processor = RSSDataProcessor("test", engine)
+    return [processor._process_single_entry(entry) for entry in parse_entries(source, engine)]
+
+
+def test_lxml_matches_feedparser_on_feed_xml():
+    """Los episodios de feed.xml son idénticos con ambos motores."""
+    feed = current_dir.parent / "feed.xml"
+    lxml_episodes = RSSDataProcessor(str(feed), 'lxml').fetch_and_process_entries()
+    assert lxml_episodes == RSSDataProcessor(str(feed), 'feedparser').fetch_and_process_entries()
+    assert len(lxml_episodes) == 300
+
+
+def test_lxml_matches_feedparser_on_edge_cases():
+    """Entidades, guid como enlace, itunes:summary de respaldo y campos ausentes."""
+    assert _process(TRICKY_FEED, 'lxml') == _process(TRICKY_FEED, 'feedparser')
+    first = _process(TRICKY_FEED, 'lxml')[0]
+    assert first['url'] == "https://popcastingpop.com/12"
+    assert first['comments'] == "especial & cosas"
+    assert first['duration'] == 3310
+
+
+if __name__ == "__main__":
+    test_lxml_matches_feedparser_on_feed_xml()
+    test_lxml_matches_feedparser_on_edge_cases()
+    print("✅ Pruebas del parser RSS con lxml completadas")
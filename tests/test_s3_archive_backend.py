@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la réplica del archivo en S3.
+
+La prueba contra un bucket real solo se ejecuta si hay un MinIO (u otro
+servicio compatible) disponible, p. ej.:
+
+    docker run -p 9000:9000 minio/minio server /data
+    S3_TEST_ENDPOINT=http://localhost:9000 S3_TEST_BUCKET=popcasting-test \\
+        S3_ACCESS_KEY_ID=minioadmin S3_SECRET_ACCESS_KEY=minioadmin python tests/test_s3_archive_backend.py
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir))
+
+from fake_synology_server import FakeSynologyServer
+from components import s3_archive_backend
+from components.s3_archive_backend import S3ArchiveBackend, compute_s3_etag
+from components.local_archive_backend import LocalArchiveBackend
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from components.temp_storage import TempStorageManager
+
+
+class MockDatabaseManager:
+    """Base de datos simulada que solo registra las huellas y duraciones guardadas."""
+
+    def __init__(self):
+        self.fingerprints = {}
+
+    def update_podcast_audio_fingerprint(self, podcast_id, sha256, size_in_bytes, md5=None):
+        self.fingerprints[podcast_id] = (sha256, size_in_bytes, md5)
+        return True
+
+    def update_podcast_mp3_duration(self, podcast_id, duration):
+        return True
+
+
+def test_multipart_etag():
+    """El ETag calculado coincide con el formato de S3 para una y varias partes."""
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "audio.mp3"
+        data = os.urandom(12 * 1024 * 1024)
+        path.write_bytes(data)
+
+        single = compute_s3_etag(path, 16 * 1024 * 1024)
+        assert single['etag'] == single['md5'] == hashlib.md5(data).hexdigest()
+
+        part = 5 * 1024 * 1024
+        digests = b"".join(hashlib.md5(data[i:i + part]).digest() for i in range(0, len(data), part))
+        multi = compute_s3_etag(path, part)
+        assert multi['etag'] == f"{hashlib.md5(digests).hexdigest()}-3"
+        assert multi['md5'] == single['md5'] and multi['size'] == len(data)
+
+        # Un archivo de exactamente part_size bytes también se sube en multipart (una parte)
+        exact = compute_s3_etag(path, len(data))
+        assert exact['etag'] == f"{hashlib.md5(hashlib.md5(data).digest()).hexdigest()}-1"
+
+
+def test_mirror_is_filled_when_nas_copy_is_valid():
+    """Si el NAS ya tiene el episodio pero la réplica no, solo se sube a la réplica."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "origin") as server:
+            nas = LocalArchiveBackend(Path(root) / "nas")
+            mirror = LocalArchiveBackend(Path(root) / "mirror")
+            nas.create_folder('/popcasting/mp3/0400')
+            (Path(root) / "nas/popcasting/mp3/0400/popcasting_0485.mp3").write_bytes(b"n" * 2000)
+
+            podcast = {'id': 1, 'program_number': 485, 'file_size': 2000,
+                       'download_url': server.add_enclosure("ivoox_485.mp3", b"n" * 2000)}
+            mirrors = [{'name': 'mirror', 'backend': mirror, 'inventory': NASInventory(mirror)}]
+            audio_manager = AudioManager(MockDatabaseManager(), nas,
+                                         {'nas_folder': '/popcasting/mp3', 'layout': 'hundreds'},
+                                         NASInventory(nas), TempStorageManager(Path(root) / "temp"), mirrors)
+
+            assert audio_manager.needs_archiving(podcast)
+            nas_mtime = nas.get_file_info('/popcasting/mp3/0400/popcasting_0485.mp3')['mtime']
+            assert audio_manager.archive_podcast(podcast)
+
+            assert mirror.get_file_info('/popcasting/mp3/0400/popcasting_0485.mp3')['size'] == 2000
+            assert nas.get_file_info('/popcasting/mp3/0400/popcasting_0485.mp3')['mtime'] == nas_mtime
+            assert not audio_manager.needs_archiving(podcast)
+
+
+def test_mismatched_mirror_copy_is_repaired():
+    """Una copia truncada en la réplica se detecta y se reemplaza, no basta con que exista el nombre."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "origin") as server:
+            nas = LocalArchiveBackend(Path(root) / "nas")
+            mirror = LocalArchiveBackend(Path(root) / "mirror")
+            for backend in (nas, mirror):
+                backend.create_folder('/popcasting/mp3')
+            (Path(root) / "nas/popcasting/mp3/popcasting_0485.mp3").write_bytes(b"n" * 2000)
+            (Path(root) / "mirror/popcasting/mp3/popcasting_0485.mp3").write_bytes(b"n" * 700)
+
+            podcast = {'id': 1, 'program_number': 485, 'file_size': 2000, 'mp3_size': 2000,
+                       'download_url': server.add_enclosure("ivoox_485.mp3", b"n" * 2000)}
+            mirrors = [{'name': 'mirror', 'backend': mirror, 'inventory': NASInventory(mirror)}]
+            audio_manager = AudioManager(MockDatabaseManager(), nas, {'nas_folder': '/popcasting/mp3'},
+                                         NASInventory(nas), TempStorageManager(Path(root) / "temp"), mirrors)
+
+            assert audio_manager.needs_archiving(podcast)
+            assert audio_manager.archive_podcast(podcast)
+            assert mirror.get_file_info('/popcasting/mp3/popcasting_0485.mp3')['size'] == 2000
+            assert not audio_manager.needs_archiving(podcast)
+
+            # ETag de una sola parte (S3) distinto del MD5 registrado
+            podcast['mp3_md5'] = hashlib.md5(b"n" * 2000).hexdigest()
+            assert audio_manager._is_mirror_copy_valid(podcast, {'size': 2000, 'etag': podcast['mp3_md5']})
+            assert not audio_manager._is_mirror_copy_valid(podcast, {'size': 2000, 'etag': "0" * 32})
+
+
+def test_minio_roundtrip():
+    """Subida multipart, omisión de objetos idénticos y listado paginado contra MinIO."""
+    if s3_archive_backend.boto3 is None or not os.getenv("S3_TEST_ENDPOINT"):
+        pytest.skip("Sin boto3 o sin S3_TEST_ENDPOINT: se omite la prueba contra MinIO")
+
+    backend = S3ArchiveBackend(
+        bucket=os.getenv("S3_TEST_BUCKET", "popcasting-test"),
+        prefix=f"test-{uuid.uuid4().hex[:8]}/",
+        endpoint_url=os.getenv("S3_TEST_ENDPOINT"),
+        region=os.getenv("S3_TEST_REGION", "us-east-1"),
+        access_key=os.getenv("S3_ACCESS_KEY_ID", "minioadmin"),
+        secret_key=os.getenv("S3_SECRET_ACCESS_KEY", "minioadmin"),
+        part_size=5 * 1024 * 1024,
+        max_concurrency=4,
+    )
+    try:
+        backend.s3.create_bucket(Bucket=backend.bucket)
+    except Exception:
+        pass  # Ya existe
+    assert backend.login()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "popcasting_0485.mp3"
+        path.write_bytes(os.urandom(11 * 1024 * 1024))
+        progress = []
+        assert backend.upload_file(path, "/popcasting/mp3/0400", progress_callback=lambda s, t: progress.append(s))
+        assert progress[-1] == path.stat().st_size
+
+        head = backend.s3.head_object(Bucket=backend.bucket, Key=backend.key_for("/popcasting/mp3/0400/popcasting_0485.mp3"))
+        assert head['ETag'].strip('"') == compute_s3_etag(path, backend.part_size)['etag']
+
+        # Un objeto idéntico no se vuelve a subir; uno distinto solo con overwrite
+        progress.clear()
+        assert backend.upload_file(path, "/popcasting/mp3/0400") and not progress
+        path.write_bytes(b"otro contenido")
+        assert not backend.upload_file(path, "/popcasting/mp3/0400")
+        assert backend.upload_file(path, "/popcasting/mp3/0400", overwrite=True)
+
+        listing = backend.list_all_files("/popcasting/mp3", page_size=1)
+        assert [(f['name'], f['isdir']) for f in listing] == [("0400", True)]
+        inventory = NASInventory(backend)
+        assert inventory.get_size("popcasting_0485.mp3", "/popcasting/mp3/0400") == len(b"otro contenido")
+
+        assert backend.download_file("/popcasting/mp3/0400/popcasting_0485.mp3", str(Path(root) / "out"))
+        assert (Path(root) / "out/popcasting_0485.mp3").read_bytes() == b"otro contenido"
+
+
+if __name__ == "__main__":
+    test_multipart_etag()
+    test_mirror_is_filled_when_nas_copy_is_valid()
+    test_mismatched_mirror_copy_is_repaired()
+    try:
+        test_minio_roundtrip()
+    except pytest.skip.Exception as e:
+        print(f"⏭️ {e}")
+    print("✅ Pruebas de la réplica S3 completadas")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las transferencias masivas con el NAS (download_many con
+reanudación por Range y sincronización de carpetas con sync_directory).
+No necesita NAS: usa el servidor falso de tests/fake_synology_server.py.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(current_dir))
+
+from fake_synology_server import FakeSynologyServer
+from components.synology_client import SynologyClient
+
+
+def test_download_many_skips_and_resumes():
+    """Descarga en paralelo, reanuda un .part existente y omite los archivos idénticos."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas") as server:
+            folder = server.nas_path('/popcasting/mp3/0400')
+            folder.mkdir(parents=True)
+            contents = {n: os.urandom(300_000 + n) for n in range(480, 486)}
+            for n, data in contents.items():
+                (folder / f"popcasting_0{n}.mp3").write_bytes(data)
+
+            client = SynologyClient(server.host, server.port, server.username, server.password, pool_size=4)
+            assert client.login()
+            local = Path(root) / "restore"
+            local.mkdir()
+            # Descarga cortada a medias de un episodio
+            (local / "popcasting_0485.mp3.part").write_bytes(contents[485][:100_000])
+
+            paths = [f"/popcasting/mp3/0400/popcasting_0{n}.mp3" for n in contents]
+            summary = client.download_many(paths + ["/popcasting/mp3/0400/popcasting_0999.mp3"], local, workers=4)
+
+            assert summary['downloaded'] == 6 and summary['failed'] == 1
+            assert summary['failures'] == ["/popcasting/mp3/0400/popcasting_0999.mp3"]
+            assert summary['bytes'] == sum(len(d) for d in contents.values()) - 100_000
+            for n, data in contents.items():
+                restored = local / f"popcasting_0{n}.mp3"
+                assert restored.read_bytes() == data
+                assert int(restored.stat().st_mtime) == int((folder / restored.name).stat().st_mtime)
+            assert not list(local.glob("*.part"))
+
+            # Una segunda pasada no descarga nada
+            downloads = server.request_counts[('SYNO.FileStation.Download', 'download')]
+            assert downloads == 6
+            summary = client.download_many(paths, local)
+            assert summary['skipped'] == 6 and summary['bytes'] == 0
+            assert server.request_counts[('SYNO.FileStation.Download', 'download')] == downloads
+
+
+def test_download_file_checks_part_and_empty_files():
+    """Un .part que no corresponde al archivo remoto no se reanuda y los archivos vacíos se descargan."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas") as server:
+            folder = server.nas_path('/popcasting/mp3')
+            folder.mkdir(parents=True)
+            data = os.urandom(300_000)
+            (folder / "popcasting_0485.mp3").write_bytes(data)
+            (folder / "vacio.txt").write_bytes(b"")
+
+            client = SynologyClient(server.host, server.port, server.username, server.password)
+            assert client.login()
+            local = Path(root) / "restore"
+            local.mkdir()
+            # .part de una versión anterior, más grande que el archivo actual
+            (local / "popcasting_0485.mp3.part").write_bytes(b"x" * 400_000)
+
+            assert client.download_file("/popcasting/mp3/popcasting_0485.mp3", local)
+            assert (local / "popcasting_0485.mp3").read_bytes() == data
+
+            downloads = server.request_counts[('SYNO.FileStation.Download', 'download')]
+            assert client.download_file("/popcasting/mp3/vacio.txt", local, remote_info={'size': 0, 'mtime': None})
+            assert (local / "vacio.txt").read_bytes() == b""
+            assert server.request_counts[('SYNO.FileStation.Download', 'download')] == downloads
+            assert not list(local.glob("*.part"))
+
+
+def test_sync_directory_uploads_only_changes():
+    """La sincronización sube lo nuevo o modificado, respeta el dry run y conserva las fechas."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas") as server:
+            local = Path(root) / "data"
+            (local / "sub").mkdir(parents=True)
+            (local / "a.json").write_bytes(b"a" * 1000)
+            (local / "sub" / "b.json").write_bytes(b"b" * 2000)
+            (local / ".oculto").write_bytes(b"x")
+
+            client = SynologyClient(server.host, server.port, server.username, server.password)
+            assert client.login()
+
+            summary = client.sync_directory(local, "/backup", dry_run=True)
+            assert summary['expected_bytes'] == 3000 and summary['uploaded'] == 0
+            assert not server.nas_path('/backup').exists()
+
+            summary = client.sync_directory(local, "/backup", workers=2)
+            assert summary['uploaded'] == 2 and summary['bytes'] == 3000
+            assert server.nas_path('/backup/sub/b.json').read_bytes() == b"b" * 2000
+            assert not server.nas_path('/backup/.oculto').exists()
+
+            # Sin cambios no se sube nada; un archivo modificado se reemplaza
+            assert client.sync_directory(local, "/backup")['plan'] == []
+            (local / "a.json").write_bytes(b"c" * 1500)
+            summary = client.sync_directory(local, "/backup")
+            assert [(item['local_path'].name, item['reason']) for item in summary['plan']] == [("a.json", "changed")]
+            assert server.nas_path('/backup/a.json').read_bytes() == b"c" * 1500
+
+
+if __name__ == "__main__":
+    test_download_many_skips_and_resumes()
+    test_download_file_checks_part_and_empty_files()
+    test_sync_directory_uploads_only_changes()
+    print("✅ Pruebas de transferencias con el NAS completadas")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el gestor de la carpeta temporal (TempStorageManager).
+No necesita red: trabaja sobre una carpeta temporal.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+import components.audio_manager as audio_manager
+from components.audio_manager import AudioManager
+from components.temp_storage import TempStorageManager
+
+
+class NoLengthHandler(BaseHTTPRequestHandler):
+    """MP3 de 10 KB sin Content-Length (HTTP/1.0: el cuerpo termina al cerrar la conexión)."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"x" * 10000)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_orphans_are_removed_on_startup():
+    """Los archivos antiguos se borran al arrancar; los recientes se conservan."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        orphan = Path(temp_dir) / "popcasting_0001.mp3"
+        orphan.write_bytes(b"x")
+        os.utime(orphan, (0, 0))
+        recent = Path(temp_dir) / "popcasting_0002.mp3"
+        recent.write_bytes(b"x")
+
+        TempStorageManager(temp_dir, orphan_max_age=3600)
+
+        assert not orphan.exists()
+        assert recent.exists()
+
+
+def test_budget_admission_and_release():
+    """Una reserva mayor que el presupuesto se rechaza; al liberar se borran sus archivos."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = TempStorageManager(temp_dir, budget_bytes=1000, min_free_bytes=0)
+
+        with storage.reservation("grande") as reservation:
+            assert not reservation.request(1001)
+        assert storage.usage()['rejected'] == 1
+
+        with storage.reservation("normal") as reservation:
+            assert reservation.request(800)
+            reservation.path_for("popcasting_0003.mp3").write_bytes(b"x" * 800)
+            assert storage.usage()['reserved_bytes'] == 800
+            assert not storage.reservation("otra").request(300, wait=False)
+
+        usage = storage.usage()
+        assert usage['reserved_bytes'] == 0
+        assert usage['disk_bytes'] == 0
+        assert usage['peak_bytes'] == 800
+
+
+def test_waits_for_space():
+    """Una reserva que no cabe espera a que otra libere espacio."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = TempStorageManager(temp_dir, budget_bytes=1000, min_free_bytes=0, wait_timeout=5)
+        first = storage.reservation("primera")
+        assert first.request(700)
+
+        admitted = []
+        second = storage.reservation("segunda")
+        waiter = threading.Thread(target=lambda: admitted.append(second.request(700)))
+        waiter.start()
+        waiter.join(timeout=0.2)
+        assert not admitted
+
+        first.release()
+        waiter.join(timeout=5)
+        assert admitted == [True]
+        second.release()
+
+
+def test_download_without_length_over_budget_fails():
+    """Sin Content-Length, una descarga cortada por falta de espacio no se da por buena."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), NoLengthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    step = audio_manager.UNKNOWN_LENGTH_STEP
+    audio_manager.UNKNOWN_LENGTH_STEP = 1024
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = TempStorageManager(temp_dir, budget_bytes=4096, min_free_bytes=0)
+            manager = AudioManager(None, object(), temp_storage=storage)
+            with storage.reservation("sin_longitud") as reservation:
+                result = manager._download_file(f"http://127.0.0.1:{server.server_port}/popcasting_0487.mp3",
+                                                Path(temp_dir), reservation)
+                assert result is None
+                assert not (Path(temp_dir) / "popcasting_0487.mp3").exists()
+    finally:
+        audio_manager.UNKNOWN_LENGTH_STEP = step
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_orphans_are_removed_on_startup()
+    test_budget_admission_and_release()
+    test_waits_for_space()
+    test_download_without_length_over_budget_fails()
+    print("✅ Pruebas de TempStorageManager completadas")
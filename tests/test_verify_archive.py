@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de scripts/verify_archive.py contra el NAS falso.
+"""
+
+import sys
+import hashlib
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio src y scripts al path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir.parent / "src"))
+sys.path.insert(0, str(current_dir.parent / "scripts"))
+sys.path.insert(0, str(current_dir))
+
+from fake_synology_server import FakeSynologyServer
+from components.synology_client import SynologyClient
+from components.nas_inventory import NASInventory
+from components.audio_manager import AudioManager
+from components.temp_storage import TempStorageManager
+from verify_archive import ArchiveVerifier
+
+
+def test_verify_reports_corrupt_and_missing():
+    """Se detectan archivos corruptos y ausentes sin descargarlos."""
+    with tempfile.TemporaryDirectory() as root:
+        with FakeSynologyServer(Path(root) / "nas") as server:
+            folder = server.nas_path('/popcasting/mp3')
+            folder.mkdir(parents=True)
+            contents = {n: bytes([n % 256]) * 5000 for n in (1, 2, 3, 4)}
+            for n, data in contents.items():
+                (folder / f"popcasting_{n:04d}.mp3").write_bytes(data)
+            # El episodio 2 se corrompe en el NAS sin cambiar de tamaño
+            (folder / "popcasting_0002.mp3").write_bytes(b"\0" * 5000)
+
+            podcasts = [
+                {'program_number': n, 'mp3_size': 5000, 'mp3_md5': hashlib.md5(data).hexdigest()}
+                for n, data in contents.items()
+            ]
+            podcasts[3]['mp3_md5'] = None
+            podcasts.append({'program_number': 5, 'mp3_size': 5000, 'mp3_md5': 'x'})
+
+            client = SynologyClient(server.host, server.port, server.username, server.password)
+            assert client.login()
+            audio_manager = AudioManager(None, client, {'nas_folder': '/popcasting/mp3'}, NASInventory(client),
+                                         TempStorageManager(Path(root) / "temp"))
+
+            report = ArchiveVerifier(client, audio_manager, concurrency=2, poll_interval=0.05).verify(podcasts)
+
+            statuses = {pn: result['status'] for pn, result in report['episodes'].items()}
+            assert statuses == {'1': 'ok', '2': 'corrupt', '3': 'ok', '4': 'unverified', '5': 'missing'}
+            assert server.request_counts[('SYNO.FileStation.Download', 'download')] == 0
+            assert server.md5_tasks == {}
+
+
+if __name__ == "__main__":
+    test_verify_reports_corrupt_and_missing()
+    print("✅ Pruebas de verify_archive completadas")
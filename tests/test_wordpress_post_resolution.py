@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la localización de posts de WordPress: índice del catálogo,
+API REST por slug y, si no, comprobación en paralelo (HEAD) de las fechas candidatas.
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components.data_processor import DataProcessor
+from components.models import Episode
+from components.rss_data_processor import RSSDataProcessor
+from components.wordpress_client import WordPressClient, WordPressUnavailableError
+from components.wordpress_data_processor import WordPressDataProcessor
+from components.wordpress_url_map import WordPressURLMap
+
+
+PAGE = (b"<html><head><title>Popcasting487</title></head><body><h1 class='entry-title'>Popcasting487</h1>"
+        b"<p>Vainica Doble \xc2\xb7 Caramelo :: Nick Lowe \xc2\xb7 Cruel to be kind</p></body></html>")
+
+CATALOGUE = [
+    {'id': 3, 'slug': "popcasting-487", 'link': "https://popcastingpop.com/2025/07/25/popcasting-487/",
+     'date': "2025-07-25T19:00:00", 'title': {'rendered': "Popcasting487"},
+     'jetpack_featured_media_url': "https://popcastingpop.com/wp-content/uploads/487.jpg",
+     'content': {'rendered': "<p style='text-align: center'>Vainica Doble · Caramelo :: Nick Lowe · Cruel to be kind</p>"}},
+    {'id': 2, 'slug': "aviso-vacaciones", 'link': "https://popcastingpop.com/aviso/", 'date': "2025-07-20T10:00:00",
+     'title': {'rendered': "Aviso"}, 'content': {'rendered': "<p>Volvemos en septiembre</p>"}},
+    {'id': 1, 'slug': "popcasting-486", 'link': "https://popcastingpop.com/2025/07/18/popcasting-486/",
+     'date': "2025-07-18T19:00:00", 'title': {'rendered': "Popcasting486"}, 'content': {'rendered': ""}},
+]
+
+
+class WordPressHandler(BaseHTTPRequestHandler):
+    """Sitio con la API REST opcional y un único post publicado el 2025/07/25."""
+    rest_posts = []
+    requests = []
+    unavailable = False
+
+    def _route(self, send_body):
+        url = urlparse(self.path)
+        WordPressHandler.requests.append((self.command, url.path))
+        query = parse_qs(url.query)
+        extra_headers = {}
+        if WordPressHandler.unavailable:
+            body, status = b"service unavailable", 503
+        elif url.path == "/wp-json/wp/v2/posts" and 'slug' in query:
+            body, status = json.dumps(WordPressHandler.rest_posts).encode(), 200
+        elif url.path == "/wp-json/wp/v2/posts":
+            # Catálogo paginado
+            per_page, page = int(query['per_page'][0]), int(query['page'][0])
+            pages = [CATALOGUE[i:i + per_page] for i in range(0, len(CATALOGUE), per_page)]
+            extra_headers['X-WP-TotalPages'] = str(len(pages))
+            body, status = json.dumps(pages[page - 1]).encode(), 200
+        elif url.path == "/2025/07/25/popcasting-487/":
+            body, status = PAGE, 200
+        else:
+            body, status = b"not found", 404
+        self.send_response(status)
+        for header, value in extra_headers.items():
+            self.send_header(header, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._route(True)
+
+    def do_HEAD(self):
+        self._route(False)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), WordPressHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    return server, base, WordPressClient(f"{base}/wp-json/wp/v2")
+
+
+def test_rest_slug_resolution_downloads_one_page():
+    """La API REST da la URL: una consulta y una sola página, sin probar fechas."""
+    server, base, client = _serve()
+    try:
+        WordPressHandler.requests = []
+        WordPressHandler.rest_posts = [{'link': f"{base}/2025/07/25/popcasting-487/", 'date': "2025-07-25T19:00:00"}]
+        post = client.find_post_by_number("2025-07-24", "487")
+        assert post['wordpress_url'] == f"{base}/2025/07/25/popcasting-487/" and post['date'] == "2025-07-25"
+        assert WordPressHandler.requests == [('GET', "/wp-json/wp/v2/posts"), ('GET', "/2025/07/25/popcasting-487/")]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_parallel_head_probing():
+    """Sin resultado en la API se comprueban las cuatro fechas con HEAD y solo se descarga la que existe."""
+    server, base, client = _serve()
+    try:
+        WordPressHandler.requests = []
+        WordPressHandler.rest_posts = []
+        post = client.find_post_by_number("2025-07-24", "487")
+        assert post['date'] == "2025-07-25"
+        gets = [path for method, path in WordPressHandler.requests if method == 'GET']
+        heads = [path for method, path in WordPressHandler.requests if method == 'HEAD']
+        assert gets == ["/wp-json/wp/v2/posts", "/2025/07/25/popcasting-487/"]
+        assert "/2025/07/25/popcasting-487/" in heads and len(heads) <= 4
+
+        assert client.find_post_by_number("2025-07-24", "999") is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unavailable_site_is_not_recorded_as_missing():
+    """Con 503 no se sabe si el post existe: no se anota como "sin post" hasta que WordPress lo confirma."""
+    server, base, client = _serve()
+    url_map = WordPressURLMap(None, 3600)
+    processor = DataProcessor(RSSDataProcessor(""), WordPressDataProcessor(), url_map)
+    episode = Episode(title="Popcasting999", date="2025-07-24T18:00:00", program_number=999)
+    try:
+        WordPressHandler.rest_posts = []
+        WordPressHandler.unavailable = True
+        try:
+            client.find_post_by_number("2025-07-24", "999")
+            raise AssertionError("Un 503 no puede tomarse como post inexistente")
+        except WordPressUnavailableError:
+            pass
+        assert processor.process_single_episode(episode, client).wordpress is None
+        assert url_map.get(999) is None
+
+        WordPressHandler.unavailable = False
+        assert processor.process_single_episode(episode, client).wordpress is None
+        assert url_map.is_missing(999)
+    finally:
+        WordPressHandler.unavailable = False
+        server.shutdown()
+        server.server_close()
+
+
+def test_catalogue_index():
+    """build_index pagina la API REST y el episodio se resuelve sin descargar su página."""
+    server, base, client = _serve()
+    try:
+        WordPressHandler.requests = []
+        index = client.build_index(per_page=2)
+        assert sorted(index) == [486, 487]
+        assert len(WordPressHandler.requests) == 2
+
+        post = client.find_post_by_number("2025-07-24", "487")
+        assert len(WordPressHandler.requests) == 2
+        assert post['wordpress_url'] == "https://popcastingpop.com/2025/07/25/popcasting-487/"
+        assert post['cover_image_url'] == "https://popcastingpop.com/wp-content/uploads/487.jpg"
+        assert post['web_playlist'] == [
+            {'position': 1, 'artist': 'Vainica Doble', 'title': 'Caramelo'},
+            {'position': 2, 'artist': 'Nick Lowe', 'title': 'Cruel to be kind'},
+        ]
+        assert post['title'] == "Popcasting487" and post['date'] == "2025-07-25"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_rest_slug_resolution_downloads_one_page()
+    test_parallel_head_probing()
+    test_unavailable_site_is_not_recorded_as_missing()
+    test_catalogue_index()
+    print("✅ Pruebas de la localización de posts de WordPress completadas")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del mapa persistente número de programa -> URL del post de WordPress.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar el directorio src al path
+current_dir = Path(__file__).parent
+src_dir = current_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from components.data_processor import DataProcessor
+from components.models import Episode
+from components.rss_data_processor import RSSDataProcessor
+from components.wordpress_data_processor import WordPressDataProcessor
+from components.wordpress_url_map import WordPressURLMap
+
+
+class FakeWordPressClient:
+    """Solo el programa 487 tiene post; registra qué búsquedas se hacen."""
+
+    def __init__(self):
+        self.calls = []
+
+    def find_post_by_number(self, date, number):
+        self.calls.append(('find', number))
+        return self._post(number) if number == "487" else None
+
+    def get_post_details_by_url(self, url, date):
+        self.calls.append(('url', url))
+        return self._post("487") if url.endswith("/popcasting-487/") else None
+
+    def get_post_details_from_index(self, number):
+        return None
+
+    def _post(self, number):
+        return {'title': f"Popcasting{number}", 'date': "2025-07-25",
+                'wordpress_url': f"https://popcastingpop.com/2025/07/25/popcasting-{number}/",
+                'web_playlist': [], 'web_extra_links': []}
+
+
+def _episode(number):
+    return Episode(title=f"Popcasting{number}", date="2025-07-24T18:00:00", program_number=number)
+
+
+def test_found_and_missing_episodes_are_remembered():
+    """Una ejecución resuelve por fechas; la siguiente usa la URL guardada y no repite los fallos."""
+    with tempfile.TemporaryDirectory() as work:
+        client = FakeWordPressClient()
+        processor = DataProcessor(RSSDataProcessor(""), WordPressDataProcessor(), WordPressURLMap(work, 3600))
+        assert processor.process_single_episode(_episode(487), client).wordpress is not None
+        assert processor.process_single_episode(_episode(488), client).wordpress is None
+        assert client.calls == [('find', "487"), ('find', "488")]
+
+        # Nueva ejecución con el mapa guardado en disco
+        client = FakeWordPressClient()
+        url_map = WordPressURLMap(work, 3600)
+        processor = DataProcessor(RSSDataProcessor(""), WordPressDataProcessor(), url_map)
+        linked = processor.process_single_episode(_episode(487), client)
+        assert linked.wordpress.link == "https://popcastingpop.com/2025/07/25/popcasting-487/"
+        assert processor.process_single_episode(_episode(488), client).wordpress is None
+        assert client.calls == [('url', "https://popcastingpop.com/2025/07/25/popcasting-487/")]
+
+        # Cuando caduca el fallo se vuelve a buscar, y la espera se duplica
+        url_map._entries["488"]['retry_after'] = time.time() - 1
+        processor.process_single_episode(_episode(488), client)
+        assert client.calls[-1] == ('find', "488")
+        assert url_map.get(488)['misses'] == 2 and url_map.get(488)['retry_after'] > time.time() + 7000
+
+
+def test_stale_url_is_searched_again():
+    """Si la URL guardada ya no responde se olvida y se busca de nuevo."""
+    url_map = WordPressURLMap(None, 3600)
+    url_map.record_found(487, "https://popcastingpop.com/antigua/", "2025-07-25")
+    client = FakeWordPressClient()
+    processor = DataProcessor(RSSDataProcessor(""), WordPressDataProcessor(), url_map)
+    assert processor.process_single_episode(_episode(487), client).wordpress is not None
+    assert client.calls == [('url', "https://popcastingpop.com/antigua/"), ('find', "487")]
+    assert url_map.get_url(487)['url'] == "https://popcastingpop.com/2025/07/25/popcasting-487/"
+
+
+if __name__ == "__main__":
+    test_found_and_missing_episodes_are_remembered()
+    test_stale_url_is_searched_again()
+    print("✅ Pruebas del mapa de URLs de WordPress completadas")